@@ -19,6 +19,30 @@ from pathlib import Path
 from urllib.parse import urljoin
 from tqdm import tqdm
 
+from node_download import read_chunks
+from node_progress import ProgressReporter
+from node_mirrors import parse_mirrors
+
+
+class TqdmProgress(ProgressReporter):
+    """Relatório de progresso com barra do tqdm (atualizada no máximo 10x por segundo)"""
+    
+    def start(self, total):
+        super().start(total)
+        self.bar = tqdm(
+            total=total or None,
+            unit='B',
+            unit_scale=True,
+            unit_divisor=1024,
+            desc=self.description or "Baixando"
+        )
+    
+    def render(self, downloaded, total):
+        self.bar.update(downloaded - self.bar.n)
+    
+    def close(self):
+        self.bar.close()
+
 
 class NodeDownloader:
     """Classe responsável pelo download e gerenciamento de versões do Node.js"""
@@ -31,7 +55,8 @@ class NodeDownloader:
             base_dir (str): Diretório base onde as versões serão salvas
         """
         self.base_dir = Path(base_dir)
-        self.base_url = "https://nodejs.org/dist/"
+        # Primeiro espelho de NODE_MIRRORS (ex: Artifactory interno) ou o servidor oficial
+        self.base_url = (parse_mirrors(os.environ.get('NODE_MIRRORS')) or ["https://nodejs.org/dist/"])[0]
         
     def validate_version(self, version):
         """
@@ -110,19 +135,20 @@ class NodeDownloader:
             total_size = int(response.headers.get('content-length', 0))
             
             # Configura a barra de progresso
-            with tqdm(
-                total=total_size,
-                unit='B',
-                unit_scale=True,
-                unit_divisor=1024,
-                desc="Baixando"
-            ) as pbar:
-                
+            progress = TqdmProgress("Baixando")
+            progress.start(total_size)
+            
+            # Lê direto no buffer reaproveitado (readinto), com tamanho adaptativo
+            response.raw.decode_content = True
+            try:
                 with open(destination, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                            pbar.update(len(chunk))
+                    downloaded = 0
+                    for chunk in read_chunks(response.raw):
+                        f.write(chunk)
+                        downloaded += len(chunk)
+                        progress.update(downloaded)
+            finally:
+                progress.finish()
             
             return True
             
@@ -14,11 +14,49 @@ Data: 2025-10-30
 import os
 import sys
 import re
+import time
+import shutil
+import tarfile
 import zipfile
+import threading
 from pathlib import Path
-from urllib.request import urlopen, Request, build_opener, ProxyHandler, HTTPSHandler
+from contextlib import redirect_stdout
 from urllib.error import URLError, HTTPError
-import ssl
+
+from node_http import HTTPTransport, BandwidthLimiter
+from node_download import (probe_remote_file, SegmentedDownload, PartState,
+                           RemoteFileChanged, ResumableStream, PrefetchReader,
+                           MIN_SEGMENT_SIZE, read_chunks)
+from node_index import (ReleaseIndex, normalize_version, tar_extension,
+                        PLATFORM_ARTIFACTS, DEFAULT_INDEX_TTL)
+from node_extract import extract_zip_to, sync_zip_to, extract_tar_stream, default_workers
+from node_checksum import ReleaseChecksums, OrderedHasher, ChecksumMismatch
+from node_batch import BatchInstaller, read_versions_file, print_summary
+from node_batch import DEFAULT_DOWNLOAD_JOBS, DEFAULT_EXTRACT_JOBS
+from node_cache import ArchiveCache, TeeReader, default_cache_dir, parse_size, DEFAULT_CACHE_MAX
+from node_progress import ProgressReporter, ConsoleProgress
+from node_mirrors import MirrorSet, parse_mirrors, DEFAULT_MIN_SPEED
+from node_server import serve, DEFAULT_SERVE_PORT
+from node_daemon import run_daemon
+from node_registry import InstallRegistry, print_entries, print_entry, version_key
+from node_remotezip import (RemoteZip, RangeNotSupported, plan_members, install_plan, parse_only,
+                            member_filter, RUNTIME_FIRST)
+from node_metrics import InstallMetrics
+from node_store import BlobStore
+from node_trace import span, start_trace, stop_trace
+
+
+# Servidor oficial de releases do Node.js
+DEFAULT_BASE_URL = "https://nodejs.org/download/release/"
+
+# Plataforma padrão: o ZIP para Windows x64
+DEFAULT_PLATFORM = "win-x64"
+
+# Intervalo (segundos) entre consultas ao registro em `py node.py wait`
+WAIT_INTERVAL = 0.2
+
+# Espera máxima por uma instalação em duas etapas (segundos)
+DEFAULT_WAIT_TIMEOUT = 900
 
 
 def load_env_file(file_path=".env"):
@@ -73,10 +111,41 @@ def get_proxy_from_env():
         return f"http://{host}:{port}"
 
 
+def detect_platform():
+    """
+    Detecta a plataforma da máquina atual no formato dos arquivos do Node.js
+    
+    Returns:
+        str: Plataforma (ex: "win-x64", "linux-x64", "darwin-arm64")
+    """
+    import platform
+    
+    machine = platform.machine().lower()
+    if machine in ('x86_64', 'amd64'):
+        arch = 'x64'
+    elif machine in ('arm64', 'aarch64'):
+        arch = 'arm64'
+    elif machine in ('i386', 'i686', 'x86'):
+        arch = 'x86'
+    else:
+        arch = machine
+    
+    if sys.platform.startswith('win'):
+        system = 'win'
+    elif sys.platform == 'darwin':
+        system = 'darwin'
+    else:
+        system = 'linux'
+    return f"{system}-{arch}"
+
+
 class NodeDownloader:
     """Classe responsável pelo download e gerenciamento de versões do Node.js"""
     
-    def __init__(self, base_dir=None, proxy_url=None, ignore_ssl=False):
+    def __init__(self, base_dir=None, proxy_url=None, ignore_ssl=False, connections=None,
+                 extract_workers=None, platform=None, base_url=None, cache_dir=None, cache_max=None,
+                 bandwidth=None, progress=None, mirrors=None, only=None, lazy=None, store=None,
+                 force=False):
         """
         Inicializa o downloader com o diretório base
         
@@ -84,6 +153,21 @@ class NodeDownloader:
             base_dir (str): Diretório base onde as versões serão salvas
             proxy_url (str): URL do proxy (ex: "http://proxy.empresa.com:8080")
             ignore_ssl (bool): Ignorar verificações SSL (apenas para desenvolvimento)
+            connections (int): Conexões simultâneas por download (1 desativa o modo segmentado)
+            extract_workers (int): Workers de extração do ZIP em paralelo
+            platform (str): Plataforma dos arquivos (ex: "win-x64", "linux-x64", "auto")
+            base_url (str): URL base das releases (padrão: servidor oficial)
+            cache_dir (str): Cache de arquivos por SHA-256 ("off" desativa)
+            cache_max (str): Tamanho máximo do cache (ex: "2G"; 0 = sem limite)
+            bandwidth (str): Limite de banda total em bytes/s (ex: "10M"; 0 = sem limite)
+            progress (type): Classe de relatório de progresso (padrão: ConsoleProgress)
+            mirrors (str|list): Espelhos das releases, em ordem de preferência
+            only (str|list): Instalar só os arquivos que casam com estes padrões ou
+                perfis (ex: "runtime-only", "node.exe,node_modules/npm/*")
+            lazy (bool): Publicar o node.exe primeiro e terminar o restante em segundo plano
+            store (bool): Guardar o conteúdo dos arquivos em base_dir/.store, com as
+                versões ligadas por hard link (arquivos iguais ocupam o disco uma vez)
+            force (bool): Reinstalar versões já instaladas (só os arquivos alterados são regravados)
         """
         # Define diretório base: parâmetro > variável de ambiente > padrão
         if base_dir:
@@ -93,46 +177,122 @@ class NodeDownloader:
         else:
             self.base_dir = Path("d:/nvm")
             
-        self.base_url = "https://nodejs.org/download/release/"
+        # Espelhos: parâmetro > variável de ambiente. O principal (base_url ou
+        # o primeiro espelho) fornece o índice e os checksums
+        mirror_list = parse_mirrors(mirrors or os.environ.get('NODE_MIRRORS'))
+        self.base_url = base_url or (mirror_list[0] if mirror_list else DEFAULT_BASE_URL)
+        if not self.base_url.endswith('/'):
+            self.base_url += '/'
+        self.mirrors = MirrorSet(
+            [self.base_url] + [mirror for mirror in mirror_list if mirror != self.base_url],
+            self.base_dir / ".cache" / "mirrors.json",
+            self._open_url,
+        )
+        self.min_speed = parse_size(os.environ.get('MIRROR_MIN_SPEED') or DEFAULT_MIN_SPEED)
         
-        # Configuração de proxy e SSL
-        self.opener = None
-        if proxy_url or ignore_ssl:
-            handlers = []
-            
-            # Configurar proxy se fornecido
-            if proxy_url:
-                proxy_handler = ProxyHandler({'http': proxy_url, 'https': proxy_url})
-                handlers.append(proxy_handler)
-                print(f"🌐 Usando proxy: {proxy_url}")
-            
-            # Configurar SSL se necessário
-            if ignore_ssl:
-                ssl_context = ssl.create_default_context()
-                ssl_context.check_hostname = False
-                ssl_context.verify_mode = ssl.CERT_NONE
-                https_handler = HTTPSHandler(context=ssl_context)
-                handlers.append(https_handler)
-                print("⚠️  Verificação SSL desabilitada (apenas para desenvolvimento)")
-            
-            if handlers:
-                self.opener = build_opener(*handlers)
-    
-    def _open_url(self, url, timeout=10):
+        # Plataforma: parâmetro > variável de ambiente > Windows x64
+        self.platform = platform or os.environ.get('NODE_PLATFORM') or DEFAULT_PLATFORM
+        if self.platform == 'auto':
+            self.platform = detect_platform()
+        if self.platform not in PLATFORM_ARTIFACTS:
+            raise ValueError(f"Plataforma não suportada: {self.platform}")
+        
+        # Conexões por download: parâmetro > variável de ambiente > padrão
+        if connections:
+            self.connections = int(connections)
+        else:
+            self.connections = int(os.environ.get('DOWNLOAD_CONNECTIONS', 4))
+        
+        # Workers de extração: parâmetro > variável de ambiente > um por núcleo
+        if extract_workers:
+            self.extract_workers = int(extract_workers)
+        else:
+            self.extract_workers = int(os.environ.get('EXTRACT_WORKERS', default_workers()))
+        
+        # Instalação parcial: parâmetro > variável de ambiente > completa
+        self.only = parse_only(only or os.environ.get('NODE_ONLY'))
+        
+        # Instalação em duas etapas (node.exe primeiro): parâmetro > variável de ambiente
+        self.lazy = lazy if lazy is not None else os.environ.get('NODE_LAZY', '').lower() == 'true'
+        self._pending = {}
+        
+        # Armazenamento por conteúdo: parâmetro > variável de ambiente > desligado
+        if store is None:
+            store = os.environ.get('NODE_STORE', '').lower() == 'true'
+        self.store = BlobStore(self.base_dir / ".store") if store else None
+        self.force = force
+        
+        # Índice de versões (index.json) com cache em base_dir/.cache
+        self.index = ReleaseIndex(
+            self.base_url,
+            self.base_dir / ".cache",
+            self._open_url,
+            ttl=int(os.environ.get('INDEX_TTL', DEFAULT_INDEX_TTL)),
+        )
+        
+        # Versões instaladas (base_dir/installed.json)
+        self.registry = InstallRegistry(self.base_dir)
+        
+        # Tempo, bytes e vazão de cada fase das instalações (--report, --json)
+        self.metrics = InstallMetrics()
+        
+        # SHASUMS256.txt de cada versão, também em base_dir/.cache
+        self.checksums = ReleaseChecksums(self.base_url, self.base_dir / ".cache", self._open_url)
+        
+        # Cache de arquivos por SHA-256, compartilhável entre NVM_DIR e máquinas:
+        # parâmetro > variável de ambiente > diretório do usuário
+        cache_dir = cache_dir or os.environ.get('NODE_ARCHIVE_CACHE') or default_cache_dir()
+        cache_max = cache_max or os.environ.get('NODE_ARCHIVE_CACHE_MAX') or DEFAULT_CACHE_MAX
+        if str(cache_dir).lower() in ('off', 'none', 'false', '0'):
+            self.archive_cache = None
+        else:
+            self.archive_cache = ArchiveCache(Path(cache_dir), parse_size(cache_max))
+        
+        # Configuração de proxy e SSL: todas as requisições passam pelo
+        # mesmo transporte, que mantém as conexões abertas entre chamadas
+        if proxy_url:
+            print(f"🌐 Usando proxy: {proxy_url}")
+        if ignore_ssl:
+            print("⚠️  Verificação SSL desabilitada (apenas para desenvolvimento)")
+        
+        # Limite de banda: vale para todas as conexões juntas (ex: instalação em lote)
+        bandwidth = parse_size(bandwidth or os.environ.get('DOWNLOAD_BANDWIDTH') or 0)
+        limiter = BandwidthLimiter(bandwidth) if bandwidth else None
+        if limiter:
+            print(f"🚦 Limite de banda: {bandwidth // 1024} KB/s")
+        self.transport = HTTPTransport(proxy_url=proxy_url, ignore_ssl=ignore_ssl, limiter=limiter)
+        
+        # Progresso na mesma linha (desligado quando há vários downloads simultâneos)
+        self.show_progress = True
+        self.progress_class = progress or ConsoleProgress
+        
+    def _open_url(self, url, timeout=10, headers=None, method=None):
         """
         Abre uma URL usando as configurações de proxy/SSL
         
+        A conexão é devolvida ao pool do transporte quando a resposta é
+        fechada (use sempre com `with`).
+        
         Args:
             url (str): URL para abrir
             timeout (int): Timeout em segundos
+            headers (dict): Cabeçalhos adicionais (ex: Range)
+            method (str): Método HTTP (padrão: GET)
             
         Returns:
             Response object
         """
-        if self.opener:
-            return self.opener.open(url, timeout=timeout)
-        else:
-            return urlopen(url, timeout=timeout)
+        return self.transport.open(url, timeout=timeout, headers=headers, method=method)
+    
+    def pool_stats(self):
+        """
+        Estatísticas do pool de conexões
+        
+        Returns:
+            dict: requests, opened (conexões novas), reused (reaproveitadas),
+                  tls_resumed (sessões TLS retomadas), idle (conexões ociosas)
+        """
+        return self.transport.stats()
         
     def validate_version(self, version):
         """
@@ -162,10 +322,94 @@ class NodeDownloader:
         version_dir.mkdir(parents=True, exist_ok=True)
         return version_dir
     
+    def resolve_spec(self, spec):
+        """
+        Converte uma versão, intervalo ou apelido em uma versão exata
+        
+        Aceita "18.17.0", "v18.17.0", "18", "^18.17", ">=16 <19", "latest",
+        "lts", "lts/hydrogen", "lts/-1" (ver node_semver). Só versões que
+        publicam o arquivo da plataforma configurada são consideradas.
+        
+        Args:
+            spec (str): Especificação da versão
+            
+        Returns:
+            str: Versão exata (ex: "18.17.0")
+            
+        Raises:
+            ValueError: Se a especificação for inválida
+            Exception: Se nenhuma versão corresponder ou o índice estiver indisponível
+        """
+        if self.validate_version(normalize_version(spec)):
+            return normalize_version(spec)
+        if not self.index.available():
+            raise Exception("Intervalos e apelidos de versão precisam do índice (index.json)")
+        version = self.index.table().resolve(spec, PLATFORM_ARTIFACTS[self.platform])
+        if version is None:
+            raise Exception(f"Nenhuma versão com {self._artifact_label()} corresponde a '{spec}'")
+        return version
+    
     def get_download_url(self, version):
         """
         Encontra a URL de download correta para a versão especificada
         
+        Consulta o índice de versões (index.json em cache). Se o servidor
+        não publicar o índice, recorre à página HTML da versão.
+        
+        Args:
+            version (str): Versão do Node.js
+            
+        Returns:
+            tuple: (URL completa para download, nome do arquivo)
+        """
+        if not self.index.available():
+            return self._scrape_download_url(version)
+        
+        located = self.index.artifact_url(version, PLATFORM_ARTIFACTS[self.platform])
+        if located:
+            return located
+        
+        version = f"v{normalize_version(version)}"
+        if not self.index.has_version(version):
+            raise Exception(f"Versão {version} não encontrada no site do Node.js")
+        raise Exception(f"Arquivo {self._artifact_label()} não encontrado para a versão {version}")
+    
+    def resolve_versions(self, versions):
+        """
+        Resolve as URLs de download de várias versões de uma só vez
+        
+        Com o índice disponível, custa no máximo uma requisição no total.
+        
+        Args:
+            versions (list): Versões do Node.js (também intervalos e apelidos)
+            
+        Returns:
+            dict: versão -> (URL, nome do arquivo) ou None se não encontrada
+        """
+        with span("resolve_versions", 'phase', versions=list(versions)):
+            if self.index.available():
+                exact = {}
+                for version in versions:
+                    try:
+                        exact[version] = self.resolve_spec(version)
+                    except Exception:
+                        exact[version] = None
+                located = self.index.resolve_many([v for v in exact.values() if v],
+                                                  PLATFORM_ARTIFACTS[self.platform])
+                return {version: located.get(exact[version]) for version in versions}
+            
+            resolved = {}
+            for version in versions:
+                try:
+                    resolved[version] = self._scrape_download_url(version)
+                except Exception:
+                    resolved[version] = None
+            return resolved
+    
+    def _scrape_download_url(self, version):
+        """
+        Encontra a URL de download lendo a página HTML da versão
+        
         Args:
             version (str): Versão do Node.js
             
@@ -183,40 +427,8 @@ class NodeDownloader:
             print(f"Verificando versão em: {version_url}")
             with self._open_url(version_url, timeout=10) as response:
                 html_content = response.read().decode('utf-8')
-                
-            # Procura por links de arquivos ZIP para Windows x64
-            zip_pattern = r'href="(node-v[\d.]+.*?-win-x64\.zip)"'
-            zip_matches = re.findall(zip_pattern, html_content)
             
-            if zip_matches:
-                filename = zip_matches[0]
-                # Verifica se o filename já contém caminho completo ou relativo
-                if filename.startswith('http'):
-                    # É uma URL completa
-                    full_url = filename
-                elif filename.startswith('/'):
-                    # É um caminho absoluto do site
-                    full_url = f"https://nodejs.org{filename}"
-                else:
-                    # É um arquivo relativo à página atual
-                    full_url = version_url + filename
-                return full_url, filename.split('/')[-1]  # Retorna apenas o nome do arquivo
-            else:
-                # Fallback: procura qualquer arquivo ZIP que contenha "win" e "x64"
-                general_pattern = r'href="(.*?win.*?x64.*?\.zip)"'
-                general_matches = re.findall(general_pattern, html_content)
-                if general_matches:
-                    filename = general_matches[0]
-                    # Mesmo tratamento para o fallback
-                    if filename.startswith('http'):
-                        full_url = filename
-                    elif filename.startswith('/'):
-                        full_url = f"https://nodejs.org{filename}"
-                    else:
-                        full_url = version_url + filename
-                    return full_url, filename.split('/')[-1]
-                else:
-                    raise Exception(f"Arquivo ZIP para Windows x64 não encontrado para a versão {version}")
+            return self._parse_release_page(version, version_url, html_content)
                     
         except HTTPError as e:
             if e.code == 404:
@@ -226,6 +438,79 @@ class NodeDownloader:
         except URLError as e:
             raise Exception(f"Erro de conexão: {e.reason}")
     
+    def _parse_release_page(self, version, version_url, html_content):
+        """
+        Procura o link do arquivo da plataforma na página HTML da versão
+        
+        Args:
+            version (str): Versão do Node.js (com 'v')
+            version_url (str): URL da página da versão
+            html_content (str): Conteúdo da página
+            
+        Returns:
+            tuple: (URL completa para download, nome do arquivo)
+        """
+        # Procura por links do arquivo da plataforma (ZIP no Windows, tarball no Linux/macOS)
+        zip_pattern, general_pattern = self._link_patterns(version)
+        zip_matches = re.findall(zip_pattern, html_content)
+        
+        if zip_matches:
+            filename = zip_matches[0]
+            # Verifica se o filename já contém caminho completo ou relativo
+            if filename.startswith('http'):
+                # É uma URL completa
+                full_url = filename
+            elif filename.startswith('/'):
+                # É um caminho absoluto do site
+                full_url = f"https://nodejs.org{filename}"
+            else:
+                # É um arquivo relativo à página atual
+                full_url = version_url + filename
+            return full_url, filename.split('/')[-1]  # Retorna apenas o nome do arquivo
+        else:
+            # Fallback: procura qualquer arquivo da plataforma (ex: "win" e "x64")
+            general_matches = re.findall(general_pattern, html_content)
+            if general_matches:
+                filename = general_matches[0]
+                # Mesmo tratamento para o fallback
+                if filename.startswith('http'):
+                    full_url = filename
+                elif filename.startswith('/'):
+                    full_url = f"https://nodejs.org{filename}"
+                else:
+                    full_url = version_url + filename
+                return full_url, filename.split('/')[-1]
+            else:
+                raise Exception(f"Arquivo {self._artifact_label()} não encontrado para a versão {version}")
+    
+    def _link_patterns(self, version):
+        """
+        Expressões para encontrar o arquivo da plataforma na página HTML
+        
+        Args:
+            version (str): Versão do Node.js
+            
+        Returns:
+            tuple: (padrão exato, padrão de fallback)
+        """
+        platform = re.escape(self.platform)
+        if self.platform.startswith('win-'):
+            if self.platform == 'win-x64':
+                return r'href="(node-v[\d.]+.*?-win-x64\.zip)"', r'href="(.*?win.*?x64.*?\.zip)"'
+            return rf'href="(node-v[\d.]+.*?-{platform}\.zip)"', rf'href="(.*?{platform}.*?\.zip)"'
+        
+        ext = tar_extension(version)
+        return (rf'href="(node-v[\d.]+.*?-{platform}\.tar\.{ext})"',
+                rf'href="(.*?{platform}.*?\.tar\.(?:xz|gz))"')
+    
+    def _artifact_label(self):
+        """Descrição do arquivo da plataforma para mensagens"""
+        if self.platform == 'win-x64':
+            return "ZIP para Windows x64"
+        if self.platform.startswith('win-'):
+            return f"ZIP para {self.platform}"
+        return f"tarball para {self.platform}"
+    
     def check_version_exists(self, version):
         """
         Verifica se a versão existe no servidor
@@ -236,61 +521,87 @@ class NodeDownloader:
         Returns:
             bool: True se existe, False caso contrário
         """
+        # Com o índice, a existência é respondida sem acessar o arquivo
+        if self.index.available():
+            try:
+                return self.index.artifact_url(version, PLATFORM_ARTIFACTS[self.platform]) is not None
+            except Exception:
+                return False
+        
         try:
-            url, filename = self.get_download_url(version)
+            url, _ = self._scrape_download_url(version)
             # Faz uma requisição HEAD para verificar se o arquivo existe
-            req = Request(url, method='HEAD')
-            if self.opener:
-                with self.opener.open(req, timeout=10) as response:
-                    return response.status == 200
-            else:
-                with urlopen(req, timeout=10) as response:
-                    return response.status == 200
+            with self._open_url(url, timeout=10, method='HEAD') as response:
+                return response.status == 200
         except Exception:
             return False
     
-    def download_file(self, url, destination):
+    def download_file(self, url, destination, sha256=None, stats=None):
         """
         Faz o download de um arquivo usando urllib
         
+        Quando o servidor aceita requisições Range, o arquivo é dividido em
+        faixas baixadas em paralelo (ver self.connections). Caso contrário,
+        usa uma única conexão.
+        
+        Os bytes são gravados em `<destination>.part` e o progresso em
+        `<destination>.part.json`. Se o download for interrompido, a próxima
+        chamada continua de onde parou (Range/If-Range). O arquivo só recebe
+        o nome final quando estiver completo.
+        
+        Com sha256, o hash é calculado enquanto os bytes são gravados e o
+        arquivo só é aceito se conferir; caso contrário é baixado de novo
+        uma vez antes de desistir.
+        
         Args:
             url (str): URL para download
             destination (Path): Caminho de destino
+            sha256 (str): SHA-256 esperado (None para não verificar)
+            stats (dict): Recebe bytes (transferidos nesta execução) e hash_seconds
             
         Returns:
             bool: True se sucesso, False caso contrário
         """
+        part_path = destination.with_name(destination.name + '.part')
+        
         try:
-            print(f"Iniciando download de: {url}")
+            urls = self._mirror_urls(url, part_path)
+            print(f"Iniciando download de: {urls[0]}")
             
-            with self._open_url(url, timeout=30) as response:
-                # Obtém o tamanho total do arquivo
-                content_length = response.headers.get('Content-Length')
-                total_size = int(content_length) if content_length else 0
-                
-                # Lê e escreve o arquivo em chunks
-                with open(destination, 'wb') as f:
-                    downloaded = 0
-                    chunk_size = 8192
-                    
-                    while True:
-                        chunk = response.read(chunk_size)
-                        if not chunk:
-                            break
-                        
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        
-                        # Mostra progresso simples
-                        if total_size > 0:
-                            percentage = (downloaded / total_size) * 100
-                            print(f"\rProgresso: {percentage:.1f}% ({downloaded // 1024 // 1024} MB)", end='', flush=True)
-                        else:
-                            print(f"\rBaixado: {downloaded // 1024 // 1024} MB", end='', flush=True)
-                
-                print()  # Nova linha após o progresso
-            return True
+            for attempt in range(2):
+                info, urls = self._probe_mirrors(urls)
+                try:
+                    if info.accept_ranges and info.size > 0:
+                        success = self._download_ranges(urls[0], part_path, info, sha256,
+                                                        alternates=urls[1:], stats=stats)
+                    else:
+                        success = self._download_single(urls[0], part_path, sha256, stats=stats)
+                    break
+                except RemoteFileChanged:
+                    # O arquivo mudou no servidor: descarta o parcial e recomeça
+                    print("\nArquivo remoto foi alterado, reiniciando o download...")
+                    self._discard_partial(part_path)
+                    if attempt == 1:
+                        raise
+                except ChecksumMismatch as e:
+                    # Bytes corrompidos: o parcial não serve nem para retomar
+                    print(f"\n❌ {e}")
+                    self._discard_partial(part_path)
+                    if attempt == 1:
+                        print("❌ Arquivo recusado: o download não confere com o SHASUMS256.txt")
+                        return False
+                    print("Baixando novamente...")
+            
+            if success:
+                if sha256:
+                    print("✅ SHA-256 conferido")
+                with span("rename", 'publish', target=str(destination)):
+                    os.replace(part_path, destination)
+            return success
             
+        except KeyboardInterrupt:
+            print("\nDownload interrompido. Execute novamente para continuar de onde parou.")
+            raise
         except (URLError, HTTPError) as e:
             print(f"\nErro durante o download: {e}")
             return False
@@ -298,62 +609,248 @@ class NodeDownloader:
             print(f"\nErro inesperado: {e}")
             return False
     
-    def extract_zip(self, zip_path, extract_to):
+    def _mirror_urls(self, url, part_path=None):
+        """
+        URLs do arquivo em cada espelho, começando pelo mais rápido
+        
+        Args:
+            url (str): URL do arquivo no espelho principal
+            part_path (Path): Download parcial (continua no espelho em que começou)
+            
+        Returns:
+            list: URLs em ordem de preferência (só [url] sem outros espelhos)
+        """
+        if len(self.mirrors) < 2:
+            return [url]
+        urls = self.mirrors.urls_for(url)
+        
+        # ETag e faixas do .part valem para o espelho em que o download começou
+        state = PartState.load(part_path) if part_path else None
+        if state and state.url in urls:
+            urls.remove(state.url)
+            urls.insert(0, state.url)
+        
+        print(f"🌐 Espelho escolhido: {self.mirrors.mirror_of(urls[0])}")
+        return urls
+    
+    def _probe_mirrors(self, urls):
+        """
+        Sonda o arquivo no primeiro espelho que responder
+        
+        Args:
+            urls (list): URLs em ordem de preferência
+            
+        Returns:
+            tuple: (RemoteFileInfo, URLs a partir do espelho que respondeu)
+        """
+        for index, url in enumerate(urls):
+            try:
+                return probe_remote_file(self._open_url, url), urls[index:]
+            except (URLError, HTTPError, OSError) as e:
+                if index == len(urls) - 1:
+                    raise
+                self._mirror_failed(url, e)
+    
+    def _mirror_failed(self, url, error):
+        """
+        Registra que um espelho falhou ou ficou lento demais durante uma transferência
+        
+        Args:
+            url (str): URL abandonada
+            error (Exception): Motivo
+        """
+        print(f"\n⚠️  Trocando de espelho: {self.mirrors.mirror_of(url) or url} ({error})")
+        self.mirrors.record_failure(url)
+    
+    def _download_ranges(self, url, part_path, info, sha256=None, alternates=None, stats=None):
+        """
+        Baixa o arquivo por faixas HTTP Range, retomando um .part existente
+        
+        Args:
+            url (str): URL para download
+            part_path (Path): Arquivo .part de destino
+            info (RemoteFileInfo): Resultado da sondagem do servidor
+            sha256 (str): SHA-256 esperado (None para não verificar)
+            alternates (list): Mesmo arquivo em outros espelhos (troca se travar)
+            stats (dict): Recebe bytes (transferidos nesta execução) e hash_seconds
+            
+        Returns:
+            bool: True se sucesso, False caso contrário
+        
+        Raises:
+            ChecksumMismatch: Se o arquivo completo não conferir com sha256
+        """
+        state = PartState.load(part_path)
+        if state and state.url == url and state.matches(info):
+            done = state.completed_bytes()
+            print(f"Retomando download: {done // 1024 // 1024} de {info.size // 1024 // 1024} MB já baixados")
+        else:
+            self._discard_partial(part_path)
+            state = PartState(part_path, url, info.size, info.etag, info.last_modified)
+        
+        connections = self.connections if info.size >= 2 * MIN_SEGMENT_SIZE else 1
+        if connections > 1:
+            print(f"Download segmentado: {connections} conexões")
+        
+        # O hash acompanha as faixas gravadas; o que já estava no .part é lido uma vez
+        hasher = OrderedHasher(part_path, completed=state.ranges) if sha256 else None
+        
+        reporter = self._progress_reporter("Baixando")
+        reporter.start(info.size)
+        download = SegmentedDownload(
+            self._open_url, url, part_path, info.size,
+            connections=connections,
+            progress=reporter,
+            state=state,
+            hasher=hasher,
+            alternates=alternates,
+            min_speed=self.min_speed,
+            failover=self._mirror_failed,
+        )
+        done_before = download.downloaded
+        started = time.monotonic()
+        try:
+            success = download.run()
+        finally:
+            reporter.finish()
+        
+        # A vazão real alimenta o histórico (se o espelho não foi abandonado)
+        if success and not download.failovers:
+            self.mirrors.record(url, download.downloaded - done_before, time.monotonic() - started)
+        if stats is not None:
+            stats['bytes'] = download.downloaded - done_before
+            stats['hash_seconds'] = hasher.seconds if hasher else None
+        
+        if success:
+            if hasher:
+                hasher.verify(sha256, part_path.name[:-len('.part')])
+            state.remove()
+        return success
+    
+    def _discard_partial(self, part_path):
+        """
+        Remove um download parcial e seu arquivo de estado
+        
+        Args:
+            part_path (Path): Arquivo .part
+        """
+        for path in (part_path, part_path.with_name(part_path.name + '.json')):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+    
+    def _download_single(self, url, destination, sha256=None, stats=None):
+        """
+        Baixa o arquivo em uma única conexão
+        
+        Args:
+            url (str): URL para download
+            destination (Path): Caminho de destino
+            sha256 (str): SHA-256 esperado (None para não verificar)
+            stats (dict): Recebe bytes e hash_seconds
+            
+        Returns:
+            bool: True se sucesso, False caso contrário
+        
+        Raises:
+            ChecksumMismatch: Se o arquivo não conferir com sha256
+        """
+        hasher = OrderedHasher(destination) if sha256 else None
+        reporter = self._progress_reporter("Baixando")
+        with self._open_url(url, timeout=30) as response:
+            # Obtém o tamanho total do arquivo
+            content_length = response.headers.get('Content-Length')
+            total_size = int(content_length) if content_length else 0
+            reporter.start(total_size)
+            
+            # Lê e escreve o arquivo em blocos (buffer reaproveitado, tamanho adaptativo)
+            try:
+                with open(destination, 'wb') as f:
+                    downloaded = 0
+                    for chunk in read_chunks(response):
+                        f.write(chunk)
+                        if hasher:
+                            hasher.update(downloaded, chunk)
+                        downloaded += len(chunk)
+                        reporter.update(downloaded)
+            finally:
+                reporter.finish()
+        
+        if stats is not None:
+            stats['bytes'] = downloaded
+            stats['hash_seconds'] = hasher.seconds if hasher else None
+        if hasher:
+            hasher.verify(sha256, destination.name[:-len('.part')])
+        return True
+    
+    def _progress_reporter(self, description):
+        """
+        Cria o relatório de progresso de um download
+        
+        Args:
+            description (str): Texto exibido junto ao progresso
+            
+        Returns:
+            ProgressReporter: Relatório configurado (silencioso se show_progress=False)
+        """
+        if not self.show_progress:
+            return ProgressReporter(description)
+        return self.progress_class(description)
+    
+    def extract_zip(self, zip_path, extract_to, remove_zip=True, stats=None):
         """
         Extrai um arquivo ZIP e organiza os arquivos
         
+        Cada arquivo é descompactado uma única vez, direto para o caminho
+        final sem a pasta node-v{versão}-win-x64/, em um diretório de
+        preparação que substitui extract_to com um rename no final. Os
+        membros são divididos entre self.extract_workers workers.
+        
+        Se extract_to já existe (reparo, --force), só os arquivos que
+        diferem do ZIP são regravados, conferidos pelo manifesto da
+        extração anterior em base_dir/.manifests.
+        
         Args:
             zip_path (Path): Caminho do arquivo ZIP
             extract_to (Path): Diretório de destino final
+            remove_zip (bool): Remover o ZIP após a extração (False para o do cache)
+            stats (dict): Recebe as estatísticas da extração (files, bytes)
             
         Returns:
             bool: True se sucesso, False caso contrário
         """
-        import shutil
-        import tempfile
-        
         try:
             print(f"Extraindo arquivo: {zip_path}")
             
-            # Cria um diretório temporário para extração
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_path = Path(temp_dir)
-                
-                # Extrai o ZIP no diretório temporário
-                with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                    zip_ref.extractall(temp_path)
-                
-                # Procura pela pasta extraída (normalmente node-v{version}-win-x64)
-                extracted_folders = [d for d in temp_path.iterdir() if d.is_dir()]
-                
-                if not extracted_folders:
-                    print("Erro: Nenhuma pasta encontrada no arquivo ZIP")
-                    return False
-                
-                source_folder = extracted_folders[0]  # Primeira (e geralmente única) pasta
-                print(f"Movendo conteúdo de: {source_folder.name}")
-                
-                # Move todos os arquivos da pasta extraída para o destino final
-                for item in source_folder.iterdir():
-                    dest_item = extract_to / item.name
-                    
-                    if item.is_dir():
-                        if dest_item.exists():
-                            shutil.rmtree(dest_item)
-                        shutil.copytree(item, dest_item)
-                    else:
-                        if dest_item.exists():
-                            dest_item.unlink()
-                        shutil.copy2(item, dest_item)
-                
-                print(f"Arquivos organizados em: {extract_to}")
+            reused_before = self.store.reused_bytes if self.store else 0
+            manifest_path = self.base_dir / ".manifests" / f"{extract_to.name}.json"
+            if extract_to.is_dir() and any(extract_to.iterdir()):
+                result = sync_zip_to(zip_path, extract_to, workers=self.extract_workers,
+                                     store=self.store, manifest_path=manifest_path)
+                print(f"♻️  Reinstalação incremental: {result['written']} arquivos regravados, "
+                      f"{result['unchanged']} iguais, {result['removed']} removidos")
+            else:
+                result = extract_zip_to(zip_path, extract_to, workers=self.extract_workers,
+                                        store=self.store, manifest_path=manifest_path)
+            if not result['files']:
+                print("Erro: Nenhum arquivo encontrado no arquivo ZIP")
+                return False
+            if stats is not None:
+                stats.update(result)
+            
+            print(f"Arquivos organizados em: {extract_to} ({result['files']} arquivos, {result['workers']} workers)")
+            if self.store and self.store.reused_bytes > reused_before:
+                saved = (self.store.reused_bytes - reused_before) / 1024 / 1024
+                print(f"🔗 {saved:.1f} MB já estavam no armazenamento (ligados por hard link)")
             
             # Remove o arquivo ZIP após extração bem-sucedida
-            try:
-                zip_path.unlink()
-                print(f"Arquivo ZIP removido: {zip_path}")
-            except Exception as e:
-                print(f"Aviso: Não foi possível remover o ZIP: {e}")
+            if remove_zip:
+                try:
+                    zip_path.unlink()
+                    print(f"Arquivo ZIP removido: {zip_path}")
+                except Exception as e:
+                    print(f"Aviso: Não foi possível remover o ZIP: {e}")
             
             return True
             
@@ -364,83 +861,828 @@ class NodeDownloader:
             print(f"Erro ao extrair arquivo: {e}")
             return False
     
-    def download_version(self, version, extract=True):
+    def stream_install(self, url, version_dir, compression, sha256=None, filename=None, stats=None):
+        """
+        Baixa e extrai um tarball ao mesmo tempo
+        
+        Os bytes recebidos alimentam a descompactação diretamente (uma
+        thread recebe enquanto outra extrai), então o tempo total fica
+        próximo do maior entre download e extração, e não da soma. Se a
+        conexão cair, o download continua de onde parou via Range.
+        
+        Args:
+            url (str): URL do tarball (.tar.xz ou .tar.gz)
+            version_dir (Path): Diretório de destino final
+            compression (str): "xz" ou "gz"
+            sha256 (str): SHA-256 esperado; a versão só é publicada se conferir
+            filename (str): Nome do arquivo; com ele, uma cópia vai para o cache
+            stats (dict): Recebe as estatísticas da extração (files, bytes) e hash_seconds
+            
+        Returns:
+            bool: True se sucesso, False caso contrário
+        """
+        try:
+            print(f"Baixando e extraindo: {url}")
+            
+            reporter = self._progress_reporter("Baixando e extraindo")
+            urls = self._mirror_urls(url)
+            for attempt in range(2):
+                stream = ResumableStream(self._open_url, urls[0], progress=reporter, sha256=sha256,
+                                         alternates=urls[1:], min_speed=self.min_speed,
+                                         failover=self._mirror_failed)
+                reporter.start(stream.total_size)
+                
+                # Os bytes recebidos também são gravados no cache, sem nova leitura
+                writer = self._cache_writer(filename)
+                reader = PrefetchReader(TeeReader(stream, writer) if writer else stream)
+                try:
+                    result = extract_tar_stream(reader, version_dir, compression, store=self.store)
+                    if writer:
+                        self._store_in_cache(writer.commit, stream.hexdigest())
+                    break
+                except ChecksumMismatch as e:
+                    # A extração em preparação é descartada; nada foi publicado
+                    print(f"\n❌ {e}")
+                    if attempt == 1:
+                        print("❌ Arquivo recusado: o download não confere com o SHASUMS256.txt")
+                        return False
+                    print("Baixando novamente...")
+                finally:
+                    reader.close()
+                    if writer:
+                        writer.abort()
+            
+            reporter.finish()
+            if sha256:
+                print("✅ SHA-256 conferido")
+            if stats is not None:
+                stats.update(result)
+                stats['hash_seconds'] = stream.hash_seconds if sha256 else None
+            print(f"Arquivos organizados em: {version_dir} ({result['files']} arquivos)")
+            return True
+            
+        except KeyboardInterrupt:
+            print("\nDownload interrompido.")
+            raise
+        except (URLError, HTTPError) as e:
+            print(f"\nErro durante o download: {e}")
+            return False
+        except tarfile.TarError as e:
+            print(f"\nErro: Arquivo corrompido: {e}")
+            return False
+        except Exception as e:
+            print(f"\nErro ao extrair arquivo: {e}")
+            return False
+    
+    def extract_tarball(self, tarball_path, version_dir, compression, stats=None):
+        """
+        Extrai um tarball já presente em disco (ex: do cache)
+        
+        Args:
+            tarball_path (Path): Arquivo .tar.xz/.tar.gz
+            version_dir (Path): Diretório de destino final
+            compression (str): "xz" ou "gz"
+            stats (dict): Recebe as estatísticas da extração (files, bytes)
+            
+        Returns:
+            bool: True se sucesso, False caso contrário
+        """
+        try:
+            print(f"Extraindo arquivo: {tarball_path}")
+            with open(tarball_path, 'rb') as f:
+                result = extract_tar_stream(f, version_dir, compression, store=self.store)
+            if stats is not None:
+                stats.update(result)
+            print(f"Arquivos organizados em: {version_dir} ({result['files']} arquivos)")
+            return True
+        except tarfile.TarError as e:
+            print(f"Erro: Arquivo corrompido: {e}")
+            return False
+        except Exception as e:
+            print(f"Erro ao extrair arquivo: {e}")
+            return False
+    
+    def _cache_writer(self, filename):
+        """
+        Abre uma gravação no cache de arquivos
+        
+        Args:
+            filename (str): Nome do arquivo (None não grava)
+            
+        Returns:
+            CacheWriter: Gravação aberta ou None (cache desativado ou indisponível)
+        """
+        if not self.archive_cache or not filename:
+            return None
+        try:
+            return self.archive_cache.writer(filename)
+        except OSError as e:
+            print(f"⚠️  Cache de arquivos indisponível: {e}")
+            return None
+    
+    def _store_in_cache(self, store, *args):
+        """
+        Guarda um arquivo no cache sem interromper a instalação em caso de erro
+        
+        Args:
+            store (callable): ArchiveCache.add ou CacheWriter.commit
+            *args: Argumentos repassados a store
+        """
+        try:
+            path = store(*args)
+            print(f"📦 Arquivo guardado no cache: {path}")
+        except OSError as e:
+            print(f"⚠️  Não foi possível guardar o arquivo no cache: {e}")
+    
+    def _is_installed(self, version_dir):
+        """
+        Verifica se o executável do Node.js existe no diretório da versão
+        
+        Args:
+            version_dir (Path): Diretório da versão
+            
+        Returns:
+            bool: True se node.exe (Windows) ou bin/node (Linux/macOS) existir
+        """
+        return self._find_executable(version_dir) is not None
+    
+    def _find_executable(self, version_dir):
+        """
+        Localiza o executável do Node.js no diretório da versão
+        
+        Args:
+            version_dir (Path): Diretório da versão
+            
+        Returns:
+            str: "node.exe" ou "bin/node" (relativo ao diretório) ou None
+        """
+        for executable in ("node.exe", "bin/node"):
+            if (version_dir / executable).exists():
+                return executable
+        return None
+    
+    def is_version_installed(self, version):
+        """
+        Verifica pelo registro se uma versão está instalada
+        
+        Uma entrada cujo executável sumiu (diretório apagado à mão) é
+        removida. Instalações anteriores ao registro são incorporadas.
+        
+        Args:
+            version (str): Versão exata (ex: "18.17.0")
+            
+        Returns:
+            bool: True se instalada
+        """
+        version_dir = self.base_dir / f"v{version}"
+        entry = self.registry.get(version)
+        if entry:
+            if (version_dir / entry['executable']).exists():
+                return True
+            self.registry.remove(version)
+            return False
+        
+        # Diretório de antes do registro: registra sem o hash de origem
+        executable = self._find_executable(version_dir)
+        if executable is None:
+            return False
+        self.registry.record(version, version_dir, executable)
+        return True
+    
+    def _covers(self, version, only=None):
+        """
+        Verifica se a instalação registrada tem os arquivos pedidos
+        
+        Args:
+            version (str): Versão instalada
+            only (list): Padrões pedidos (None = instalação completa)
+            
+        Returns:
+            bool: True se a instalação é completa ou inclui todos os padrões pedidos
+        """
+        entry = self.registry.get(version)
+        if entry and entry.get('state'):
+            # Só o runtime: o restante ainda está sendo instalado ou falhou
+            return False
+        installed = entry.get('only') if entry else None
+        if installed is None:
+            return True
+        return only is not None and set(only) <= set(installed)
+    
+    def prepare_install(self, version, resolved=None):
+        """
+        Primeira fase da instalação: valida a versão, localiza o arquivo e consulta o cache
+        
+        Args:
+            version (str): Versão do Node.js
+            resolved (tuple): (URL, nome do arquivo) já resolvidos (ex: por resolve_versions)
+            
+        Returns:
+            dict: Instalação preparada (version, url, filename, version_dir, zip_path,
+                  sha256, cached, installed, metrics...) ou None se a versão não puder
+                  ser instalada
+        """
+        record = self.metrics.begin(version)
+        with self.metrics.phase(record, 'resolve'):
+            # Intervalos e apelidos (ex: "18", "lts/hydrogen") viram uma versão exata
+            if not self.validate_version(version):
+                try:
+                    exact = self.resolve_spec(version)
+                except ValueError:
+                    print(f"Erro: Versão '{version}' inválida. Use X.Y.Z (ex: 18.17.0), "
+                          f"um intervalo (18, ^18.17) ou um apelido (latest, lts, lts/hydrogen)")
+                    self.metrics.finish(record, 'failed', error="versão inválida")
+                    return None
+                except Exception as e:
+                    print(f"Erro: {e}")
+                    self.metrics.finish(record, 'failed', error=str(e))
+                    return None
+                print(f"🔎 {version} → {exact}")
+                version = exact
+            record['version'] = normalize_version(version)
+            
+            # Verifica se a versão existe e obtém URL
+            if resolved:
+                url, filename = resolved
+            else:
+                print(f"Verificando se a versão {version} existe...")
+                try:
+                    url, filename = self.get_download_url(version)
+                except Exception as e:
+                    print(f"Erro: {e}")
+                    print("Versões populares: 18.17.0, 20.9.0, 22.0.0")
+                    self.metrics.finish(record, 'failed', error=str(e))
+                    return None
+        
+        # O diretório final só é criado pela extração (publicado com rename)
+        version_dir = self.base_dir / f"v{version}"
+        print(f"Diretório de destino: {version_dir}")
+        
+        job = {
+            'version': version,
+            'url': url,
+            'filename': filename,
+            'version_dir': version_dir,
+            'is_tarball': not filename.endswith('.zip'),
+            'compression': filename.rsplit('.', 1)[-1],
+            'installed': False,
+            'extracted': False,
+            'archive': None,
+            'cached': None,
+            'sha256': None,
+            'stats': {},
+            'metrics': record,
+            'only': self.only,
+        }
+        
+        # Instalação em duas etapas em andamento neste processo: espera terminar
+        if version in self._pending:
+            self.wait_install(version)
+        
+        # Verifica se já foi instalado (uma instalação parcial só serve se cobrir o pedido)
+        installed = self.is_version_installed(version) and self._covers(version, self.only)
+        if installed and not self.force:
+            print("✅ Node.js já está instalado nesta versão")
+            job['installed'] = True
+            self.metrics.finish(record, 'present')
+            return job
+        if installed:
+            print(f"🔧 Reinstalando em {version_dir}: só os arquivos alterados serão regravados")
+        elif version_dir.exists():
+            print(f"⚠️  Instalação incompleta em {version_dir}: será reparada")
+        
+        # Downloads ficam em base_dir/.downloads para poderem ser retomados
+        downloads_dir = self.base_dir / ".downloads"
+        downloads_dir.mkdir(parents=True, exist_ok=True)
+        job['zip_path'] = downloads_dir / filename
+        
+        # Hash publicado no SHASUMS256.txt da versão (baixado uma vez e guardado)
+        with self.metrics.phase(record, 'checksums'):
+            job['sha256'] = self.checksums.expected(version, filename)
+        if not job['sha256']:
+            print("⚠️  Checksum não encontrado: o arquivo não será verificado")
+        
+        # Cache local por SHA-256: reinstalar uma versão já vista não usa a rede
+        if self.archive_cache:
+            job['cached'] = self.archive_cache.lookup(job['sha256'], filename)
+            if job['cached']:
+                print(f"📦 Arquivo encontrado no cache: {job['cached']}")
+        record['source'] = 'cache' if job['cached'] else 'network'
+        return job
+    
+    def fetch_archive(self, job, extract=True):
+        """
+        Segunda fase: obtém o arquivo (cache ou download)
+        
+        Tarballs com extract=True são baixados e extraídos juntos, em fluxo.
+        Em uma instalação parcial (job['only']), só os membros escolhidos do
+        ZIP são baixados (HTTP Range) e extraídos aqui mesmo.
+        
+        Args:
+            job (dict): Instalação retornada por prepare_install
+            extract (bool): Se o arquivo será extraído depois
+            
+        Returns:
+            bool: True se sucesso, False caso contrário
+        """
+        version, url, filename = job['version'], job['url'], job['filename']
+        zip_path, cached = job['zip_path'], job['cached']
+        record = job['metrics']
+        
+        # Instalação parcial (--only): só os membros escolhidos do ZIP
+        if job['only'] and job['is_tarball']:
+            print("ℹ️  Tarballs não permitem instalação parcial: a versão será instalada completa")
+            job['only'] = None
+        if extract and job['only'] and not job['is_tarball']:
+            if cached:
+                return self.fetch_members(job, archive=cached)
+            try:
+                return self.fetch_members(job)
+            except RangeNotSupported as e:
+                print(f"ℹ️  {e}: o ZIP será baixado inteiro")
+        
+        if cached:
+            if extract:
+                job['archive'] = cached
+            else:
+                shutil.copyfile(cached, zip_path)
+                job['archive'] = zip_path
+                self.metrics.finish(record, 'downloaded')
+            return True
+        
+        print(f"Baixando Node.js v{version}...")
+        
+        # Tarballs (Linux/macOS) são extraídos enquanto os bytes chegam
+        if extract and job['is_tarball']:
+            with self.metrics.phase(record, 'stream') as details:
+                job['extracted'] = self.stream_install(url, job['version_dir'], job['compression'],
+                                                       job['sha256'], filename, stats=job['stats'])
+                details.update(bytes=job['stats'].get('bytes'), files=job['stats'].get('files'))
+            if job['stats'].get('hash_seconds') is not None:
+                self.metrics.add_phase(record, 'hash', job['stats']['hash_seconds'])
+            if not job['extracted']:
+                self.metrics.finish(record, 'failed', error="download")
+            return job['extracted']
+        
+        # Faz o download
+        transfer = {}
+        with self.metrics.phase(record, 'download') as details:
+            success = self.download_file(url, zip_path, job['sha256'], stats=transfer)
+            details['bytes'] = transfer.get('bytes')
+        if transfer.get('hash_seconds') is not None:
+            self.metrics.add_phase(record, 'hash', transfer['hash_seconds'], bytes=transfer.get('bytes'))
+        if not success:
+            if zip_path.with_name(filename + '.part.json').exists():
+                print("O download parcial foi mantido e será retomado na próxima execução.")
+            self.metrics.finish(record, 'failed', error="download")
+            return False
+        
+        print(f"Download concluído!")
+        if self.archive_cache:
+            self._store_in_cache(self.archive_cache.add, zip_path, job['sha256'])
+        job['archive'] = zip_path
+        if extract and job['only'] and not job['is_tarball']:
+            success = self.fetch_members(job, archive=zip_path)
+            zip_path.unlink(missing_ok=True)
+            return success
+        if not extract:
+            self.metrics.finish(record, 'downloaded')
+        return True
+    
+    def install_archive(self, job):
+        """
+        Terceira fase: extrai o arquivo obtido no diretório da versão
+        
+        Args:
+            job (dict): Instalação com o arquivo já obtido por fetch_archive
+            
+        Returns:
+            bool: True se sucesso, False caso contrário
+        """
+        version, version_dir = job['version'], job['version_dir']
+        record = job['metrics']
+        
+        if job['extracted']:
+            success = True
+        else:
+            with self.metrics.phase(record, 'extract') as details:
+                if job['is_tarball']:
+                    success = self.extract_tarball(job['archive'], version_dir, job['compression'],
+                                                   stats=job['stats'])
+                else:
+                    success = self.extract_zip(job['archive'], version_dir,
+                                               remove_zip=not job['cached'], stats=job['stats'])
+                details.update(bytes=job['stats'].get('bytes'), files=job['stats'].get('files'))
+        
+        executable = self._find_executable(version_dir) if success else None
+        if executable:
+            self.registry.record(version, version_dir, executable,
+                                 sha256=job['sha256'], archive=job['filename'],
+                                 files=job['stats'].get('files'), size=job['stats'].get('bytes'),
+                                 only=job['only'])
+            print(f"✅ Node.js v{version} instalado com sucesso em: {version_dir}")
+            print(f"📁 Estrutura final:")
+            print(f"   {version_dir}/")
+            if job['is_tarball']:
+                print(f"   ├── bin/node")
+                print(f"   └── lib/node_modules/")
+            else:
+                print(f"   ├── node.exe")
+                print(f"   ├── npm")
+                print(f"   └── node_modules/")
+        elif job['cached']:
+            # Arquivo inválido não deve ser reaproveitado
+            self.archive_cache.remove(job['cached'])
+        elif job['archive'] and job['archive'].exists():
+            job['archive'].unlink()
+        
+        if success:
+            self.metrics.finish(record, 'installed')
+        else:
+            self.metrics.finish(record, 'failed', error="extração")
+        return success
+    
+    def download_version(self, version, extract=True, lazy=None):
         """
         Faz o download completo de uma versão do Node.js
         
         Args:
             version (str): Versão do Node.js
             extract (bool): Se deve extrair o arquivo ZIP
+            lazy (bool): Retornar quando o node.exe estiver pronto e terminar o
+                restante em segundo plano (padrão: self.lazy; ver wait_install)
             
         Returns:
             bool: True se sucesso, False caso contrário
         """
-        import tempfile
+        job = self.prepare_install(version)
+        if job is None:
+            return False
+        if job['installed']:
+            return True
         
-        # Valida a versão
-        if not self.validate_version(version):
-            print(f"Erro: Versão '{version}' inválida. Use o formato: X.Y.Z (ex: 18.17.0)")
+        # Com um node.exe já utilizável (--force, reparo), a reinstalação
+        # incremental regrava só o que mudou: não há o que adiantar
+        lazy = self.lazy if lazy is None else lazy
+        if lazy and self._find_executable(job['version_dir']):
+            lazy = False
+        if lazy and extract and not job['only'] and not job['is_tarball']:
+            return self.install_lazy(job)
+        
+        if not self.fetch_archive(job, extract):
             return False
         
-        # Verifica se a versão existe e obtém URL
-        print(f"Verificando se a versão {version} existe...")
+        # Extrai o arquivo se solicitado
+        if extract:
+            return self.install_archive(job)
+        
+        print(f"Arquivo salvo em: {job['archive']}")
+        return True
+    
+    def install_lazy(self, job):
+        """
+        Instalação em duas etapas: node.exe e atalhos primeiro, o restante em segundo plano
+        
+        O executável e os atalhos da raiz (RUNTIME_FIRST) são baixados por
+        HTTP Range e publicados no diretório da versão, que é registrada
+        com state="runtime". Uma thread baixa e extrai o restante e o
+        acrescenta ao diretório (node_modules aparece de uma vez, com um
+        rename); ao terminar, o registro passa a indicar a instalação
+        completa. Sem Range, o ZIP é baixado inteiro e só a extração é
+        dividida. Um diretório de versão já existente (instalação
+        incompleta) recebe o runtime por merge, sem ser substituído.
+        
+        A thread morre com o processo: na linha de comando, o node.py só
+        termina depois do restante (o node.exe já pode ser usado de outro
+        terminal); pelo daemon (node_client.py), o comando retorna com o
+        runtime pronto e `wait` espera o restante.
+        
+        Args:
+            job (dict): Instalação retornada por prepare_install
+            
+        Returns:
+            bool: True se o runtime ficou pronto (o restante segue em wait_install)
+        """
+        version, version_dir, record = job['version'], job['version_dir'], job['metrics']
+        started = time.perf_counter()
+        remote = None
+        
+        if job['cached']:
+            zip_path = job['cached']
+        else:
+            remote = RemoteZip(job['url'], job['zip_path'].with_name(job['filename'] + '.ranges'),
+                               self._open_url)
+            zip_path = remote.path
+        
         try:
-            url, filename = self.get_download_url(version)
+            if remote:
+                try:
+                    with self.metrics.phase(record, 'directory') as details:
+                        members = remote.load()
+                        details['bytes'] = remote.bytes
+                    record['source'] = 'ranges'
+                except RangeNotSupported as e:
+                    print(f"ℹ️  {e}: o ZIP será baixado inteiro antes do node.exe")
+                    remote.path.unlink(missing_ok=True)
+                    remote = None
+                    if not self.fetch_archive(job):
+                        return False
+                    zip_path = job['archive']
+            if remote is None:
+                with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                    members = zip_ref.infolist()
+            
+            runtime = member_filter(RUNTIME_FIRST)
+            first = plan_members(members, select=runtime)
+            rest = plan_members(members, select=lambda relative: not runtime(relative))
+            if not any(relative.as_posix() == "node.exe" for _, relative in first['fetch']):
+                raise Exception("node.exe não encontrado no ZIP")
+            
+            if remote:
+                with self.metrics.phase(record, 'download') as details:
+                    before = remote.bytes
+                    remote.fetch([info for info, _ in first['fetch']], self.connections)
+                    details['bytes'] = remote.bytes - before
+            with self.metrics.phase(record, 'extract') as details:
+                stats = install_plan(zip_path, first, version_dir, self.extract_workers,
+                                     merge=version_dir.exists(), store=self.store)
+                details.update(bytes=stats['bytes'], files=stats['files'])
         except Exception as e:
-            print(f"Erro: {e}")
-            print("Versões populares: 18.17.0, 20.9.0, 22.0.0")
+            print(f"❌ Erro na instalação do runtime: {e}")
+            self.metrics.finish(record, 'failed', error=str(e))
+            if remote:
+                remote.path.unlink(missing_ok=True)
             return False
         
-        # Cria o diretório final
-        version_dir = self.create_directory(version)
-        print(f"Diretório de destino: {version_dir}")
-        
-        # Verifica se já foi instalado
-        if any(version_dir.iterdir()):
-            print(f"Versão já existe em: {version_dir}")
-            node_exe = version_dir / "node.exe"
-            if node_exe.exists():
-                print("✅ Node.js já está instalado nesta versão")
-                return True
+        self.registry.record(version, version_dir, "node.exe", sha256=job['sha256'],
+                             archive=job['filename'], files=stats['files'], size=stats['bytes'],
+                             only=RUNTIME_FIRST, state='runtime')
+        record['runtime_seconds'] = round(time.perf_counter() - started, 6)
+        self.metrics.emit('runtime_ready', version=version, seconds=record['runtime_seconds'])
+        print(f"⚡ Runtime pronto em {record['runtime_seconds']:.1f}s: {version_dir / 'node.exe'} "
+              f"(node_modules em segundo plano)")
         
-        # Cria arquivo temporário para o ZIP
-        with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as temp_file:
-            temp_zip_path = Path(temp_file.name)
+        job['stats'] = stats
+        thread = threading.Thread(target=self._finish_lazy, args=(job, remote, zip_path, rest),
+                                  name=f"lazy-{version}")
+        self._pending[version] = thread
+        thread.start()
+        return True
+    
+    def _finish_lazy(self, job, remote, zip_path, plan):
+        """
+        Segunda etapa de install_lazy: baixa e acrescenta o restante da versão
         
+        Args:
+            job (dict): Instalação com o runtime já publicado
+            remote (RemoteZip): ZIP remoto já carregado (None para um ZIP local)
+            zip_path (Path): Arquivo esparso ou ZIP local
+            plan (dict): Membros restantes (plan_members)
+        """
+        version, version_dir, record = job['version'], job['version_dir'], job['metrics']
         try:
-            # Faz o download
-            print(f"Baixando Node.js v{version}...")
+            if remote:
+                with self.metrics.phase(record, 'download') as details:
+                    before = remote.bytes
+                    remote.fetch([info for info, _ in plan['fetch']], self.connections)
+                    details['bytes'] = remote.bytes - before
+            with self.metrics.phase(record, 'extract') as details:
+                stats = install_plan(zip_path, plan, version_dir, self.extract_workers, merge=True,
+                                     store=self.store)
+                details.update(bytes=stats['bytes'], files=stats['files'])
             
-            if not self.download_file(url, temp_zip_path):
+            job['stats'] = {'files': job['stats']['files'] + stats['files'],
+                            'bytes': job['stats']['bytes'] + stats['bytes']}
+            job['extracted'] = True
+            job['only'] = None
+            self.install_archive(job)
+        except Exception as e:
+            print(f"❌ Erro ao concluir a instalação de v{version}: {e}")
+            self.registry.record(version, version_dir, "node.exe", sha256=job['sha256'],
+                                 archive=job['filename'], only=RUNTIME_FIRST, state='failed')
+            self.metrics.finish(record, 'failed', error=str(e))
+        finally:
+            if remote:
+                remote.path.unlink(missing_ok=True)
+            elif not job['cached']:
+                zip_path.unlink(missing_ok=True)
+            self._pending.pop(version, None)
+    
+    def wait_install(self, version, timeout=DEFAULT_WAIT_TIMEOUT):
+        """
+        Espera a segunda etapa de uma instalação em duas etapas (--lazy)
+        
+        Neste processo, espera a thread da instalação; em outro processo,
+        acompanha o registro até o estado deixar de ser "runtime".
+        
+        Args:
+            version (str): Versão exata
+            timeout (float): Tempo máximo em segundos (None = sem limite)
+            
+        Returns:
+            bool: True se a versão estiver instalada completa
+        """
+        thread = self._pending.get(version)
+        if thread is not None:
+            thread.join(timeout)
+        
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            entry = self.registry.get(version)
+            if entry is None or entry.get('state') != 'runtime':
+                return bool(entry) and not entry.get('state') and not entry.get('only')
+            if deadline is not None and time.monotonic() >= deadline:
                 return False
+            time.sleep(WAIT_INTERVAL)
+    
+    def wait_pending(self):
+        """Espera todas as instalações em duas etapas deste processo"""
+        for version, thread in list(self._pending.items()):
+            print(f"⏳ Concluindo a instalação de v{version} em segundo plano...")
+            thread.join()
+    
+    def upgrade_version(self, version, base=None):
+        """
+        Instala uma versão reaproveitando os arquivos iguais de outra já instalada
+        
+        Lê o diretório central do ZIP remoto por HTTP Range, compara o
+        tamanho e o CRC-32 de cada membro com os arquivos da versão de
+        origem e baixa só os membros que mudaram (ver node_remotezip). Sem
+        versão de origem, com o arquivo no cache, com tarballs ou com um
+        servidor sem Range, faz a instalação completa.
+        
+        Args:
+            version (str): Versão a instalar (exata, intervalo ou apelido)
+            base (str): Versão instalada de origem (padrão: a mais recente da mesma major)
             
-            print(f"Download concluído!")
+        Returns:
+            bool: True se sucesso, False caso contrário
+        """
+        job = self.prepare_install(version)
+        if job is None:
+            return False
+        if job['installed']:
+            return True
+        
+        base_version = self._upgrade_base(job['version'], base)
+        if base_version is None:
+            reason = "nenhuma versão de origem instalada"
+        elif job['cached']:
+            reason = "arquivo no cache"
+        elif job['is_tarball']:
+            reason = "tarballs não têm diretório central"
+        else:
+            try:
+                return self.fetch_members(job, base_version) and self.install_archive(job)
+            except RangeNotSupported as e:
+                reason = str(e)
+        
+        print(f"ℹ️  Instalação completa: {reason}")
+        return self.fetch_archive(job) and self.install_archive(job)
+    
+    def _upgrade_base(self, version, base=None):
+        """
+        Escolhe a versão instalada usada como origem da atualização delta
+        
+        Args:
+            version (str): Versão a instalar
+            base (str): Versão de origem pedida (None = escolher)
             
-            # Extrai o arquivo se solicitado
-            if extract:
-                success = self.extract_zip(temp_zip_path, version_dir)
-                if success:
-                    print(f"✅ Node.js v{version} instalado com sucesso em: {version_dir}")
-                    print(f"📁 Estrutura final:")
-                    print(f"   {version_dir}/")
-                    print(f"   ├── node.exe")
-                    print(f"   ├── npm")
-                    print(f"   └── node_modules/")
-                return success
+        Returns:
+            str: Versão instalada ou None se não houver
+        """
+        if base:
+            base = normalize_version(base)
+            if not self.is_version_installed(base):
+                print(f"⚠️  Versão de origem v{base} não está instalada")
+                return None
+            return base
+        
+        # A mais recente da mesma major, de preferência anterior à nova
+        major = version.split('.')[0]
+        candidates = [entry['version'] for entry in self.registry.entries()
+                      if entry['version'].split('.')[0] == major and entry['version'] != version
+                      and self.is_version_installed(entry['version'])]
+        older = [candidate for candidate in candidates if version_key(candidate) < version_key(version)]
+        return (older or candidates or [None])[-1]
+    
+    def fetch_members(self, job, base_version=None, archive=None):
+        """
+        Obtém e extrai só os membros necessários do ZIP (--only e atualização delta)
+        
+        Sem `archive`, lê o diretório central e os membros escolhidos do ZIP
+        remoto por HTTP Range (ver node_remotezip); com `archive`, usa o ZIP
+        local (cache ou já baixado). Com base_version, os arquivos iguais aos
+        da versão de origem são reaproveitados em vez de baixados.
+        
+        Args:
+            job (dict): Instalação retornada por prepare_install
+            base_version (str): Versão instalada de origem (atualização delta)
+            archive (Path): ZIP local
             
-            return True
+        Returns:
+            bool: True se sucesso (job['extracted']), False caso contrário
+            
+        Raises:
+            RangeNotSupported: Se o servidor não atender Range (nada foi instalado)
+        """
+        record = job['metrics']
+        select = member_filter(job['only']) if job['only'] else None
+        reuse_dir = self.base_dir / f"v{base_version}" if base_version else None
+        remote = None
+        if base_version:
+            print(f"🔁 Atualização delta: v{base_version} → v{job['version']}")
+        if job['only']:
+            print(f"✂️  Instalação parcial: {', '.join(job['only'])}")
+        
+        try:
+            if archive:
+                zip_path = archive
+                with zipfile.ZipFile(archive, 'r') as zip_ref:
+                    members = zip_ref.infolist()
+            else:
+                remote = RemoteZip(job['url'], job['zip_path'].with_name(job['filename'] + '.ranges'),
+                                   self._open_url)
+                zip_path = remote.path
+                with self.metrics.phase(record, 'directory') as details:
+                    members = remote.load()
+                    details['bytes'] = remote.bytes
+                record['source'] = 'delta' if base_version else 'ranges'
+            
+            if reuse_dir:
+                with self.metrics.phase(record, 'compare') as details:
+                    plan = plan_members(members, reuse_dir, select)
+                    details.update(bytes=plan['reused_bytes'], files=len(plan['reuse']))
+            else:
+                plan = plan_members(members, select=select)
+            selected = {relative.as_posix() for _, relative in plan['fetch'] + plan['reuse']}
+            if not selected & {"node.exe", "bin/node"}:
+                raise Exception("a seleção não inclui o executável do Node.js (node.exe)")
+            if base_version:
+                print(f"   {len(plan['reuse'])} arquivos iguais aos de v{base_version}, "
+                      f"{len(plan['fetch'])} a baixar")
             
+            if remote:
+                with self.metrics.phase(record, 'download') as details:
+                    before = remote.bytes
+                    ranges = remote.fetch([info for info, _ in plan['fetch']], self.connections)
+                    details.update(bytes=remote.bytes - before, ranges=len(ranges))
+                print(f"📉 Baixados {remote.bytes / 1024 / 1024:.1f} MB de "
+                      f"{remote.size / 1024 / 1024:.1f} MB ({remote.requests} requisições)")
+            
+            with self.metrics.phase(record, 'extract') as details:
+                job['stats'] = install_plan(zip_path, plan, job['version_dir'], self.extract_workers,
+                                            store=self.store)
+                details.update(bytes=job['stats']['bytes'], files=job['stats']['files'])
+        except RangeNotSupported:
+            raise
+        except Exception as e:
+            print(f"❌ Erro na instalação parcial: {e}")
+            self.metrics.finish(record, 'failed', error=str(e))
+            return False
         finally:
-            # Garante que o arquivo temporário seja removido
-            try:
-                if temp_zip_path.exists():
-                    temp_zip_path.unlink()
-            except:
-                pass
+            if remote:
+                remote.path.unlink(missing_ok=True)
+        
+        print(f"Arquivos organizados em: {job['version_dir']} ({job['stats']['extracted']} extraídos, "
+              f"{job['stats']['reused']} reaproveitados)")
+        if remote:
+            print("ℹ️  SHA-256 do ZIP não conferido: só parte dele foi baixada (CRC-32 de cada arquivo conferido)")
+        job['extracted'] = True
+        return True
+
+
+def finish_run(downloader, report_path=None, trace_path=None):
+    """
+    Fim da execução: relatório de métricas (--report/--json) e trace (--trace)
+    
+    Args:
+        downloader (NodeDownloader): Downloader usado na execução
+        report_path (str): Arquivo do relatório JSON
+        trace_path (str): Arquivo do trace
+    """
+    downloader.metrics.finish_run(downloader.pool_stats(), report_path)
+    if trace_path:
+        stop_trace(trace_path)
 
 
 def main():
     """Função principal da aplicação"""
+    # --json: o stdout recebe só os eventos JSON-lines; as mensagens vão para o stderr
+    if '--json' in sys.argv[1:]:
+        events = sys.stdout
+        with redirect_stdout(sys.stderr):
+            return run(events)
+    return run()
+
+
+def run(events=None):
+    """
+    Executa a linha de comando
+    
+    Args:
+        events (file): Recebe os eventos JSON-lines das instalações (--json)
+    """
     print("=" * 60)
     print("Node.js Version Manager (NVM) - Python")
     print("=" * 60)
@@ -454,7 +1696,25 @@ def main():
     # Configurações de proxy/SSL
     proxy_url = get_proxy_from_env()  # Primeiro tenta do .env
     ignore_ssl = os.environ.get('IGNORE_SSL', '').lower() == 'true'
-    version = None
+    connections = None
+    extract_workers = None
+    platform = None
+    cache_dir = None
+    cache_max = None
+    bandwidth = None
+    mirrors = None
+    download_jobs = DEFAULT_DOWNLOAD_JOBS
+    extract_jobs = DEFAULT_EXTRACT_JOBS
+    serve_host = '0.0.0.0'
+    serve_port = int(os.environ.get('SERVE_PORT', DEFAULT_SERVE_PORT))
+    serve_dir = os.environ.get('SERVE_DIR')
+    report_path = None
+    trace_path = None
+    only = None
+    lazy = None
+    store = None
+    force = False
+    versions = []
     
     # Parse de argumentos da linha de comando (sobrescreve .env se fornecido)
     args = sys.argv[1:]
@@ -463,8 +1723,47 @@ def main():
             proxy_url = arg.split('=', 1)[1]
         elif arg == '--ignore-ssl':
             ignore_ssl = True
+        elif arg.startswith('--connections='):
+            connections = int(arg.split('=', 1)[1])
+        elif arg.startswith('--extract-workers='):
+            extract_workers = int(arg.split('=', 1)[1])
+        elif arg.startswith('--platform='):
+            platform = arg.split('=', 1)[1]
+        elif arg.startswith('--cache-dir='):
+            cache_dir = arg.split('=', 1)[1]
+        elif arg.startswith('--cache-max='):
+            cache_max = arg.split('=', 1)[1]
+        elif arg.startswith('--max-bandwidth='):
+            bandwidth = arg.split('=', 1)[1]
+        elif arg.startswith('--mirrors='):
+            mirrors = arg.split('=', 1)[1]
+        elif arg.startswith('--download-jobs='):
+            download_jobs = int(arg.split('=', 1)[1])
+        elif arg.startswith('--extract-jobs='):
+            extract_jobs = int(arg.split('=', 1)[1])
+        elif arg.startswith('--bind='):
+            serve_host = arg.split('=', 1)[1]
+        elif arg.startswith('--port='):
+            serve_port = int(arg.split('=', 1)[1])
+        elif arg.startswith('--serve-dir='):
+            serve_dir = arg.split('=', 1)[1]
+        elif arg.startswith('--report='):
+            report_path = arg.split('=', 1)[1]
+        elif arg.startswith('--trace='):
+            trace_path = arg.split('=', 1)[1]
+            start_trace()
+        elif arg == '--lazy':
+            lazy = True
+        elif arg == '--store':
+            store = True
+        elif arg == '--force':
+            force = True
+        elif arg.startswith('--only='):
+            only = arg.split('=', 1)[1]
+        elif arg.startswith('--from-file='):
+            versions.extend(read_versions_file(arg.split('=', 1)[1]))
         elif not arg.startswith('--'):
-            version = arg
+            versions.append(arg)
     
     # Mostra configurações carregadas
     if proxy_url:
@@ -484,14 +1783,111 @@ def main():
     print()
     
     # Cria o downloader com configurações
-    downloader = NodeDownloader(proxy_url=proxy_url, ignore_ssl=ignore_ssl)
+    downloader = NodeDownloader(proxy_url=proxy_url, ignore_ssl=ignore_ssl, connections=connections,
+                                extract_workers=extract_workers, platform=platform,
+                                cache_dir=cache_dir, cache_max=cache_max, bandwidth=bandwidth,
+                                mirrors=mirrors, only=only, lazy=lazy, store=store,
+                                force=force)
+    downloader.metrics.events = events
     
     # Garante que o diretório base existe
     downloader.base_dir.mkdir(parents=True, exist_ok=True)
     print(f"Diretório base: {downloader.base_dir}")
     print()
     
+    # Servidor de cache para a rede local: py node.py serve
+    if versions and versions[0] == 'serve':
+        serve(downloader, serve_host, serve_port, serve_dir)
+        return
+    
+    # Registro das versões instaladas: py node.py list | status [versão] | rebuild
+    if versions and versions[0] in ('list', 'status', 'rebuild'):
+        if versions[0] == 'rebuild':
+            print("Reconstruindo o registro a partir dos diretórios das versões...")
+            entries, incomplete = downloader.registry.rebuild(downloader._find_executable)
+            for version_dir in incomplete:
+                print(f"⚠️  Instalação incompleta (não registrada): {version_dir}")
+            print_entries(entries)
+        elif versions[0] == 'status' and len(versions) > 1:
+            for spec in versions[1:]:
+                try:
+                    version = downloader.resolve_spec(spec)
+                except Exception as e:
+                    print(f"❌ {spec}: {e}")
+                    continue
+                installed = downloader.is_version_installed(version)
+                print_entry(version, downloader.registry.get(version) if installed else None)
+        else:
+            print_entries(downloader.registry.entries())
+        return
+    
+    # Blobs que nenhuma versão usa mais: py node.py gc
+    if versions and versions[0] == 'gc':
+        store = downloader.store or BlobStore(downloader.base_dir / ".store")
+        result = store.gc()
+        stats = store.stats()
+        print(f"🧹 {result['removed']} blobs removidos ({result['bytes'] / 1024 / 1024:.1f} MB liberados, "
+              f"{result['temp']} temporários)")
+        print(f"📦 Armazenamento: {stats['blobs']} blobs, {stats['bytes'] / 1024 / 1024:.1f} MB")
+        return
+    
+    # Daemon residente para node_client.py: py node.py daemon
+    if versions and versions[0] == 'daemon':
+        run_daemon(downloader)
+        return
+    
+    # Espera a instalação em duas etapas (--lazy) de outro processo: py node.py wait <versão>
+    if versions and versions[0] == 'wait':
+        for spec in versions[1:]:
+            try:
+                version = downloader.resolve_spec(spec)
+            except Exception as e:
+                print(f"❌ {spec}: {e}")
+                continue
+            print(f"⏳ Esperando a instalação de v{version}...")
+            if downloader.wait_install(version):
+                print(f"✅ v{version} instalada por completo")
+            else:
+                print(f"❌ v{version} não foi concluída")
+        return
+    
+    # Atualização delta: py node.py upgrade <versão> [versão instalada de origem]
+    if versions and versions[0] == 'upgrade':
+        if len(versions) < 2:
+            print("Uso: py node.py upgrade <versão> [versão instalada de origem]")
+            return
+        try:
+            success = downloader.upgrade_version(versions[1], versions[2] if len(versions) > 2 else None)
+            if success:
+                print(f"✅ Versão {versions[1]} atualizada com sucesso!")
+            else:
+                print(f"❌ Falha ao atualizar para a versão {versions[1]}")
+        except KeyboardInterrupt:
+            print("\n\nOperação cancelada pelo usuário.")
+        
+        finish_run(downloader, report_path, trace_path)
+        return
+    
+    # Várias versões: instalação em lote, com downloads e extrações sobrepostos
+    if len(versions) > 1:
+        print(f"Instalação em lote: {len(versions)} versões "
+              f"({download_jobs} downloads e {extract_jobs} extrações simultâneos)")
+        print()
+        
+        installer = BatchInstaller(downloader, download_jobs, extract_jobs)
+        try:
+            results = installer.run(versions)
+            print_summary(results, installer.elapsed)
+        except KeyboardInterrupt:
+            print("\n\nOperação cancelada pelo usuário.")
+        
+        stats = downloader.pool_stats()
+        print(f"🔌 Conexões HTTP: {stats['opened']} abertas, {stats['reused']} reutilizadas")
+        finish_run(downloader, report_path, trace_path)
+        return
+    
     # Verifica se foi passada uma versão como argumento
+    version = versions[0] if versions else None
     if version:
         print(f"Versão especificada via linha de comando: {version}")
         print()
@@ -502,8 +1898,17 @@ def main():
                 print(f"✅ Versão {version} baixada com sucesso!")
             else:
                 print(f"❌ Falha ao baixar a versão {version}")
+            # --lazy: o node.exe já pode ser usado, mas a segunda etapa é uma thread
+            # deste processo; só o daemon (node_client.py) retorna antes dela
+            downloader.wait_pending()
+        except KeyboardInterrupt:
+            print("\n\nOperação cancelada pelo usuário.")
         except Exception as e:
             print(f"Erro: {e}")
+        
+        stats = downloader.pool_stats()
+        print(f"🔌 Conexões HTTP: {stats['opened']} abertas, {stats['reused']} reutilizadas")
+        finish_run(downloader, report_path, trace_path)
         return
     
     # Modo interativo
@@ -516,7 +1921,7 @@ def main():
     while True:
         try:
             # Solicita a versão
-            version = input("Digite a versão do Node.js (ex: 18.17.0) ou 'quit' para sair: ").strip()
+            version = input("Digite a versão do Node.js (ex: 18.17.0, 18, lts) ou 'quit' para sair: ").strip()
             
             if version.lower() in ['quit', 'q', 'exit', 'sair']:
                 print("Saindo...")
@@ -544,6 +1949,8 @@ def main():
         except Exception as e:
             print(f"Erro inesperado: {e}")
             print("Tente novamente.")
+    
+    finish_run(downloader, report_path, trace_path)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,823 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Versão assíncrona (asyncio) do Node.js Downloader
+
+Para serviços que já rodam um event loop (ex: um servidor de CI que
+resolve e instala versões para muitos jobs ao mesmo tempo). Toda a rede
+usa asyncio streams, inclusive o proxy (URL absoluta para HTTP e túnel
+CONNECT para HTTPS), então centenas de consultas e dezenas de downloads
+dividem uma única thread sem bloqueá-la. O que toca o disco (gravação,
+hash, cache de arquivos, extração) roda no executor do loop.
+
+A configuração, o índice de versões, os checksums e o cache são os
+mesmos do NodeDownloader, que é usado internamente apenas para o que não
+envolve a rede.
+
+Uso:
+    async with AsyncNodeDownloader(base_dir="d:/nvm") as downloader:
+        await asyncio.gather(*(downloader.download_version(v) for v in versions))
+"""
+
+import io
+import os
+import time
+import socket
+import asyncio
+import hashlib
+import http.client
+from functools import partial
+from urllib.parse import urlsplit, urljoin
+from urllib.error import URLError, HTTPError
+
+from node import NodeDownloader, get_proxy_from_env
+from node_http import (MAX_REDIRECTS, REDIRECT_CODES, MAX_IDLE_PER_HOST, create_ssl_context,
+                       prepare_request, proxy_authorization)
+from node_index import PLATFORM_ARTIFACTS, MISSING_REVALIDATE_AGE, normalize_version
+from node_download import PartState
+from node_checksum import ChecksumMismatch
+
+
+# Requisições simultâneas por cliente (as demais aguardam uma vaga)
+DEFAULT_MAX_CONNECTIONS = 32
+
+# Tamanho de cada leitura da rede
+READ_SIZE = 256 * 1024
+
+# Bytes acumulados antes de cada gravação em disco (feita no executor)
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Erros de rede tratados como falha de conexão (URLError e HTTPError são OSError)
+NETWORK_ERRORS = (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError,
+                  http.client.HTTPException, ValueError)
+
+
+class AsyncResponse:
+    """Resposta HTTP lida do stream; a conexão volta ao pool no close()"""
+    
+    def __init__(self, client, key, reader, writer, status, reason, headers, url, method, timeout):
+        self._client = client
+        self._key = key
+        self._reader = reader
+        self._writer = writer
+        self._timeout = timeout
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        
+        self._chunked = 'chunked' in (headers.get('Transfer-Encoding') or '').lower()
+        self._chunk_left = 0
+        length = headers.get('Content-Length')
+        self._remaining = int(length) if length is not None and not self._chunked else None
+        if method == 'HEAD' or status in (204, 304):
+            self._chunked = False
+            self._remaining = 0
+        # Sem tamanho nem chunked: o corpo termina quando o servidor fecha
+        self.will_close = ((headers.get('Connection') or '').lower() == 'close'
+                           or (self._remaining is None and not self._chunked))
+        self._eof = self._remaining == 0
+    
+    def geturl(self):
+        return self.url
+    
+    def getheader(self, name, default=None):
+        return self.headers.get(name, default)
+    
+    async def read(self, size=-1):
+        """
+        Lê o corpo da resposta
+        
+        Args:
+            size (int): Máximo de bytes (-1 lê tudo)
+        
+        Returns:
+            bytes: Dados lidos (b'' no fim do corpo)
+        """
+        if size is None or size < 0:
+            parts = []
+            while True:
+                data = await self.read(READ_SIZE)
+                if not data:
+                    return b''.join(parts)
+                parts.append(data)
+        
+        if self._eof:
+            return b''
+        if self._chunked:
+            return await self._read_chunked(size)
+        if self._remaining is None:
+            data = await self._recv(size)
+            if not data:
+                self._eof = True
+            return data
+        
+        data = await self._recv(min(size, self._remaining))
+        if not data:
+            raise http.client.IncompleteRead(b'', self._remaining)
+        self._remaining -= len(data)
+        self._eof = self._remaining == 0
+        return data
+    
+    async def _recv(self, size):
+        return await asyncio.wait_for(self._reader.read(size), self._timeout)
+    
+    async def _readline(self):
+        return await asyncio.wait_for(self._reader.readline(), self._timeout)
+    
+    async def _read_chunked(self, size):
+        """Decodifica Transfer-Encoding: chunked"""
+        if self._chunk_left == 0:
+            line = await self._readline()
+            if not line:
+                raise http.client.IncompleteRead(b'')
+            self._chunk_left = int(line.split(b';', 1)[0].strip(), 16)
+            if self._chunk_left == 0:
+                # Último bloco: descarta os trailers até a linha em branco
+                while (await self._readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                self._eof = True
+                return b''
+        
+        data = await self._recv(min(size, self._chunk_left))
+        if not data:
+            raise http.client.IncompleteRead(b'', self._chunk_left)
+        self._chunk_left -= len(data)
+        if self._chunk_left == 0:
+            await asyncio.wait_for(self._reader.readexactly(2), self._timeout)
+        return data
+    
+    def close(self):
+        """Fecha a resposta, devolvendo a conexão ao pool se o corpo foi lido"""
+        if self._writer is None:
+            return
+        writer, self._writer = self._writer, None
+        self._client._release(self._key, self._reader, writer, self._eof and not self.will_close)
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+
+class AsyncHTTPClient:
+    """Cliente HTTP/1.1 sobre asyncio streams, com pool keep-alive e proxy"""
+    
+    def __init__(self, proxy_url=None, ignore_ssl=False, max_connections=DEFAULT_MAX_CONNECTIONS,
+                 max_idle_per_host=MAX_IDLE_PER_HOST):
+        """
+        Args:
+            proxy_url (str): URL do proxy (None usa HTTP(S)_PROXY do sistema)
+            ignore_ssl (bool): Ignorar verificações SSL (apenas para desenvolvimento)
+            max_connections (int): Requisições simultâneas (as demais aguardam)
+            max_idle_per_host (int): Conexões ociosas guardadas por servidor
+        """
+        self.proxy_url = proxy_url
+        self.ssl_context = create_ssl_context(ignore_ssl)
+        self.max_connections = max(1, max_connections)
+        self.max_idle_per_host = max_idle_per_host
+        self._idle = {}
+        self._slots = None
+        self._stats = {'requests': 0, 'opened': 0, 'reused': 0}
+    
+    async def open(self, url, timeout=10, headers=None, method=None):
+        """
+        Faz uma requisição HTTP seguindo redirecionamentos
+        
+        Args:
+            url (str): URL para abrir
+            timeout (int): Timeout em segundos (conexão e cada leitura)
+            headers (dict): Cabeçalhos adicionais
+            method (str): Método HTTP (padrão: GET)
+        
+        Returns:
+            AsyncResponse: Resposta (usar com `async with` para devolver a conexão)
+        
+        Raises:
+            HTTPError: Para respostas 4xx/5xx
+            URLError: Para falhas de conexão
+        """
+        method = method or 'GET'
+        for _ in range(MAX_REDIRECTS + 1):
+            response = await self._send(url, method, headers, timeout)
+            
+            location = response.getheader('Location')
+            if response.status in REDIRECT_CODES and location:
+                await self._drain(response)
+                url = urljoin(url, location)
+                if response.status == 303:
+                    method = 'GET'
+                continue
+            
+            if response.status >= 400:
+                body = await self._drain(response)
+                raise HTTPError(url, response.status, response.reason, response.headers, io.BytesIO(body))
+            
+            return response
+        
+        raise URLError(f"Redirecionamentos demais: {url}")
+    
+    def stats(self):
+        """
+        Estatísticas do pool
+        
+        Returns:
+            dict: requests, opened (conexões novas), reused (reaproveitadas), idle
+        """
+        stats = dict(self._stats)
+        stats['idle'] = sum(len(conns) for conns in self._idle.values())
+        return stats
+    
+    async def close(self):
+        """Fecha todas as conexões ociosas"""
+        idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for _, writer in conns:
+                writer.close()
+    
+    def _semaphore(self):
+        # Criado dentro do loop em uso
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_connections)
+        return self._slots
+    
+    async def _send(self, url, method, headers, timeout):
+        """Envia a requisição, refazendo-a uma vez se a conexão reaproveitada caiu"""
+        key, path, request_headers = prepare_request(url, headers, self.proxy_url)
+        request = f"{method} {path} HTTP/1.1\r\n"
+        request += "".join(f"{name}: {value}\r\n" for name, value in request_headers.items())
+        request = (request + "\r\n").encode('latin-1')
+        
+        await self._semaphore().acquire()
+        try:
+            conn = self._acquire(key)
+            reused = conn is not None
+            while True:
+                if conn is None:
+                    conn = await self._connect(key, timeout)
+                reader, writer = conn
+                try:
+                    writer.write(request)
+                    await asyncio.wait_for(writer.drain(), timeout)
+                    status, reason, response_headers = await self._read_head(reader, timeout)
+                    break
+                except NETWORK_ERRORS as e:
+                    writer.close()
+                    conn = None
+                    # Conexão keep-alive fechada pelo servidor: tenta com uma nova
+                    if reused:
+                        reused = False
+                        continue
+                    raise URLError(e)
+        except BaseException:
+            self._semaphore().release()
+            raise
+        
+        self._stats['requests'] += 1
+        self._stats['reused' if reused else 'opened'] += 1
+        return AsyncResponse(self, key, reader, writer, status, reason, response_headers,
+                             url, method, timeout)
+    
+    async def _read_head(self, reader, timeout):
+        """
+        Lê a linha de status e os cabeçalhos (ignorando respostas 1xx)
+        
+        Returns:
+            tuple: (status, reason, http.client.HTTPMessage)
+        """
+        while True:
+            line = await asyncio.wait_for(reader.readline(), timeout)
+            if not line:
+                raise http.client.RemoteDisconnected("Conexão encerrada sem resposta")
+            parts = line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+            if len(parts) < 2 or not parts[0].startswith('HTTP/'):
+                raise http.client.BadStatusLine(line)
+            status = int(parts[1])
+            
+            head = b''
+            while True:
+                line = await asyncio.wait_for(reader.readline(), timeout)
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                head += line
+            if status >= 200:
+                headers = http.client.parse_headers(io.BytesIO(head + b'\r\n'))
+                return status, parts[2] if len(parts) > 2 else '', headers
+    
+    async def _connect(self, key, timeout):
+        """Abre uma conexão nova (direta, via proxy ou por túnel CONNECT)"""
+        scheme, host, port, proxy = key
+        ssl_context = self.ssl_context if scheme == 'https' else None
+        try:
+            if proxy:
+                proxy_parts = urlsplit(proxy)
+                proxy_host, proxy_port = proxy_parts.hostname, proxy_parts.port or 8080
+            if proxy and ssl_context:
+                sock = await self._open_tunnel(proxy_host, proxy_port, host, port, proxy, timeout)
+                connecting = asyncio.open_connection(sock=sock, ssl=ssl_context, server_hostname=host)
+            elif proxy:
+                connecting = asyncio.open_connection(proxy_host, proxy_port)
+            else:
+                connecting = asyncio.open_connection(host, port, ssl=ssl_context)
+            return await asyncio.wait_for(connecting, timeout)
+        except URLError:
+            raise
+        except NETWORK_ERRORS as e:
+            raise URLError(e)
+    
+    async def _open_tunnel(self, proxy_host, proxy_port, host, port, proxy, timeout):
+        """
+        Abre um túnel CONNECT no proxy sem bloquear o loop
+        
+        Returns:
+            socket.socket: Socket não bloqueante já ligado ao servidor de destino
+        """
+        loop = asyncio.get_running_loop()
+        family, sock_type, proto, _, address = (
+            await loop.getaddrinfo(proxy_host, proxy_port, type=socket.SOCK_STREAM))[0]
+        sock = socket.socket(family, sock_type, proto)
+        sock.setblocking(False)
+        try:
+            await asyncio.wait_for(loop.sock_connect(sock, address), timeout)
+            
+            request = f"CONNECT {host}:{port} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+            auth = proxy_authorization(proxy)
+            if auth:
+                request += f"Proxy-Authorization: {auth}\r\n"
+            await loop.sock_sendall(sock, (request + "\r\n").encode('latin-1'))
+            
+            # A resposta do CONNECT não tem corpo: lê até o fim dos cabeçalhos
+            response = b''
+            while b'\r\n\r\n' not in response:
+                data = await asyncio.wait_for(loop.sock_recv(sock, 4096), timeout)
+                if not data:
+                    raise URLError("Proxy encerrou a conexão durante o CONNECT")
+                response += data
+            status_line = response.split(b'\r\n', 1)[0].decode('latin-1')
+            if status_line.split(' ', 2)[1:2] != ['200']:
+                raise URLError(f"Proxy recusou o túnel: {status_line}")
+            return sock
+        except BaseException:
+            sock.close()
+            raise
+    
+    async def _drain(self, response):
+        """Lê o corpo restante da resposta e devolve a conexão ao pool"""
+        try:
+            return await response.read()
+        except NETWORK_ERRORS:
+            return b''
+        finally:
+            response.close()
+    
+    def _acquire(self, key):
+        """Retira uma conexão ociosa do pool (ou None)"""
+        conns = self._idle.get(key)
+        while conns:
+            reader, writer = conns.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer
+            writer.close()
+        return None
+    
+    def _release(self, key, reader, writer, reusable):
+        """Devolve uma conexão ao pool ou a fecha, liberando a vaga"""
+        self._semaphore().release()
+        if reusable and not writer.is_closing():
+            conns = self._idle.setdefault(key, [])
+            if len(conns) < self.max_idle_per_host:
+                conns.append((reader, writer))
+                return
+        writer.close()
+
+
+def _write_block(f, hasher, state, position, data):
+    """Grava um bloco, atualiza o hash e registra a faixa (roda no executor)"""
+    f.write(data)
+    hasher.update(data)
+    state.mark(0, position + len(data) - 1)
+
+
+def _hash_prefix(path, length, hasher):
+    """Adiciona ao hash os primeiros bytes de um arquivo (download retomado)"""
+    with open(path, 'rb') as f:
+        while length > 0:
+            data = f.read(min(WRITE_BUFFER_SIZE, length))
+            if not data:
+                raise OSError(f"Arquivo parcial menor que o esperado: {path}")
+            hasher.update(data)
+            length -= len(data)
+
+
+class AsyncNodeDownloader:
+    """Downloader assíncrono com a mesma interface do NodeDownloader (métodos são corrotinas)"""
+    
+    def __init__(self, base_dir=None, proxy_url=None, ignore_ssl=False, platform=None,
+                 base_url=None, cache_dir=None, cache_max=None, extract_workers=None,
+                 max_connections=DEFAULT_MAX_CONNECTIONS, executor=None, only=None):
+        """
+        Args:
+            base_dir (str): Diretório base onde as versões serão salvas
+            proxy_url (str): URL do proxy (padrão: PROXY_HOST/PROXY_PORT do ambiente)
+            ignore_ssl (bool): Ignorar verificações SSL (apenas para desenvolvimento)
+            platform (str): Plataforma dos arquivos (ex: "win-x64", "linux-x64", "auto")
+            base_url (str): URL base das releases (padrão: servidor oficial)
+            cache_dir (str): Cache de arquivos por SHA-256 ("off" desativa)
+            cache_max (str): Tamanho máximo do cache (ex: "2G"; 0 = sem limite)
+            extract_workers (int): Workers de extração do ZIP em paralelo
+            max_connections (int): Requisições simultâneas no total
+            executor (Executor): Executor para disco e extração (padrão: o do loop)
+            only (str|list): Instalar só os arquivos que casam com estes padrões ou
+                perfis (padrão: NODE_ONLY; ver NodeDownloader)
+        """
+        proxy_url = proxy_url or get_proxy_from_env()
+        
+        # Configuração, índice, checksums, cache e extração da versão síncrona;
+        # a rede dela só é usada pela instalação parcial (--only), no executor
+        self.sync = NodeDownloader(base_dir=base_dir, proxy_url=proxy_url, ignore_ssl=ignore_ssl,
+                                   platform=platform, base_url=base_url, cache_dir=cache_dir,
+                                   cache_max=cache_max, extract_workers=extract_workers, only=only)
+        self.sync.show_progress = False
+        self.base_dir = self.sync.base_dir
+        self.base_url = self.sync.base_url
+        self.platform = self.sync.platform
+        self.index = self.sync.index
+        
+        self.client = AsyncHTTPClient(proxy_url=proxy_url, ignore_ssl=ignore_ssl,
+                                      max_connections=max_connections)
+        self.executor = executor
+        self._index_lock = None
+        self._index_checked = 0.0
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    async def close(self):
+        """Fecha as conexões ociosas"""
+        await self.client.close()
+    
+    def pool_stats(self):
+        """
+        Estatísticas do pool de conexões
+        
+        Returns:
+            dict: requests, opened (conexões novas), reused (reaproveitadas), idle
+        """
+        return self.client.stats()
+    
+    async def _run(self, func, *args):
+        """Executa uma função bloqueante (disco, hash, extração) no executor"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, partial(func, *args))
+    
+    async def _load_index(self, force=False):
+        """
+        Garante que o índice está carregado (uma única atualização por vez)
+        
+        Args:
+            force (bool): Revalida no servidor mesmo dentro do TTL
+        
+        Returns:
+            bool: True se o índice está disponível (rede ou cache)
+        """
+        if self._index_lock is None:
+            self._index_lock = asyncio.Lock()
+        
+        async with self._index_lock:
+            index = self.index
+            if index.releases is None:
+                await self._run(index.load_from_disk)
+            if index.is_fresh() and not force:
+                return True
+            # Falha recente sem cache: não tenta de novo a cada versão consultada
+            if index.releases is None and time.time() - self._index_checked < MISSING_REVALIDATE_AGE:
+                return False
+            
+            self._index_checked = time.time()
+            try:
+                print(f"Atualizando índice de versões: {index.url}")
+                async with await self.client.open(index.url, timeout=15,
+                                                  headers=index.conditional_headers()) as response:
+                    body = await response.read()
+                await self._run(index.apply_response, response.status, response.headers, body)
+            except HTTPError as e:
+                if index.releases is None:
+                    return False
+                print(f"⚠️  Usando índice em cache (HTTP {e.code} ao revalidar)")
+            except (URLError, OSError, ValueError, asyncio.TimeoutError) as e:
+                if index.releases is None:
+                    return False
+                print(f"⚠️  Usando índice em cache (falha ao revalidar: {e})")
+            return True
+    
+    async def _get_release(self, version):
+        """Entrada do índice para uma versão, revalidando uma vez se não estiver no cache"""
+        release = self.index.releases.get(normalize_version(version))
+        last_check = max(self.index.meta.get('fetched_at', 0), self._index_checked)
+        if release is None and time.time() - last_check >= MISSING_REVALIDATE_AGE:
+            await self._load_index(force=True)
+            release = self.index.releases.get(normalize_version(version))
+        return release
+    
+    async def get_download_url(self, version):
+        """
+        Encontra a URL de download correta para a versão especificada
+        
+        Args:
+            version (str): Versão do Node.js
+        
+        Returns:
+            tuple: (URL completa para download, nome do arquivo)
+        """
+        if not await self._load_index():
+            return await self._scrape_download_url(version)
+        
+        release = await self._get_release(version)
+        located = self.index.release_artifact(release, PLATFORM_ARTIFACTS[self.platform])
+        if located:
+            return located
+        
+        version = f"v{normalize_version(version)}"
+        if release is None:
+            raise Exception(f"Versão {version} não encontrada no site do Node.js")
+        raise Exception(f"Arquivo {self.sync._artifact_label()} não encontrado para a versão {version}")
+    
+    async def resolve_spec(self, spec):
+        """
+        Converte uma versão, intervalo ou apelido em uma versão exata
+        
+        Mesma tabela do índice que NodeDownloader.resolve_spec, com o
+        index.json obtido pelo cliente assíncrono.
+        
+        Args:
+            spec (str): Especificação da versão (ex: "18", "lts", "latest")
+        
+        Returns:
+            str: Versão exata (ex: "18.17.0")
+        
+        Raises:
+            ValueError: Se a especificação for inválida
+            Exception: Se nenhuma versão corresponder ou o índice estiver indisponível
+        """
+        if self.sync.validate_version(normalize_version(spec)):
+            return normalize_version(spec)
+        if not await self._load_index():
+            raise Exception("Intervalos e apelidos de versão precisam do índice (index.json)")
+        version = self.index.table(load=False).resolve(spec, PLATFORM_ARTIFACTS[self.platform])
+        if version is None:
+            raise Exception(f"Nenhuma versão com {self.sync._artifact_label()} corresponde a '{spec}'")
+        return version
+    
+    async def resolve_versions(self, versions):
+        """
+        Resolve as URLs de download de várias versões ao mesmo tempo
+        
+        Args:
+            versions (list): Versões do Node.js
+        
+        Returns:
+            dict: versão -> (URL, nome do arquivo) ou None se não encontrada
+        """
+        results = await asyncio.gather(*(self.get_download_url(version) for version in versions),
+                                       return_exceptions=True)
+        return {version: None if isinstance(result, Exception) else result
+                for version, result in zip(versions, results)}
+    
+    async def _scrape_download_url(self, version):
+        """
+        Encontra a URL de download lendo a página HTML da versão
+        
+        Args:
+            version (str): Versão do Node.js
+        
+        Returns:
+            tuple: (URL completa para download, nome do arquivo)
+        """
+        if not version.startswith('v'):
+            version = f"v{version}"
+        version_url = f"{self.base_url}{version}/"
+        
+        try:
+            print(f"Verificando versão em: {version_url}")
+            async with await self.client.open(version_url, timeout=10) as response:
+                html_content = (await response.read()).decode('utf-8')
+            return self.sync._parse_release_page(version, version_url, html_content)
+        except HTTPError as e:
+            if e.code == 404:
+                raise Exception(f"Versão {version} não encontrada no site do Node.js")
+            raise Exception(f"Erro HTTP {e.code}: {e.reason}")
+        except URLError as e:
+            raise Exception(f"Erro de conexão: {e.reason}")
+    
+    async def check_version_exists(self, version):
+        """
+        Verifica se a versão existe no servidor
+        
+        Args:
+            version (str): Versão do Node.js
+        
+        Returns:
+            bool: True se existe, False caso contrário
+        """
+        try:
+            if await self._load_index():
+                return await self.get_download_url(version) is not None
+            url, _ = await self._scrape_download_url(version)
+            async with await self.client.open(url, timeout=10, method='HEAD') as response:
+                return response.status == 200
+        except Exception:
+            return False
+    
+    async def _load_checksums(self, version):
+        """Obtém o SHASUMS256.txt da versão pela rede, se ainda não estiver em cache"""
+        checksums = self.sync.checksums
+        if await self._run(checksums.cached, version) is not None or checksums.recently_failed(version):
+            return
+        text = None
+        try:
+            async with await self.client.open(checksums.url(version), timeout=15) as response:
+                text = (await response.read()).decode('utf-8')
+        except (URLError, HTTPError, OSError, ValueError, asyncio.TimeoutError) as e:
+            print(f"⚠️  SHASUMS256.txt indisponível para v{normalize_version(version)}: {e}")
+        await self._run(checksums.store, version, text)
+    
+    async def download_file(self, url, destination, sha256=None):
+        """
+        Baixa um arquivo para `<destination>.part`, retomando um parcial existente
+        
+        Com sha256, o hash é calculado enquanto os bytes são gravados e o
+        arquivo só é aceito se conferir; caso contrário é baixado de novo
+        uma vez antes de desistir.
+        
+        Args:
+            url (str): URL para download
+            destination (Path): Caminho de destino
+            sha256 (str): SHA-256 esperado (None para não verificar)
+        
+        Returns:
+            bool: True se sucesso, False caso contrário
+        """
+        part_path = destination.with_name(destination.name + '.part')
+        print(f"Iniciando download de: {url}")
+        
+        for attempt in range(2):
+            try:
+                await self._download_to(url, part_path, sha256)
+                break
+            except ChecksumMismatch as e:
+                # Bytes corrompidos: o parcial não serve nem para retomar
+                print(f"❌ {e}")
+                await self._run(self.sync._discard_partial, part_path)
+                if attempt == 1:
+                    print("❌ Arquivo recusado: o download não confere com o SHASUMS256.txt")
+                    return False
+                print("Baixando novamente...")
+            except NETWORK_ERRORS as e:
+                print(f"Erro durante o download: {e}")
+                return False
+        
+        if sha256:
+            print("✅ SHA-256 conferido")
+        await self._run(os.replace, part_path, destination)
+        return True
+    
+    async def _download_to(self, url, part_path, sha256=None):
+        """
+        Baixa (ou continua) o arquivo .part com uma conexão
+        
+        Raises:
+            ChecksumMismatch: Se o arquivo completo não conferir com sha256
+        """
+        # Continua de onde parou se o parcial anterior for contínuo desde o início
+        state = await self._run(PartState.load, part_path)
+        offset = 0
+        headers = {}
+        if state and state.url == url and state.ranges and state.ranges[0][0] == 0 and state.if_range():
+            offset = state.ranges[0][1] + 1
+            headers = {'Range': f'bytes={offset}-', 'If-Range': state.if_range()}
+        
+        async with await self.client.open(url, timeout=30, headers=headers) as response:
+            if response.status != 206:
+                # Servidor ignorou o Range (ou o arquivo mudou): recomeça do zero
+                offset = 0
+            length = response.getheader('Content-Length')
+            total = offset + int(length) if length is not None else 0
+            state = PartState(part_path, url, total, response.getheader('ETag'),
+                              response.getheader('Last-Modified'),
+                              [(0, offset - 1)] if offset else None)
+            
+            hasher = hashlib.sha256()
+            if offset:
+                print(f"Continuando download a partir de {offset // 1024} KB")
+                await self._run(_hash_prefix, part_path, offset, hasher)
+            
+            f = await self._run(open, part_path, 'r+b' if offset else 'wb')
+            position = offset
+            try:
+                if offset:
+                    await self._run(f.seek, offset)
+                buffer = bytearray()
+                while True:
+                    data = await response.read(READ_SIZE)
+                    if data:
+                        buffer += data
+                    if buffer and (not data or len(buffer) >= WRITE_BUFFER_SIZE):
+                        await self._run(_write_block, f, hasher, state, position, bytes(buffer))
+                        position += len(buffer)
+                        buffer.clear()
+                    if not data:
+                        break
+            finally:
+                await self._run(f.close)
+                await self._run(state.save)
+        
+        if total and position != total:
+            raise http.client.IncompleteRead(b'', total - position)
+        if sha256 and hasher.hexdigest() != sha256.lower():
+            raise ChecksumMismatch(f"SHA-256 não confere para {part_path.name}: "
+                                   f"esperado {sha256}, recebido {hasher.hexdigest()}")
+        await self._run(state.remove)
+    
+    async def download_version(self, version, extract=True):
+        """
+        Faz o download completo de uma versão do Node.js
+        
+        Args:
+            version (str): Versão, intervalo ou apelido (ex: "18.17.0", "18", "lts")
+            extract (bool): Se deve extrair o arquivo
+        
+        Returns:
+            bool: True se sucesso, False caso contrário
+        """
+        sync = self.sync
+        try:
+            exact = await self.resolve_spec(version)
+        except ValueError:
+            print(f"Erro: Versão '{version}' inválida. Use X.Y.Z (ex: 18.17.0), "
+                  f"um intervalo (18, ^18.17) ou um apelido (latest, lts, lts/hydrogen)")
+            return False
+        except Exception as e:
+            print(f"Erro: {e}")
+            return False
+        if exact != normalize_version(version):
+            print(f"🔎 {version} → {exact}")
+        version = exact
+        
+        print(f"Verificando se a versão {version} existe...")
+        try:
+            resolved = await self.get_download_url(version)
+        except Exception as e:
+            print(f"Erro: {e}")
+            print("Versões populares: 18.17.0, 20.9.0, 22.0.0")
+            return False
+        
+        # Com os checksums já em memória, a preparação não acessa a rede
+        await self._load_checksums(version)
+        job = await self._run(sync.prepare_install, version, resolved)
+        if job is None:
+            return False
+        if job['installed']:
+            return True
+        
+        # Instalação parcial: mesma seleção de membros (HTTP Range) do NodeDownloader
+        if job['only'] and job['is_tarball']:
+            print("ℹ️  Tarballs não permitem instalação parcial: a versão será instalada completa")
+            job['only'] = None
+        if extract and job['only']:
+            if not await self._run(sync.fetch_archive, job, extract):
+                return False
+            return await self._run(sync.install_archive, job)
+        
+        if job['cached']:
+            await self._run(sync.fetch_archive, job, extract)
+        else:
+            print(f"Baixando Node.js v{version}...")
+            zip_path = job['zip_path']
+            with sync.metrics.phase(job['metrics'], 'download') as details:
+                success = await self.download_file(job['url'], zip_path, job['sha256'])
+                if success:
+                    details['bytes'] = zip_path.stat().st_size
+            if not success:
+                if zip_path.with_name(job['filename'] + '.part.json').exists():
+                    print("O download parcial foi mantido e será retomado na próxima execução.")
+                sync.metrics.finish(job['metrics'], 'failed', error="download")
+                return False
+            print(f"Download concluído: v{version}")
+            if sync.archive_cache:
+                await self._run(sync._store_in_cache, sync.archive_cache.add, zip_path, job['sha256'])
+            job['archive'] = zip_path
+        
+        if not extract:
+            print(f"Arquivo salvo em: {job['archive']}")
+            if not job['cached']:
+                sync.metrics.finish(job['metrics'], 'downloaded')
+            return True
+        
+        success = await self._run(sync.install_archive, job)
+        # Tarballs baixados (não vindos do cache) não são removidos pela extração
+        if success and job['is_tarball'] and not job['cached']:
+            await self._run(job['archive'].unlink)
+        return success
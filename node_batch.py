@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Instalação de várias versões do Node.js em lote
+
+Todas as versões são resolvidas juntas (uma consulta ao índice) e cada
+instalação passa por duas filas com tamanho limitado: uma de downloads
+e outra de extrações. Enquanto uma versão é extraída as próximas já
+estão sendo baixadas, então o tempo total fica perto do maior dos dois
+trabalhos e não da soma de todas as instalações. O limite de banda do
+NodeDownloader (--max-bandwidth) vale para todos os downloads juntos.
+
+Uso (via node.py):
+    py node.py 16.20.0 18.17.0 20.9.0 22.0.0
+    py node.py --from-file=versoes.txt
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from node_index import normalize_version
+
+
+# Downloads simultâneos (cada um ainda pode usar várias conexões)
+DEFAULT_DOWNLOAD_JOBS = 3
+
+# Extrações simultâneas (cada uma ainda pode usar vários workers)
+DEFAULT_EXTRACT_JOBS = 2
+
+
+def read_versions_file(path):
+    """
+    Lê uma lista de versões (uma por linha, '#' inicia comentário)
+    
+    Args:
+        path (str): Caminho do arquivo
+    
+    Returns:
+        list: Versões na ordem do arquivo
+    """
+    versions = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            versions.extend(line.split('#', 1)[0].split())
+    return versions
+
+
+class BatchInstaller:
+    """Instala várias versões sobrepondo downloads e extrações"""
+    
+    def __init__(self, downloader, download_jobs=DEFAULT_DOWNLOAD_JOBS,
+                 extract_jobs=DEFAULT_EXTRACT_JOBS):
+        """
+        Args:
+            downloader (NodeDownloader): Downloader configurado (proxy, cache, banda...)
+            download_jobs (int): Downloads simultâneos
+            extract_jobs (int): Extrações simultâneas
+        """
+        self.downloader = downloader
+        self.download_jobs = max(1, download_jobs)
+        self.extract_jobs = max(1, extract_jobs)
+        self._lock = threading.Lock()
+        self._extract_futures = []
+        self._started = 0.0
+        self.elapsed = 0.0
+    
+    def run(self, versions, extract=True):
+        """
+        Instala as versões e retorna o resultado de cada uma
+        
+        Args:
+            versions (list): Versões do Node.js (duplicadas são ignoradas)
+            extract (bool): Se deve extrair os arquivos
+        
+        Returns:
+            list: Um dicionário por versão (version, status, download_time,
+                  extract_time, finished_at, error), na ordem recebida
+        """
+        unique, seen = [], set()
+        for version in versions:
+            if normalize_version(version) not in seen:
+                seen.add(normalize_version(version))
+                unique.append(version)
+        
+        self._started = time.monotonic()
+        self._extract_futures = []
+        print(f"Resolvendo {len(unique)} versões...")
+        resolved = self.downloader.resolve_versions(unique)
+        
+        results = [{
+            'version': version,
+            'status': 'pendente',
+            'download_time': None,
+            'extract_time': None,
+            'finished_at': None,
+            'error': None,
+        } for version in unique]
+        
+        # Várias barras de progresso na mesma linha ficariam ilegíveis
+        show_progress = self.downloader.show_progress
+        self.downloader.show_progress = False
+        
+        downloads = ThreadPoolExecutor(max_workers=self.download_jobs, thread_name_prefix="download-job")
+        extracts = ThreadPoolExecutor(max_workers=self.extract_jobs, thread_name_prefix="extract-job")
+        try:
+            futures = [downloads.submit(self._download, result, resolved.get(result['version']),
+                                        extracts, extract)
+                       for result in results]
+            for future in futures:
+                future.result()
+            # Todas as extrações já foram enfileiradas quando os downloads terminam
+            for future in list(self._extract_futures):
+                future.result()
+        except BaseException:
+            downloads.shutdown(wait=False, cancel_futures=True)
+            extracts.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            downloads.shutdown(wait=True)
+            extracts.shutdown(wait=True)
+            self.downloader.show_progress = show_progress
+        
+        self.elapsed = time.monotonic() - self._started
+        return results
+    
+    def _download(self, result, resolved, extracts, extract):
+        """Fila de downloads: prepara, obtém o arquivo e enfileira a extração"""
+        version = result['version']
+        try:
+            if resolved is None:
+                return self._finish(result, 'falhou', error="versão não encontrada")
+            
+            job = self.downloader.prepare_install(version, resolved)
+            if job is None:
+                return self._finish(result, 'falhou', error="versão inválida")
+            if job['installed']:
+                return self._finish(result, 'já instalado')
+            
+            started = time.monotonic()
+            success = self.downloader.fetch_archive(job, extract)
+            result['download_time'] = time.monotonic() - started
+            if not success:
+                return self._finish(result, 'falhou', error="download")
+            
+            if not extract:
+                return self._finish(result, 'baixado')
+            if job['extracted']:
+                # Tarball extraído em fluxo durante o download
+                self.downloader.install_archive(job)
+                return self._finish(result, 'instalado')
+            
+            future = extracts.submit(self._extract, result, job)
+            with self._lock:
+                self._extract_futures.append(future)
+        except Exception as e:
+            self._finish(result, 'falhou', error=str(e))
+    
+    def _extract(self, result, job):
+        """Fila de extrações: extrai o arquivo já obtido"""
+        try:
+            started = time.monotonic()
+            success = self.downloader.install_archive(job)
+            result['extract_time'] = time.monotonic() - started
+            if success:
+                self._finish(result, 'instalado')
+            else:
+                self._finish(result, 'falhou', error="extração")
+        except Exception as e:
+            self._finish(result, 'falhou', error=str(e))
+    
+    def _finish(self, result, status, error=None):
+        result['status'] = status
+        result['error'] = error
+        result['finished_at'] = time.monotonic() - self._started
+        print(f"{'❌' if status == 'falhou' else '✅'} v{normalize_version(result['version'])}: {status}")
+
+
+def print_summary(results, elapsed):
+    """
+    Mostra o tempo de cada versão e o total do lote
+    
+    Args:
+        results (list): Resultados de BatchInstaller.run
+        elapsed (float): Tempo total do lote em segundos
+    """
+    def seconds(value):
+        return f"{value:.1f}s" if value is not None else "-"
+    
+    print()
+    print("📊 Resumo da instalação em lote:")
+    print(f"   {'Versão':<12}{'Download':>10}{'Extração':>10}{'Concluído':>11}   Resultado")
+    for result in results:
+        status = result['status'] + (f" ({result['error']})" if result['error'] else "")
+        icon = '❌' if result['status'] == 'falhou' else '✅'
+        print(f"   {normalize_version(result['version']):<12}{seconds(result['download_time']):>10}"
+              f"{seconds(result['extract_time']):>10}{seconds(result['finished_at']):>11}   {icon} {status}")
+    
+    work = sum((result['download_time'] or 0) + (result['extract_time'] or 0) for result in results)
+    installed = sum(1 for result in results if result['status'] != 'falhou')
+    print(f"   {installed} de {len(results)} versões prontas em {elapsed:.1f}s "
+          f"(soma dos tempos individuais: {work:.1f}s)")
@@ -0,0 +1,683 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do pipeline de instalação contra um servidor local de releases
+
+Gera uma árvore de releases sintética (index.json, listagens HTML no
+formato do nodejs.org/dist, SHASUMS256.txt e ZIPs com o tamanho e a
+quantidade de arquivos pedidos) e a serve em 127.0.0.1, opcionalmente
+com HTTPS, latência, limite de banda e falhas injetadas. Cada versão é
+instalada do zero por um NodeDownloader novo e as fases são
+cronometradas separadamente:
+
+    resolve   localizar o arquivo (index.json ou página da versão)
+    download  baixar o ZIP (em faixas quando o servidor aceita Range)
+    verify    baixar o SHASUMS256.txt e conferir o hash do arquivo
+    extract   extrair no diretório da versão
+
+O download roda sem o hash em linha para que o custo da verificação
+apareça na própria fase. Os resultados vão para um JSON (com o commit
+atual) que pode ser comparado com o de outra execução:
+
+    py node_bench.py --size=30M --files=2000 --output=antes.json
+    py node_bench.py --size=30M --files=2000 --compare=antes.json
+"""
+
+import io
+import os
+import ssl
+import sys
+import json
+import time
+import random
+import zipfile
+import platform
+import tempfile
+import threading
+import statistics
+import subprocess
+from pathlib import Path
+from contextlib import redirect_stdout
+from email.utils import formatdate
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from node import NodeDownloader
+from node_cache import parse_size, file_sha256
+from node_server import REQUEST_QUEUE_SIZE, clean_path, parse_range
+
+
+# Versões geradas por padrão
+DEFAULT_VERSIONS = ["18.17.0", "20.9.0"]
+
+# Tamanho descompactado padrão de cada versão
+DEFAULT_ARCHIVE_SIZE = "8M"
+
+# Quantidade padrão de arquivos em cada ZIP
+DEFAULT_FILE_COUNT = 500
+
+# Fases cronometradas, na ordem do pipeline
+PHASES = ('resolve', 'download', 'verify', 'extract')
+
+# Bloco de envio quando há limite de banda ou queda injetada
+SEND_BLOCK = 64 * 1024
+
+# Versão do formato do JSON de resultados
+RESULTS_FORMAT = 1
+
+# Conteúdo de texto dos arquivos gerados (a outra metade é aleatória)
+FILLER = b"module.exports = function () { return require('./lib/npm.js'); };\n"
+
+
+def synthetic_payload(rng, size):
+    """
+    Conteúdo que comprime mais ou menos como os arquivos reais (~50%)
+    
+    Args:
+        rng (random.Random): Gerador (semente fixa = árvores iguais entre execuções)
+        size (int): Tamanho em bytes
+    
+    Returns:
+        bytes: Metade aleatória, metade texto repetido
+    """
+    half = size // 2
+    text = FILLER * (((size - half) // len(FILLER)) + 1)
+    return rng.randbytes(half) + text[:size - half]
+
+
+def listing_html(rel_path, directory):
+    """
+    Listagem de diretório no formato do nginx usado pelo nodejs.org/dist
+    
+    Args:
+        rel_path (str): Caminho pedido (ex: "v18.17.0/")
+        directory (Path): Diretório listado
+    
+    Returns:
+        str: Página HTML
+    """
+    title = f"Index of /dist/{rel_path}"
+    lines = ['<a href="../">../</a>']
+    for entry in sorted(directory.iterdir()):
+        stat = entry.stat()
+        modified = time.strftime('%d-%b-%Y %H:%M', time.gmtime(stat.st_mtime))
+        name = entry.name + ('/' if entry.is_dir() else '')
+        size = '-' if entry.is_dir() else str(stat.st_size)
+        lines.append(f'<a href="{name}">{name}</a>{" " * max(1, 51 - len(name))}'
+                     f'{modified} {size:>19}')
+    return (f"<html>\r\n<head><title>{title}</title></head>\r\n<body>\r\n"
+            f"<h1>{title}</h1><hr><pre>" + "\r\n".join(lines) + "\r\n</pre><hr></body>\r\n</html>\r\n")
+
+
+class ReleaseTree:
+    """Árvore de releases sintética em disco, no formato do servidor oficial"""
+    
+    def __init__(self, root, versions=None, size=DEFAULT_ARCHIVE_SIZE, files=DEFAULT_FILE_COUNT,
+                 index=True, seed=0):
+        """
+        Args:
+            root (Path): Diretório onde a árvore é gerada
+            versions (list): Versões "X.Y.Z" (padrão: DEFAULT_VERSIONS)
+            size (str|int): Tamanho descompactado de cada versão (ex: "30M")
+            files (int): Arquivos em cada ZIP (o node.exe fica com ~40% do tamanho)
+            index (bool): Publicar index.json (False força a leitura das listagens HTML)
+            seed (int): Semente do conteúdo gerado
+        """
+        self.root = Path(root)
+        self.versions = list(versions or DEFAULT_VERSIONS)
+        self.size = parse_size(size)
+        self.files = max(1, int(files))
+        self.index = index
+        self.seed = seed
+        self.archives = {}
+    
+    def build(self):
+        """
+        Gera os ZIPs, os SHASUMS256.txt e o index.json
+        
+        Returns:
+            ReleaseTree: A própria árvore
+        """
+        rng = random.Random(self.seed)
+        releases = []
+        for version in self.versions:
+            version_dir = self.root / f"v{version}"
+            version_dir.mkdir(parents=True, exist_ok=True)
+            filename = f"node-v{version}-win-x64.zip"
+            path = version_dir / filename
+            self._write_zip(path, f"node-v{version}-win-x64", rng)
+            
+            sha256 = file_sha256(path)
+            (version_dir / "SHASUMS256.txt").write_text(f"{sha256}  {filename}\n", encoding='utf-8')
+            self.archives[version] = {'filename': filename, 'sha256': sha256,
+                                      'bytes': path.stat().st_size}
+            releases.append({"version": f"v{version}", "date": time.strftime('%Y-%m-%d'),
+                             "lts": False, "files": ["win-x64-zip"]})
+        
+        if self.index:
+            releases.sort(key=lambda r: tuple(int(p) for p in r['version'][1:].split('.')),
+                          reverse=True)
+            (self.root / "index.json").write_text(json.dumps(releases), encoding='utf-8')
+        return self
+    
+    def _write_zip(self, path, top, rng):
+        """Gera o ZIP de uma versão: node.exe + arquivos pequenos em node_modules"""
+        others = self.files - 1
+        executable = self.size * 2 // 5 if others else self.size
+        remaining = self.size - executable
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
+            zip_ref.writestr(f"{top}/node.exe", synthetic_payload(rng, executable))
+            for i in range(others):
+                size = remaining // (others - i)
+                remaining -= size
+                zip_ref.writestr(f"{top}/node_modules/npm/lib/d{i // 100:03d}/module{i:05d}.js",
+                                 synthetic_payload(rng, size))
+
+
+class FaultInjector:
+    """Latência, limite de banda e falhas aplicados pelo servidor de benchmark"""
+    
+    def __init__(self, latency=0.0, bandwidth=0, fail_rate=0.0, drop_rate=0.0, limit=None, seed=0):
+        """
+        Args:
+            latency (float): Segundos de espera antes de cada resposta
+            bandwidth (str|int): Limite de banda por conexão em bytes/s (0 = sem limite)
+            fail_rate (float): Probabilidade de responder 503 a um GET de arquivo
+            drop_rate (float): Probabilidade de fechar a conexão no meio do arquivo
+            limit (int): Máximo de falhas injetadas (None = sem limite)
+            seed (int): Semente do sorteio das falhas
+        """
+        self.latency = float(latency)
+        self.bandwidth = parse_size(bandwidth or 0)
+        self.fail_rate = float(fail_rate)
+        self.drop_rate = float(drop_rate)
+        self.limit = limit
+        self.failures = 0
+        self.drops = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    def should_fail(self):
+        """Sorteia se este GET recebe 503"""
+        if not self._roll(self.fail_rate):
+            return False
+        with self._lock:
+            self.failures += 1
+        return True
+    
+    def drop_after(self, length):
+        """
+        Sorteia se a conexão cai no meio da resposta
+        
+        Args:
+            length (int): Bytes que seriam enviados
+        
+        Returns:
+            int: Bytes enviados antes de fechar a conexão, ou None para enviar tudo
+        """
+        if length < 2 or not self._roll(self.drop_rate):
+            return None
+        with self._lock:
+            self.drops += 1
+        return length // 2
+    
+    def stats(self):
+        return {'failures': self.failures, 'drops': self.drops}
+    
+    def _roll(self, rate):
+        if rate <= 0:
+            return False
+        with self._lock:
+            if self.limit is not None and self.failures + self.drops >= self.limit:
+                return False
+            return self._random.random() < rate
+
+
+class BenchRequestHandler(BaseHTTPRequestHandler):
+    """Atende a árvore sintética com as falhas do FaultInjector"""
+    
+    protocol_version = "HTTP/1.1"
+    server_version = "node-nvm-bench"
+    # Cabeçalhos e corpo saem em escritas separadas: sem isto o ACK atrasado
+    # do cliente soma ~40 ms a cada resposta pequena (SHASUMS, index.json)
+    disable_nagle_algorithm = True
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def do_GET(self):
+        self._serve(head=False)
+    
+    def do_HEAD(self):
+        self._serve(head=True)
+    
+    def _serve(self, head):
+        server = self.server
+        server.count(requests=1)
+        if server.faults.latency:
+            time.sleep(server.faults.latency)
+        
+        rel_path = clean_path(self.path)
+        if rel_path is None:
+            self.send_error(400, "Caminho inválido")
+            return
+        path = server.tree.root / rel_path
+        
+        if path.is_dir():
+            if rel_path and not rel_path.endswith('/'):
+                self.send_response(301)
+                self.send_header('Location', f"/{rel_path}/")
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            body = listing_html(rel_path, path).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if not head:
+                self.wfile.write(body)
+                server.count(bytes_sent=len(body))
+            return
+        
+        if not path.is_file():
+            self.send_error(404)
+            return
+        
+        # Falhas só nos GETs dos arquivos: a sonda (HEAD) e os textos passam
+        archive = path.suffix == '.zip' and not head
+        if archive and server.faults.should_fail():
+            self.send_error(503, "Falha injetada")
+            return
+        with open(path, 'rb') as f:
+            self._send_body(f, archive, head)
+    
+    def _send_body(self, f, archive, head):
+        """Envia o arquivo inteiro ou a faixa pedida (If-Range pelo Last-Modified)"""
+        total = os.fstat(f.fileno()).st_size
+        last_modified = formatdate(os.fstat(f.fileno()).st_mtime, usegmt=True)
+        byte_range = None
+        if self.headers.get('Range'):
+            if_range = self.headers.get('If-Range')
+            if not if_range or if_range == last_modified:
+                byte_range = parse_range(self.headers['Range'], total)
+        
+        if byte_range is False:
+            self.send_response(416)
+            self.send_header('Content-Range', f'bytes */{total}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        
+        start, end = byte_range or (0, total - 1)
+        length = end - start + 1
+        self.send_response(206 if byte_range else 200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(length))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Last-Modified', last_modified)
+        if byte_range:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{total}')
+        self.end_headers()
+        if head:
+            return
+        
+        drop_after = self.server.faults.drop_after(length) if archive else None
+        try:
+            self._send_range(f, start, length if drop_after is None else drop_after)
+        except (ConnectionError, TimeoutError):
+            drop_after = 0
+        if drop_after is not None:
+            # Conexão fechada antes do Content-Length: o cliente precisa retomar
+            self.close_connection = True
+    
+    def _send_range(self, f, start, count):
+        """Envia `count` bytes a partir de `start`, respeitando o limite de banda"""
+        bandwidth = self.server.faults.bandwidth
+        if not bandwidth:
+            sent = self.connection.sendfile(f, start, count)
+            self.server.count(bytes_sent=sent)
+            return
+        
+        f.seek(start)
+        started = time.monotonic()
+        sent = 0
+        while sent < count:
+            data = f.read(min(SEND_BLOCK, count - sent))
+            if not data:
+                break
+            self.wfile.write(data)
+            sent += len(data)
+            self.server.count(bytes_sent=len(data))
+            delay = sent / bandwidth - (time.monotonic() - started)
+            if delay > 0:
+                time.sleep(delay)
+
+
+class BenchServer(ThreadingHTTPServer):
+    """Servidor HTTP(S) local da árvore sintética"""
+    
+    daemon_threads = True
+    request_queue_size = REQUEST_QUEUE_SIZE
+    
+    def __init__(self, tree, faults=None, address=('127.0.0.1', 0), certfile=None, keyfile=None):
+        """
+        Args:
+            tree (ReleaseTree): Árvore já gerada
+            faults (FaultInjector): Falhas a injetar (padrão: nenhuma)
+            address (tuple): (host, porta); porta 0 escolhe uma livre
+            certfile (str): Certificado PEM para servir HTTPS
+            keyfile (str): Chave privada do certificado (se não estiver no certfile)
+        """
+        self.tree = tree
+        self.faults = faults or FaultInjector()
+        self.requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self.ssl_context = None
+        if certfile:
+            self.ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            self.ssl_context.load_cert_chain(certfile, keyfile)
+        super().__init__(address, BenchRequestHandler)
+    
+    def get_request(self):
+        sock, address = super().get_request()
+        if self.ssl_context:
+            # Handshake na thread da conexão, não na que aceita conexões
+            sock = self.ssl_context.wrap_socket(sock, server_side=True,
+                                                do_handshake_on_connect=False)
+        return sock, address
+    
+    def count(self, requests=0, bytes_sent=0):
+        with self._lock:
+            self.requests += requests
+            self.bytes_sent += bytes_sent
+    
+    def stats(self):
+        """
+        Returns:
+            dict: requests, bytes_sent, failures (503 injetados), drops (conexões cortadas)
+        """
+        with self._lock:
+            stats = {'requests': self.requests, 'bytes_sent': self.bytes_sent}
+        stats.update(self.faults.stats())
+        return stats
+    
+    @property
+    def url(self):
+        """URL base para o downloader (base_url)"""
+        host, port = self.server_address[:2]
+        scheme = 'https' if self.ssl_context else 'http'
+        return f"{scheme}://{host}:{port}/"
+
+
+def install_once(base_url, version, base_dir, connections=None, workers=None, ignore_ssl=False):
+    """
+    Instala uma versão do zero, cronometrando cada fase
+    
+    Args:
+        base_url (str): URL do servidor de benchmark
+        version (str): Versão "X.Y.Z"
+        base_dir (Path): NVM_DIR vazio desta execução
+        connections (int): Conexões por download
+        workers (int): Workers de extração
+        ignore_ssl (bool): Aceitar o certificado do servidor sem verificar
+    
+    Returns:
+        dict: phases (segundos por fase), archive_bytes, files, bytes, pool
+    
+    Raises:
+        Exception: Se alguma fase falhar
+    """
+    base_dir = Path(base_dir)
+    downloader = NodeDownloader(base_dir=base_dir, base_url=base_url, mirrors=[base_url],
+                                cache_dir="off", ignore_ssl=ignore_ssl, connections=connections,
+                                extract_workers=workers, platform="win-x64")
+    downloader.show_progress = False
+    phases = {}
+    
+    started = time.perf_counter()
+    url, filename = downloader.get_download_url(version)
+    phases['resolve'] = time.perf_counter() - started
+    
+    archive = base_dir / ".downloads" / filename
+    archive.parent.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    if not downloader.download_file(url, archive):
+        raise Exception(f"Falha no download de {filename}")
+    phases['download'] = time.perf_counter() - started
+    archive_bytes = archive.stat().st_size
+    
+    started = time.perf_counter()
+    expected = downloader.checksums.expected(version, filename)
+    if not expected or file_sha256(archive) != expected:
+        raise Exception(f"SHA-256 de {filename} não confere")
+    phases['verify'] = time.perf_counter() - started
+    
+    stats = {}
+    started = time.perf_counter()
+    if not downloader.extract_zip(archive, base_dir / f"v{version}", stats=stats):
+        raise Exception(f"Falha ao extrair {filename}")
+    phases['extract'] = time.perf_counter() - started
+    
+    return {
+        'phases': phases,
+        'archive_bytes': archive_bytes,
+        'files': stats.get('files'),
+        'bytes': stats.get('bytes'),
+        'pool': downloader.pool_stats(),
+    }
+
+
+def current_commit():
+    """Commit atual do repositório (para comparar resultados), ou None"""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def summarize(runs):
+    """
+    Mediana, mínimo e máximo de cada fase nas execuções bem-sucedidas
+    
+    Args:
+        runs (list): Execuções de run_benchmark
+    
+    Returns:
+        dict: fase -> {median, min, max}, mais total e download_mb_s
+    """
+    succeeded = [run for run in runs if run['ok']]
+    if not succeeded:
+        return {}
+    summary = {}
+    for phase in PHASES + ('total',):
+        values = [run['phases'][phase] if phase != 'total' else sum(run['phases'].values())
+                  for run in succeeded]
+        summary[phase] = {'median': statistics.median(values), 'min': min(values), 'max': max(values)}
+    throughput = [run['archive_bytes'] / run['phases']['download'] / 1024 / 1024
+                  for run in succeeded if run['phases']['download'] > 0]
+    summary['download_mb_s'] = statistics.median(throughput) if throughput else None
+    return summary
+
+
+def run_benchmark(versions=None, size=DEFAULT_ARCHIVE_SIZE, files=DEFAULT_FILE_COUNT, iterations=3,
+                  connections=None, workers=None, faults=None, index=True, certfile=None,
+                  keyfile=None, seed=0, verbose=False):
+    """
+    Gera a árvore, sobe o servidor e instala cada versão `iterations` vezes
+    
+    Args:
+        versions (list): Versões geradas e instaladas
+        size (str|int): Tamanho descompactado de cada versão
+        files (int): Arquivos em cada ZIP
+        iterations (int): Instalações de cada versão
+        connections (int): Conexões por download (padrão do downloader se None)
+        workers (int): Workers de extração (padrão do downloader se None)
+        faults (FaultInjector): Latência, banda e falhas do servidor
+        index (bool): Publicar index.json
+        certfile (str): Certificado para servir HTTPS
+        keyfile (str): Chave do certificado
+        seed (int): Semente do conteúdo
+        verbose (bool): Mostrar a saída do downloader
+    
+    Returns:
+        dict: Resultados (config, runs, summary, server), prontos para JSON
+    """
+    with tempfile.TemporaryDirectory(prefix="node-bench-") as temp_dir:
+        tree = ReleaseTree(Path(temp_dir) / "dist", versions, size, files, index, seed)
+        print(f"🏗️  Gerando {len(tree.versions)} versões ({tree.size / 1024 / 1024:.1f} MB, "
+              f"{tree.files} arquivos cada)...")
+        tree.build()
+        
+        server = BenchServer(tree, faults, certfile=certfile, keyfile=keyfile)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"🌐 Servidor de benchmark em {server.url}")
+        
+        runs = []
+        try:
+            for iteration in range(iterations):
+                for version in tree.versions:
+                    base_dir = Path(temp_dir) / f"nvm-{iteration}-{version}"
+                    run = {'version': version, 'iteration': iteration, 'ok': False}
+                    output = sys.stdout if verbose else io.StringIO()
+                    try:
+                        with redirect_stdout(output):
+                            run.update(install_once(server.url, version, base_dir, connections,
+                                                    workers, ignore_ssl=bool(certfile)))
+                        run['ok'] = True
+                    except Exception as e:
+                        run['error'] = str(e)
+                    runs.append(run)
+                    print_run(run)
+        finally:
+            server.shutdown()
+            server.server_close()
+        
+        return {
+            'format': RESULTS_FORMAT,
+            'commit': current_commit(),
+            'created_at': time.time(),
+            'python': platform.python_version(),
+            'system': platform.platform(),
+            'config': {
+                'versions': tree.versions,
+                'size': tree.size,
+                'files': tree.files,
+                'iterations': iterations,
+                'connections': connections,
+                'workers': workers,
+                'index': index,
+                'tls': bool(certfile),
+                'latency': server.faults.latency,
+                'bandwidth': server.faults.bandwidth,
+                'fail_rate': server.faults.fail_rate,
+                'drop_rate': server.faults.drop_rate,
+            },
+            'archives': tree.archives,
+            'runs': runs,
+            'summary': summarize(runs),
+            'server': server.stats(),
+        }
+
+
+def print_run(run):
+    """Uma linha por instalação"""
+    if not run['ok']:
+        print(f"   ❌ v{run['version']} #{run['iteration'] + 1}: {run['error']}")
+        return
+    phases = "  ".join(f"{phase} {run['phases'][phase] * 1000:7.1f} ms" for phase in PHASES)
+    print(f"   ✅ v{run['version']} #{run['iteration'] + 1}: {phases}")
+
+
+def print_summary(results, baseline=None):
+    """
+    Mostra as medianas de cada fase, comparando com um resultado anterior
+    
+    Args:
+        results (dict): Resultado de run_benchmark
+        baseline (dict): Resultado anterior (ex: de outro commit) ou None
+    """
+    summary = results['summary']
+    if not summary:
+        print("❌ Nenhuma instalação concluída")
+        return
+    old = (baseline or {}).get('summary') or {}
+    if old:
+        print(f"\n📊 Medianas (commit {results['commit'] or '?'} x {baseline.get('commit') or '?'}):")
+    else:
+        print(f"\n📊 Medianas (commit {results['commit'] or '?'}):")
+    for phase in PHASES + ('total',):
+        line = f"   {phase:<10}{summary[phase]['median'] * 1000:9.1f} ms"
+        if phase in old and old[phase]['median'] > 0:
+            change = (summary[phase]['median'] / old[phase]['median'] - 1) * 100
+            line += f"   (antes {old[phase]['median'] * 1000:.1f} ms, {change:+.1f}%)"
+        print(line)
+    if summary['download_mb_s']:
+        print(f"   download  {summary['download_mb_s']:9.1f} MB/s")
+    server = results['server']
+    print(f"   servidor: {server['requests']} requisições, {server['bytes_sent'] / 1024 / 1024:.1f} MB, "
+          f"{server['failures']} falhas e {server['drops']} quedas injetadas")
+
+
+def main():
+    """Função principal do benchmark"""
+    options = {}
+    for arg in sys.argv[1:]:
+        if arg.startswith('--') and '=' in arg:
+            key, value = arg[2:].split('=', 1)
+            options[key] = value
+        elif arg == '--no-index':
+            options['no-index'] = True
+        elif arg == '--verbose':
+            options['verbose'] = True
+        else:
+            print(f"Opção desconhecida: {arg}")
+            print("Uso: py node_bench.py [--versions=18.17.0,20.9.0] [--size=8M] [--files=500] "
+                  "[--iterations=3] [--connections=N] [--workers=N] [--latency=0.05] "
+                  "[--bandwidth=10M] [--fail-rate=0.1] [--drop-rate=0.1] [--no-index] "
+                  "[--cert=cert.pem --key=key.pem] [--output=resultado.json] [--compare=antes.json]")
+            return 2
+    
+    baseline = None
+    if options.get('compare'):
+        try:
+            with open(options['compare'], 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"❌ Não foi possível ler {options['compare']}: {e}")
+            return 2
+    
+    faults = FaultInjector(
+        latency=float(options.get('latency', 0)),
+        bandwidth=options.get('bandwidth', 0),
+        fail_rate=float(options.get('fail-rate', 0)),
+        drop_rate=float(options.get('drop-rate', 0)),
+    )
+    versions = options['versions'].split(',') if options.get('versions') else None
+    results = run_benchmark(
+        versions=versions,
+        size=options.get('size', DEFAULT_ARCHIVE_SIZE),
+        files=int(options.get('files', DEFAULT_FILE_COUNT)),
+        iterations=int(options.get('iterations', 3)),
+        connections=options.get('connections'),
+        workers=options.get('workers'),
+        faults=faults,
+        index=not options.get('no-index'),
+        certfile=options.get('cert'),
+        keyfile=options.get('key'),
+        verbose=options.get('verbose', False),
+    )
+    
+    print_summary(results, baseline)
+    
+    output = options.get('output') or f"bench-{results['commit'] or 'resultado'}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Resultados salvos em: {output}")
+    return 0 if all(run['ok'] for run in results['runs']) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache local de arquivos do Node.js endereçado por SHA-256
+
+Os arquivos baixados (ZIPs e tarballs) são guardados pelo seu SHA-256,
+em um diretório que pode ser compartilhado entre vários NVM_DIR e entre
+máquinas (ex: um volume montado nos runners de CI). Reinstalar uma
+versão já vista usa o arquivo do cache em vez da rede.
+
+Estrutura:
+    <cache>/sha256/ab/abcdef...    conteúdo, nomeado pelo próprio hash
+    <cache>/refs/<arquivo>         nome do arquivo -> hash (sem SHASUMS256.txt)
+    <cache>/tmp/                   gravações em andamento
+
+Toda gravação vai para tmp/ e entra no cache com um rename, então
+processos concorrentes nunca veem um arquivo pela metade. O tamanho
+total é limitado e os arquivos usados há mais tempo (mtime, atualizado
+a cada uso) são removidos primeiro.
+"""
+
+import os
+import re
+import uuid
+import shutil
+import hashlib
+from pathlib import Path
+
+
+# Tamanho máximo padrão do cache
+DEFAULT_CACHE_MAX = 2 * 1024 * 1024 * 1024
+
+# Tamanho das leituras ao calcular o hash de um arquivo
+HASH_READ_SIZE = 1024 * 1024
+
+SIZE_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+
+
+def default_cache_dir():
+    """
+    Diretório padrão do cache, no perfil do usuário (compartilhado entre NVM_DIR)
+    
+    Returns:
+        Path: %LOCALAPPDATA%/node-nvm/archives no Windows, ~/.cache/node-nvm/archives nos demais
+    """
+    if os.name == 'nt' and os.environ.get('LOCALAPPDATA'):
+        root = Path(os.environ['LOCALAPPDATA'])
+    else:
+        root = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / ".cache")
+    return root / "node-nvm" / "archives"
+
+
+def parse_size(value):
+    """
+    Converte um tamanho como "500M" ou "2G" em bytes
+    
+    Args:
+        value (str|int): Tamanho em bytes ou com sufixo K/M/G/T
+    
+    Returns:
+        int: Tamanho em bytes (0 = sem limite)
+    
+    Raises:
+        ValueError: Se o formato for inválido
+    """
+    if isinstance(value, int):
+        return value
+    match = re.match(r'^\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*$', str(value), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Tamanho inválido: {value}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+
+def file_sha256(path):
+    """Calcula o SHA-256 de um arquivo"""
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(HASH_READ_SIZE)
+            if not chunk:
+                break
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class CacheWriter:
+    """Arquivo sendo gravado no cache (ex: cópia de um tarball durante o download)"""
+    
+    def __init__(self, cache, filename):
+        """
+        Args:
+            cache (ArchiveCache): Cache de destino
+            filename (str): Nome do arquivo original (para a referência por nome)
+        """
+        self.cache = cache
+        self.filename = filename
+        self.temp_path = cache.temp_path()
+        self.committed = False
+        self._file = open(self.temp_path, 'wb')
+    
+    def write(self, data):
+        self._file.write(data)
+    
+    def commit(self, sha256):
+        """
+        Publica o arquivo gravado no cache
+        
+        Args:
+            sha256 (str): SHA-256 do conteúdo gravado
+        
+        Returns:
+            Path: Caminho no cache
+        """
+        self._file.close()
+        self.committed = True
+        return self.cache._publish(self.temp_path, sha256, self.filename)
+    
+    def abort(self):
+        """Descarta o arquivo gravado (se ainda não foi publicado)"""
+        self._file.close()
+        if self.committed:
+            return
+        try:
+            self.temp_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class TeeReader:
+    """Repassa as leituras de uma fonte e grava uma cópia de cada bloco"""
+    
+    def __init__(self, source, sink):
+        """
+        Args:
+            source: Objeto com read(n)
+            sink: Objeto com write(data) (ex: CacheWriter)
+        """
+        self.source = source
+        self.sink = sink
+    
+    def read(self, size=-1):
+        data = self.source.read(size)
+        if data:
+            self.sink.write(data)
+        return data
+    
+    def close(self):
+        self.source.close()
+
+
+class ArchiveCache:
+    """Cache de arquivos do Node.js endereçado por SHA-256, com limite de tamanho (LRU)"""
+    
+    def __init__(self, root, max_bytes=DEFAULT_CACHE_MAX):
+        """
+        Args:
+            root (Path): Diretório do cache (pode ser compartilhado)
+            max_bytes (int): Tamanho máximo total (0 = sem limite)
+        """
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.objects_dir = self.root / "sha256"
+        self.refs_dir = self.root / "refs"
+        self.tmp_dir = self.root / "tmp"
+    
+    def object_path(self, sha256):
+        """Caminho do conteúdo com um dado SHA-256"""
+        sha256 = sha256.lower()
+        return self.objects_dir / sha256[:2] / sha256
+    
+    def temp_path(self):
+        """Caminho único para uma gravação em andamento"""
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        return self.tmp_dir / f"{os.getpid()}-{uuid.uuid4().hex}"
+    
+    def lookup(self, sha256=None, filename=None):
+        """
+        Procura um arquivo no cache, conferindo o conteúdo
+        
+        Args:
+            sha256 (str): SHA-256 esperado (preferido)
+            filename (str): Nome do arquivo, usado quando o SHA-256 não é conhecido
+        
+        Returns:
+            Path: Caminho do arquivo no cache ou None
+        """
+        if not sha256 and filename:
+            try:
+                sha256 = (self.refs_dir / filename).read_text(encoding='utf-8').strip()
+            except OSError:
+                return None
+        if not sha256:
+            return None
+        
+        path = self.object_path(sha256)
+        if not path.exists():
+            return None
+        
+        # Cache compartilhado: um arquivo danificado é descartado, não usado
+        if file_sha256(path) != sha256.lower():
+            print(f"⚠️  Arquivo inválido removido do cache: {path}")
+            self.remove(path)
+            return None
+        
+        # Marca como usado recentemente (LRU)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+    
+    def add(self, path, sha256=None, filename=None):
+        """
+        Guarda um arquivo no cache (hardlink quando possível, senão cópia)
+        
+        Args:
+            path (Path): Arquivo a guardar
+            sha256 (str): SHA-256 do arquivo (calculado se None)
+            filename (str): Nome original (padrão: nome de path)
+        
+        Returns:
+            Path: Caminho no cache
+        """
+        sha256 = (sha256 or file_sha256(path)).lower()
+        existing = self.object_path(sha256)
+        if existing.exists():
+            self._write_ref(filename or path.name, sha256)
+            os.utime(existing)
+            return existing
+        
+        temp_path = self.temp_path()
+        try:
+            os.link(path, temp_path)
+        except OSError:
+            shutil.copyfile(path, temp_path)
+        return self._publish(temp_path, sha256, filename or path.name)
+    
+    def writer(self, filename):
+        """
+        Abre uma gravação incremental no cache
+        
+        Args:
+            filename (str): Nome original do arquivo
+        
+        Returns:
+            CacheWriter: Objeto com write/commit/abort
+        """
+        return CacheWriter(self, filename)
+    
+    def remove(self, path):
+        """Remove um arquivo do cache"""
+        try:
+            Path(path).unlink()
+        except FileNotFoundError:
+            pass
+    
+    def entries(self):
+        """
+        Lista os arquivos do cache
+        
+        Returns:
+            list: Tuplas (mtime, tamanho, caminho)
+        """
+        entries = []
+        if not self.objects_dir.exists():
+            return entries
+        for path in self.objects_dir.glob("*/*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+    
+    def evict(self, keep=None):
+        """
+        Remove os arquivos usados há mais tempo até respeitar o limite de tamanho
+        
+        Args:
+            keep (Path): Arquivo que não deve ser removido (o recém-adicionado)
+        
+        Returns:
+            int: Bytes liberados
+        """
+        if not self.max_bytes:
+            return 0
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if keep is not None and path == keep:
+                continue
+            self.remove(path)
+            total -= size
+            freed += size
+        return freed
+    
+    def _publish(self, temp_path, sha256, filename):
+        """Move uma gravação concluída para o seu endereço e aplica o limite"""
+        destination = self.object_path(sha256)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(temp_path, destination)
+        self._write_ref(filename, sha256)
+        self.evict(keep=destination)
+        return destination
+    
+    def _write_ref(self, filename, sha256):
+        """Grava a referência nome do arquivo -> SHA-256"""
+        try:
+            self.refs_dir.mkdir(parents=True, exist_ok=True)
+            temp_path = self.temp_path()
+            temp_path.write_text(sha256, encoding='utf-8')
+            os.replace(temp_path, self.refs_dir / filename)
+        except OSError as e:
+            print(f"⚠️  Não foi possível gravar a referência no cache: {e}")
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Verificação SHA-256 dos arquivos do Node.js (SHASUMS256.txt)
+
+Cada release publica um `SHASUMS256.txt` com o hash de todos os seus
+arquivos. Ele é baixado uma vez por versão e guardado em disco (releases
+publicadas não mudam), e o arquivo baixado é conferido contra ele.
+
+O hash é calculado durante o download, no mesmo laço que grava os bytes.
+No download segmentado as faixas chegam fora de ordem, então o
+OrderedHasher processa os blocos na ordem do arquivo: o que chega na
+posição atual é processado na hora, o que chega adiantado espera em
+memória (até um limite) e só o excedente é relido do disco quando a
+posição atual alcançá-lo. Ao retomar um .part, os bytes baixados em
+execuções anteriores precisam ser lidos uma vez do disco.
+"""
+
+import re
+import time
+import hashlib
+import threading
+from urllib.error import URLError, HTTPError
+
+from node_index import normalize_version
+from node_trace import span
+
+
+# Memória máxima para blocos que chegaram antes da posição atual do hash
+HASH_BUFFER_LIMIT = 64 * 1024 * 1024
+
+# Tamanho das leituras ao processar bytes que ficaram só no disco
+HASH_READ_SIZE = 1024 * 1024
+
+# Segundos em que uma falha ao obter o SHASUMS256.txt evita nova tentativa
+FAILURE_TTL = 60
+
+
+class ChecksumMismatch(Exception):
+    """O SHA-256 do arquivo baixado não confere com o publicado"""
+
+
+class OrderedHasher:
+    """SHA-256 incremental de um arquivo escrito em faixas fora de ordem"""
+    
+    def __init__(self, path, completed=None, max_buffer=HASH_BUFFER_LIMIT):
+        """
+        Args:
+            path (Path): Arquivo sendo gravado (para os bytes que não ficaram em memória)
+            completed (list): Faixas (início, fim) já presentes no disco (download retomado)
+            max_buffer (int): Bytes adiantados mantidos em memória
+        """
+        self.path = path
+        self.max_buffer = max_buffer
+        self.position = 0
+        self.seconds = 0.0
+        self._sha256 = hashlib.sha256()
+        self._pending = {}
+        self._pending_bytes = 0
+        self._on_disk = []
+        self._lock = threading.Lock()
+        
+        for start, end in completed or []:
+            self._mark_on_disk(start, end)
+        with self._lock:
+            self._advance()
+    
+    def update(self, offset, data):
+        """
+        Registra um bloco já gravado no arquivo
+        
+        Args:
+            offset (int): Posição do bloco no arquivo
+            data (bytes): Conteúdo do bloco (memoryview é copiada se ficar pendente)
+        """
+        if not data:
+            return
+        with self._lock:
+            if offset == self.position:
+                self._consume(data)
+                self._advance()
+            elif self._pending_bytes + len(data) <= self.max_buffer:
+                self._pending[offset] = bytes(data)
+                self._pending_bytes += len(data)
+            else:
+                self._mark_on_disk(offset, offset + len(data) - 1)
+    
+    def hexdigest(self):
+        """Retorna o SHA-256 dos bytes processados até agora"""
+        with self._lock:
+            return self._sha256.hexdigest()
+    
+    def verify(self, expected, name=None):
+        """
+        Confere o hash final com o esperado
+        
+        Args:
+            expected (str): SHA-256 publicado (hexadecimal)
+            name (str): Nome do arquivo para a mensagem de erro
+        
+        Raises:
+            ChecksumMismatch: Se o hash não conferir
+        """
+        actual = self.hexdigest()
+        if actual != expected.lower():
+            raise ChecksumMismatch(
+                f"SHA-256 não confere para {name or self.path}: esperado {expected}, obtido {actual}")
+    
+    def _consume(self, data):
+        started = time.perf_counter()
+        with span("sha256", 'hash', bytes=len(data), offset=self.position):
+            self._sha256.update(data)
+        self.seconds += time.perf_counter() - started
+        self.position += len(data)
+    
+    def _mark_on_disk(self, start, end):
+        """Registra uma faixa que será lida do disco quando a posição chegar nela"""
+        merged = []
+        for current in sorted(self._on_disk + [(start, end)]):
+            if merged and current[0] <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], current[1]))
+            else:
+                merged.append(current)
+        self._on_disk = merged
+    
+    def _advance(self):
+        """Processa os blocos em memória e as faixas em disco contíguos à posição atual"""
+        while True:
+            data = self._pending.pop(self.position, None)
+            if data is not None:
+                self._pending_bytes -= len(data)
+                self._consume(data)
+                continue
+            
+            if self._on_disk and self._on_disk[0][0] == self.position:
+                start, end = self._on_disk.pop(0)
+                with open(self.path, 'rb') as f:
+                    f.seek(start)
+                    remaining = end - start + 1
+                    while remaining > 0:
+                        chunk = f.read(min(HASH_READ_SIZE, remaining))
+                        if not chunk:
+                            raise ChecksumMismatch(f"Arquivo menor que o esperado: {self.path}")
+                        self._consume(chunk)
+                        remaining -= len(chunk)
+                continue
+            return
+
+
+def parse_shasums(text):
+    """
+    Converte o conteúdo de um SHASUMS256.txt em um dicionário
+    
+    Args:
+        text (str): Linhas no formato "<sha256>  <arquivo>"
+    
+    Returns:
+        dict: nome do arquivo -> SHA-256 (hexadecimal, minúsculo)
+    """
+    checksums = {}
+    for line in text.splitlines():
+        match = re.match(r'^([0-9a-fA-F]{64})\s+\*?(\S+)\s*$', line)
+        if match:
+            checksums[match.group(2)] = match.group(1).lower()
+    return checksums
+
+
+class ReleaseChecksums:
+    """SHASUMS256.txt das releases, baixados uma vez e guardados em disco"""
+    
+    def __init__(self, base_url, cache_dir, open_url, failure_ttl=FAILURE_TTL):
+        """
+        Args:
+            base_url (str): URL base das releases (terminada em '/')
+            cache_dir (Path): Diretório onde os arquivos são guardados
+            open_url (callable): Função compatível com NodeDownloader._open_url
+            failure_ttl (float): Segundos sem tentar de novo após uma falha (o
+                daemon roda indefinidamente: uma falha passageira não pode
+                desligar a verificação da versão até ser reiniciado)
+        """
+        self.base_url = base_url
+        self.open_url = open_url
+        key = hashlib.sha1(base_url.encode('utf-8')).hexdigest()[:12]
+        self.cache_dir = cache_dir / "shasums" / key
+        self._loaded = {}
+        self.failure_ttl = failure_ttl
+        self._failed = {}
+    
+    def load(self, version):
+        """
+        Obtém os checksums de uma versão (memória, disco ou rede)
+        
+        Args:
+            version (str): Versão do Node.js
+        
+        Returns:
+            dict: nome do arquivo -> SHA-256, ou None se não estiver disponível
+        """
+        version = normalize_version(version)
+        checksums = self.cached(version)
+        if checksums or self.recently_failed(version):
+            return checksums
+        
+        text = None
+        try:
+            with self.open_url(self.url(version), timeout=15) as response:
+                text = response.read().decode('utf-8')
+        except (URLError, HTTPError, OSError, ValueError) as e:
+            print(f"⚠️  SHASUMS256.txt indisponível para v{version}: {e}")
+        return self.store(version, text)
+    
+    def recently_failed(self, version):
+        """
+        Verifica se a última tentativa de obter os checksums falhou há pouco
+        
+        Args:
+            version (str): Versão do Node.js
+        
+        Returns:
+            bool: True se a falha ainda está dentro de failure_ttl
+        """
+        failed_at = self._failed.get(normalize_version(version))
+        return failed_at is not None and time.monotonic() - failed_at < self.failure_ttl
+    
+    def url(self, version):
+        """URL do SHASUMS256.txt de uma versão"""
+        return f"{self.base_url}v{normalize_version(version)}/SHASUMS256.txt"
+    
+    def cached(self, version):
+        """
+        Checksums já obtidos (memória ou disco), sem acessar a rede
+        
+        Args:
+            version (str): Versão do Node.js
+        
+        Returns:
+            dict: nome do arquivo -> SHA-256, ou None se ainda não estiverem disponíveis
+        """
+        version = normalize_version(version)
+        if not self._loaded.get(version):
+            try:
+                text = (self.cache_dir / f"v{version}.txt").read_text(encoding='utf-8')
+                checksums = parse_shasums(text)
+                if checksums:
+                    self._loaded[version] = checksums
+            except (OSError, ValueError):
+                pass
+        return self._loaded.get(version)
+    
+    def store(self, version, text):
+        """
+        Registra o conteúdo de um SHASUMS256.txt obtido da rede
+        
+        Args:
+            version (str): Versão do Node.js
+            text (str): Conteúdo baixado (None se não estiver disponível)
+        
+        Returns:
+            dict: nome do arquivo -> SHA-256, ou None
+        """
+        version = normalize_version(version)
+        checksums = parse_shasums(text) or None if text else None
+        if checksums:
+            self._save(self.cache_dir / f"v{version}.txt", text)
+            self._loaded[version] = checksums
+            self._failed.pop(version, None)
+        else:
+            # Falhas não ficam em cache: nova tentativa depois de failure_ttl
+            self._failed[version] = time.monotonic()
+        return checksums
+    
+    def expected(self, version, filename):
+        """
+        Retorna o SHA-256 publicado para um arquivo
+        
+        Args:
+            version (str): Versão do Node.js
+            filename (str): Nome do arquivo (ex: "node-v18.17.0-win-x64.zip")
+        
+        Returns:
+            str: SHA-256 esperado ou None se não houver checksum publicado
+        """
+        checksums = self.load(version)
+        return checksums.get(filename) if checksums else None
+    
+    def _save(self, path, text):
+        """Grava o SHASUMS256.txt no cache (releases publicadas não mudam)"""
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_name(path.name + '.tmp')
+            temp_path.write_text(text, encoding='utf-8')
+            temp_path.replace(path)
+        except OSError as e:
+            print(f"⚠️  Não foi possível salvar o SHASUMS256.txt em cache: {e}")
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cliente leve do daemon do Node.js Downloader
+
+Uso em scripts de build, no lugar de `py node.py <versão>`:
+    py node_client.py 18.17.0            instala (ou confirma que já está instalada)
+    py node_client.py resolve 18.17.0    mostra a URL do arquivo da versão
+    py node_client.py wait 18.17.0       espera o node_modules de uma instalação --lazy
+    py node_client.py list               versões instaladas
+    py node_client.py status             estado do daemon
+    py node_client.py stop               encerra o daemon
+
+O daemon (`py node.py daemon`) mantém em memória o índice de versões, o
+pool de conexões e as versões instaladas. Este módulo importa apenas o
+necessário para falar com ele (sem ssl, zipfile, urllib nem leitura do
+.env), então uma consulta a uma versão já instalada leva milissegundos.
+
+A comunicação usa multiprocessing.connection: named pipe no Windows e
+socket Unix nos demais, autenticados por uma chave que só o usuário lê.
+Sem daemon rodando, ou com opções (--proxy...), o cliente executa o
+node.py normalmente.
+"""
+
+import os
+import sys
+import getpass
+import tempfile
+from multiprocessing.connection import Client
+
+
+# Comandos atendidos pelo daemon (qualquer outro argumento é uma versão)
+DAEMON_COMMANDS = ('resolve', 'wait', 'list', 'status', 'stop')
+
+
+class DaemonUnavailable(Exception):
+    """O daemon não está rodando (ou não aceitou a conexão)"""
+
+
+def daemon_address():
+    """
+    Endereço do daemon do usuário atual
+    
+    NODE_DAEMON_ADDRESS sobrescreve o padrão (ex: um daemon por NVM_DIR).
+    
+    Returns:
+        str: \\\\.\\pipe\\node-nvm-<usuário> no Windows, <runtime>/node-nvm-<uid>.sock nos demais
+    """
+    if os.environ.get('NODE_DAEMON_ADDRESS'):
+        return os.environ['NODE_DAEMON_ADDRESS']
+    if os.name == 'nt':
+        return rf"\\.\pipe\node-nvm-{getpass.getuser()}"
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"node-nvm-{os.getuid()}.sock")
+
+
+def key_path(address):
+    """
+    Arquivo com a chave de autenticação do daemon
+    
+    Args:
+        address (str): Endereço do daemon
+    
+    Returns:
+        str: Caminho do arquivo (legível só pelo usuário)
+    """
+    if address.startswith('\\\\.\\pipe\\'):
+        root = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+        return os.path.join(root, 'node-nvm', address.rsplit('\\', 1)[-1] + '.key')
+    return address + '.key'
+
+
+def request(command, address=None, **arguments):
+    """
+    Envia um comando ao daemon e espera a resposta
+    
+    Args:
+        command (str): install, resolve, list, status, stop ou ping
+        address (str): Endereço do daemon (padrão: daemon_address())
+        **arguments: Argumentos do comando (ex: versions=[...])
+    
+    Returns:
+        dict: Resposta do daemon
+    
+    Raises:
+        DaemonUnavailable: Se o daemon não estiver rodando
+    """
+    address = address or daemon_address()
+    try:
+        with open(key_path(address), 'rb') as f:
+            authkey = f.read()
+        connection = Client(address, authkey=authkey)
+    except (OSError, EOFError) as e:
+        raise DaemonUnavailable(str(e))
+    
+    with connection:
+        try:
+            connection.send(dict(arguments, command=command))
+            return connection.recv()
+        except (OSError, EOFError) as e:
+            raise DaemonUnavailable(str(e))
+
+
+def print_results(reply):
+    """Mostra o resultado de install/resolve/list e retorna o código de saída"""
+    if reply.get('error'):
+        print(f"❌ {reply['error']}")
+        return 1
+    
+    for result in reply.get('results', []):
+        version = result['version']
+        if result['status'] == 'present':
+            print(f"✅ v{version} já instalado em: {result['path']}")
+        elif result['status'] == 'installed':
+            print(f"✅ v{version} instalado em: {result['path']} ({result['elapsed']:.1f}s)")
+        elif result['status'] == 'resolved':
+            print(f"🌐 v{version}: {result['url']}")
+        else:
+            print(f"❌ v{version}: {result.get('error') or 'falha na instalação'}")
+    
+    for version, path in reply.get('installed', []):
+        print(f"   v{version}  {path}")
+    
+    return 0 if reply.get('ok') else 1
+
+
+def main():
+    """Função principal do cliente"""
+    args = sys.argv[1:]
+    
+    # Modo interativo ou opções de linha de comando: executa o node.py
+    if not args or any(arg.startswith('--') for arg in args):
+        return run_directly()
+    
+    command = args[0] if args[0] in DAEMON_COMMANDS else 'install'
+    versions = args[1:] if command != 'install' else args
+    
+    try:
+        reply = request(command, versions=versions)
+    except DaemonUnavailable:
+        if command in ('install', 'wait'):
+            return run_directly()
+        print("❌ O daemon não está rodando (inicie com: py node.py daemon)")
+        return 1
+    
+    if command == 'status':
+        for key, value in reply.items():
+            print(f"   {key}: {value}")
+        return 0
+    if command == 'stop':
+        print("Daemon encerrado.")
+        return 0
+    return print_results(reply)
+
+
+def run_directly():
+    """Sem daemon: executa o node.py neste processo"""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import node
+    node.main()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
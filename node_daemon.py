@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Daemon residente do Node.js Downloader (`py node.py daemon`)
+
+Cada `py node.py <versão>` paga a inicialização do Python, os imports
+(ssl, zipfile, urllib), a leitura do .env e começa sem conexões abertas
+nem índice carregado. Em pipelines que chamam o downloader dezenas de
+vezes, o daemon mantém tudo isso vivo:
+
+- o NodeDownloader configurado (proxy, SSL, espelhos, cache);
+- o índice de versões em memória (revalidado pelo TTL de sempre);
+- o pool de conexões keep-alive;
+- o registro das versões instaladas (installed.json, já lido).
+
+Os clientes (node_client.py) falam com ele por named pipe (Windows) ou
+socket Unix, autenticados por uma chave aleatória gravada em um arquivo
+que só o usuário lê. Cada conexão é atendida em uma thread; instalações
+são feitas uma de cada vez. Com `--lazy`, a instalação responde assim que
+o node.exe está pronto e `node_client.py wait` espera o restante.
+"""
+
+import os
+import time
+import secrets
+import threading
+from multiprocessing.connection import Listener, Client
+from multiprocessing import AuthenticationError
+
+from node_client import daemon_address, key_path, request, DaemonUnavailable
+
+
+class NodeDaemon:
+    """Atende os comandos de node_client.py com um NodeDownloader residente"""
+    
+    def __init__(self, downloader, address=None):
+        """
+        Args:
+            downloader (NodeDownloader): Downloader configurado
+            address (str): Endereço do daemon (padrão: daemon_address())
+        """
+        self.downloader = downloader
+        self.address = address or daemon_address()
+        self.registry = downloader.registry
+        self.requests = 0
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._install_lock = threading.Lock()
+        self._listener = None
+        self._authkey = None
+        self._running = False
+    
+    def warm(self):
+        """Carrega o registro e o índice de versões antes do primeiro pedido"""
+        self.registry.entries()
+        self.downloader.index.available()
+    
+    def installed_path(self, version):
+        """
+        Diretório de uma versão instalada que atende o pedido (consulta ao registro)
+        
+        Uma instalação parcial (--only) que não cobre o pedido, uma --lazy
+        ainda em andamento ou que falhou e --force seguem pela instalação.
+        
+        Returns:
+            Path: Diretório da versão ou None
+        """
+        downloader = self.downloader
+        if (downloader.is_version_installed(version) and not downloader.force
+                and downloader._covers(version, downloader.only)):
+            return downloader.base_dir / f"v{version}"
+        return None
+    
+    def handle(self, message):
+        """
+        Executa um comando recebido de um cliente
+        
+        Args:
+            message (dict): {'command': ..., 'versions': [...]}
+        
+        Returns:
+            dict: Resposta enviada ao cliente
+        """
+        with self._lock:
+            self.requests += 1
+        command = message.get('command')
+        versions = [str(version).lstrip('v') for version in message.get('versions') or []]
+        
+        if command == 'ping':
+            return {'ok': True, 'pid': os.getpid()}
+        if command == 'status':
+            return self.status()
+        if command == 'list':
+            return {'ok': True, 'installed': [(entry['version'], entry['path'])
+                                              for entry in self.registry.entries()]}
+        if command == 'resolve':
+            return self.resolve(versions)
+        if command == 'install':
+            return self.install(versions)
+        if command == 'wait':
+            return self.wait(versions)
+        if command == 'stop':
+            self._running = False
+            return {'ok': True}
+        return {'ok': False, 'error': f"Comando desconhecido: {command}"}
+    
+    def resolve(self, versions):
+        """Resolve as URLs das versões usando o índice em memória"""
+        resolved = self.downloader.resolve_versions(versions)
+        results = []
+        for version in versions:
+            located = resolved.get(version)
+            if located:
+                results.append({'version': version, 'status': 'resolved', 'url': located[0]})
+            else:
+                results.append({'version': version, 'status': 'failed',
+                                'error': "versão ou arquivo não encontrado"})
+        return {'ok': all(result['status'] == 'resolved' for result in results), 'results': results}
+    
+    def install(self, versions):
+        """
+        Instala as versões que faltam (versões presentes respondem sem rede)
+        
+        Returns:
+            dict: ok e um resultado por versão (present, installed ou failed)
+        """
+        results = []
+        for spec in versions:
+            # Intervalos e apelidos usam o índice em memória
+            try:
+                version = self.downloader.resolve_spec(spec)
+            except Exception as e:
+                results.append({'version': spec, 'status': 'failed', 'error': str(e)})
+                continue
+            path = self.installed_path(version)
+            if path is not None:
+                results.append({'version': version, 'status': 'present', 'path': str(path)})
+                continue
+            
+            started = time.monotonic()
+            with self._install_lock:
+                try:
+                    success = self.downloader.download_version(version)
+                except Exception as e:
+                    print(f"Erro: {e}")
+                    success = False
+            version_dir = self.downloader.base_dir / f"v{version}"
+            results.append({'version': version, 'status': 'installed' if success else 'failed',
+                            'path': str(version_dir), 'elapsed': time.monotonic() - started})
+        return {'ok': all(result['status'] != 'failed' for result in results), 'results': results}
+    
+    def wait(self, versions):
+        """
+        Espera as instalações em duas etapas (--lazy) terminarem o node_modules
+        
+        Returns:
+            dict: ok e um resultado por versão (installed ou failed)
+        """
+        results = []
+        for spec in versions:
+            try:
+                version = self.downloader.resolve_spec(spec)
+            except Exception as e:
+                results.append({'version': spec, 'status': 'failed', 'error': str(e)})
+                continue
+            started = time.monotonic()
+            success = self.downloader.wait_install(version)
+            results.append({'version': version, 'status': 'installed' if success else 'failed',
+                            'path': str(self.downloader.base_dir / f"v{version}"),
+                            'elapsed': time.monotonic() - started})
+        return {'ok': all(result['status'] != 'failed' for result in results), 'results': results}
+    
+    def status(self):
+        """Estado do daemon para `node_client.py status`"""
+        stats = self.downloader.pool_stats()
+        installed = len(self.registry.entries())
+        with self._lock:
+            requests = self.requests
+        return {
+            'ok': True,
+            'pid': os.getpid(),
+            'address': self.address,
+            'base_dir': str(self.downloader.base_dir),
+            'uptime': f"{time.time() - self.started:.0f}s",
+            'requests': requests,
+            'installed': installed,
+            'index_loaded': self.downloader.index.releases is not None,
+            'connections': f"{stats['opened']} abertas, {stats['reused']} reutilizadas",
+        }
+    
+    def serve_forever(self):
+        """
+        Aceita clientes até receber o comando stop
+        
+        Returns:
+            bool: False se outro daemon já atende no mesmo endereço
+        """
+        try:
+            request('ping', address=self.address)
+            print(f"⚠️  Já existe um daemon em: {self.address}")
+            return False
+        except DaemonUnavailable:
+            pass
+        
+        self._authkey = secrets.token_bytes(32)
+        self._write_key(self._authkey)
+        if not self.address.startswith('\\\\.\\pipe\\') and os.path.exists(self.address):
+            # Socket de um daemon que não terminou direito
+            os.unlink(self.address)
+        
+        self._listener = Listener(self.address, authkey=self._authkey)
+        self._running = True
+        print(f"🚀 Daemon atendendo em: {self.address} (pid {os.getpid()})")
+        try:
+            while self._running:
+                try:
+                    connection = self._listener.accept()
+                except AuthenticationError:
+                    continue
+                threading.Thread(target=self._serve_client, args=(connection,), daemon=True).start()
+        finally:
+            self._listener.close()
+            self._remove_key()
+        print("Daemon encerrado.")
+        return True
+    
+    def _serve_client(self, connection):
+        """Atende um cliente (thread própria)"""
+        stopping = False
+        with connection:
+            try:
+                message = connection.recv()
+                reply = self.handle(message)
+                stopping = message.get('command') == 'stop'
+                connection.send(reply)
+            except (OSError, EOFError):
+                return
+        if stopping:
+            # Acorda o accept() do laço principal para ele ver _running = False
+            try:
+                Client(self.address, authkey=self._authkey).close()
+            except (OSError, EOFError):
+                pass
+    
+    def _write_key(self, authkey):
+        """Grava a chave de autenticação com permissão só para o usuário"""
+        path = key_path(self.address)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        if os.path.exists(path):
+            os.unlink(path)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(authkey)
+    
+    def _remove_key(self):
+        try:
+            os.unlink(key_path(self.address))
+        except OSError:
+            pass
+
+
+def run_daemon(downloader, address=None):
+    """
+    Inicia o daemon em primeiro plano até `node_client.py stop` ou Ctrl+C
+    
+    Args:
+        downloader (NodeDownloader): Downloader configurado
+        address (str): Endereço do daemon (padrão: daemon_address())
+    """
+    daemon = NodeDaemon(downloader, address)
+    print("Carregando índice de versões e versões instaladas...")
+    daemon.warm()
+    print(f"📦 {len(daemon.registry.entries())} versões instaladas em {downloader.base_dir}")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        print("\n\nDaemon encerrado.")
@@ -0,0 +1,799 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Download segmentado (múltiplas conexões) para o Node.js Downloader
+
+Divide o arquivo remoto em faixas de bytes (HTTP Range) e baixa cada
+faixa em paralelo, escrevendo diretamente na posição correta de um
+arquivo pré-alocado. Usado por NodeDownloader.download_file quando o
+servidor anuncia suporte a Range.
+
+O progresso fica registrado em um arquivo lateral (<arquivo>.part.json)
+com a URL, os validadores (ETag/Last-Modified) e as faixas já concluídas,
+para que um download interrompido continue de onde parou.
+
+Também oferece leitura sequencial em fluxo (ResumableStream +
+PrefetchReader), usada para extrair tarballs enquanto os bytes chegam.
+
+Com espelhos alternativos (node_mirrors), uma faixa cuja conexão cai ou
+fica abaixo da velocidade mínima continua, do ponto em que parou, no
+próximo espelho.
+
+As leituras de rede (read_chunks) usam readinto em um buffer reaproveitado,
+sem criar um objeto bytes por bloco, e o tamanho do bloco acompanha a
+vazão observada em cada conexão.
+"""
+
+import os
+import json
+import hashlib
+import time
+import queue
+import threading
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import URLError, HTTPError
+
+from node_checksum import ChecksumMismatch
+from node_mirrors import StallMonitor, TransferStalled, stall_read_limit, DEFAULT_MIN_SPEED
+from node_trace import span
+
+
+# Tamanho das leituras: começa em INITIAL_CHUNK_SIZE e se ajusta à vazão
+INITIAL_CHUNK_SIZE = 64 * 1024
+MIN_CHUNK_SIZE = 16 * 1024
+MAX_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Duração desejada de cada leitura (blocos mais rápidos que isso crescem)
+CHUNK_TARGET_TIME = 0.05
+
+# Segmentos menores que isso não compensam uma conexão extra
+MIN_SEGMENT_SIZE = 1024 * 1024
+
+# Tentativas por segmento antes de desistir do download
+SEGMENT_RETRIES = 3
+
+# Intervalo mínimo (segundos) entre gravações do arquivo lateral
+STATE_SAVE_INTERVAL = 1.0
+
+
+class RemoteFileChanged(Exception):
+    """O arquivo remoto mudou desde o início do download (If-Range falhou)"""
+
+
+class SegmentInterrupted(Exception):
+    """A conexão de uma faixa caiu (ou travou) depois de gravar parte dos bytes"""
+    
+    def __init__(self, position, cause):
+        """
+        Args:
+            position (int): Próximo byte a baixar
+            cause (Exception): Erro original
+        """
+        super().__init__(str(cause))
+        self.position = position
+        self.cause = cause
+
+
+def content_range_total(response):
+    """
+    Tamanho total informado no Content-Range de uma resposta 206
+    
+    Returns:
+        int: Tamanho total ou None se ausente/desconhecido
+    """
+    value = response.getheader('Content-Range') or ''
+    total = value.rpartition('/')[2].strip()
+    return int(total) if total.isdigit() else None
+
+
+class RemoteFileInfo:
+    """Metadados de um arquivo remoto obtidos na sondagem inicial"""
+    
+    def __init__(self, size=0, accept_ranges=False, etag=None, last_modified=None):
+        """
+        Args:
+            size (int): Tamanho em bytes (0 se desconhecido)
+            accept_ranges (bool): Se o servidor aceita requisições Range
+            etag (str): Cabeçalho ETag, se existir
+            last_modified (str): Cabeçalho Last-Modified, se existir
+        """
+        self.size = size
+        self.accept_ranges = accept_ranges
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+def probe_remote_file(open_url, url, timeout=10):
+    """
+    Sonda o arquivo remoto com uma requisição HEAD
+    
+    Args:
+        open_url (callable): Função compatível com NodeDownloader._open_url
+        url (str): URL do arquivo
+        timeout (int): Timeout em segundos
+    
+    Returns:
+        RemoteFileInfo: Metadados do arquivo (size=0 se o servidor não aceitar HEAD
+            ou não informar o tamanho)
+    
+    Raises:
+        URLError, HTTPError, OSError: Servidor inacessível ou arquivo indisponível
+            (quem chama pode tentar outro espelho)
+    """
+    try:
+        with open_url(url, timeout=timeout, method='HEAD') as response:
+            headers = response.headers
+            content_length = headers.get('Content-Length')
+            accept_ranges = (headers.get('Accept-Ranges') or '').strip().lower()
+            return RemoteFileInfo(
+                size=int(content_length) if content_length else 0,
+                accept_ranges=accept_ranges == 'bytes',
+                etag=headers.get('ETag'),
+                last_modified=headers.get('Last-Modified'),
+            )
+    except HTTPError as e:
+        # Sem suporte a HEAD: o download segue sem sondagem, por GET simples
+        if e.code in (405, 501):
+            return RemoteFileInfo()
+        raise
+    except ValueError:
+        return RemoteFileInfo()
+
+
+def split_ranges(total_size, parts, min_segment_size=MIN_SEGMENT_SIZE):
+    """
+    Divide um arquivo em faixas de bytes contíguas
+    
+    Args:
+        total_size (int): Tamanho total do arquivo
+        parts (int): Número máximo de faixas
+        min_segment_size (int): Tamanho mínimo de cada faixa
+    
+    Returns:
+        list: Lista de tuplas (início, fim) com fim inclusivo
+    """
+    if total_size <= 0:
+        return []
+    
+    parts = max(1, min(parts, total_size // max(1, min_segment_size)))
+    segment_size = total_size // parts
+    ranges = []
+    start = 0
+    for index in range(parts):
+        end = total_size - 1 if index == parts - 1 else start + segment_size - 1
+        ranges.append((start, end))
+        start = end + 1
+    return ranges
+
+
+def split_missing(gaps, parts, min_segment_size=MIN_SEGMENT_SIZE):
+    """
+    Divide as faixas que faltam para ocupar até `parts` conexões
+    
+    Args:
+        gaps (list): Faixas (início, fim) ainda não baixadas
+        parts (int): Número de conexões disponíveis
+        min_segment_size (int): Tamanho mínimo de cada faixa
+    
+    Returns:
+        list: Faixas (início, fim) com fim inclusivo
+    """
+    missing = sum(end - start + 1 for start, end in gaps)
+    if missing <= 0:
+        return []
+    
+    ranges = []
+    for start, end in gaps:
+        # Cada lacuna recebe conexões proporcionais ao seu tamanho
+        length = end - start + 1
+        share = max(1, round(parts * length / missing))
+        for offset_start, offset_end in split_ranges(length, share, min_segment_size):
+            ranges.append((start + offset_start, start + offset_end))
+    return ranges
+
+
+class AdaptiveChunkSize:
+    """Tamanho de leitura que cresce com a vazão observada e diminui em links lentos"""
+    
+    def __init__(self, initial=INITIAL_CHUNK_SIZE, minimum=MIN_CHUNK_SIZE,
+                 maximum=MAX_CHUNK_SIZE, target=CHUNK_TARGET_TIME):
+        """
+        Args:
+            initial (int): Tamanho da primeira leitura
+            minimum (int): Menor tamanho permitido
+            maximum (int): Maior tamanho permitido
+            target (float): Duração desejada de cada leitura em segundos
+        """
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.size = min(max(initial, minimum), self.maximum)
+        self.target = target
+    
+    def record(self, count, elapsed):
+        """
+        Ajusta o tamanho a partir de uma leitura concluída
+        
+        Args:
+            count (int): Bytes lidos
+            elapsed (float): Duração da leitura em segundos
+        
+        Returns:
+            int: Tamanho da próxima leitura
+        """
+        if count >= self.size and elapsed < self.target / 2:
+            # O bloco inteiro chegou rápido: o link comporta leituras maiores
+            self.size = min(self.size * 2, self.maximum)
+        elif elapsed > self.target * 2:
+            # Leituras longas atrasam o cancelamento e o progresso
+            self.size = max(self.size // 2, self.minimum)
+        return self.size
+
+
+def read_chunks(response, limit=None, sizer=None):
+    """
+    Lê uma resposta em blocos usando readinto em um buffer reaproveitado
+    
+    Cada bloco é uma memoryview do mesmo buffer, válida apenas até a
+    próxima iteração: quem precisar guardar os dados deve copiá-los.
+    
+    Args:
+        response: Resposta com readinto (ex: PooledResponse)
+        limit (int): Máximo de bytes a ler (None lê até o fim)
+        sizer (AdaptiveChunkSize): Tamanho adaptativo (um por conexão)
+    
+    Yields:
+        memoryview: Bytes recebidos
+    """
+    sizer = sizer or AdaptiveChunkSize()
+    buffer = bytearray(sizer.size)
+    remaining = limit
+    
+    while remaining is None or remaining > 0:
+        size = sizer.size if remaining is None else min(sizer.size, remaining)
+        if size > len(buffer):
+            # Só cresce: o buffer maior é reaproveitado daqui em diante
+            buffer = bytearray(sizer.size)
+        
+        started = time.monotonic()
+        with memoryview(buffer) as view:
+            count = response.readinto(view[:size])
+            if not count:
+                break
+            sizer.record(count, time.monotonic() - started)
+            if remaining is not None:
+                remaining -= count
+            yield view[:count]
+
+
+class PartState:
+    """Estado persistente de um download parcial (arquivo .part.json)"""
+    
+    def __init__(self, part_path, url, size, etag=None, last_modified=None, ranges=None):
+        """
+        Args:
+            part_path (Path): Caminho do arquivo .part
+            url (str): URL de origem
+            size (int): Tamanho total do arquivo
+            etag (str): ETag informado pelo servidor
+            last_modified (str): Last-Modified informado pelo servidor
+            ranges (list): Faixas (início, fim) já concluídas
+        """
+        self.part_path = part_path
+        self.sidecar_path = part_path.with_name(part_path.name + '.json')
+        self.url = url
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+        self.ranges = [tuple(r) for r in ranges or []]
+        self._lock = threading.Lock()
+        self._last_save = 0.0
+    
+    @classmethod
+    def load(cls, part_path):
+        """
+        Carrega o estado salvo de um download parcial
+        
+        Args:
+            part_path (Path): Caminho do arquivo .part
+        
+        Returns:
+            PartState: Estado salvo ou None se não houver (ou estiver inválido)
+        """
+        sidecar_path = part_path.with_name(part_path.name + '.json')
+        if not part_path.exists() or not sidecar_path.exists():
+            return None
+        try:
+            with open(sidecar_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return cls(part_path, data['url'], data['size'], data.get('etag'),
+                       data.get('last_modified'), data.get('ranges'))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+    
+    def matches(self, info):
+        """
+        Verifica se o estado salvo corresponde ao arquivo remoto atual
+        
+        Args:
+            info (RemoteFileInfo): Resultado da sondagem do servidor
+        
+        Returns:
+            bool: True se é seguro continuar o download
+        """
+        if info.size != self.size:
+            return False
+        if self.etag and info.etag:
+            return self.etag == info.etag
+        if self.last_modified and info.last_modified:
+            return self.last_modified == info.last_modified
+        # Sem validadores não há como garantir que é o mesmo arquivo
+        return False
+    
+    def if_range(self):
+        """Retorna o valor para o cabeçalho If-Range (ETag forte ou Last-Modified)"""
+        if self.etag and not self.etag.startswith('W/'):
+            return self.etag
+        return self.last_modified
+    
+    def completed_bytes(self):
+        """Retorna o total de bytes já concluídos"""
+        with self._lock:
+            return sum(end - start + 1 for start, end in self.ranges)
+    
+    def missing_ranges(self):
+        """
+        Calcula as lacunas que ainda precisam ser baixadas
+        
+        Returns:
+            list: Faixas (início, fim) com fim inclusivo
+        """
+        with self._lock:
+            gaps = []
+            position = 0
+            for start, end in self.ranges:
+                if start > position:
+                    gaps.append((position, start - 1))
+                position = max(position, end + 1)
+            if position < self.size:
+                gaps.append((position, self.size - 1))
+            return gaps
+    
+    def mark(self, start, end):
+        """
+        Registra uma faixa como concluída (mesclando com as vizinhas)
+        
+        Args:
+            start (int): Primeiro byte
+            end (int): Último byte (inclusivo)
+        """
+        with self._lock:
+            merged = []
+            for current in sorted(self.ranges + [(start, end)]):
+                if merged and current[0] <= merged[-1][1] + 1:
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], current[1]))
+                else:
+                    merged.append(current)
+            self.ranges = merged
+        
+        if time.monotonic() - self._last_save >= STATE_SAVE_INTERVAL:
+            self.save()
+    
+    def save(self):
+        """Grava o arquivo lateral de forma atômica"""
+        with self._lock:
+            data = {
+                'url': self.url,
+                'size': self.size,
+                'etag': self.etag,
+                'last_modified': self.last_modified,
+                'ranges': [list(r) for r in self.ranges],
+            }
+            temp_path = self.sidecar_path.with_name(self.sidecar_path.name + '.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.sidecar_path)
+            self._last_save = time.monotonic()
+    
+    def remove(self):
+        """Remove o arquivo lateral"""
+        try:
+            self.sidecar_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SegmentedDownload:
+    """Baixa um arquivo em faixas paralelas escrevendo em um arquivo pré-alocado"""
+    
+    def __init__(self, open_url, url, destination, total_size, connections=4,
+                 chunk_size=INITIAL_CHUNK_SIZE, timeout=30, progress=None, state=None, hasher=None,
+                 alternates=None, min_speed=DEFAULT_MIN_SPEED, failover=None):
+        """
+        Args:
+            open_url (callable): Função compatível com NodeDownloader._open_url
+            url (str): URL do arquivo
+            destination (Path): Arquivo de destino
+            total_size (int): Tamanho total informado pelo servidor
+            connections (int): Número de conexões simultâneas
+            chunk_size (int): Tamanho inicial das leituras (ajustado à vazão)
+            timeout (int): Timeout em segundos de cada conexão
+            progress (callable): Função chamada com (baixado, total)
+            state (PartState): Estado persistente para retomar o download
+            hasher (OrderedHasher): Recebe cada bloco gravado para calcular o SHA-256
+            alternates (list): URLs do mesmo arquivo em outros espelhos
+            min_speed (int): Velocidade mínima por conexão antes de trocar de espelho
+            failover (callable): Chamada com (url, erro) ao abandonar um espelho
+        """
+        self.open_url = open_url
+        self.url = url
+        self.urls = [url] + list(alternates or [])
+        self.min_speed = min_speed
+        self.failover = failover
+        self.failovers = 0
+        self.destination = destination
+        self.total_size = total_size
+        self.connections = max(1, connections)
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.progress = progress
+        self.state = state
+        self.hasher = hasher
+        self.downloaded = state.completed_bytes() if state else 0
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+    
+    def run(self):
+        """
+        Executa o download das faixas que ainda faltam
+        
+        Returns:
+            bool: True se todas as faixas foram baixadas por completo
+        
+        Raises:
+            RemoteFileChanged: Se o servidor indicar que o arquivo mudou
+            Exception: Se alguma faixa falhar após todas as tentativas
+        """
+        if self.state:
+            gaps = self.state.missing_ranges()
+        else:
+            gaps = [(0, self.total_size - 1)] if self.total_size > 0 else []
+        ranges = split_missing(gaps, self.connections)
+        
+        # Pré-aloca o arquivo para que cada faixa escreva no seu offset
+        mode = 'r+b' if self.destination.exists() else 'wb'
+        with open(self.destination, mode) as f:
+            f.truncate(self.total_size)
+        
+        if not ranges:
+            return True
+        
+        executor = ThreadPoolExecutor(max_workers=min(len(ranges), self.connections),
+                                      thread_name_prefix="segment")
+        try:
+            futures = [executor.submit(self._fetch_segment, start, end) for start, end in ranges]
+            for future in futures:
+                future.result()
+        except BaseException:
+            # Interrompe as demais faixas (inclusive em Ctrl+C) e preserva o progresso
+            self._cancelled.set()
+            raise
+        finally:
+            executor.shutdown(wait=True)
+            if self.state:
+                self.state.save()
+        
+        return self.downloaded == self.total_size
+    
+    def _fetch_segment(self, start, end):
+        """
+        Baixa uma faixa de bytes, retomando do ponto de parada em caso de falha
+        
+        Args:
+            start (int): Primeiro byte da faixa
+            end (int): Último byte da faixa (inclusivo)
+        """
+        position = start
+        last_error = None
+        maximum = MAX_CHUNK_SIZE
+        if len(self.urls) > 1 and self.min_speed:
+            maximum = min(maximum, stall_read_limit(self.min_speed))
+        sizer = AdaptiveChunkSize(self.chunk_size, maximum=maximum)
+        url_index = 0
+        
+        # Cada espelho extra dá mais uma tentativa à faixa
+        for _ in range(SEGMENT_RETRIES + len(self.urls) - 1):
+            if position > end or self._cancelled.is_set():
+                return
+            url = self.urls[url_index]
+            try:
+                position = self._fetch_range(position, end, sizer, url)
+                if position > end:
+                    return
+                last_error = Exception(f"Conexão encerrada antes do fim da faixa {start}-{end}")
+            except SegmentInterrupted as e:
+                position, last_error = e.position, e.cause
+            except (URLError, HTTPError, OSError) as e:
+                last_error = e
+            
+            # Continua a faixa no próximo espelho
+            if len(self.urls) > 1:
+                with self._lock:
+                    self.failovers += 1
+                if self.failover:
+                    self.failover(url, last_error)
+                url_index = (url_index + 1) % len(self.urls)
+        
+        if self._cancelled.is_set():
+            return
+        raise Exception(f"Falha ao baixar a faixa {start}-{end}: {last_error}")
+    
+    def _fetch_range(self, position, end, sizer=None, url=None):
+        """
+        Faz uma requisição Range e escreve os bytes recebidos no offset
+        
+        Args:
+            position (int): Primeiro byte a pedir
+            end (int): Último byte da faixa (inclusivo)
+            sizer (AdaptiveChunkSize): Tamanho das leituras desta conexão
+            url (str): Espelho a usar (padrão: a URL principal)
+        
+        Returns:
+            int: Próxima posição a ser baixada
+        
+        Raises:
+            SegmentInterrupted: Se a conexão cair ou travar depois de receber bytes
+        """
+        url = url or self.url
+        headers = {'Range': f'bytes={position}-{end}'}
+        # ETag/Last-Modified valem só para o servidor que os informou
+        validator = self.state.if_range() if self.state and url == self.url else None
+        if validator:
+            headers['If-Range'] = validator
+        
+        first = position
+        with span(f"segment {position}-{end}", 'download', url=url, start=position, end=end) as trace, \
+                self.open_url(url, timeout=self.timeout, headers=headers) as response:
+            if response.status == 200 and validator:
+                raise RemoteFileChanged(f"Arquivo remoto mudou: {url}")
+            if response.status != 206:
+                raise URLError(f"Servidor ignorou o Range (HTTP {response.status})")
+            if url != self.url and content_range_total(response) != self.total_size:
+                # Outro espelho com um arquivo diferente: não serve para completar este
+                raise URLError(f"Tamanho diferente no espelho: {url}")
+            
+            # Abaixo da velocidade mínima a faixa passa para outro espelho
+            monitor = StallMonitor(self.min_speed) if len(self.urls) > 1 else None
+            
+            # Sem buffer: o que o arquivo lateral registra já está no disco
+            with open(self.destination, 'r+b', buffering=0) as f:
+                f.seek(position)
+                try:
+                    for chunk in read_chunks(response, end - position + 1, sizer):
+                        if self._cancelled.is_set():
+                            break
+                        f.write(chunk)
+                        if self.hasher:
+                            self.hasher.update(position, chunk)
+                        if self.state:
+                            self.state.mark(position, position + len(chunk) - 1)
+                        position += len(chunk)
+                        self._advance(len(chunk))
+                        if monitor:
+                            monitor.add(len(chunk))
+                except (OSError, http.client.HTTPException, TransferStalled) as e:
+                    trace['bytes'] = position - first
+                    raise SegmentInterrupted(position, e)
+            trace['bytes'] = position - first
+        
+        return position
+    
+    def _advance(self, count):
+        """Atualiza o contador global de bytes e notifica o progresso"""
+        with self._lock:
+            self.downloaded += count
+            if self.progress:
+                self.progress(self.downloaded, self.total_size)
+
+
+class ResumableStream:
+    """Leitura sequencial de uma URL que reconecta com Range após quedas"""
+    
+    def __init__(self, open_url, url, timeout=30, retries=SEGMENT_RETRIES, progress=None,
+                 sha256=None, alternates=None, min_speed=DEFAULT_MIN_SPEED, failover=None):
+        """
+        Args:
+            open_url (callable): Função compatível com NodeDownloader._open_url
+            url (str): URL do arquivo
+            timeout (int): Timeout em segundos de cada conexão
+            retries (int): Reconexões permitidas
+            progress (callable): Função chamada com (baixado, total)
+            sha256 (str): SHA-256 esperado, conferido ao chegar no fim do arquivo
+            alternates (list): URLs do mesmo arquivo em outros espelhos
+            min_speed (int): Velocidade mínima antes de trocar de espelho
+            failover (callable): Chamada com (url, erro) ao abandonar um espelho
+        """
+        self.open_url = open_url
+        self.url = url
+        self.urls = [url] + list(alternates or [])
+        self.current_url = url
+        self.failover = failover
+        self.monitor = StallMonitor(min_speed) if alternates else None
+        self.read_limit = stall_read_limit(min_speed) if alternates and min_speed else None
+        self.timeout = timeout
+        self.retries = retries
+        self.progress = progress
+        self.position = 0
+        self.sha256 = sha256
+        self.hash_seconds = 0.0
+        self._hash = hashlib.sha256()
+        
+        self.response = open_url(url, timeout=timeout)
+        headers = self.response.headers
+        content_length = headers.get('Content-Length')
+        self.total_size = int(content_length) if content_length else 0
+        self.accept_ranges = (headers.get('Accept-Ranges') or '').strip().lower() == 'bytes'
+        etag = headers.get('ETag')
+        self.validator = etag if etag and not etag.startswith('W/') else headers.get('Last-Modified')
+    
+    def read(self, size=-1):
+        """
+        Lê até `size` bytes, reconectando a partir da posição atual se a conexão cair
+        
+        Returns:
+            bytes: Dados lidos (vazio no fim do arquivo)
+        
+        Raises:
+            ChecksumMismatch: No fim do arquivo, se o SHA-256 não conferir
+        """
+        # Leituras curtas o bastante para a troca de espelho não esperar demais
+        if self.read_limit and (size is None or size < 0 or size > self.read_limit):
+            size = self.read_limit
+        
+        for attempt in range(self.retries + 1):
+            try:
+                chunk = self.response.read(size)
+                if chunk or not self.total_size or self.position >= self.total_size:
+                    break
+                raise OSError("Conexão encerrada antes do fim do arquivo")
+            except (OSError, URLError, http.client.HTTPException) as e:
+                if not self.accept_ranges or not self.total_size or attempt == self.retries:
+                    raise
+                self._reopen(e)
+        
+        self.position += len(chunk)
+        if chunk:
+            started = time.perf_counter()
+            with span("sha256", 'hash', bytes=len(chunk)):
+                self._hash.update(chunk)
+            self.hash_seconds += time.perf_counter() - started
+            if self.monitor:
+                try:
+                    self.monitor.add(len(chunk))
+                except TransferStalled as e:
+                    # Os bytes já lidos valem; os próximos vêm de outro espelho
+                    self._reopen(e)
+        elif self.sha256 and self._hash.hexdigest() != self.sha256.lower():
+            raise ChecksumMismatch(
+                f"SHA-256 não confere para {self.url}: esperado {self.sha256}, "
+                f"obtido {self._hash.hexdigest()}")
+        if self.progress and chunk:
+            self.progress(self.position, self.total_size)
+        return chunk
+    
+    def hexdigest(self):
+        """Retorna o SHA-256 dos bytes lidos até agora"""
+        return self._hash.hexdigest()
+    
+    def _reopen(self, error=None):
+        """
+        Abre uma nova conexão pedindo os bytes a partir da posição atual
+        
+        Com espelhos alternativos, a nova conexão vai para o próximo espelho.
+        
+        Args:
+            error (Exception): Motivo da reconexão
+        """
+        self.response.close()
+        if len(self.urls) > 1:
+            if self.failover:
+                self.failover(self.current_url, error)
+            self.current_url = self.urls[(self.urls.index(self.current_url) + 1) % len(self.urls)]
+            self.monitor.reset()
+        
+        headers = {'Range': f'bytes={self.position}-'}
+        # ETag/Last-Modified valem só para o servidor que os informou
+        if self.validator and self.current_url == self.url:
+            headers['If-Range'] = self.validator
+        self.response = self.open_url(self.current_url, timeout=self.timeout, headers=headers)
+        if self.response.status != 206:
+            raise RemoteFileChanged(f"Arquivo remoto mudou: {self.current_url}")
+        if self.current_url != self.url and content_range_total(self.response) != self.total_size:
+            raise RemoteFileChanged(f"Tamanho diferente no espelho: {self.current_url}")
+    
+    def close(self):
+        self.response.close()
+
+
+class PrefetchReader:
+    """
+    Lê uma fonte em uma thread separada, entregando os blocos por uma fila
+    
+    Enquanto o consumidor (ex: descompactação do tar) processa um bloco, a
+    thread já está recebendo os próximos, sobrepondo rede e CPU/disco.
+    """
+    
+    def __init__(self, source, chunk_size=256 * 1024, depth=32):
+        """
+        Args:
+            source: Objeto com read(n)
+            chunk_size (int): Tamanho de cada leitura da fonte
+            depth (int): Blocos mantidos na fila (limita o uso de memória)
+        """
+        self.source = source
+        self.chunk_size = chunk_size
+        self._queue = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._chunk = b''
+        self._offset = 0
+        self._eof = False
+        self._thread = threading.Thread(target=self._produce, name="prefetch", daemon=True)
+        self._thread.start()
+    
+    def _produce(self):
+        """Laço da thread: lê a fonte e enfileira blocos, None no fim ou a exceção"""
+        try:
+            while not self._stop.is_set():
+                chunk = self.source.read(self.chunk_size)
+                if not chunk:
+                    self._put(None)
+                    return
+                self._put(chunk)
+        except BaseException as e:
+            self._put(e)
+    
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+    
+    def read(self, size=-1):
+        """
+        Lê até `size` bytes (ou tudo, se size < 0)
+        
+        Returns:
+            bytes: Dados lidos (vazio no fim)
+        """
+        if size is None or size < 0:
+            parts = []
+            while True:
+                data = self.read(self.chunk_size)
+                if not data:
+                    return b''.join(parts)
+                parts.append(data)
+        
+        if self._offset >= len(self._chunk):
+            if self._eof:
+                return b''
+            item = self._queue.get()
+            if item is None:
+                self._eof = True
+                return b''
+            if isinstance(item, BaseException):
+                self._eof = True
+                raise item
+            self._chunk, self._offset = item, 0
+        
+        data = self._chunk[self._offset:self._offset + size]
+        self._offset += len(data)
+        return data
+    
+    def close(self):
+        """Interrompe a thread de leitura e fecha a fonte"""
+        self._stop.set()
+        if hasattr(self.source, 'close'):
+            self.source.close()
+        self._thread.join(timeout=5)
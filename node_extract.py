@@ -0,0 +1,638 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Extração de arquivos ZIP do Node.js em uma única passada
+
+Cada membro do ZIP é descompactado direto para o caminho final, com a
+pasta de topo (ex: "node-v18.17.0-win-x64/") removida do nome durante a
+extração. Tudo é escrito em um diretório de preparação (staging) no
+mesmo sistema de arquivos do destino, que é publicado com um rename no
+final. Assim cada byte é escrito uma única vez e uma extração
+interrompida nunca deixa um diretório de versão pela metade.
+
+Os membros podem ser extraídos em paralelo: o diretório central é
+dividido em lotes de tamanho equilibrado e cada worker abre seu próprio
+ZipFile, descompacta e grava os seus membros, conferindo o CRC-32 de
+cada um. O zlib e as escritas em disco liberam o GIL, então threads
+bastam para ocupar vários núcleos.
+
+Tarballs (.tar.xz/.tar.gz, usados no Linux e macOS) são extraídos em
+modo de fluxo: os membros são gravados à medida que os bytes chegam,
+sem precisar do arquivo completo em disco.
+
+Reinstalar sobre um diretório já publicado (reparo, --force) não precisa
+regravar tudo: sync_zip_to compara tamanho e CRC-32 de cada membro com o
+que está em disco e regrava só os arquivos diferentes, removendo os que
+não existem mais no ZIP. O manifesto gravado junto com cada extração
+(tamanho, CRC-32 e mtime de cada arquivo) evita ler de novo os arquivos
+que não foram tocados desde então.
+
+Com um armazenamento por conteúdo (node_store.BlobStore), o conteúdo de
+cada arquivo vai para o blob do seu SHA-256 e o staging recebe um link
+para ele: arquivos iguais entre versões ocupam o disco uma única vez.
+
+Uso direto (para ZIPs baixados manualmente, ver node_manual.py):
+    py node_extract.py <arquivo.zip> [diretório_destino]
+"""
+
+import os
+import re
+import sys
+import json
+import zlib
+import heapq
+import stat
+import shutil
+import tarfile
+import zipfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePosixPath
+
+from node_trace import span
+
+
+# Tamanho do buffer de cópia de cada membro
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Custo fixo estimado por arquivo (abrir/criar/fechar), em bytes equivalentes
+FILE_OVERHEAD = 16 * 1024
+
+# Abaixo disso não compensa dividir a extração entre workers
+MIN_PARALLEL_FILES = 64
+
+# Versão do formato do manifesto de arquivos extraídos
+MANIFEST_FORMAT = 1
+
+
+def default_workers():
+    """Número padrão de workers de extração (um por núcleo, até 8)"""
+    return max(1, min(8, os.cpu_count() or 1))
+
+
+def common_prefix(names):
+    """
+    Encontra a pasta de topo comum a todos os membros do ZIP
+    
+    Args:
+        names (list): Nomes dos membros do ZIP
+    
+    Returns:
+        str: Prefixo a remover (ex: "node-v18.17.0-win-x64/") ou "" se não houver
+    """
+    prefix = None
+    for name in names:
+        first = name.split('/', 1)[0]
+        if '/' not in name and not name.endswith('/'):
+            return ""  # Arquivo solto na raiz: não há pasta comum
+        if prefix is None:
+            prefix = first
+        elif first != prefix:
+            return ""
+    return f"{prefix}/" if prefix else ""
+
+
+def member_target(name, prefix, root):
+    """
+    Calcula o caminho final de um membro, com o prefixo removido
+    
+    Args:
+        name (str): Nome do membro no ZIP
+        prefix (str): Prefixo a remover
+        root (Path): Diretório raiz da extração
+    
+    Returns:
+        Path: Caminho de destino ou None para a própria pasta de topo
+    
+    Raises:
+        Exception: Se o membro tentar escrever fora do diretório raiz
+    """
+    relative = name[len(prefix):] if prefix and name.startswith(prefix) else name
+    relative = relative.replace('\\', '/')
+    if not relative.strip('/'):
+        return None
+    
+    parts = PurePosixPath(relative).parts
+    if relative.startswith('/') or '..' in parts or re.match(r'^[A-Za-z]:', relative):
+        raise Exception(f"Caminho inválido no ZIP: {name}")
+    return root.joinpath(*parts)
+
+
+def staging_dir_for(target_dir):
+    """
+    Cria um diretório de preparação ao lado do destino (mesmo sistema de arquivos)
+    
+    Args:
+        target_dir (Path): Diretório final da versão
+    
+    Returns:
+        Path: Diretório de preparação vazio
+    """
+    target_dir.parent.mkdir(parents=True, exist_ok=True)
+    staging = target_dir.with_name(f".{target_dir.name}.staging-{os.getpid()}")
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir()
+    return staging
+
+
+def publish(staging, target_dir):
+    """
+    Publica o diretório de preparação no lugar do destino via rename
+    
+    Se o destino já existir, ele é renomeado para o lado antes e só é
+    removido depois que a nova versão estiver no lugar.
+    
+    Args:
+        staging (Path): Diretório de preparação completo
+        target_dir (Path): Diretório final da versão
+    """
+    previous = None
+    if target_dir.exists():
+        previous = target_dir.with_name(f".{target_dir.name}.old-{os.getpid()}")
+        if previous.exists():
+            shutil.rmtree(previous)
+        os.rename(target_dir, previous)
+    
+    try:
+        with span("rename", 'publish', target=str(target_dir), replaced=previous is not None):
+            os.rename(staging, target_dir)
+    except OSError:
+        if previous is not None:
+            os.rename(previous, target_dir)
+        raise
+    
+    if previous is not None:
+        shutil.rmtree(previous, ignore_errors=True)
+
+
+def merge_into(staging, target_dir):
+    """
+    Move o conteúdo de um diretório de preparação para um destino já publicado
+    
+    Cada entrada de primeiro nível (ex: node_modules/) aparece de uma vez,
+    com um rename; uma entrada com o mesmo nome no destino é substituída.
+    
+    Args:
+        staging (Path): Diretório de preparação completo
+        target_dir (Path): Diretório da versão já publicado
+    """
+    for entry in sorted(staging.iterdir()):
+        destination = target_dir / entry.name
+        with span(entry.name, 'publish', target=str(destination)):
+            if destination.is_dir() and not destination.is_symlink():
+                shutil.rmtree(destination)
+            elif destination.exists() or destination.is_symlink():
+                destination.unlink()
+            os.rename(entry, destination)
+    staging.rmdir()
+
+
+def balance_batches(files, workers):
+    """
+    Divide os membros em lotes de trabalho com tamanhos equilibrados
+    
+    Usa a heurística do maior primeiro: cada membro (do maior para o
+    menor) vai para o lote com menos trabalho acumulado.
+    
+    Args:
+        files (list): Tuplas (ZipInfo, destino)
+        workers (int): Número de lotes
+    
+    Returns:
+        list: Lista de lotes (listas de tuplas), sem lotes vazios
+    """
+    heap = [(0, index, []) for index in range(max(1, workers))]
+    for item in sorted(files, key=lambda item: item[0].file_size, reverse=True):
+        load, index, batch = heapq.heappop(heap)
+        batch.append(item)
+        heapq.heappush(heap, (load + item[0].file_size + FILE_OVERHEAD, index, batch))
+    return [batch for _, _, batch in sorted(heap, key=lambda entry: entry[1]) if batch]
+
+
+def extract_member(zip_ref, info, destination, store=None):
+    """
+    Descompacta um membro direto para o arquivo de destino, conferindo o CRC-32
+    
+    Args:
+        zip_ref (zipfile.ZipFile): ZIP aberto
+        info (zipfile.ZipInfo): Membro a extrair
+        destination (Path): Caminho final do arquivo
+        store (BlobStore): Armazenamento por conteúdo (None = grava o arquivo direto)
+    
+    Raises:
+        zipfile.BadZipFile: Se o CRC-32 do conteúdo não conferir
+    """
+    # Permissões Unix, quando o ZIP as registra
+    mode = (info.external_attr >> 16) & 0o777
+    
+    if store is not None:
+        with span(destination.name, 'extract', member=info.filename, bytes=info.file_size,
+                  compressed=info.compress_size), zip_ref.open(info) as source:
+            try:
+                blob = store.add(source, mode, expected_crc=info.CRC)
+            except ValueError:
+                raise zipfile.BadZipFile(f"CRC-32 inválido: {info.filename}") from None
+            store.link(blob, destination)
+        return
+    
+    crc = 0
+    with span(destination.name, 'extract', member=info.filename, bytes=info.file_size,
+              compressed=info.compress_size), \
+            zip_ref.open(info) as source, open(destination, 'wb') as target:
+        while True:
+            chunk = source.read(COPY_BUFFER_SIZE)
+            if not chunk:
+                break
+            crc = zlib.crc32(chunk, crc)
+            target.write(chunk)
+    
+    if crc != info.CRC:
+        raise zipfile.BadZipFile(f"CRC-32 inválido: {info.filename}")
+    
+    if mode:
+        os.chmod(destination, mode)
+
+
+def extract_batch(zip_path, batch, cancelled, store=None):
+    """
+    Extrai um lote de membros usando um ZipFile próprio
+    
+    Args:
+        zip_path (Path): Arquivo ZIP
+        batch (list): Tuplas (ZipInfo, destino)
+        cancelled (threading.Event): Sinal para abandonar o lote
+        store (BlobStore): Armazenamento por conteúdo (opcional)
+    """
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        for info, destination in batch:
+            if cancelled.is_set():
+                return
+            extract_member(zip_ref, info, destination, store)
+
+
+def extract_files(zip_path, files, workers=1, store=None):
+    """
+    Extrai membros já mapeados para o destino, divididos entre workers
+    
+    Args:
+        zip_path (Path): Arquivo ZIP
+        files (list): Tuplas (ZipInfo, destino), com os diretórios já criados
+        workers (int): Workers de extração em paralelo
+        store (BlobStore): Armazenamento por conteúdo (opcional)
+    
+    Returns:
+        int: Workers usados
+    """
+    if len(files) < MIN_PARALLEL_FILES:
+        workers = 1
+    batches = balance_batches(files, workers)
+    cancelled = threading.Event()
+    
+    with ThreadPoolExecutor(max_workers=max(1, len(batches)),
+                            thread_name_prefix="extract") as executor:
+        futures = [executor.submit(extract_batch, zip_path, batch, cancelled, store) for batch in batches]
+        try:
+            for future in futures:
+                future.result()
+        except BaseException:
+            cancelled.set()
+            raise
+    return len(batches)
+
+
+def extract_zip_to(zip_path, target_dir, workers=1, store=None, manifest_path=None):
+    """
+    Extrai o ZIP removendo a pasta de topo e publica em target_dir
+    
+    Args:
+        zip_path (Path): Arquivo ZIP
+        target_dir (Path): Diretório final (substituído se já existir)
+        workers (int): Workers de extração em paralelo
+        store (BlobStore): Armazenamento por conteúdo (opcional)
+        manifest_path (Path): Onde gravar o manifesto dos arquivos (None = não grava)
+    
+    Returns:
+        dict: Estatísticas {'files': quantidade, 'bytes': tamanho descompactado,
+              'workers': workers usados}
+    """
+    staging = staging_dir_for(target_dir)
+    try:
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            members = zip_ref.infolist()
+            prefix = common_prefix([info.filename for info in members])
+            
+            # Diretórios são criados antes, para os workers só gravarem arquivos
+            files = []
+            for info in members:
+                destination = member_target(info.filename, prefix, staging)
+                if destination is None:
+                    continue
+                if info.is_dir():
+                    destination.mkdir(parents=True, exist_ok=True)
+                else:
+                    destination.parent.mkdir(parents=True, exist_ok=True)
+                    files.append((info, destination))
+        
+        workers = extract_files(zip_path, files, workers, store)
+        publish(staging, target_dir)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    
+    if manifest_path:
+        save_manifest(manifest_path, target_dir,
+                      [(info, destination.relative_to(staging).as_posix()) for info, destination in files])
+    return {
+        'files': len(files),
+        'bytes': sum(info.file_size for info, _ in files),
+        'workers': workers,
+    }
+
+
+def load_manifest(manifest_path):
+    """
+    Lê o manifesto de uma extração anterior
+    
+    Args:
+        manifest_path (Path): Arquivo do manifesto
+    
+    Returns:
+        dict: {caminho relativo: [tamanho, CRC-32, mtime_ns]} (vazio se ausente ou inválido)
+    """
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get('format') != MANIFEST_FORMAT:
+        return {}
+    return data.get('files') or {}
+
+
+def save_manifest(manifest_path, target_dir, files):
+    """
+    Grava o manifesto dos arquivos extraídos, com o mtime de cada um em disco
+    
+    Args:
+        manifest_path (Path): Arquivo do manifesto
+        target_dir (Path): Diretório da versão
+        files (list): Tuplas (ZipInfo, caminho relativo)
+    """
+    entries = {}
+    for info, relative in files:
+        try:
+            mtime = (target_dir / relative).stat().st_mtime_ns
+        except OSError:
+            continue
+        entries[relative] = [info.file_size, info.CRC, mtime]
+    
+    manifest_path = Path(manifest_path)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = manifest_path.with_name(f"{manifest_path.name}.{os.getpid()}.tmp")
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'format': MANIFEST_FORMAT, 'files': entries}, f, separators=(',', ':'))
+    os.replace(temp_path, manifest_path)
+
+
+def file_crc(path):
+    """CRC-32 do conteúdo de um arquivo"""
+    crc = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(COPY_BUFFER_SIZE)
+            if not chunk:
+                return crc
+            crc = zlib.crc32(chunk, crc)
+
+
+def member_state(path, info, entry=None):
+    """
+    Confere se o arquivo em disco já tem o conteúdo do membro
+    
+    Args:
+        path (Path): Arquivo em disco
+        info (zipfile.ZipInfo): Membro do ZIP
+        entry (list): Entrada do manifesto [tamanho, CRC-32, mtime_ns] (opcional)
+    
+    Returns:
+        str: "manifest" (igual pelo manifesto), "crc" (igual após ler o arquivo)
+             ou None (precisa ser regravado)
+    """
+    try:
+        info_stat = path.lstat()
+    except OSError:
+        return None
+    if not stat.S_ISREG(info_stat.st_mode) or info_stat.st_size != info.file_size:
+        return None
+    if entry and entry == [info.file_size, info.CRC, info_stat.st_mtime_ns]:
+        return 'manifest'
+    # Sem manifesto (ou arquivo tocado depois dele): ler ainda é mais barato que regravar
+    return 'crc' if file_crc(path) == info.CRC else None
+
+
+def sync_zip_to(zip_path, target_dir, workers=1, store=None, manifest_path=None):
+    """
+    Atualiza um diretório já publicado com o ZIP, regravando só o que mudou
+    
+    Os arquivos diferentes são extraídos para um temporário ao lado do
+    destino e trocados com rename (nunca gravados no lugar, o que
+    alteraria também os hard links do armazenamento). Arquivos e
+    diretórios que não existem no ZIP são removidos.
+    
+    Args:
+        zip_path (Path): Arquivo ZIP
+        target_dir (Path): Diretório da versão (já existente)
+        workers (int): Workers de extração em paralelo
+        store (BlobStore): Armazenamento por conteúdo (opcional)
+        manifest_path (Path): Manifesto da extração anterior, regravado no final
+    
+    Returns:
+        dict: Estatísticas {'files', 'bytes', 'workers', 'written', 'unchanged',
+              'verified' (conferidos lendo o arquivo), 'removed'}
+    """
+    known = load_manifest(manifest_path) if manifest_path else {}
+    
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        members = zip_ref.infolist()
+        prefix = common_prefix([info.filename for info in members])
+        
+        directories = {target_dir}
+        files = []
+        for info in members:
+            destination = member_target(info.filename, prefix, target_dir)
+            if destination is None:
+                continue
+            if info.is_dir():
+                if destination.is_file() or destination.is_symlink():
+                    destination.unlink()
+                destination.mkdir(parents=True, exist_ok=True)
+                directories.add(destination)
+            else:
+                destination.parent.mkdir(parents=True, exist_ok=True)
+                directories.update(destination.parents)
+                files.append((info, destination, destination.relative_to(target_dir).as_posix()))
+    
+    changed = []
+    verified = 0
+    for info, destination, relative in files:
+        state = member_state(destination, info, known.get(relative))
+        if state is None:
+            changed.append((info, destination.with_name(f".{destination.name}.{os.getpid()}.tmp"),
+                            destination))
+        elif state == 'crc':
+            verified += 1
+    
+    try:
+        if changed:
+            workers = extract_files(zip_path, [(info, temp_path) for info, temp_path, _ in changed],
+                                    workers, store)
+        else:
+            workers = 0
+        for info, temp_path, destination in changed:
+            if destination.is_dir() and not destination.is_symlink():
+                shutil.rmtree(destination)
+            os.replace(temp_path, destination)
+    except BaseException:
+        for info, temp_path, _ in changed:
+            temp_path.unlink(missing_ok=True)
+        raise
+    
+    # O que sobrou da instalação anterior e não está mais no ZIP
+    expected = {destination for _, destination, _ in files}
+    removed = 0
+    with span("sync", 'publish', target=str(target_dir)):
+        for root, dir_names, file_names in os.walk(target_dir, topdown=False):
+            root = Path(root)
+            for name in file_names:
+                path = root / name
+                if path not in expected:
+                    path.unlink()
+                    removed += 1
+            for name in dir_names:
+                path = root / name
+                if path.is_symlink():
+                    path.unlink()
+                    removed += 1
+                elif path not in directories:
+                    try:
+                        path.rmdir()
+                    except OSError:
+                        pass
+    
+    if manifest_path:
+        save_manifest(manifest_path, target_dir, [(info, relative) for info, _, relative in files])
+    return {
+        'files': len(files),
+        'bytes': sum(info.file_size for info, _, _ in files),
+        'workers': workers,
+        'written': len(changed),
+        'unchanged': len(files) - len(changed),
+        'verified': verified,
+        'removed': removed,
+    }
+
+
+def extract_tar_stream(fileobj, target_dir, compression='xz', store=None):
+    """
+    Extrai um tarball lido em fluxo, removendo a pasta de topo
+    
+    Args:
+        fileobj: Objeto com read(n) que entrega o tarball compactado
+        target_dir (Path): Diretório final (substituído se já existir)
+        compression (str): "xz" ou "gz"
+        store (BlobStore): Armazenamento por conteúdo (opcional)
+    
+    Returns:
+        dict: Estatísticas {'files': quantidade, 'bytes': tamanho descompactado}
+    """
+    # Filtro 'data' (Python 3.12+/3.11.4+): recusa links e permissões perigosos
+    extract_options = {'filter': 'data'} if hasattr(tarfile, 'data_filter') else {}
+    
+    staging = staging_dir_for(target_dir)
+    files = 0
+    total_bytes = 0
+    try:
+        with tarfile.open(fileobj=fileobj, mode=f'r|{compression}') as tar:
+            prefix = None
+            for member in tar:
+                if prefix is None:
+                    prefix = member.name.split('/', 1)[0] + '/'
+                if member.name.rstrip('/') + '/' == prefix:
+                    continue
+                
+                destination = member_target(member.name, prefix, staging)
+                if destination is None:
+                    continue
+                member.name = destination.relative_to(staging).as_posix()
+                
+                if member.islnk():
+                    link_target = member_target(member.linkname, prefix, staging)
+                    member.linkname = link_target.relative_to(staging).as_posix()
+                elif member.issym() and not extract_options:
+                    # Sem o filtro 'data', valida o destino do link manualmente
+                    resolved = os.path.normpath(os.path.join(os.path.dirname(member.name), member.linkname))
+                    if os.path.isabs(member.linkname) or resolved.startswith('..'):
+                        raise Exception(f"Link inválido no tarball: {member.name} -> {member.linkname}")
+                
+                with span(destination.name, 'extract', member=member.name, bytes=member.size):
+                    if store is not None and member.isfile():
+                        # Mesmas permissões que o filtro 'data' deixaria
+                        destination.parent.mkdir(parents=True, exist_ok=True)
+                        blob = store.add(tar.extractfile(member), (member.mode & 0o755) | 0o600)
+                        store.link(blob, destination)
+                    else:
+                        tar.extract(member, staging, **extract_options)
+                if member.isfile():
+                    files += 1
+                    total_bytes += member.size
+        
+        # Lê o restante do fluxo (preenchimento final) para que verificações
+        # feitas no fim do arquivo (ex: SHA-256) aconteçam antes da publicação
+        while fileobj.read(COPY_BUFFER_SIZE):
+            pass
+        
+        publish(staging, target_dir)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    
+    return {'files': files, 'bytes': total_bytes}
+
+
+def main():
+    """Extrai um ZIP do Node.js baixado manualmente"""
+    if len(sys.argv) < 2:
+        print("Uso: py node_extract.py <arquivo.zip> [diretório_destino]")
+        return
+    
+    zip_path = Path(sys.argv[1])
+    if not zip_path.exists():
+        print(f"❌ Arquivo não encontrado: {zip_path}")
+        return
+    
+    if len(sys.argv) > 2:
+        target_dir = Path(sys.argv[2])
+    else:
+        # Destino padrão: <NVM_DIR>/v<versão>, como no node.py
+        from node import load_env_file
+        load_env_file()
+        match = re.search(r'node-v(\d+\.\d+\.\d+)', zip_path.name)
+        if not match:
+            print("❌ Não foi possível identificar a versão pelo nome do arquivo")
+            return
+        base_dir = Path(os.environ.get('NVM_DIR', 'd:/nvm'))
+        target_dir = base_dir / f"v{match.group(1)}"
+    
+    print(f"Extraindo {zip_path} para {target_dir}...")
+    try:
+        stats = extract_zip_to(zip_path, target_dir, workers=default_workers())
+        print(f"✅ {stats['files']} arquivos extraídos em: {target_dir}")
+    except zipfile.BadZipFile:
+        print("❌ Erro: Arquivo ZIP corrompido")
+    except Exception as e:
+        print(f"❌ Erro ao extrair arquivo: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice de versões do Node.js (index.json) com cache em disco
+
+Em vez de abrir a página HTML de cada versão, o índice oficial
+`{base_url}index.json` é baixado uma vez e guardado em disco. Enquanto
+estiver dentro do TTL ele é usado sem acessar a rede; depois disso é
+revalidado com ETag/Last-Modified (HTTP 304 mantém o cache atual).
+"""
+
+import os
+import json
+import time
+import hashlib
+from urllib.error import URLError, HTTPError
+
+from node_semver import ReleaseTable
+
+
+# Tempo padrão (segundos) em que o índice em disco é considerado atual
+DEFAULT_INDEX_TTL = 3600
+
+# Idade mínima (segundos) para revalidar o índice ao procurar uma versão ausente
+MISSING_REVALIDATE_AGE = 60
+
+# Chave do artefato no index.json -> sufixo do nome do arquivo
+# ({ext} é a compressão do tarball: "xz" ou "gz")
+ARTIFACTS = {
+    'win-x64-zip': 'win-x64.zip',
+    'win-x86-zip': 'win-x86.zip',
+    'win-arm64-zip': 'win-arm64.zip',
+    'linux-x64': 'linux-x64.tar.{ext}',
+    'linux-arm64': 'linux-arm64.tar.{ext}',
+    'linux-armv7l': 'linux-armv7l.tar.{ext}',
+    'osx-x64-tar': 'darwin-x64.tar.{ext}',
+    'osx-arm64-tar': 'darwin-arm64.tar.{ext}',
+}
+
+# Plataforma (como aparece no nome do arquivo) -> chave do artefato
+PLATFORM_ARTIFACTS = {
+    'win-x64': 'win-x64-zip',
+    'win-x86': 'win-x86-zip',
+    'win-arm64': 'win-arm64-zip',
+    'linux-x64': 'linux-x64',
+    'linux-arm64': 'linux-arm64',
+    'linux-armv7l': 'linux-armv7l',
+    'darwin-x64': 'osx-x64-tar',
+    'darwin-arm64': 'osx-arm64-tar',
+}
+
+# Primeira versão publicada também em .tar.xz
+FIRST_XZ_MAJOR = 4
+
+
+def normalize_version(version):
+    """
+    Remove o prefixo 'v' de uma versão
+    
+    Args:
+        version (str): Versão (ex: "v18.17.0" ou "18.17.0")
+    
+    Returns:
+        str: Versão sem prefixo (ex: "18.17.0")
+    """
+    return version[1:] if version.startswith('v') else version
+
+
+def tar_extension(version):
+    """
+    Escolhe a compressão do tarball para uma versão
+    
+    Prefere .tar.xz (menor) quando a versão o publica e o Python tem lzma.
+    
+    Args:
+        version (str): Versão do Node.js
+    
+    Returns:
+        str: "xz" ou "gz"
+    """
+    try:
+        import lzma  # noqa: F401
+    except ImportError:
+        return 'gz'
+    major = int(normalize_version(version).split('.')[0])
+    return 'xz' if major >= FIRST_XZ_MAJOR else 'gz'
+
+
+class ReleaseIndex:
+    """Índice de versões publicado pelo servidor de releases do Node.js"""
+    
+    def __init__(self, base_url, cache_dir, open_url=None, ttl=DEFAULT_INDEX_TTL):
+        """
+        Args:
+            base_url (str): URL base das releases (terminada em '/')
+            cache_dir (Path): Diretório onde o índice é guardado
+            open_url (callable): Função compatível com NodeDownloader._open_url
+            ttl (int): Segundos em que o cache é usado sem revalidar
+        """
+        self.base_url = base_url
+        self.url = f"{base_url}index.json"
+        self.open_url = open_url
+        self.ttl = ttl
+        
+        # Um arquivo por servidor, para que espelhos diferentes não se misturem
+        key = hashlib.sha1(base_url.encode('utf-8')).hexdigest()[:12]
+        self.cache_path = cache_dir / f"index-{key}.json"
+        self.meta_path = cache_dir / f"index-{key}.meta.json"
+        
+        self.releases = None
+        self.meta = {}
+        self._last_attempt = 0.0
+        self._table = None
+    
+    def is_fresh(self):
+        """Retorna True se o índice carregado ainda está dentro do TTL"""
+        fetched_at = self.meta.get('fetched_at', 0)
+        return self.releases is not None and time.time() - fetched_at < self.ttl
+    
+    def load_from_disk(self):
+        """
+        Carrega o índice salvo em disco, se existir
+        
+        Returns:
+            bool: True se o cache foi carregado
+        """
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(self.cache_path, 'rb') as f:
+                body = f.read()
+            self._parse(body)
+            self.meta = meta
+            return True
+        except (OSError, ValueError):
+            return False
+    
+    def conditional_headers(self):
+        """
+        Cabeçalhos para revalidar o cache no servidor
+        
+        Returns:
+            dict: If-None-Match / If-Modified-Since conforme o cache atual
+        """
+        headers = {}
+        if self.releases is not None:
+            if self.meta.get('etag'):
+                headers['If-None-Match'] = self.meta['etag']
+            if self.meta.get('last_modified'):
+                headers['If-Modified-Since'] = self.meta['last_modified']
+        return headers
+    
+    def apply_response(self, status, headers, body):
+        """
+        Atualiza o índice a partir de uma resposta HTTP
+        
+        Args:
+            status (int): Código HTTP (200 ou 304)
+            headers: Cabeçalhos da resposta (objeto com .get)
+            body (bytes): Corpo da resposta (ignorado em 304)
+        """
+        if status != 304:
+            self._parse(body)
+            self.meta = {
+                'url': self.url,
+                'etag': headers.get('ETag'),
+                'last_modified': headers.get('Last-Modified'),
+            }
+            self._write_atomic(self.cache_path, body)
+        self.meta['fetched_at'] = time.time()
+        self._write_atomic(self.meta_path, json.dumps(self.meta).encode('utf-8'))
+    
+    def load(self, force=False):
+        """
+        Garante que o índice está carregado, usando a rede só quando preciso
+        
+        Args:
+            force (bool): Revalida no servidor mesmo dentro do TTL
+        
+        Returns:
+            bool: True se o índice está disponível
+        
+        Raises:
+            Exception: Se o índice não puder ser obtido e não houver cache
+        """
+        if self.releases is None:
+            self.load_from_disk()
+        if self.is_fresh() and not force:
+            return True
+        
+        self._last_attempt = time.time()
+        try:
+            print(f"Atualizando índice de versões: {self.url}")
+            with self.open_url(self.url, timeout=15, headers=self.conditional_headers()) as response:
+                self.apply_response(response.status, response.headers, response.read())
+        except HTTPError as e:
+            if e.code == 304:
+                self.apply_response(304, e.headers, b'')
+            elif self.releases is None:
+                raise Exception(f"Índice de versões indisponível (HTTP {e.code})")
+            else:
+                print(f"⚠️  Usando índice em cache (HTTP {e.code} ao revalidar)")
+        except (URLError, OSError, ValueError) as e:
+            if self.releases is None:
+                raise Exception(f"Índice de versões indisponível: {e}")
+            print(f"⚠️  Usando índice em cache (falha ao revalidar: {e})")
+        return True
+    
+    def available(self):
+        """
+        Retorna True se o índice pôde ser carregado (rede ou cache)
+        
+        Uma falha recente é lembrada, para que servidores sem index.json
+        não recebam uma tentativa extra a cada versão consultada.
+        """
+        if self.releases is None and time.time() - self._last_attempt < MISSING_REVALIDATE_AGE:
+            return False
+        try:
+            return self.load()
+        except Exception:
+            return False
+    
+    def get_release(self, version):
+        """
+        Retorna a entrada do índice para uma versão
+        
+        Args:
+            version (str): Versão do Node.js
+        
+        Returns:
+            dict: Entrada do index.json ou None se não existir
+        """
+        self.load()
+        release = self.releases.get(normalize_version(version))
+        
+        # Versão recém-publicada pode não estar no cache: revalida uma vez
+        last_check = max(self.meta.get('fetched_at', 0), self._last_attempt)
+        if release is None and time.time() - last_check >= MISSING_REVALIDATE_AGE:
+            self.load(force=True)
+            release = self.releases.get(normalize_version(version))
+        return release
+    
+    def has_version(self, version):
+        """Retorna True se a versão existe no índice"""
+        return self.get_release(version) is not None
+    
+    def files(self, version):
+        """
+        Lista os artefatos publicados para uma versão
+        
+        Args:
+            version (str): Versão do Node.js
+        
+        Returns:
+            list: Chaves de artefato (ex: ["win-x64-zip", "linux-x64", ...])
+        """
+        release = self.get_release(version)
+        return list(release.get('files', [])) if release else []
+    
+    def platforms(self, version):
+        """
+        Lista as plataformas atendidas por uma versão
+        
+        Args:
+            version (str): Versão do Node.js
+        
+        Returns:
+            list: Plataformas sem o sufixo de formato (ex: ["win-x64", "linux-x64"])
+        """
+        platforms = []
+        for key in self.files(version):
+            for suffix in ('-zip', '-msi', '-7z', '-exe', '-tar', '-pkg'):
+                if key.endswith(suffix):
+                    key = key[:-len(suffix)]
+                    break
+            if key not in platforms:
+                platforms.append(key)
+        return platforms
+    
+    def artifact_url(self, version, artifact='win-x64-zip'):
+        """
+        Monta a URL de download de um artefato a partir do índice
+        
+        Args:
+            version (str): Versão do Node.js
+            artifact (str): Chave do artefato no index.json
+        
+        Returns:
+            tuple: (URL completa, nome do arquivo) ou None se não publicado
+        """
+        return self.release_artifact(self.get_release(version), artifact)
+    
+    def release_artifact(self, release, artifact='win-x64-zip'):
+        """
+        Monta a URL de um artefato a partir de uma entrada já obtida (sem acesso à rede)
+        
+        Args:
+            release (dict): Entrada do index.json (ou None)
+            artifact (str): Chave do artefato no index.json
+        
+        Returns:
+            tuple: (URL completa, nome do arquivo) ou None se não publicado
+        """
+        if not release or artifact not in release.get('files', []):
+            return None
+        
+        version = normalize_version(release['version'])
+        suffix = ARTIFACTS[artifact].format(ext=tar_extension(version))
+        filename = f"node-v{version}-{suffix}"
+        return f"{self.base_url}v{version}/{filename}", filename
+    
+    def table(self, load=True):
+        """
+        Tabela ordenada das versões para intervalos e apelidos (ex: "18", "lts/hydrogen")
+        
+        Remontada só quando o índice muda.
+        
+        Args:
+            load (bool): Atualizar o índice antes, se preciso (False quando quem
+                chama já o carregou, ex: pelo cliente assíncrono)
+        
+        Returns:
+            ReleaseTable: Tabela do índice atual
+        """
+        if load:
+            self.load()
+        releases = self.releases
+        if self._table is None or self._table[0] is not releases:
+            self._table = (releases, ReleaseTable(releases.values()))
+        return self._table[1]
+    
+    def resolve_many(self, versions, artifact='win-x64-zip'):
+        """
+        Resolve as URLs de várias versões com no máximo um acesso à rede
+        
+        Args:
+            versions (list): Versões do Node.js
+            artifact (str): Chave do artefato no index.json
+        
+        Returns:
+            dict: versão -> (URL, nome do arquivo) ou None se não existir
+        """
+        self.load()
+        return {version: self.artifact_url(version, artifact) for version in versions}
+    
+    def _parse(self, body):
+        """Converte o corpo do index.json em um dicionário versão -> entrada"""
+        entries = json.loads(body.decode('utf-8'))
+        self.releases = {normalize_version(entry['version']): entry for entry in entries}
+    
+    def _write_atomic(self, path, data):
+        """Grava um arquivo do cache de forma atômica"""
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_name(path.name + '.tmp')
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"⚠️  Não foi possível salvar o índice em cache: {e}")
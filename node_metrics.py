@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Métricas das instalações: tempo, bytes e vazão de cada fase
+
+Cada instalação passa pelas fases abaixo (só as que se aplicam):
+
+    resolve     intervalo/apelido -> versão exata e URL do arquivo
+    checksums   SHASUMS256.txt da versão (memória, disco ou rede)
+    download    transferência do arquivo
+    hash        SHA-256 calculado durante o download (tempo já incluído em download)
+    stream      download e extração juntos (tarballs)
+    directory   diretório central do ZIP remoto (atualização delta)
+    compare     arquivos da versão de origem conferidos (atualização delta)
+    extract     extração no diretório da versão
+
+As fases são registradas no job da instalação (job['metrics']) e reunidas
+em um relatório JSON (`--report=arquivo.json`) com as requisições HTTP e
+a reutilização de conexões. Com `--json`, cada fase também vira uma linha
+JSON no stdout assim que termina, para dashboards de CI:
+
+    {"event": "phase", "version": "18.17.0", "phase": "download", "seconds": 2.41, ...}
+
+Na instalação em duas etapas (--lazy), o evento "runtime_ready" e o campo
+runtime_seconds do registro marcam quando o node.exe ficou utilizável.
+"""
+
+import os
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from node_trace import span
+
+
+# Versão do formato do relatório
+REPORT_FORMAT = 1
+
+# Instalações mantidas em memória (o daemon roda indefinidamente)
+MAX_INSTALLS = 1000
+
+
+def throughput(size, seconds):
+    """Vazão em MB/s, ou None se não houver dados"""
+    if not size or not seconds:
+        return None
+    return round(size / seconds / 1024 / 1024, 2)
+
+
+class InstallMetrics:
+    """Coleta as fases de cada instalação e emite eventos JSON-lines"""
+    
+    def __init__(self, events=None):
+        """
+        Args:
+            events (file): Stream que recebe um evento JSON por linha (None = sem eventos)
+        """
+        self.events = events
+        self.started_at = time.time()
+        self.installs = deque(maxlen=MAX_INSTALLS)
+        self._lock = threading.Lock()
+    
+    def begin(self, spec):
+        """
+        Inicia o registro de uma instalação
+        
+        Args:
+            spec (str): Versão pedida (exata, intervalo ou apelido)
+        
+        Returns:
+            dict: Registro da instalação (guardado em job['metrics'])
+        """
+        record = {
+            'version': spec,
+            'spec': spec,
+            'status': None,
+            'error': None,
+            'source': None,
+            'started_at': time.time(),
+            'seconds': None,
+            'phases': {},
+        }
+        with self._lock:
+            self.installs.append(record)
+        self.emit('install_start', version=spec)
+        return record
+    
+    @contextmanager
+    def phase(self, record, name):
+        """
+        Cronometra uma fase; o dicionário devolvido recebe bytes e outros detalhes
+        
+        Args:
+            record (dict): Registro de begin
+            name (str): Nome da fase (ex: "download")
+        """
+        details = {}
+        started = time.perf_counter()
+        try:
+            with span(f"{name} {record['version']}", 'phase', version=record['version']):
+                yield details
+        finally:
+            self.add_phase(record, name, time.perf_counter() - started, **details)
+    
+    def add_phase(self, record, name, seconds, bytes=None, **details):
+        """
+        Registra uma fase já medida (fases repetidas são somadas)
+        
+        Args:
+            record (dict): Registro de begin
+            name (str): Nome da fase
+            seconds (float): Duração
+            bytes (int): Bytes processados na fase
+            **details: Outros valores (ex: files)
+        """
+        entry = record['phases'].get(name)
+        if entry is None:
+            entry = record['phases'][name] = {'seconds': 0.0, 'bytes': None}
+        entry['seconds'] = round(entry['seconds'] + seconds, 6)
+        if bytes is not None:
+            entry['bytes'] = (entry['bytes'] or 0) + bytes
+        entry['mb_s'] = throughput(entry['bytes'], entry['seconds'])
+        entry.update(details)
+        self.emit('phase', version=record['version'], phase=name, **entry)
+    
+    def finish(self, record, status, error=None):
+        """
+        Encerra o registro de uma instalação
+        
+        Args:
+            record (dict): Registro de begin
+            status (str): installed, present, downloaded ou failed
+            error (str): Motivo da falha
+        """
+        record['status'] = status
+        record['error'] = error
+        record['seconds'] = round(time.time() - record['started_at'], 6)
+        self.emit('install_end', version=record['version'], status=status, error=error,
+                  seconds=record['seconds'], source=record['source'])
+    
+    def report(self, http=None):
+        """
+        Relatório da execução
+        
+        Args:
+            http (dict): Estatísticas do pool de conexões (NodeDownloader.pool_stats)
+        
+        Returns:
+            dict: format, started_at, finished_at, seconds, installs, totals, http
+        """
+        with self._lock:
+            installs = [dict(record, phases=dict(record['phases'])) for record in self.installs]
+        
+        totals = {}
+        for record in installs:
+            for name, entry in record['phases'].items():
+                total = totals.setdefault(name, {'seconds': 0.0, 'bytes': 0})
+                total['seconds'] = round(total['seconds'] + entry['seconds'], 6)
+                total['bytes'] += entry['bytes'] or 0
+        for total in totals.values():
+            total['mb_s'] = throughput(total['bytes'], total['seconds'])
+        
+        if http:
+            http = dict(http)
+            connections = http.get('opened', 0) + http.get('reused', 0)
+            http['reuse_ratio'] = round(http.get('reused', 0) / connections, 3) if connections else None
+        
+        finished_at = time.time()
+        return {
+            'format': REPORT_FORMAT,
+            'started_at': self.started_at,
+            'finished_at': finished_at,
+            'seconds': round(finished_at - self.started_at, 6),
+            'installs': installs,
+            'totals': totals,
+            'http': http,
+        }
+    
+    def finish_run(self, http=None, path=None):
+        """
+        Fim da execução: emite o evento "run" e grava o relatório se pedido
+        
+        Args:
+            http (dict): Estatísticas do pool de conexões
+            path (str): Arquivo do relatório JSON (None = não grava)
+        
+        Returns:
+            dict: Relatório
+        """
+        report = self.report(http)
+        self.emit('run', seconds=report['seconds'], installs=len(report['installs']),
+                  totals=report['totals'], http=report['http'])
+        if path:
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            os.replace(temp_path, path)
+            print(f"📊 Relatório salvo em: {path}")
+        return report
+    
+    def emit(self, event, **fields):
+        """Escreve um evento JSON-lines (sem efeito se não houver stream de eventos)"""
+        if self.events is None:
+            return
+        line = json.dumps(dict(event=event, ts=round(time.time(), 6), **fields), ensure_ascii=False)
+        with self._lock:
+            self.events.write(line + "\n")
+            self.events.flush()
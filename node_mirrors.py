@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Espelhos (mirrors) das releases do Node.js
+
+Além do servidor oficial podem ser configurados outros espelhos com a
+mesma estrutura de diretórios (ex: repositórios remotos do Artifactory
+ou proxies do Nexus apontando para nodejs.org/dist). A lista é ordenada
+pela configuração; antes de um download os espelhos são sondados ao
+mesmo tempo (latência até os cabeçalhos e vazão de uma amostra) e o
+arquivo é baixado do mais rápido.
+
+As medições ficam em um histórico em disco (<NVM_DIR>/.cache/mirrors.json,
+média móvel) e só são refeitas quando ficam velhas. Os downloads também
+alimentam o histórico, e um espelho que travou perde posição.
+
+Se uma transferência ficar abaixo da velocidade mínima (StallMonitor),
+o download passa para o próximo espelho e continua a faixa que faltava.
+"""
+
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import URLError, HTTPError
+
+
+# Idade máxima das medições antes de sondar de novo (segundos)
+MIRROR_PROBE_TTL = 3600
+
+# Bytes lidos de cada espelho na sondagem (início do index.json)
+PROBE_BYTES = 256 * 1024
+
+# Velocidade mínima por conexão antes de trocar de espelho (bytes/s)
+DEFAULT_MIN_SPEED = 64 * 1024
+
+# Janela em que a velocidade mínima é medida (segundos)
+STALL_WINDOW = 10.0
+
+# Peso da medição mais recente na média do histórico
+HISTORY_WEIGHT = 0.5
+
+
+class TransferStalled(Exception):
+    """A transferência ficou abaixo da velocidade mínima"""
+
+
+def parse_mirrors(value):
+    """
+    Lê uma lista de espelhos separados por vírgula ou espaço
+    
+    Args:
+        value (str|list): Ex: "https://nodejs.org/dist/, https://artifactory.empresa/node/"
+    
+    Returns:
+        list: URLs terminadas em '/', na ordem recebida e sem repetições
+    """
+    if isinstance(value, (list, tuple)):
+        value = ' '.join(value)
+    mirrors = []
+    for item in (value or '').replace(',', ' ').split():
+        if not item.endswith('/'):
+            item += '/'
+        if item not in mirrors:
+            mirrors.append(item)
+    return mirrors
+
+
+def stall_read_limit(min_speed):
+    """
+    Maior leitura que, na velocidade mínima, termina dentro da janela de medição
+    
+    Leituras maiores só voltariam depois da janela, atrasando a troca de espelho.
+    
+    Args:
+        min_speed (int): Velocidade mínima em bytes/s
+    
+    Returns:
+        int: Tamanho máximo de cada leitura em bytes
+    """
+    return int(min_speed * STALL_WINDOW)
+
+
+class StallMonitor:
+    """Detecta conexões que ficaram abaixo de uma velocidade mínima"""
+    
+    def __init__(self, min_speed=DEFAULT_MIN_SPEED, window=None):
+        """
+        Args:
+            min_speed (int): Velocidade mínima em bytes/s (0 desativa)
+            window (float): Janela de medição em segundos (padrão: STALL_WINDOW)
+        """
+        self.min_speed = min_speed
+        self.window = window or STALL_WINDOW
+        self.reset()
+    
+    def reset(self):
+        """Recomeça a medição (ex: após reconectar)"""
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+    
+    def add(self, count):
+        """
+        Registra bytes recebidos, verificando a velocidade ao fim de cada janela
+        
+        Args:
+            count (int): Bytes recebidos
+        
+        Raises:
+            TransferStalled: Se a última janela ficou abaixo da velocidade mínima
+        """
+        if not self.min_speed:
+            return
+        self._window_bytes += count
+        elapsed = time.monotonic() - self._window_start
+        if elapsed < self.window:
+            return
+        speed = self._window_bytes / elapsed
+        self.reset()
+        if speed < self.min_speed:
+            raise TransferStalled(f"Velocidade abaixo do mínimo: {speed / 1024:.0f} KB/s")
+
+
+class MirrorSet:
+    """Lista ordenada de espelhos com sondagem e histórico de desempenho"""
+    
+    def __init__(self, mirrors, history_path, open_url, probe_ttl=MIRROR_PROBE_TTL):
+        """
+        Args:
+            mirrors (list): URLs base dos espelhos, em ordem de preferência
+            history_path (Path): Arquivo do histórico de medições
+            open_url (callable): Função compatível com NodeDownloader._open_url
+            probe_ttl (int): Segundos em que as medições valem sem nova sondagem
+        """
+        self.mirrors = list(mirrors)
+        self.history_path = history_path
+        self.open_url = open_url
+        self.probe_ttl = probe_ttl
+        self.history = self._load()
+        self._lock = threading.RLock()
+        self._probe_lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self.mirrors)
+    
+    def ranked(self):
+        """
+        Espelhos do mais rápido para o mais lento (sondando se o histórico estiver velho)
+        
+        Returns:
+            list: URLs base ordenadas
+        """
+        if len(self.mirrors) > 1:
+            # Downloads simultâneos (ex: lote) disparam uma única sondagem
+            with self._probe_lock:
+                if self._stale():
+                    self.probe()
+        
+        def score(mirror):
+            entry = self.history.get(mirror) or {}
+            # Sem medição: mantém a ordem configurada, depois dos medidos
+            if 'throughput' not in entry:
+                return (1, 0, self.mirrors.index(mirror))
+            if entry.get('failed'):
+                return (2, 0, self.mirrors.index(mirror))
+            return (0, -entry['throughput'], entry.get('rtt', 0))
+        
+        return sorted(self.mirrors, key=score)
+    
+    def urls_for(self, url):
+        """
+        URLs equivalentes de um arquivo em cada espelho, da mais rápida à mais lenta
+        
+        Args:
+            url (str): URL do arquivo em um dos espelhos
+        
+        Returns:
+            list: URLs (só [url] se ela não pertencer a nenhum espelho)
+        """
+        mirror = self.mirror_of(url)
+        if mirror is None:
+            return [url]
+        path = url[len(mirror):]
+        return [other + path for other in self.ranked()]
+    
+    def mirror_of(self, url):
+        """Espelho ao qual uma URL pertence (o prefixo mais longo) ou None"""
+        matches = [mirror for mirror in self.mirrors if url.startswith(mirror)]
+        return max(matches, key=len) if matches else None
+    
+    def probe(self):
+        """
+        Mede todos os espelhos ao mesmo tempo e atualiza o histórico
+        
+        Returns:
+            dict: espelho -> (latência em s, vazão em bytes/s) ou None se falhou
+        """
+        print(f"🌐 Medindo {len(self.mirrors)} espelhos...")
+        with ThreadPoolExecutor(max_workers=len(self.mirrors)) as executor:
+            results = dict(zip(self.mirrors, executor.map(self._probe_one, self.mirrors)))
+        
+        with self._lock:
+            for mirror, result in results.items():
+                if result is None:
+                    self.record_failure(mirror, save=False)
+                    print(f"   ❌ {mirror}")
+                else:
+                    rtt, throughput = result
+                    self._update(mirror, throughput, rtt)
+                    print(f"   ✅ {mirror} ({rtt * 1000:.0f} ms, {throughput / 1024 / 1024:.1f} MB/s)")
+            self._save()
+        return results
+    
+    def record(self, url, count, elapsed):
+        """
+        Registra a vazão de um download concluído
+        
+        Args:
+            url (str): URL baixada
+            count (int): Bytes baixados
+            elapsed (float): Duração em segundos
+        """
+        mirror = self.mirror_of(url)
+        # Com um único espelho não há o que ordenar
+        if len(self.mirrors) > 1 and mirror and elapsed > 0 and count:
+            with self._lock:
+                self._update(mirror, count / elapsed)
+                self._save()
+    
+    def record_failure(self, url, save=True):
+        """
+        Marca um espelho como falho/lento (vai para o fim da lista até a próxima medição)
+        
+        Args:
+            url (str): URL base ou de um arquivo do espelho
+        """
+        mirror = self.mirror_of(url) or url
+        with self._lock:
+            entry = self.history.setdefault(mirror, {})
+            entry['failed'] = True
+            entry['probed_at'] = time.time()
+            if save:
+                self._save()
+    
+    def _probe_one(self, mirror):
+        """Lê o início do index.json de um espelho, medindo latência e vazão"""
+        started = time.monotonic()
+        try:
+            headers = {'Range': f'bytes=0-{PROBE_BYTES - 1}'}
+            with self.open_url(f"{mirror}index.json", timeout=10, headers=headers) as response:
+                rtt = time.monotonic() - started
+                count = 0
+                while count < PROBE_BYTES:
+                    data = response.read(min(65536, PROBE_BYTES - count))
+                    if not data:
+                        break
+                    count += len(data)
+        except (URLError, HTTPError, OSError, ValueError):
+            return None
+        transfer = time.monotonic() - started - rtt
+        return rtt, count / max(transfer, 0.001)
+    
+    def _update(self, mirror, throughput, rtt=None):
+        """Atualiza a média móvel de um espelho"""
+        entry = self.history.setdefault(mirror, {})
+        if entry.get('failed') or 'throughput' not in entry:
+            entry['throughput'] = throughput
+        else:
+            entry['throughput'] = (HISTORY_WEIGHT * throughput
+                                   + (1 - HISTORY_WEIGHT) * entry['throughput'])
+        if rtt is not None:
+            entry['rtt'] = rtt
+            entry['probed_at'] = time.time()
+        entry['failed'] = False
+    
+    def _stale(self):
+        """True se algum espelho não tem medição recente"""
+        now = time.time()
+        return any(now - (self.history.get(mirror) or {}).get('probed_at', 0) >= self.probe_ttl
+                   for mirror in self.mirrors)
+    
+    def _load(self):
+        try:
+            with open(self.history_path, 'r', encoding='utf-8') as f:
+                history = json.load(f)
+            return history if isinstance(history, dict) else {}
+        except (OSError, ValueError):
+            return {}
+    
+    def _save(self):
+        """Grava o histórico de forma atômica"""
+        try:
+            self.history_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.history_path.with_name(f"{self.history_path.name}.{os.getpid()}.tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.history, f, indent=2)
+            os.replace(temp_path, self.history_path)
+        except OSError as e:
+            print(f"⚠️  Não foi possível gravar o histórico de espelhos: {e}")
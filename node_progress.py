@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Relatórios de progresso do Node.js Downloader
+
+O laço de download informa o total baixado a cada bloco, mas escrever no
+terminal a cada bloco (milhares de vezes por arquivo) limita a vazão em
+conexões rápidas. Os relatórios recebem todas as atualizações e só
+desenham no máximo `max_rate` vezes por segundo (10 por padrão), além do
+estado final.
+
+Para outra forma de exibição (ex: tqdm em main.py), basta herdar de
+ProgressReporter e implementar render() e close().
+"""
+
+import time
+import threading
+
+
+# Atualizações de tela por segundo
+DEFAULT_MAX_RATE = 10
+
+
+class ProgressReporter:
+    """
+    Base dos relatórios de progresso: limita a frequência de render()
+    
+    Também pode ser chamado como função (baixado, total), a forma usada
+    por SegmentedDownload e ResumableStream.
+    """
+    
+    def __init__(self, description=None, max_rate=DEFAULT_MAX_RATE):
+        """
+        Args:
+            description (str): Texto exibido junto ao progresso
+            max_rate (int): Máximo de render() por segundo (0 = sem limite)
+        """
+        self.description = description
+        self.min_interval = 1.0 / max_rate if max_rate else 0.0
+        self.total = 0
+        self.downloaded = 0
+        self.started = time.monotonic()
+        self.renders = 0
+        self._last_render = None
+        self._finished = False
+        self._lock = threading.Lock()
+    
+    def start(self, total):
+        """
+        Inicia (ou reinicia) a contagem
+        
+        Args:
+            total (int): Tamanho total em bytes (0 se desconhecido)
+        """
+        with self._lock:
+            self.total = total
+            self.downloaded = 0
+            self.started = time.monotonic()
+            self._last_render = None
+    
+    def update(self, downloaded, total=None):
+        """
+        Registra o total baixado, desenhando só se o intervalo mínimo passou
+        
+        Args:
+            downloaded (int): Bytes baixados até agora
+            total (int): Tamanho total, se mudou
+        """
+        with self._lock:
+            self.downloaded = downloaded
+            if total is not None:
+                self.total = total
+            now = time.monotonic()
+            complete = self.total > 0 and downloaded >= self.total
+            if (not complete and self._last_render is not None
+                    and now - self._last_render < self.min_interval):
+                return
+            self._last_render = now
+            self.renders += 1
+            self.render(downloaded, self.total)
+    
+    def __call__(self, downloaded, total):
+        self.update(downloaded, total)
+    
+    def finish(self):
+        """Desenha o estado final (se ainda não desenhado) e encerra a exibição"""
+        with self._lock:
+            if self._finished:
+                return
+            self._finished = True
+            if self._last_render is not None:
+                self.render(self.downloaded, self.total)
+            self.close()
+    
+    def speed(self):
+        """Velocidade média em bytes/s desde start()"""
+        elapsed = time.monotonic() - self.started
+        return self.downloaded / elapsed if elapsed > 0 else 0.0
+    
+    def render(self, downloaded, total):
+        """Exibe o progresso (sobrescrever nas subclasses)"""
+    
+    def close(self):
+        """Encerra a exibição (sobrescrever nas subclasses)"""
+
+
+class ConsoleProgress(ProgressReporter):
+    """Progresso simples na mesma linha do terminal"""
+    
+    def render(self, downloaded, total):
+        speed = self.speed() / 1024 / 1024
+        if total > 0:
+            percentage = (downloaded / total) * 100
+            print(f"\rProgresso: {percentage:.1f}% ({downloaded // 1024 // 1024} MB, {speed:.1f} MB/s)",
+                  end='', flush=True)
+        else:
+            print(f"\rBaixado: {downloaded // 1024 // 1024} MB ({speed:.1f} MB/s)", end='', flush=True)
+    
+    def close(self):
+        # Nova linha após o progresso
+        if self.renders:
+            print()
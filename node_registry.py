@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Registro das versões instaladas (<NVM_DIR>/installed.json)
+
+Cada instalação concluída grava uma entrada com o hash do arquivo de
+origem, a quantidade de arquivos, o tamanho e a data. Saber se uma
+versão está instalada, listar ou mostrar o estado passa a ser uma
+consulta a um dicionário em memória, em vez de criar e varrer o
+diretório da versão.
+
+O arquivo é gravado de forma atômica (arquivo temporário + rename) e
+relido quando outro processo o altera (mtime/tamanho), então o daemon e
+execuções diretas do node.py enxergam o mesmo registro. Cada alteração
+(reler + alterar + gravar) é feita com a trava exclusiva de
+installed.json.lock, para que duas instalações simultâneas em processos
+diferentes não apaguem a entrada uma da outra. Diretórios
+criados antes do registro (ou alterados à mão) são incorporados com
+`py node.py rebuild`.
+
+Uma entrada em estado "runtime" (instalação --lazy ainda concluindo)
+guarda o PID do processo que a conclui; se esse processo terminou sem
+concluir (ex: foi encerrado), a entrada passa a "failed" na leitura, em
+vez de deixar `wait` esperando até o tempo limite.
+"""
+
+import os
+import re
+import json
+import time
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+# Nome do registro dentro de NVM_DIR
+REGISTRY_NAME = "installed.json"
+
+# Trava entre processos das alterações do registro
+LOCK_NAME = "installed.json.lock"
+
+# Versão do formato do arquivo
+REGISTRY_FORMAT = 1
+
+VERSION_DIR_PATTERN = re.compile(r'^v(\d+)\.(\d+)\.(\d+)$')
+
+# OpenProcess/GetExitCodeProcess (Windows)
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+STILL_ACTIVE = 259
+
+
+def version_key(version):
+    """Chave de ordenação de "X.Y.Z" """
+    return tuple(int(part) for part in version.split('.'))
+
+
+def process_alive(pid):
+    """
+    Verifica se um processo ainda está em execução
+    
+    Args:
+        pid (int): Identificador do processo
+    
+    Returns:
+        bool: True se o processo existe
+    """
+    if pid == os.getpid():
+        return True
+    if os.name == 'nt':
+        # os.kill(pid, 0) no Windows enviaria CTRL_C_EVENT
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return False
+        try:
+            code = ctypes.c_ulong()
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(code)):
+                return True
+            return code.value == STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Existe, mas é de outro usuário
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def lock_file(f):
+    """Trava exclusiva de um arquivo aberto (espera enquanto outro processo a tiver)"""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        return
+    f.seek(0)
+    while True:
+        try:
+            # LK_LOCK desiste depois de ~10 s tentando
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            pass
+
+
+def unlock_file(f):
+    """Libera a trava de lock_file"""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def directory_stats(path):
+    """
+    Conta os arquivos e o tamanho de um diretório (recursivo)
+    
+    Args:
+        path (Path): Diretório
+    
+    Returns:
+        tuple: (quantidade de arquivos, total de bytes)
+    """
+    files = 0
+    size = 0
+    pending = [str(path)]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                else:
+                    files += 1
+                    size += entry.stat(follow_symlinks=False).st_size
+    return files, size
+
+
+class InstallRegistry:
+    """Versões instaladas em um NVM_DIR, guardadas em um manifesto JSON"""
+    
+    def __init__(self, base_dir):
+        """
+        Args:
+            base_dir (Path): Diretório base das versões (NVM_DIR)
+        """
+        self.base_dir = Path(base_dir)
+        self.path = self.base_dir / REGISTRY_NAME
+        self.lock_path = self.base_dir / LOCK_NAME
+        self._entries = {}
+        self._signature = None
+        self._lock = threading.RLock()
+        self._lock_file = None
+    
+    def get(self, version):
+        """
+        Entrada de uma versão instalada
+        
+        Args:
+            version (str): Versão exata (ex: "18.17.0")
+        
+        Returns:
+            dict: version, path, executable, sha256, archive, files, size,
+                  only, state, pid, installed_at; None se não estiver registrada
+        """
+        with self._lock:
+            self._refresh()
+            self._expire_runtime([version])
+            entry = self._entries.get(version)
+            return dict(entry) if entry else None
+    
+    def entries(self):
+        """
+        Todas as versões registradas
+        
+        Returns:
+            list: Entradas em ordem crescente de versão
+        """
+        with self._lock:
+            self._refresh()
+            self._expire_runtime(list(self._entries))
+            return [dict(self._entries[version])
+                    for version in sorted(self._entries, key=version_key)]
+    
+    def record(self, version, version_dir, executable, sha256=None, archive=None,
+               files=None, size=None, only=None, state=None):
+        """
+        Registra uma instalação concluída
+        
+        Args:
+            version (str): Versão exata
+            version_dir (Path): Diretório da versão
+            executable (str): Caminho do node relativo ao diretório (ex: "node.exe")
+            sha256 (str): SHA-256 do arquivo de origem, se conhecido
+            archive (str): Nome do arquivo de origem
+            files (int): Quantidade de arquivos (contada no disco se None)
+            size (int): Total de bytes descompactados (contado no disco se None)
+            only (list): Padrões de uma instalação parcial (None = completa)
+            state (str): "runtime" (executável pronto, restante em andamento neste
+                processo), "failed" (restante falhou) ou None (concluída)
+        
+        Returns:
+            dict: Entrada gravada
+        """
+        if files is None or size is None:
+            files, size = directory_stats(version_dir)
+        entry = {
+            'version': version,
+            'path': str(version_dir),
+            'executable': executable,
+            'sha256': sha256,
+            'archive': archive,
+            'files': files,
+            'size': size,
+            'only': list(only) if only else None,
+            'state': state,
+            'pid': os.getpid() if state == 'runtime' else None,
+            'installed_at': time.time(),
+        }
+        with self._locked():
+            self._refresh()
+            self._entries[version] = entry
+            self._write()
+        return dict(entry)
+    
+    def remove(self, version):
+        """Remove uma versão do registro (não apaga o diretório)"""
+        with self._locked():
+            self._refresh()
+            if self._entries.pop(version, None) is not None:
+                self._write()
+    
+    def rebuild(self, find_executable):
+        """
+        Reconstrói o registro a partir dos diretórios v*/ de NVM_DIR
+        
+        Hash, arquivo de origem, padrões de uma instalação parcial (--only),
+        estado de uma instalação --lazy e data de instalação já registrados
+        são mantidos; versões sem entrada recebem a data do diretório.
+        
+        Args:
+            find_executable (callable): Diretório -> caminho relativo do node ou None
+        
+        Returns:
+            tuple: (entradas registradas, diretórios incompletos)
+        """
+        with self._locked():
+            self._refresh()
+            previous = self._entries
+            entries = {}
+            incomplete = []
+            if self.base_dir.is_dir():
+                for version_dir in sorted(self.base_dir.iterdir()):
+                    match = VERSION_DIR_PATTERN.match(version_dir.name)
+                    if not match or not version_dir.is_dir():
+                        continue
+                    version = '.'.join(match.groups())
+                    executable = find_executable(version_dir)
+                    if executable is None:
+                        incomplete.append(version_dir)
+                        continue
+                    files, size = directory_stats(version_dir)
+                    old = previous.get(version) or {}
+                    entries[version] = {
+                        'version': version,
+                        'path': str(version_dir),
+                        'executable': executable,
+                        'sha256': old.get('sha256'),
+                        'archive': old.get('archive'),
+                        'files': files,
+                        'size': size,
+                        'only': old.get('only'),
+                        'state': old.get('state'),
+                        'pid': old.get('pid'),
+                        'installed_at': old.get('installed_at') or version_dir.stat().st_mtime,
+                    }
+            self._entries = entries
+            self._write()
+            return self.entries(), incomplete
+    
+    def _expire_runtime(self, versions):
+        """Marca como "failed" as instalações --lazy cujo processo terminou sem concluir"""
+        def orphaned(entry):
+            if not entry or entry.get('state') != 'runtime' or not entry.get('pid'):
+                return False
+            return not process_alive(entry['pid'])
+        
+        if not any(orphaned(self._entries.get(version)) for version in versions):
+            return
+        with self._locked():
+            self._refresh()
+            for version in versions:
+                entry = self._entries.get(version)
+                if orphaned(entry):
+                    entry['state'] = 'failed'
+                    entry['pid'] = None
+            self._write()
+    
+    @contextmanager
+    def _locked(self):
+        """Trava o registro entre threads e entre processos (reentrante)"""
+        with self._lock:
+            if self._lock_file is not None:
+                yield
+                return
+            self.base_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.lock_path, 'a+b') as f:
+                lock_file(f)
+                self._lock_file = f
+                try:
+                    yield
+                finally:
+                    self._lock_file = None
+                    unlock_file(f)
+    
+    def _refresh(self):
+        """Relê o arquivo se ele mudou desde a última leitura (ex: outro processo)"""
+        try:
+            stat = self.path.stat()
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+        if signature == self._signature:
+            return
+        self._signature = signature
+        self._entries = {}
+        if signature is None:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict) and isinstance(data.get('installed'), dict):
+                self._entries = data['installed']
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Registro de versões ilegível ({e}); use: py node.py rebuild")
+    
+    def _write(self):
+        """Grava o registro de forma atômica"""
+        data = {'format': REGISTRY_FORMAT, 'installed': self._entries}
+        try:
+            self.base_dir.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(temp_path, self.path)
+            stat = self.path.stat()
+            self._signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError as e:
+            print(f"⚠️  Não foi possível gravar o registro de versões: {e}")
+
+
+def print_entries(entries):
+    """
+    Mostra as versões registradas (py node.py list / status)
+    
+    Args:
+        entries (list): Entradas de InstallRegistry.entries
+    """
+    if not entries:
+        print("Nenhuma versão instalada.")
+        return
+    
+    print(f"   {'Versão':<12}{'Arquivos':>10}{'Tamanho':>11}   {'Instalada em':<17} Origem")
+    for entry in entries:
+        installed_at = time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['installed_at']))
+        origin = (entry['sha256'] or '')[:12] or 'sem hash'
+        if entry.get('state'):
+            origin += f" ({entry['state']})"
+        elif entry.get('only'):
+            origin += ' (parcial)'
+        print(f"   {entry['version']:<12}{entry['files']:>10}{entry['size'] / 1024 / 1024:>9.1f}MB"
+              f"   {installed_at:<17} {origin}")
+    total = sum(entry['size'] for entry in entries)
+    print(f"   {len(entries)} versões, {total / 1024 / 1024:.1f} MB")
+
+
+def print_entry(version, entry):
+    """
+    Mostra os detalhes de uma versão (py node.py status <versão>)
+    
+    Args:
+        version (str): Versão consultada
+        entry (dict): Entrada do registro ou None
+    """
+    if entry is None:
+        print(f"❌ v{version} não está instalada")
+        return
+    print(f"✅ v{entry['version']} instalada em: {entry['path']}")
+    print(f"   Executável: {entry['executable']}")
+    print(f"   Arquivos: {entry['files']} ({entry['size'] / 1024 / 1024:.1f} MB)")
+    if entry.get('state') == 'runtime':
+        print("   Estado: runtime pronto, node_modules em andamento (py node.py wait)")
+    elif entry.get('state') == 'failed':
+        print("   Estado: runtime pronto, mas o restante da instalação falhou")
+    elif entry.get('only'):
+        print(f"   Instalação parcial: {', '.join(entry['only'])}")
+    print(f"   Origem: {entry['archive'] or '-'} (SHA-256 {entry['sha256'] or 'desconhecido'})")
+    print(f"   Instalada em: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['installed_at']))}")
@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Leitura parcial de ZIPs remotos por HTTP Range
+
+O diretório central de um ZIP fica no fim do arquivo e traz, para cada
+membro, o tamanho, o CRC-32 e a posição do cabeçalho local. Baixando só
+o fim do arquivo dá para saber o que há dentro e onde cada membro está,
+e então buscar apenas os membros necessários:
+
+    1. Range "bytes=-64K": fim do diretório central (EOCD) e, em geral,
+       boa parte do próprio diretório; o restante vem em uma segunda faixa
+    2. Os membros escolhidos, com faixas vizinhas agrupadas em uma só
+       requisição quando o intervalo entre elas é pequeno
+
+Os bytes recebidos são gravados na mesma posição de um arquivo local
+esparso (<arquivo>.ranges) do tamanho do ZIP remoto. Para o zipfile ele
+é um ZIP comum: o diretório central e os membros baixados estão no
+lugar certo e os trechos não baixados nunca são lidos. Assim a extração
+(paralela, com CRC-32 conferido) é a mesma de node_extract.
+
+Atualização delta (py node.py upgrade 18.17.1): os arquivos da versão
+instalada com o mesmo tamanho e CRC-32 do membro novo são reaproveitados
+com hard link (ou cópia, se o sistema de arquivos não permitir) e só os
+membros que mudaram são baixados.
+
+Instalação parcial (--only=runtime-only ou --only=node.exe,...): só os
+membros que casam com os padrões (ou perfis, ver PROFILES) são baixados
+e extraídos.
+
+O SHA-256 publicado vale para o ZIP inteiro e não pode ser conferido em
+uma instalação parcial; a integridade de cada membro vem do CRC-32 do
+diretório central. Todas as faixas usam If-Range com o validador da
+primeira resposta, então um arquivo trocado no servidor no meio do
+caminho é detectado.
+"""
+
+import os
+import zlib
+import fnmatch
+import shutil
+import struct
+import zipfile
+import threading
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.error import URLError
+
+from node_download import RemoteFileChanged, content_range_total, read_chunks
+from node_extract import (COPY_BUFFER_SIZE, common_prefix, member_target, staging_dir_for,
+                          extract_files, publish, merge_into)
+from node_trace import span
+
+
+# Primeira leitura do fim do arquivo (o comentário do ZIP tem no máximo 64 KB)
+TAIL_SIZE = 64 * 1024
+
+# Membros separados por menos que isso vão na mesma requisição
+COALESCE_GAP = 64 * 1024
+
+# Tentativas por faixa antes de desistir
+RANGE_RETRIES = 3
+
+# Perfis de instalação parcial (--only=perfil)
+PROFILES = {
+    'runtime-only': ['node.exe'],
+}
+
+# Instalação em duas etapas (--lazy): o executável e os atalhos da raiz vão primeiro
+RUNTIME_FIRST = PROFILES['runtime-only'] + ['npm', 'npm.cmd', 'npx', 'npx.cmd', 'corepack',
+                                            'corepack.cmd', 'nodevars.bat']
+
+EOCD_SIGNATURE = b'PK\x05\x06'
+EOCD_SIZE = 22
+ZIP64_LOCATOR_SIGNATURE = b'PK\x06\x07'
+ZIP64_LOCATOR_SIZE = 20
+ZIP64_EOCD_SIGNATURE = b'PK\x06\x06'
+
+
+class RangeNotSupported(Exception):
+    """O servidor respondeu sem Range (HTTP 200): é preciso baixar o arquivo inteiro"""
+
+
+def parse_only(value):
+    """
+    Interpreta a seleção de uma instalação parcial
+    
+    Args:
+        value (str|list): Padrões glob e perfis separados por vírgula
+            (ex: "runtime-only", "node.exe,node_modules/npm/*")
+    
+    Returns:
+        list: Padrões, com os perfis expandidos (None = instalação completa)
+    """
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    patterns = []
+    for item in value:
+        item = item.strip().replace('\\', '/')
+        for pattern in PROFILES.get(item, [item] if item else []):
+            if pattern not in patterns:
+                patterns.append(pattern)
+    return patterns or None
+
+
+def member_filter(patterns):
+    """
+    Função que diz se um caminho relativo faz parte da seleção
+    
+    Um padrão casa com o caminho inteiro (glob, ex: "node_modules/npm/*")
+    ou com um diretório e tudo o que há dentro (ex: "node_modules/npm").
+    
+    Args:
+        patterns (list): Padrões de parse_only
+    
+    Returns:
+        callable: Recebe o caminho relativo ("a/b.js") e devolve bool
+    """
+    prefixes = tuple(pattern.rstrip('/') + '/' for pattern in patterns)
+    
+    def select(relative):
+        return relative.startswith(prefixes) or any(
+            fnmatch.fnmatchcase(relative, pattern) for pattern in patterns)
+    return select
+
+
+def central_directory_location(tail, tail_offset):
+    """
+    Localiza o diretório central a partir do fim do ZIP
+    
+    Args:
+        tail (bytes): Últimos bytes do arquivo
+        tail_offset (int): Posição de tail[0] no arquivo
+    
+    Returns:
+        tuple: (posição, tamanho) do diretório central
+    
+    Raises:
+        zipfile.BadZipFile: Se o fim do diretório central não estiver no trecho
+    """
+    position = tail.rfind(EOCD_SIGNATURE)
+    if position < 0 or len(tail) - position < EOCD_SIZE:
+        raise zipfile.BadZipFile("Fim do diretório central não encontrado")
+    cd_size, cd_offset = struct.unpack('<LL', tail[position + 12:position + 20])
+    
+    if cd_size == 0xFFFFFFFF or cd_offset == 0xFFFFFFFF:
+        # ZIP64: o localizador logo antes do EOCD aponta para o registro de 64 bits
+        locator = position - ZIP64_LOCATOR_SIZE
+        if locator < 0 or tail[locator:locator + 4] != ZIP64_LOCATOR_SIGNATURE:
+            raise zipfile.BadZipFile("Localizador ZIP64 não encontrado")
+        record = struct.unpack('<Q', tail[locator + 8:locator + 16])[0] - tail_offset
+        if record < 0 or tail[record:record + 4] != ZIP64_EOCD_SIGNATURE:
+            raise zipfile.BadZipFile("Registro ZIP64 fora do trecho lido")
+        cd_size, cd_offset = struct.unpack('<QQ', tail[record + 40:record + 56])
+    return cd_offset, cd_size
+
+
+def member_ranges(members, end_of_data, wanted, gap=COALESCE_GAP):
+    """
+    Faixas de bytes que contêm os membros escolhidos
+    
+    Cada membro ocupa do seu cabeçalho local até o cabeçalho seguinte (ou
+    o diretório central), o que inclui o descritor de dados, se houver.
+    Membros próximos são agrupados na mesma faixa.
+    
+    Args:
+        members (list): Todos os ZipInfo do arquivo
+        end_of_data (int): Posição do diretório central
+        wanted (list): ZipInfo a baixar
+        gap (int): Distância máxima entre membros agrupados
+    
+    Returns:
+        list: Tuplas (início, fim inclusivo) em ordem crescente
+    """
+    offsets = {info.header_offset for info in wanted}
+    starts = sorted({info.header_offset for info in members})
+    ranges = []
+    for index, start in enumerate(starts):
+        if start not in offsets:
+            continue
+        end = (starts[index + 1] if index + 1 < len(starts) else end_of_data) - 1
+        if ranges and start - ranges[-1][1] - 1 <= gap:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end])
+    return [tuple(byte_range) for byte_range in ranges]
+
+
+def same_content(path, info):
+    """
+    Verifica se um arquivo local tem o tamanho e o CRC-32 de um membro
+    
+    Args:
+        path (Path): Arquivo local
+        info (zipfile.ZipInfo): Membro do ZIP
+    
+    Returns:
+        bool: True se o conteúdo é o mesmo
+    """
+    try:
+        if path.stat().st_size != info.file_size:
+            return False
+        crc = 0
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(COPY_BUFFER_SIZE)
+                if not chunk:
+                    break
+                crc = zlib.crc32(chunk, crc)
+    except OSError:
+        return False
+    return crc == info.CRC
+
+
+def link_or_copy(source, destination):
+    """
+    Reaproveita um arquivo com hard link, ou cópia se o link não for possível
+    
+    Args:
+        source (Path): Arquivo existente
+        destination (Path): Novo caminho
+    
+    Returns:
+        bool: True se foi criado um hard link
+    """
+    try:
+        os.link(source, destination)
+        return True
+    except OSError:
+        # Outro volume, FAT ou limite de links: copia
+        shutil.copy2(source, destination)
+        return False
+
+
+class RemoteZip:
+    """ZIP remoto lido por faixas para um arquivo local esparso"""
+    
+    def __init__(self, url, path, open_url, timeout=30):
+        """
+        Args:
+            url (str): URL do ZIP
+            path (Path): Arquivo local esparso (ex: .downloads/node-v18.17.1-win-x64.zip.ranges)
+            open_url (callable): Função compatível com NodeDownloader._open_url
+            timeout (int): Timeout em segundos de cada requisição
+        """
+        self.url = url
+        self.path = Path(path)
+        self.open_url = open_url
+        self.timeout = timeout
+        self.size = None
+        self.validator = None
+        self.cd_offset = None
+        self.members = []
+        self.requests = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+    
+    def load(self):
+        """
+        Baixa o diretório central e lê a lista de membros
+        
+        Returns:
+            list: ZipInfo de todos os membros
+        
+        Raises:
+            RangeNotSupported: Se o servidor não atender Range
+            RemoteFileChanged: Se o arquivo mudar entre as requisições
+            zipfile.BadZipFile: Se o fim do arquivo não for de um ZIP
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'w+b') as f:
+            tail_offset = self._fetch(f"-{TAIL_SIZE}", f)
+            f.seek(tail_offset)
+            tail = f.read()
+            self.cd_offset, _ = central_directory_location(tail, tail_offset)
+            if self.cd_offset < tail_offset:
+                self._fetch(f"{self.cd_offset}-{tail_offset - 1}", f)
+        
+        with zipfile.ZipFile(self.path, 'r') as zip_ref:
+            self.members = zip_ref.infolist()
+        return self.members
+    
+    def fetch(self, wanted, connections=4):
+        """
+        Baixa os membros escolhidos para as suas posições no arquivo local
+        
+        Args:
+            wanted (list): ZipInfo a baixar
+            connections (int): Requisições simultâneas
+        
+        Returns:
+            list: Faixas baixadas (início, fim inclusivo)
+        """
+        ranges = member_ranges(self.members, self.cd_offset, wanted)
+        if not ranges:
+            return ranges
+        with ThreadPoolExecutor(max_workers=max(1, min(connections, len(ranges))),
+                                thread_name_prefix="range") as executor:
+            for _ in executor.map(self._fetch_range, ranges):
+                pass
+        return ranges
+    
+    def _fetch_range(self, byte_range):
+        """Baixa uma faixa de membros, com novas tentativas se a conexão cair"""
+        start, end = byte_range
+        last_error = None
+        for _ in range(RANGE_RETRIES):
+            try:
+                with open(self.path, 'r+b') as f:
+                    self._fetch(f"{start}-{end}", f, expected=end - start + 1)
+                return
+            except (URLError, OSError, http.client.HTTPException) as e:
+                last_error = e
+        raise last_error
+    
+    def _fetch(self, byte_range, target, expected=None):
+        """
+        Faz uma requisição Range e grava a resposta na mesma posição do arquivo local
+        
+        Args:
+            byte_range (str): Faixa no formato do cabeçalho ("0-99" ou "-100")
+            target (file): Arquivo local aberto para escrita
+            expected (int): Bytes esperados (None = o que o servidor enviar)
+        
+        Returns:
+            int: Posição do primeiro byte recebido
+        """
+        headers = {'Range': f'bytes={byte_range}'}
+        if self.validator:
+            headers['If-Range'] = self.validator
+        
+        with span(f"range {byte_range}", 'download', url=self.url) as trace, \
+                self.open_url(self.url, timeout=self.timeout, headers=headers) as response:
+            if response.status != 206:
+                if self.validator:
+                    raise RemoteFileChanged(f"Arquivo remoto mudou: {self.url}")
+                raise RangeNotSupported(f"Servidor não atende Range (HTTP {response.status})")
+            
+            total = content_range_total(response)
+            if self.size is None:
+                self.size = total
+                etag = response.getheader('ETag')
+                self.validator = (etag if etag and not etag.startswith('W/')
+                                  else response.getheader('Last-Modified'))
+            elif total != self.size:
+                raise RemoteFileChanged(f"Tamanho do arquivo remoto mudou: {self.url}")
+            
+            value = response.getheader('Content-Range') or ''
+            start = int(value.split()[-1].split('-', 1)[0])
+            target.seek(start)
+            count = 0
+            for chunk in read_chunks(response, expected):
+                target.write(chunk)
+                count += len(chunk)
+            if expected is not None and count != expected:
+                raise http.client.IncompleteRead(b'', expected - count)
+            trace['bytes'] = count
+        
+        with self._lock:
+            self.requests += 1
+            self.bytes += count
+        return start
+
+
+def plan_members(members, reuse_dir=None, select=None):
+    """
+    Separa os membros em diretórios, arquivos a baixar e arquivos reaproveitados
+    
+    Args:
+        members (list): ZipInfo do diretório central
+        reuse_dir (Path): Versão instalada cujos arquivos iguais são reaproveitados
+        select (callable): Filtro de member_filter (None = todos os membros)
+    
+    Returns:
+        dict: directories (caminhos relativos), fetch e reuse (tuplas
+              (ZipInfo, caminho relativo)), reuse_dir e reused_bytes
+    """
+    prefix = common_prefix([info.filename for info in members])
+    plan = {'directories': [], 'fetch': [], 'reuse': [], 'reuse_dir': reuse_dir,
+            'reused_bytes': 0}
+    for info in members:
+        relative = member_target(info.filename, prefix, Path())
+        if relative is None or (select and not select(relative.as_posix())):
+            continue
+        if info.is_dir():
+            plan['directories'].append(relative)
+        elif reuse_dir is not None and same_content(reuse_dir / relative, info):
+            plan['reuse'].append((info, relative))
+            plan['reused_bytes'] += info.file_size
+        else:
+            plan['fetch'].append((info, relative))
+    return plan
+
+
+def install_plan(zip_path, plan, target_dir, workers=1, merge=False, store=None):
+    """
+    Monta o diretório da versão: reaproveita os arquivos iguais e extrai os baixados
+    
+    Args:
+        zip_path (Path): Arquivo local esparso com os membros baixados
+        plan (dict): Resultado de plan_members
+        target_dir (Path): Diretório final (substituído se já existir)
+        workers (int): Workers de extração em paralelo
+        merge (bool): Acrescentar ao diretório já publicado em vez de substituí-lo
+        store (BlobStore): Armazenamento por conteúdo para os membros extraídos (opcional)
+    
+    Returns:
+        dict: Estatísticas {'files', 'bytes', 'workers', 'extracted', 'reused', 'linked'}
+    """
+    staging = staging_dir_for(target_dir)
+    try:
+        for relative in plan['directories']:
+            (staging / relative).mkdir(parents=True, exist_ok=True)
+        
+        linked = 0
+        for info, relative in plan['reuse']:
+            destination = staging / relative
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            linked += link_or_copy(plan['reuse_dir'] / relative, destination)
+        
+        files = []
+        for info, relative in plan['fetch']:
+            destination = staging / relative
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            files.append((info, destination))
+        workers = extract_files(zip_path, files, workers, store)
+        
+        if merge:
+            merge_into(staging, target_dir)
+        else:
+            publish(staging, target_dir)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    
+    entries = plan['fetch'] + plan['reuse']
+    return {
+        'files': len(entries),
+        'bytes': sum(info.file_size for info, _ in entries),
+        'workers': workers,
+        'extracted': len(plan['fetch']),
+        'reused': len(plan['reuse']),
+        'linked': linked,
+    }
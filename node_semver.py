@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Resolução de intervalos e apelidos de versões do Node.js
+
+Além da versão exata (18.17.0), aceita as formas usadas no npm/nvm:
+
+    18, 18.x, 18.17          maior versão com esse prefixo
+    ^18.17.0, ~18.17         compatíveis (mesma major / mesma minor)
+    >=16 <19, <=18.17        comparações (espaço = E, || = OU)
+    latest, current, node    última versão publicada
+    lts, lts/*               última LTS
+    lts/hydrogen, lts/-1     última de uma linha LTS (pelo codinome ou
+                             contando a partir da mais recente)
+
+As consultas usam uma tabela ordenada (ReleaseTable) montada uma vez a
+partir do index.json: tuplas (major, minor, patch) em ordem crescente,
+com o codinome LTS, a data e os artefatos publicados em listas paralelas.
+Cada intervalo vira um par [início, fim) de tuplas e a maior versão
+dentro dele é encontrada com bisect, sem percorrer a lista.
+"""
+
+import re
+from bisect import bisect_left
+from functools import lru_cache
+
+
+# Menor e maior chave possíveis, para intervalos abertos
+LOWEST = (0, 0, 0)
+HIGHEST = (float('inf'), 0, 0)
+
+# Apelidos da última versão publicada
+LATEST_ALIASES = ('latest', 'current', 'node', '*', 'x')
+
+# Comparador: operador opcional + versão parcial (x/* como curinga)
+COMPARATOR_PATTERN = re.compile(
+    r'^(\^|~|>=|<=|>|<|=)?v?(\d+)(?:\.(\d+|[xX*]))?(?:\.(\d+|[xX*]))?$'
+)
+
+
+def parse_version(version):
+    """
+    Converte uma versão exata em tupla
+    
+    Args:
+        version (str): Ex: "18.17.0" ou "v18.17.0"
+    
+    Returns:
+        tuple: (major, minor, patch)
+    
+    Raises:
+        ValueError: Se não for uma versão X.Y.Z
+    """
+    match = re.match(r'^v?(\d+)\.(\d+)\.(\d+)$', version.strip())
+    if not match:
+        raise ValueError(f"Versão inválida: {version}")
+    return tuple(int(part) for part in match.groups())
+
+
+def format_version(key):
+    """Converte uma tupla (major, minor, patch) em "X.Y.Z" """
+    return "%d.%d.%d" % key
+
+
+def comparator_range(comparator):
+    """
+    Intervalo [início, fim) de um comparador
+    
+    Args:
+        comparator (str): Ex: "18", "^18.17.0", "~18.17", ">=16", "<19.2"
+    
+    Returns:
+        tuple: (início inclusivo, fim exclusivo), ambos tuplas de versão
+    
+    Raises:
+        ValueError: Se o comparador for inválido
+    """
+    match = COMPARATOR_PATTERN.match(comparator)
+    if not match:
+        raise ValueError(f"Intervalo de versões inválido: {comparator}")
+    operator, major, minor, patch = match.groups()
+    major = int(major)
+    minor = int(minor) if minor and minor.isdigit() else None
+    patch = int(patch) if patch is not None and minor is not None and patch.isdigit() else None
+    start = (major, minor or 0, patch or 0)
+    
+    # Fim da versão parcial: 18 -> 19.0.0, 18.17 -> 18.18.0, 18.17.1 -> 18.17.2
+    if minor is None:
+        partial_end = (major + 1, 0, 0)
+    elif patch is None:
+        partial_end = (major, minor + 1, 0)
+    else:
+        partial_end = (major, minor, patch + 1)
+    
+    if operator in (None, '='):
+        return start, partial_end
+    if operator == '^':
+        # Não muda o primeiro número diferente de zero
+        if major > 0 or minor is None:
+            return start, (major + 1, 0, 0)
+        if minor > 0 or patch is None:
+            return start, (0, minor + 1, 0)
+        return start, (0, 0, patch + 1)
+    if operator == '~':
+        return start, (major + 1, 0, 0) if minor is None else (major, minor + 1, 0)
+    if operator == '>=':
+        return start, HIGHEST
+    if operator == '>':
+        return partial_end, HIGHEST
+    if operator == '<':
+        return LOWEST, start
+    return LOWEST, partial_end
+
+
+@lru_cache(maxsize=512)
+def spec_ranges(spec):
+    """
+    Converte um intervalo completo em uma lista de alternativas [início, fim)
+    
+    Args:
+        spec (str): Ex: ">=16 <19 || 20"
+    
+    Returns:
+        tuple: Pares (início, fim), um por alternativa (||)
+    
+    Raises:
+        ValueError: Se o intervalo for inválido
+    """
+    ranges = []
+    for alternative in spec.split('||'):
+        # ">= 16" -> ">=16"
+        alternative = re.sub(r'(>=|<=|>|<|=|\^|~)\s+', r'\1', alternative.strip())
+        if not alternative:
+            raise ValueError(f"Intervalo de versões inválido: {spec}")
+        start, end = LOWEST, HIGHEST
+        for comparator in alternative.split():
+            low, high = comparator_range(comparator)
+            start, end = max(start, low), min(end, high)
+        ranges.append((start, end))
+    return tuple(ranges)
+
+
+class ReleaseTable:
+    """Tabela ordenada das versões publicadas, para consultas por intervalo"""
+    
+    def __init__(self, releases):
+        """
+        Args:
+            releases (iterable): Entradas do index.json (version, lts, date, files)
+        """
+        rows = []
+        for release in releases:
+            try:
+                key = parse_version(release['version'])
+            except (KeyError, ValueError):
+                continue
+            lts = release.get('lts')
+            rows.append((key, lts.lower() if isinstance(lts, str) else None,
+                         release.get('date'), frozenset(release.get('files', ()))))
+        rows.sort(key=lambda row: row[0])
+        
+        self.keys = [row[0] for row in rows]
+        self.lts = [row[1] for row in rows]
+        self.dates = [row[2] for row in rows]
+        self.files = [row[3] for row in rows]
+        
+        # Posições das LTS (crescente) e de cada linha LTS pelo codinome
+        self.lts_positions = [i for i, codename in enumerate(self.lts) if codename]
+        self.codenames = {}
+        for i in self.lts_positions:
+            self.codenames.setdefault(self.lts[i], []).append(i)
+        # Linhas LTS da mais antiga para a mais recente (lts/-1 = penúltima)
+        self.lts_lines = sorted(self.codenames, key=lambda name: self.codenames[name][-1])
+    
+    def __len__(self):
+        return len(self.keys)
+    
+    def highest(self, start, end, artifact=None):
+        """
+        Maior versão em [start, end) que publica o artefato
+        
+        Args:
+            start (tuple): Início inclusivo
+            end (tuple): Fim exclusivo
+            artifact (str): Chave do artefato exigido (ex: "win-x64-zip") ou None
+        
+        Returns:
+            int: Posição na tabela ou None
+        """
+        position = bisect_left(self.keys, end) - 1
+        while position >= 0 and self.keys[position] >= start:
+            if artifact is None or artifact in self.files[position]:
+                return position
+            position -= 1
+        return None
+    
+    def resolve(self, spec, artifact=None):
+        """
+        Resolve uma versão, intervalo ou apelido para a maior versão correspondente
+        
+        Args:
+            spec (str): Ex: "18", "^18.17", "lts/hydrogen", "latest"
+            artifact (str): Só considera versões que publicam este artefato
+        
+        Returns:
+            str: Versão "X.Y.Z" ou None se nenhuma corresponder
+        
+        Raises:
+            ValueError: Se a especificação for inválida
+        """
+        spec = spec.strip().lower()
+        if spec in LATEST_ALIASES:
+            position = self.highest(LOWEST, HIGHEST, artifact)
+        elif spec == 'lts' or spec.startswith('lts/'):
+            position = self._resolve_lts(spec[4:] or '*', artifact)
+        else:
+            candidates = [self.highest(start, end, artifact) for start, end in spec_ranges(spec)]
+            candidates = [position for position in candidates if position is not None]
+            position = max(candidates) if candidates else None
+        return format_version(self.keys[position]) if position is not None else None
+    
+    def release(self, version):
+        """
+        Dados de uma versão exata
+        
+        Returns:
+            dict: version, lts (codinome ou None), date, files; None se não existir
+        """
+        key = parse_version(version)
+        position = bisect_left(self.keys, key)
+        if position == len(self.keys) or self.keys[position] != key:
+            return None
+        return {
+            'version': format_version(key),
+            'lts': self.lts[position],
+            'date': self.dates[position],
+            'files': sorted(self.files[position]),
+        }
+    
+    def _resolve_lts(self, line, artifact):
+        """lts/* (qualquer linha), lts/<codinome> ou lts/-N (N linhas antes da mais recente)"""
+        if line == '*':
+            positions = self.lts_positions
+        elif re.match(r'^-\d+$', line):
+            offset = int(line[1:])
+            if offset >= len(self.lts_lines):
+                return None
+            positions = self.codenames[self.lts_lines[-1 - offset]]
+        elif line in self.codenames:
+            positions = self.codenames[line]
+        else:
+            raise ValueError(f"Linha LTS desconhecida: {line}")
+        
+        for position in reversed(positions):
+            if artifact is None or artifact in self.files[position]:
+                return position
+        return None
@@ -0,0 +1,563 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Servidor de cache das releases do Node.js para a rede local (`node.py serve`)
+
+Expõe a mesma estrutura do servidor oficial (/vX.Y.Z/..., index.json,
+SHASUMS256.txt) e busca no servidor de origem só o que ainda não tem.
+Os clientes apontam base_url (ou NODE_MIRRORS) para ele e o resto do
+downloader funciona sem mudanças: HEAD, faixas HTTP Range e If-Range.
+
+- Arquivos de uma versão (/vX.Y.Z/arquivo) nunca mudam e ficam para
+  sempre; index.json, index.tab e as listagens de diretório são
+  revalidados depois de `ttl` segundos (se a origem falhar, a cópia
+  antiga continua sendo servida).
+- Pedidos simultâneos do mesmo arquivo ausente geram uma única busca na
+  origem (UpstreamFetch). Todos recebem os bytes à medida que chegam,
+  lendo o arquivo temporário que está sendo gravado.
+- Acertos do cache são enviados com socket.sendfile (sem passar pelo
+  Python no Linux/macOS), inclusive faixas.
+
+Estrutura em disco:
+    <dir>/v18.17.0/node-v18.17.0-win-x64.zip
+    <dir>/index.json
+    <dir>/v18.17.0/.listing.html    listagem do diretório /v18.17.0/
+    <dir>/.tmp/                     buscas em andamento
+"""
+
+import os
+import re
+import time
+import uuid
+import shutil
+import mimetypes
+import threading
+from pathlib import Path
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, unquote
+from urllib.error import URLError, HTTPError
+
+from node_download import read_chunks
+from node_index import DEFAULT_INDEX_TTL
+
+
+# Porta padrão do servidor de cache
+DEFAULT_SERVE_PORT = 8080
+
+# Timeout das leituras no servidor de origem (segundos)
+UPSTREAM_TIMEOUT = 30
+
+# Conexões aguardando accept() (muitos clientes ao mesmo tempo)
+REQUEST_QUEUE_SIZE = 128
+
+# Arquivo que guarda a listagem de um diretório
+LISTING_NAME = ".listing.html"
+
+# Arquivos de uma versão publicada: nunca mudam
+IMMUTABLE_PATTERN = re.compile(r'^v\d+\.\d+\.\d+/[^/]+$')
+
+# Diretórios pedidos sem a barra final (redirecionados, como na origem)
+DIRECTORY_PATTERN = re.compile(r'^(v\d+\.\d+\.\d+|latest[^/]*)$')
+
+
+def default_serve_dir(base_dir):
+    """
+    Diretório padrão do cache do servidor
+    
+    Args:
+        base_dir (Path): Diretório base do downloader (NVM_DIR)
+    
+    Returns:
+        Path: <base_dir>/.mirror
+    """
+    return Path(base_dir) / ".mirror"
+
+
+def clean_path(request_path):
+    """
+    Converte o caminho da requisição em um caminho relativo seguro
+    
+    Args:
+        request_path (str): Caminho recebido (ex: "/v18.17.0/node-v18.17.0-win-x64.zip?x=1")
+    
+    Returns:
+        str: Caminho relativo ("" ou terminado em "/" para diretórios) ou None se inválido
+    """
+    path = unquote(urlsplit(request_path).path).lstrip('/')
+    if not path:
+        return ''
+    # O último segmento vazio indica diretório; os demais não podem ser vazios
+    segments = path.split('/')
+    for segment in segments[:-1] if path.endswith('/') else segments:
+        if segment in ('', '.', '..') or '\\' in segment or ':' in segment:
+            return None
+    return path
+
+
+def parse_range(value, total):
+    """
+    Interpreta um cabeçalho Range com uma única faixa
+    
+    Args:
+        value (str): Ex: "bytes=0-1023", "bytes=1024-", "bytes=-500"
+        total (int): Tamanho do arquivo
+    
+    Returns:
+        tuple: (início, fim inclusivo), None para ignorar o cabeçalho
+               (arquivo inteiro) ou False se a faixa não existe no arquivo
+    """
+    match = re.match(r'^\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*$', value or '')
+    if not match or not (match.group(1) or match.group(2)):
+        # Várias faixas ou formato desconhecido: responde com o arquivo inteiro
+        return None
+    if not match.group(1):
+        length = int(match.group(2))
+        if length == 0:
+            return False
+        return max(0, total - length), total - 1
+    start = int(match.group(1))
+    end = int(match.group(2)) if match.group(2) else total - 1
+    if start >= total or end < start:
+        return False
+    return start, min(end, total - 1)
+
+
+class UpstreamFetch:
+    """Busca de um arquivo na origem, compartilhada por todos os pedidos simultâneos"""
+    
+    def __init__(self, rel_path, path, temp_path, stale_path=None):
+        """
+        Args:
+            rel_path (str): Caminho relativo do arquivo
+            path (Path): Destino final no cache
+            temp_path (Path): Arquivo temporário sendo gravado
+            stale_path (Path): Cópia antiga, servida se a origem falhar
+        """
+        self.rel_path = rel_path
+        self.path = path
+        self.temp_path = temp_path
+        self.stale_path = stale_path
+        self.total = None
+        self.content_type = None
+        self.last_modified = None
+        self.size = 0
+        self.headers_ready = False
+        self.done = False
+        self.error = None
+        self.status = None
+        # A thread da busca conta como um usuário até terminar
+        self.users = 1
+        self._cond = threading.Condition()
+    
+    def begin(self, total, content_type, last_modified):
+        """Registra os cabeçalhos da origem e libera quem espera por eles"""
+        with self._cond:
+            self.total = total
+            self.content_type = content_type
+            self.last_modified = last_modified
+            self.headers_ready = True
+            self._cond.notify_all()
+    
+    def advance(self, count):
+        """Registra bytes já gravados no arquivo temporário"""
+        with self._cond:
+            self.size += count
+            self._cond.notify_all()
+    
+    def finish(self, error=None, status=None):
+        """
+        Encerra a busca
+        
+        Args:
+            error (Exception): Falha, se houver
+            status (int): Status HTTP da origem em caso de falha (ex: 404)
+        """
+        with self._cond:
+            self.error = error
+            self.status = status
+            self.done = True
+            self.headers_ready = True
+            self._cond.notify_all()
+    
+    def wait_headers(self):
+        """Espera os cabeçalhos da origem (ou o fim da busca)"""
+        with self._cond:
+            while not self.headers_ready:
+                self._cond.wait()
+    
+    def wait_done(self):
+        """Espera a busca terminar"""
+        with self._cond:
+            while not self.done:
+                self._cond.wait()
+    
+    def wait_for(self, position):
+        """
+        Espera até que o arquivo temporário tenha `position` bytes
+        
+        Args:
+            position (int): Quantidade de bytes desejada
+        
+        Returns:
+            int: Bytes disponíveis (pode ser menos se a busca terminou antes)
+        
+        Raises:
+            Exception: Se a busca falhou
+        """
+        with self._cond:
+            while self.size < position and not self.done:
+                self._cond.wait()
+            if self.error:
+                raise self.error
+            return self.size
+
+
+class PullThroughCache:
+    """Cache em disco da árvore de releases, preenchido sob demanda a partir da origem"""
+    
+    def __init__(self, upstream, root, open_url, ttl=DEFAULT_INDEX_TTL):
+        """
+        Args:
+            upstream (str): URL base da origem (ex: "https://nodejs.org/dist/")
+            root (Path): Diretório do cache
+            open_url (callable): Função compatível com NodeDownloader._open_url
+            ttl (int): Segundos em que índices e listagens valem sem revalidar
+        """
+        self.upstream = upstream if upstream.endswith('/') else upstream + '/'
+        self.root = Path(root)
+        self.open_url = open_url
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.upstream_bytes = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+        (self.root / ".tmp").mkdir(parents=True, exist_ok=True)
+    
+    def local_path(self, rel_path):
+        """Caminho no cache de um caminho relativo (listagens em LISTING_NAME)"""
+        if rel_path == '' or rel_path.endswith('/'):
+            return self.root / rel_path / LISTING_NAME
+        return self.root / rel_path
+    
+    def is_immutable(self, rel_path):
+        """True para arquivos de uma versão publicada"""
+        return bool(IMMUTABLE_PATTERN.match(rel_path))
+    
+    def get(self, rel_path):
+        """
+        Localiza um arquivo, iniciando (ou reaproveitando) a busca na origem se preciso
+        
+        Args:
+            rel_path (str): Caminho relativo (ver clean_path)
+        
+        Returns:
+            tuple: (Path, None) para um acerto do cache ou (None, UpstreamFetch);
+                   neste caso chamar release(fetch) ao terminar de usá-lo
+        """
+        with self._lock:
+            fetch = self._inflight.get(rel_path)
+            if fetch is not None:
+                fetch.users += 1
+                self.coalesced += 1
+                return None, fetch
+            
+            path = self.local_path(rel_path)
+            if path.is_file() and self._is_fresh(rel_path, path):
+                self.hits += 1
+                return path, None
+            
+            fetch = UpstreamFetch(rel_path, path, self.root / ".tmp" / uuid.uuid4().hex,
+                                  stale_path=path if path.is_file() else None)
+            fetch.users += 1
+            self._inflight[rel_path] = fetch
+            self.misses += 1
+        
+        threading.Thread(target=self._run_fetch, args=(fetch,), daemon=True).start()
+        return None, fetch
+    
+    def release(self, fetch):
+        """
+        Deixa de usar uma busca; o último usuário publica o arquivo no cache
+        
+        O arquivo só é movido depois que ninguém mais o lê (no Windows não
+        é possível renomear um arquivo aberto).
+        """
+        with self._lock:
+            fetch.users -= 1
+            if fetch.users:
+                return
+            del self._inflight[fetch.rel_path]
+            if fetch.error is None:
+                try:
+                    fetch.path.parent.mkdir(parents=True, exist_ok=True)
+                    os.replace(fetch.temp_path, fetch.path)
+                    return
+                except OSError as e:
+                    print(f"⚠️  Não foi possível guardar /{fetch.rel_path}: {e}")
+        try:
+            fetch.temp_path.unlink()
+        except OSError:
+            pass
+    
+    def stats(self):
+        """
+        Estatísticas do cache
+        
+        Returns:
+            dict: hits, misses, coalesced (pedidos atendidos por uma busca em
+                  andamento), upstream_bytes, inflight
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'upstream_bytes': self.upstream_bytes,
+                'inflight': len(self._inflight),
+            }
+    
+    def clear_temp(self):
+        """Remove buscas interrompidas de execuções anteriores"""
+        shutil.rmtree(self.root / ".tmp", ignore_errors=True)
+        (self.root / ".tmp").mkdir(parents=True, exist_ok=True)
+    
+    def _is_fresh(self, rel_path, path):
+        if self.is_immutable(rel_path):
+            return True
+        return time.time() - path.stat().st_mtime < self.ttl
+    
+    def _run_fetch(self, fetch):
+        """Baixa o arquivo da origem para o temporário (thread própria)"""
+        url = self.upstream + fetch.rel_path
+        started = time.monotonic()
+        print(f"🌐 Buscando na origem: /{fetch.rel_path}")
+        try:
+            # Sem buffer: o que foi escrito já pode ser lido pelos outros pedidos.
+            # O arquivo existe antes dos cabeçalhos serem liberados
+            with open(fetch.temp_path, 'wb', buffering=0) as f, \
+                    self.open_url(url, timeout=UPSTREAM_TIMEOUT) as response:
+                content_length = response.getheader('Content-Length')
+                total = int(content_length) if content_length else None
+                fetch.begin(total, response.getheader('Content-Type'),
+                            response.getheader('Last-Modified'))
+                for chunk in read_chunks(response):
+                    f.write(chunk)
+                    fetch.advance(len(chunk))
+            
+            if total is not None and fetch.size != total:
+                raise URLError(f"Resposta incompleta da origem: {fetch.size} de {total} bytes")
+            
+            # Arquivos de versão guardam a data da origem (Last-Modified / If-Range);
+            # índices guardam a hora da busca (base do ttl)
+            if fetch.last_modified and self.is_immutable(fetch.rel_path):
+                try:
+                    mtime = parsedate_to_datetime(fetch.last_modified).timestamp()
+                    os.utime(fetch.temp_path, (mtime, mtime))
+                except (TypeError, ValueError, OverflowError):
+                    pass
+            
+            with self._lock:
+                self.upstream_bytes += fetch.size
+            elapsed = time.monotonic() - started
+            speed = fetch.size / elapsed / 1024 / 1024 if elapsed > 0 else 0
+            print(f"✅ /{fetch.rel_path} ({fetch.size / 1024 / 1024:.1f} MB, {speed:.1f} MB/s)")
+            fetch.finish()
+        except HTTPError as e:
+            print(f"❌ /{fetch.rel_path}: HTTP {e.code}")
+            fetch.finish(e, status=e.code)
+        except (URLError, OSError) as e:
+            print(f"❌ /{fetch.rel_path}: {e}")
+            fetch.finish(e)
+        finally:
+            self.release(fetch)
+
+
+class ReleaseRequestHandler(BaseHTTPRequestHandler):
+    """Atende GET/HEAD a partir do cache, com faixas e If-Range"""
+    
+    protocol_version = "HTTP/1.1"
+    server_version = "node-nvm-cache"
+    
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+    
+    def do_GET(self):
+        self._serve(head=False)
+    
+    def do_HEAD(self):
+        self._serve(head=True)
+    
+    def _serve(self, head):
+        rel_path = clean_path(self.path)
+        if rel_path is None:
+            self.send_error(400, "Caminho inválido")
+            return
+        if DIRECTORY_PATTERN.match(rel_path):
+            self.send_response(301)
+            self.send_header('Location', f"/{rel_path}/")
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        
+        cache = self.server.cache
+        path, fetch = cache.get(rel_path)
+        if fetch is None:
+            self._send_file(path, rel_path, head)
+            return
+        
+        try:
+            fetch.wait_headers()
+            if fetch.error is not None:
+                # Origem fora do ar: uma cópia antiga é melhor que nada
+                if fetch.stale_path is not None and fetch.status is None:
+                    self._send_file(fetch.stale_path, rel_path, head)
+                else:
+                    self.send_error(fetch.status or 502)
+                return
+            if fetch.total is None:
+                # Origem sem Content-Length: espera o arquivo inteiro
+                fetch.wait_done()
+                if fetch.error is not None:
+                    self.send_error(502)
+                    return
+                fetch.total = fetch.size
+            content_type = fetch.content_type or self._guess_type(rel_path)
+            with open(fetch.temp_path, 'rb') as f:
+                self._send_body(f, fetch.total, content_type, fetch.last_modified, head, fetch)
+        finally:
+            cache.release(fetch)
+    
+    def _send_file(self, path, rel_path, head):
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            self.send_error(404)
+            return
+        with f:
+            stat = os.fstat(f.fileno())
+            last_modified = formatdate(stat.st_mtime, usegmt=True)
+            self._send_body(f, stat.st_size, self._guess_type(rel_path), last_modified, head)
+    
+    def _send_body(self, f, total, content_type, last_modified, head, fetch=None):
+        """
+        Envia o arquivo inteiro ou a faixa pedida
+        
+        Args:
+            f (file): Arquivo aberto (pode estar crescendo, se `fetch` for informado)
+            total (int): Tamanho final do arquivo
+            content_type (str): Content-Type
+            last_modified (str): Last-Modified (também usado para comparar If-Range)
+            head (bool): Só os cabeçalhos
+            fetch (UpstreamFetch): Busca em andamento que está gravando o arquivo
+        """
+        byte_range = None
+        if self.headers.get('Range'):
+            if_range = self.headers.get('If-Range')
+            # If-Range diferente: o cliente tem outra versão, envia o arquivo inteiro
+            if not if_range or if_range == last_modified:
+                byte_range = parse_range(self.headers['Range'], total)
+        
+        if byte_range is False:
+            self.send_response(416)
+            self.send_header('Content-Range', f'bytes */{total}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        
+        start, end = byte_range or (0, total - 1)
+        self.send_response(206 if byte_range else 200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(end - start + 1))
+        self.send_header('Accept-Ranges', 'bytes')
+        if last_modified:
+            self.send_header('Last-Modified', last_modified)
+        if byte_range:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{total}')
+        self.end_headers()
+        if head:
+            return
+        
+        position = start
+        try:
+            while position <= end:
+                available = fetch.wait_for(position + 1) if fetch else end + 1
+                if available <= position:
+                    raise URLError("Arquivo terminou antes do esperado")
+                count = min(end + 1, available) - position
+                position += self.connection.sendfile(f, position, count)
+        except (ConnectionError, TimeoutError):
+            # Cliente desconectou
+            self.close_connection = True
+        except (URLError, OSError) as e:
+            # A origem falhou no meio: fecha a conexão para o cliente perceber
+            self.log_error("Falha ao enviar %s: %s", self.path, e)
+            self.close_connection = True
+    
+    def _guess_type(self, rel_path):
+        if rel_path == '' or rel_path.endswith('/'):
+            return 'text/html; charset=utf-8'
+        return mimetypes.guess_type(rel_path)[0] or 'application/octet-stream'
+
+
+class ReleaseServer(ThreadingHTTPServer):
+    """Servidor HTTP com uma thread por conexão, ligado a um PullThroughCache"""
+    
+    daemon_threads = True
+    request_queue_size = REQUEST_QUEUE_SIZE
+    
+    def __init__(self, address, cache, verbose=False):
+        """
+        Args:
+            address (tuple): (host, porta); porta 0 escolhe uma livre
+            cache (PullThroughCache): Cache que atende os pedidos
+            verbose (bool): Registrar cada requisição
+        """
+        self.cache = cache
+        self.verbose = verbose
+        super().__init__(address, ReleaseRequestHandler)
+    
+    @property
+    def url(self):
+        """URL base para os clientes (base_url / NODE_MIRRORS)"""
+        host, port = self.server_address[:2]
+        if host in ('0.0.0.0', '::', ''):
+            host = '127.0.0.1'
+        return f"http://{host}:{port}/"
+
+
+def serve(downloader, host='0.0.0.0', port=DEFAULT_SERVE_PORT, root=None):
+    """
+    Executa o servidor de cache até Ctrl+C
+    
+    A origem é o servidor principal do downloader (base_url), acessado com
+    o mesmo proxy/SSL e pool de conexões.
+    
+    Args:
+        downloader (NodeDownloader): Downloader configurado (proxy, SSL, base_url)
+        host (str): Endereço de escuta
+        port (int): Porta de escuta
+        root (str): Diretório do cache (padrão: <NVM_DIR>/.mirror)
+    """
+    root = Path(root) if root else default_serve_dir(downloader.base_dir)
+    cache = PullThroughCache(downloader.base_url, root, downloader._open_url, ttl=downloader.index.ttl)
+    cache.clear_temp()
+    server = ReleaseServer((host, port), cache)
+    
+    print(f"📦 Cache em: {root}")
+    print(f"🌐 Origem: {cache.upstream}")
+    print(f"🚀 Servindo em http://{host}:{server.server_address[1]}/ (Ctrl+C para parar)")
+    print(f"💡 Nos clientes: NODE_MIRRORS=http://<este-host>:{server.server_address[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n\nServidor encerrado.")
+    finally:
+        server.server_close()
+        stats = cache.stats()
+        print(f"📊 {stats['hits']} acertos, {stats['misses']} buscas na origem, "
+              f"{stats['coalesced']} pedidos agrupados, "
+              f"{stats['upstream_bytes'] / 1024 / 1024:.1f} MB baixados da origem")
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Armazenamento de arquivos por conteúdo compartilhado entre as versões
+
+Cada versão instalada traz sua própria cópia de node_modules/npm, e boa
+parte dos arquivos é idêntica entre versões de patch (e até entre
+majors). Com o armazenamento ligado (--store ou NODE_STORE=true), a
+extração grava o conteúdo de cada arquivo uma única vez em
+
+    <NVM_DIR>/.store/blobs/ab/abcdef...    (SHA-256 do conteúdo)
+
+e o arquivo no diretório da versão é um hard link para o blob. Quando o
+hard link não é possível (limite de links do NTFS, sistema de arquivos
+sem links), usa um reflink (cópia sob demanda, FICLONE no Linux) e, por
+fim, uma cópia comum.
+
+Um blob cujo único link é o do próprio armazenamento não é usado por
+nenhuma versão: `py node.py gc` remove esses blobs e os temporários
+abandonados. Não há contagem de referências a manter: o sistema de
+arquivos já a faz (st_nlink).
+
+Os arquivos das versões compartilham o inode com o blob: editar um
+arquivo no lugar (em vez de substituí-lo) altera todas as versões que o
+usam. Por isso o armazenamento é opcional.
+"""
+
+import os
+import stat
+import time
+import zlib
+import shutil
+import hashlib
+import itertools
+import threading
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from node_trace import span
+
+
+# Tamanho do buffer de cópia
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Temporários mais antigos que isso são de extrações interrompidas
+STALE_TEMP_AGE = 3600
+
+# ioctl de clonagem de arquivo do Linux (btrfs, xfs, bcachefs...)
+FICLONE = 0x40049409
+
+
+def clone_file(source, destination):
+    """
+    Cria um reflink (cópia sob demanda) quando o sistema de arquivos permite
+    
+    Args:
+        source (Path): Arquivo existente
+        destination (Path): Novo arquivo (não pode existir)
+    
+    Returns:
+        bool: True se o reflink foi criado
+    """
+    if fcntl is None or not hasattr(fcntl, 'ioctl'):
+        return False
+    try:
+        with open(source, 'rb') as src, open(destination, 'xb') as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                return True
+            except OSError:
+                pass
+        os.unlink(destination)
+    except OSError:
+        pass
+    return False
+
+
+class BlobStore:
+    """Blobs endereçados pelo SHA-256, ligados aos diretórios das versões"""
+    
+    def __init__(self, root):
+        """
+        Args:
+            root (Path): Diretório do armazenamento (no mesmo volume das versões)
+        """
+        self.root = Path(root)
+        self.blobs_dir = self.root / "blobs"
+        self.temp_dir = self.root / "tmp"
+        self.added = 0
+        self.reused = 0
+        self.reused_bytes = 0
+        self.links = {'hardlink': 0, 'reflink': 0, 'copy': 0}
+        self._names = itertools.count()
+        self._lock = threading.Lock()
+    
+    def blob_path(self, digest, mode=0):
+        """
+        Caminho do blob de um conteúdo
+        
+        Executáveis ficam em um blob separado (sufixo "-x"): o modo é do
+        inode, compartilhado por todos os links.
+        
+        Args:
+            digest (str): SHA-256 do conteúdo
+            mode (int): Permissões Unix do arquivo (0 = padrão)
+        
+        Returns:
+            Path: Caminho do blob
+        """
+        suffix = "-x" if mode & 0o111 else ""
+        return self.blobs_dir / digest[:2] / f"{digest}{suffix}"
+    
+    def add(self, source, mode=0, expected_crc=None):
+        """
+        Grava um conteúdo lido em fluxo no armazenamento (se ainda não existir)
+        
+        Args:
+            source: Objeto com read(n) (ex: membro aberto do ZIP)
+            mode (int): Permissões Unix do arquivo (0 = padrão)
+            expected_crc (int): CRC-32 esperado do conteúdo
+        
+        Returns:
+            Path: Blob com o conteúdo
+        
+        Raises:
+            ValueError: Se o CRC-32 não conferir (nada é gravado)
+        """
+        self.temp_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = self.temp_dir / f"{os.getpid()}-{next(self._names)}"
+        hasher = hashlib.sha256()
+        crc = 0
+        size = 0
+        try:
+            with open(temp_path, 'wb') as f:
+                while True:
+                    chunk = source.read(COPY_BUFFER_SIZE)
+                    if not chunk:
+                        break
+                    hasher.update(chunk)
+                    crc = zlib.crc32(chunk, crc)
+                    f.write(chunk)
+                    size += len(chunk)
+            if expected_crc is not None and crc != expected_crc:
+                raise ValueError("CRC-32 inválido")
+            
+            blob = self.blob_path(hasher.hexdigest(), mode)
+            if mode:
+                os.chmod(temp_path, mode & 0o777)
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            # Publicado com link, que não substitui um blob existente: com um
+            # rename, o segundo escritor do mesmo conteúdo trocaria o inode já
+            # ligado às versões e elas deixariam de compartilhar o blob
+            try:
+                os.link(temp_path, blob)
+                added = True
+            except FileExistsError:
+                added = False
+            except OSError:
+                # Sem hard links (FAT...): as versões recebem cópias de qualquer forma
+                added = not blob.exists()
+                if added:
+                    os.replace(temp_path, blob)
+        finally:
+            temp_path.unlink(missing_ok=True)
+        with self._lock:
+            if added:
+                self.added += 1
+            else:
+                self.reused += 1
+                self.reused_bytes += size
+        return blob
+    
+    def link(self, blob, destination):
+        """
+        Materializa um blob no diretório da versão
+        
+        Args:
+            blob (Path): Blob de add
+            destination (Path): Arquivo a criar (não pode existir)
+        
+        Returns:
+            str: "hardlink", "reflink" ou "copy"
+        """
+        try:
+            os.link(blob, destination)
+            kind = 'hardlink'
+        except OSError:
+            # Limite de links do NTFS (1023), FAT, outro volume...
+            if clone_file(blob, destination):
+                kind = 'reflink'
+            else:
+                shutil.copy2(blob, destination)
+                kind = 'copy'
+        with self._lock:
+            self.links[kind] += 1
+        return kind
+    
+    def stats(self):
+        """
+        Tamanho do armazenamento
+        
+        Returns:
+            dict: blobs, bytes, unused (blobs sem versão) e unused_bytes
+        """
+        stats = {'blobs': 0, 'bytes': 0, 'unused': 0, 'unused_bytes': 0}
+        for blob in self._blobs():
+            info = blob.stat()
+            stats['blobs'] += 1
+            stats['bytes'] += info.st_size
+            if info.st_nlink <= 1:
+                stats['unused'] += 1
+                stats['unused_bytes'] += info.st_size
+        return stats
+    
+    def gc(self):
+        """
+        Remove os blobs que nenhuma versão usa e os temporários abandonados
+        
+        Returns:
+            dict: removed (blobs), bytes liberados e temp (temporários removidos)
+        """
+        result = {'removed': 0, 'bytes': 0, 'temp': 0}
+        with span("gc", 'publish', store=str(self.root)):
+            for blob in self._blobs():
+                info = blob.stat()
+                if info.st_nlink > 1:
+                    continue
+                try:
+                    blob.unlink()
+                except OSError:
+                    if not os.access(blob, os.W_OK):
+                        # Windows não remove arquivos somente leitura
+                        os.chmod(blob, stat.S_IWRITE)
+                        blob.unlink()
+                    else:
+                        raise
+                result['removed'] += 1
+                result['bytes'] += info.st_size
+            
+            if self.temp_dir.is_dir():
+                limit = time.time() - STALE_TEMP_AGE
+                for temp_path in self.temp_dir.iterdir():
+                    if temp_path.stat().st_mtime < limit:
+                        temp_path.unlink(missing_ok=True)
+                        result['temp'] += 1
+            
+            if self.blobs_dir.is_dir():
+                for prefix_dir in self.blobs_dir.iterdir():
+                    if prefix_dir.is_dir() and not any(prefix_dir.iterdir()):
+                        prefix_dir.rmdir()
+        return result
+    
+    def _blobs(self):
+        """Percorre os blobs do armazenamento"""
+        if not self.blobs_dir.is_dir():
+            return
+        for prefix_dir in self.blobs_dir.iterdir():
+            if prefix_dir.is_dir():
+                yield from prefix_dir.iterdir()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Linha do tempo das instalações no formato Chrome trace (--trace=arquivo.json)
+
+Desligado por padrão. Com `--trace`, cada etapa vira um intervalo
+(evento "X" do formato trace-event) com a thread em que rodou:
+
+    phase     fases de cada instalação (resolve, download, extract...)
+    http      cada requisição, do envio até os cabeçalhos da resposta
+    download  cada faixa de um download segmentado
+    hash      cada bloco processado pelo SHA-256
+    extract   cada arquivo gravado a partir do ZIP/tarball
+    publish   o rename final (diretório da versão e arquivo baixado)
+
+As threads recebem nomes pelo papel (segment_0, extract_1, download-job_0...),
+que aparecem como trilhas separadas ao abrir o arquivo em
+https://ui.perfetto.dev ou chrome://tracing.
+
+Os pontos instrumentados chamam span(); sem trace ativo ele devolve um
+contexto vazio compartilhado, então o custo desligado é uma chamada de
+função por etapa.
+"""
+
+import os
+import json
+import time
+import itertools
+import threading
+
+
+class Tracer:
+    """Acumula os intervalos da execução e grava no formato trace-event"""
+    
+    def __init__(self):
+        self.pid = os.getpid()
+        self.origin = time.perf_counter_ns()
+        self.events = []
+        self.threads = {}
+        # Ids próprios: o get_ident de uma thread encerrada é reaproveitado
+        # pela próxima, o que juntaria pools diferentes na mesma trilha
+        self._local = threading.local()
+        self._tids = itertools.count(1)
+    
+    def add(self, name, category, start_ns, end_ns, args):
+        """
+        Registra um intervalo concluído na thread atual
+        
+        Args:
+            name (str): Nome exibido
+            category (str): Categoria (phase, http, download, hash, extract, publish)
+            start_ns (int): Início (perf_counter_ns)
+            end_ns (int): Fim (perf_counter_ns)
+            args (dict): Detalhes exibidos ao selecionar o intervalo
+        """
+        tid = getattr(self._local, 'tid', None)
+        if tid is None:
+            tid = self._local.tid = next(self._tids)
+            self.threads[tid] = threading.current_thread().name
+        # list.append é atômico: as threads não precisam de lock para registrar
+        self.events.append({
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': (start_ns - self.origin) / 1000,
+            'dur': (end_ns - start_ns) / 1000,
+            'pid': self.pid,
+            'tid': tid,
+            'args': args,
+        })
+    
+    def trace_events(self):
+        """
+        Eventos no formato trace-event, com os nomes do processo e das threads
+        
+        Returns:
+            list: Eventos de metadados ("M") seguidos dos intervalos ("X")
+        """
+        metadata = [{'name': 'process_name', 'ph': 'M', 'pid': self.pid, 'tid': 0,
+                     'args': {'name': 'node.py'}}]
+        for tid, thread_name in list(self.threads.items()):
+            metadata.append({'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': tid,
+                             'args': {'name': thread_name}})
+        return metadata + list(self.events)
+    
+    def write(self, path):
+        """
+        Grava o trace (arquivo temporário + rename)
+        
+        Args:
+            path (str): Arquivo de destino (.json)
+        """
+        data = {'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms'}
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+
+class Span:
+    """Intervalo em andamento; o dicionário de __enter__ recebe detalhes extras"""
+    
+    __slots__ = ('tracer', 'name', 'category', 'args', 'start')
+    
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0
+    
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self.args
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.add(self.name, self.category, self.start, time.perf_counter_ns(), self.args)
+        return False
+
+
+class _NullSpan:
+    """Contexto sem efeito usado quando não há trace ativo"""
+    
+    def __enter__(self):
+        return {}
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+# Trace ativo (None = desligado)
+_tracer = None
+
+
+def start_trace():
+    """
+    Liga o trace para o restante da execução
+    
+    Returns:
+        Tracer: Trace ativo
+    """
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def stop_trace(path=None):
+    """
+    Desliga o trace e grava o arquivo
+    
+    Args:
+        path (str): Arquivo de destino (None = só desliga)
+    
+    Returns:
+        Tracer: Trace encerrado (None se não havia trace ativo)
+    """
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None and path:
+        tracer.write(path)
+        print(f"🧭 Trace salvo em: {path} ({len(tracer.events)} eventos; abra em https://ui.perfetto.dev)")
+    return tracer
+
+
+def span(name, category, **args):
+    """
+    Intervalo a registrar com `with`, se houver trace ativo
+    
+    Args:
+        name (str): Nome exibido
+        category (str): Categoria
+        **args: Detalhes do intervalo
+    
+    Returns:
+        Span: Contexto (NULL_SPAN com o trace desligado)
+    """
+    tracer = _tracer
+    if tracer is None:
+        return NULL_SPAN
+    return Span(tracer, name, category, args)
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do downloader assíncrono (asyncio)
+
+Sobe um servidor local HTTP/1.1 com index.json, SHASUMS256.txt (em
+chunked) e ZIPs, e verifica que muitas consultas simultâneas usam uma
+única leitura do índice, que a instalação funciona no event loop, que o
+proxy HTTP recebe a URL absoluta e que o túnel CONNECT é aberto sem
+bloquear o loop.
+"""
+
+import os
+import sys
+import json
+import socket
+import select
+import asyncio
+import tempfile
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler
+sys.path.append(os.path.dirname(__file__))
+
+import tests_support
+from tests_support import archive_name, build_zip
+from node_async import AsyncNodeDownloader, AsyncHTTPClient
+
+VERSIONS = ["16.20.0", "18.17.0", "20.9.0"]
+INDEX = json.dumps([
+    {"version": f"v{version}", "date": "2023-01-01", "files": ["win-x64-zip"],
+     "lts": "Hydrogen" if version.startswith("18.") else False}
+    for version in reversed(VERSIONS)
+]).encode('utf-8')
+
+
+class ReleaseHandler(tests_support.ReleaseHandler):
+    """Servidor de teste keep-alive que também atende como proxy HTTP"""
+    
+    protocol_version = "HTTP/1.1"
+    index = INDEX
+    archives = {archive_name(version): build_zip(version, node_size=1536 * 1024)
+                for version in VERSIONS}
+    index_requests = 0
+    proxied_requests = 0
+    
+    def release_file(self, name):
+        if self.path.startswith('http://'):
+            ReleaseHandler.proxied_requests += 1
+        if name == 'index.json':
+            ReleaseHandler.index_requests += 1
+        return super().release_file(name)
+    
+    def send_body(self, name, body, head=False):
+        if name != 'SHASUMS256.txt':
+            super().send_body(name, body, head)
+            return
+        # Em chunked, para exercitar a decodificação
+        self.send_response(200)
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for start in range(0, len(body), 40):
+            chunk = body[start:start + 40]
+            self.wfile.write(f"{len(chunk):x}\r\n".encode('ascii') + chunk + b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class TunnelHandler(BaseHTTPRequestHandler):
+    """Proxy de teste que só aceita CONNECT e repassa os bytes"""
+    
+    tunnels = 0
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def do_CONNECT(self):
+        host, port = self.path.rsplit(':', 1)
+        upstream = socket.create_connection((host, int(port)))
+        TunnelHandler.tunnels += 1
+        self.send_response(200, "Connection established")
+        self.end_headers()
+        sockets = [self.connection, upstream]
+        try:
+            while True:
+                readable, _, _ = select.select(sockets, [], [], 5)
+                if not readable:
+                    return
+                for sock in readable:
+                    data = sock.recv(65536)
+                    if not data:
+                        return
+                    (upstream if sock is self.connection else self.connection).sendall(data)
+        finally:
+            upstream.close()
+
+
+def start_server(handler=ReleaseHandler):
+    """Inicia um servidor de teste em uma porta livre"""
+    return tests_support.start_server(handler)
+
+
+def test_concurrent_resolves():
+    """Centenas de consultas simultâneas usam uma única leitura do índice"""
+    server, base_url = start_server()
+    ReleaseHandler.index_requests = 0
+    
+    async def resolve_all(downloader):
+        requests = [VERSIONS[i % len(VERSIONS)] for i in range(300)] + ["99.0.0"]
+        return await asyncio.gather(*(downloader.check_version_exists(v) for v in requests))
+    
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            downloader = AsyncNodeDownloader(base_dir=temp_dir, base_url=base_url,
+                                             cache_dir=Path(temp_dir) / "cache")
+            results = asyncio.run(resolve_all(downloader))
+            assert all(results[:-1]) and not results[-1]
+            assert ReleaseHandler.index_requests == 1
+        print("✅ 301 consultas simultâneas com um único index.json")
+    finally:
+        server.shutdown()
+
+
+def test_async_install():
+    """Várias versões instaladas ao mesmo tempo no mesmo event loop"""
+    server, base_url = start_server()
+    
+    async def install_all(downloader):
+        async with downloader:
+            results = await asyncio.gather(*(downloader.download_version(v) for v in VERSIONS))
+            # Segunda vez: já instaladas, sem download
+            again = await downloader.download_version(VERSIONS[0])
+            return results, again, downloader.pool_stats()
+    
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            downloader = AsyncNodeDownloader(base_dir=temp_dir, base_url=base_url,
+                                             cache_dir=Path(temp_dir) / "cache", max_connections=2)
+            results, again, stats = asyncio.run(install_all(downloader))
+            assert all(results) and again
+            for version in VERSIONS:
+                assert (Path(temp_dir) / f"v{version}" / "node.exe").exists()
+            assert not list((Path(temp_dir) / ".downloads").glob("*.part*"))
+            assert stats['reused'] > 0
+        print("✅ Instalação assíncrona concluída")
+    finally:
+        server.shutdown()
+
+
+def test_async_resolve_spec():
+    """Intervalos e apelidos resolvidos pela mesma tabela do NodeDownloader"""
+    server, base_url = start_server()
+    
+    async def install(downloader):
+        async with downloader:
+            return [await downloader.download_version(spec) for spec in ("lts", "20", "latest")]
+    
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            downloader = AsyncNodeDownloader(base_dir=temp_dir, base_url=base_url, cache_dir="off")
+            assert asyncio.run(install(downloader)) == [True, True, True]
+            assert sorted(p.name for p in Path(temp_dir).glob("v*")) == ["v18.17.0", "v20.9.0"]
+            assert not asyncio.run(downloader.download_version("19"))
+            assert not asyncio.run(downloader.download_version("banana"))
+        print("✅ Apelidos e intervalos no downloader assíncrono")
+    finally:
+        server.shutdown()
+
+
+def test_async_only():
+    """--only no downloader assíncrono: só os arquivos escolhidos chegam ao disco"""
+    server, base_url = start_server()
+    
+    async def install(downloader):
+        async with downloader:
+            return await downloader.download_version(VERSIONS[1])
+    
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            downloader = AsyncNodeDownloader(base_dir=temp_dir, base_url=base_url, cache_dir="off",
+                                             only="node.exe")
+            assert asyncio.run(install(downloader))
+            version_dir = Path(temp_dir) / f"v{VERSIONS[1]}"
+            assert sorted(p.name for p in version_dir.iterdir()) == ["node.exe"]
+            assert downloader.sync.registry.get(VERSIONS[1])['only'] == ["node.exe"]
+            assert not list((Path(temp_dir) / ".downloads").iterdir())
+        print("✅ Instalação parcial no downloader assíncrono")
+    finally:
+        server.shutdown()
+
+
+def test_http_proxy():
+    """Via proxy HTTP, a requisição leva a URL absoluta"""
+    server, base_url = start_server()
+    ReleaseHandler.proxied_requests = 0
+    
+    async def fetch():
+        client = AsyncHTTPClient(proxy_url=base_url)
+        async with await client.open("http://releases.invalid/dist/index.json") as response:
+            body = await response.read()
+        await client.close()
+        return body
+    
+    try:
+        assert asyncio.run(fetch()) == INDEX
+        assert ReleaseHandler.proxied_requests == 1
+        print("✅ Requisição enviada pelo proxy HTTP")
+    finally:
+        server.shutdown()
+
+
+def test_connect_tunnel():
+    """O túnel CONNECT é aberto de forma assíncrona e transporta a conexão"""
+    server, _ = start_server()
+    proxy, proxy_url = start_server(TunnelHandler)
+    TunnelHandler.tunnels = 0
+    
+    async def fetch_through_tunnel():
+        client = AsyncHTTPClient(proxy_url=proxy_url)
+        proxy_port = proxy.server_address[1]
+        sock = await client._open_tunnel('127.0.0.1', proxy_port, '127.0.0.1',
+                                         server.server_address[1], proxy_url, timeout=5)
+        reader, writer = await asyncio.open_connection(sock=sock)
+        writer.write(b"GET /index.json HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+        return response
+    
+    try:
+        response = asyncio.run(fetch_through_tunnel())
+        assert response.startswith(b"HTTP/1.1 200") and response.endswith(INDEX)
+        assert TunnelHandler.tunnels == 1
+        print("✅ Túnel CONNECT aberto pelo proxy")
+    finally:
+        proxy.shutdown()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_concurrent_resolves()
+    test_async_install()
+    test_async_resolve_spec()
+    test_async_only()
+    test_http_proxy()
+    test_connect_tunnel()
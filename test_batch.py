@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste da instalação em lote
+
+Sobe um servidor local com index.json, SHASUMS256.txt e ZIPs de três
+versões e verifica que o lote resolve todas com uma consulta ao índice,
+instala cada versão, reporta versões inexistentes e respeita o limite
+global de banda.
+"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+from pathlib import Path
+sys.path.append(os.path.dirname(__file__))
+
+import tests_support
+from tests_support import archive_name, build_index, build_zip
+from node import NodeDownloader
+from node_batch import BatchInstaller, read_versions_file
+from node_http import BandwidthLimiter
+
+VERSIONS = ["16.20.0", "18.17.0", "20.9.0"]
+
+
+class ReleaseHandler(tests_support.ReleaseHandler):
+    """Servidor de teste com várias versões, contando as leituras do índice"""
+    
+    index = build_index(VERSIONS)
+    archives = {archive_name(version): build_zip(version) for version in VERSIONS}
+    index_requests = 0
+    
+    def release_file(self, name):
+        if name == 'index.json':
+            ReleaseHandler.index_requests += 1
+        return super().release_file(name)
+
+
+def start_server():
+    """Inicia o servidor de teste em uma porta livre"""
+    return tests_support.start_server(ReleaseHandler)
+
+
+def test_read_versions_file():
+    """Arquivo de versões aceita comentários e linhas em branco"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "versoes.txt"
+        path.write_text("# imagem de build\n16.20.0\n\n18.17.0 20.9.0  # LTS\n", encoding='utf-8')
+        assert read_versions_file(path) == VERSIONS
+    print("✅ Lista de versões lida do arquivo")
+
+
+def test_batch_install():
+    """Várias versões instaladas com uma consulta ao índice"""
+    server, base_url = start_server()
+    ReleaseHandler.index_requests = 0
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            downloader = NodeDownloader(base_dir=temp_dir, base_url=base_url,
+                                        cache_dir=Path(temp_dir) / "cache")
+            installer = BatchInstaller(downloader, download_jobs=2, extract_jobs=2)
+            results = installer.run(VERSIONS + ["v18.17.0", "99.0.0"])
+            
+            statuses = {result['version']: result['status'] for result in results}
+            assert statuses == {"16.20.0": "instalado", "18.17.0": "instalado",
+                                "20.9.0": "instalado", "99.0.0": "falhou"}
+            for version in VERSIONS:
+                assert (Path(temp_dir) / f"v{version}" / "node.exe").exists()
+            assert ReleaseHandler.index_requests == 1
+            assert downloader.show_progress
+            
+            # Segunda execução: tudo já instalado
+            results = BatchInstaller(downloader).run(VERSIONS)
+            assert all(result['status'] == 'já instalado' for result in results)
+        print("✅ Instalação em lote concluída")
+    finally:
+        server.shutdown()
+
+
+def test_bandwidth_limiter():
+    """O limite de banda é compartilhado entre threads"""
+    limiter = BandwidthLimiter(1024 * 1024, burst=64 * 1024)
+    started = time.monotonic()
+    threads = [threading.Thread(target=lambda: [limiter.consume(64 * 1024) for _ in range(4)])
+               for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    # 512 KB a 1 MB/s, com 64 KB de folga inicial: pelo menos ~0.44s
+    assert time.monotonic() - started >= 0.4
+    print("✅ Limite de banda respeitado")
+
+
+if __name__ == "__main__":
+    test_read_versions_file()
+    test_batch_install()
+    test_bandwidth_limiter()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do benchmark com servidor local de releases
+
+Roda o benchmark com uma árvore pequena e verifica as quatro fases, o
+JSON de resultados e a comparação; depois injeta falhas 503 e quedas de
+conexão (em número limitado) e confere que o pipeline se recupera, e
+que sem index.json a versão é encontrada pela listagem HTML.
+"""
+
+import io
+import os
+import sys
+import json
+import tempfile
+from pathlib import Path
+from contextlib import redirect_stdout
+sys.path.append(os.path.dirname(__file__))
+
+from node import NodeDownloader
+from node_bench import PHASES, FaultInjector, ReleaseTree, listing_html, run_benchmark, print_summary
+
+
+def test_benchmark_phases():
+    """Fases cronometradas, resumo e JSON comparável"""
+    results = run_benchmark(versions=["18.17.0", "20.9.0"], size="256K", files=40, iterations=2,
+                            connections=2, workers=2)
+    assert len(results['runs']) == 4 and all(run['ok'] for run in results['runs'])
+    run = results['runs'][0]
+    assert set(run['phases']) == set(PHASES)
+    assert run['files'] == 40 and run['bytes'] == 256 * 1024
+    assert run['archive_bytes'] == results['archives']['18.17.0']['bytes']
+    assert results['summary']['total']['median'] > 0
+    assert results['server']['failures'] == 0
+    
+    # O JSON salvo serve de base para a próxima execução
+    results = json.loads(json.dumps(results))
+    output = io.StringIO()
+    with redirect_stdout(output):
+        print_summary(results, baseline=results)
+    assert "+0.0%" in output.getvalue()
+    print(f"✅ Benchmark: {results['summary']['total']['median'] * 1000:.1f} ms por instalação")
+
+
+def test_benchmark_faults():
+    """Falhas e quedas injetadas são recuperadas pelo downloader"""
+    faults = FaultInjector(fail_rate=0.5, drop_rate=0.5, limit=4, seed=3)
+    results = run_benchmark(versions=["18.17.0"], size="1M", files=10, iterations=3,
+                            connections=2, faults=faults)
+    assert all(run['ok'] for run in results['runs'])
+    assert results['server']['failures'] + results['server']['drops'] == 4
+    print(f"✅ Recuperado de {results['server']['failures']} falhas e "
+          f"{results['server']['drops']} quedas")
+
+
+def test_listing_without_index():
+    """Sem index.json, a versão é encontrada pela listagem HTML"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        tree = ReleaseTree(Path(temp_dir), ["16.20.0"], size="64K", files=3, index=False).build()
+        html = listing_html("v16.20.0/", tree.root / "v16.20.0")
+        assert '<a href="node-v16.20.0-win-x64.zip">' in html
+        assert not (tree.root / "index.json").exists()
+        
+        downloader = NodeDownloader(base_dir=Path(temp_dir) / "nvm", base_url="http://x.invalid/",
+                                    cache_dir="off")
+        url, filename = downloader._parse_release_page("v16.20.0", "http://x.invalid/v16.20.0/", html)
+        assert filename == "node-v16.20.0-win-x64.zip"
+        assert url == f"http://x.invalid/v16.20.0/{filename}"
+    
+    results = run_benchmark(versions=["16.20.0"], size="64K", files=3, iterations=1, index=False)
+    assert results['runs'][0]['ok']
+    print("✅ Listagem HTML no formato do nodejs.org")
+
+
+if __name__ == "__main__":
+    test_benchmark_phases()
+    test_benchmark_faults()
+    test_listing_without_index()
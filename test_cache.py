@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do cache de arquivos por SHA-256
+
+Sobe um servidor local com index.json, SHASUMS256.txt e um ZIP e
+verifica que uma segunda instalação, em outro NVM_DIR com o mesmo cache,
+não baixa o ZIP de novo, além da remoção dos arquivos usados há mais
+tempo quando o cache passa do limite.
+"""
+
+import os
+import sys
+import time
+import hashlib
+import tempfile
+from pathlib import Path
+sys.path.append(os.path.dirname(__file__))
+
+import tests_support
+from tests_support import archive_name, build_index, build_zip
+from node import NodeDownloader
+from node_cache import ArchiveCache, parse_size
+
+VERSION = "18.17.0"
+FILENAME = archive_name(VERSION)
+ARCHIVE = build_zip(VERSION, node_size=256 * 1024)
+
+
+class ReleaseHandler(tests_support.ReleaseHandler):
+    """Servidor de teste que conta quantas vezes o ZIP foi baixado"""
+    
+    index = build_index([VERSION], date="2023-07-18", lts="Hydrogen")
+    archives = {FILENAME: ARCHIVE}
+    archive_requests = 0
+    
+    def release_file(self, name):
+        if name == FILENAME and self.command == 'GET':
+            ReleaseHandler.archive_requests += 1
+        return super().release_file(name)
+
+
+def start_server():
+    """Inicia o servidor de teste em uma porta livre"""
+    return tests_support.start_server(ReleaseHandler)
+
+
+def test_reinstall_from_cache():
+    """Segunda instalação (outro NVM_DIR, mesmo cache) não baixa o ZIP"""
+    server, base_url = start_server()
+    ReleaseHandler.archive_requests = 0
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_dir = Path(temp_dir) / "cache"
+            for name in ("nvm-a", "nvm-b"):
+                base_dir = Path(temp_dir) / name
+                downloader = NodeDownloader(base_dir=base_dir, base_url=base_url, cache_dir=cache_dir)
+                assert downloader.download_version(VERSION)
+                assert (base_dir / f"v{VERSION}" / "node.exe").exists()
+            assert ReleaseHandler.archive_requests == 1
+            
+            cache = ArchiveCache(cache_dir)
+            assert cache.lookup(filename=FILENAME) == cache.object_path(hashlib.sha256(ARCHIVE).hexdigest())
+        print("✅ Reinstalação usou o cache, sem baixar o ZIP")
+    finally:
+        server.shutdown()
+
+
+def test_cache_lru_eviction():
+    """Acima do limite, os arquivos usados há mais tempo saem primeiro"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = ArchiveCache(Path(temp_dir) / "cache", max_bytes=parse_size("3.5K"))
+        paths = {}
+        for name in ("a", "b", "c"):
+            source = Path(temp_dir) / name
+            source.write_bytes(name.encode('ascii') * 1024)
+            paths[name] = cache.add(source)
+            os.utime(paths[name], (time.time() - 100 + len(paths), ) * 2)
+        
+        # "a" foi usado por último: "b" é o mais antigo
+        assert cache.lookup(hashlib.sha256(b"a" * 1024).hexdigest())
+        source = Path(temp_dir) / "d"
+        source.write_bytes(b"d" * 1024)
+        cache.add(source)
+        
+        assert paths["a"].exists()
+        assert not paths["b"].exists()
+        assert paths["c"].exists()
+        assert sum(size for _, size, _ in cache.entries()) <= cache.max_bytes
+    print("✅ Cache limitado removendo os menos usados")
+
+
+if __name__ == "__main__":
+    test_reinstall_from_cache()
+    test_cache_lru_eviction()
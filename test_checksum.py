@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste da verificação SHA-256 (SHASUMS256.txt)
+
+Verifica que o hash calculado durante o download segmentado (faixas
+fora de ordem) é o do arquivo completo, que um download corrompido é
+baixado de novo e que um arquivo que nunca confere é recusado.
+"""
+
+import os
+import re
+import sys
+import time
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+from urllib.error import URLError
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+sys.path.append(os.path.dirname(__file__))
+
+from node import NodeDownloader
+from node_checksum import OrderedHasher, ReleaseChecksums, parse_shasums
+
+PAYLOAD = os.urandom(3 * 1024 * 1024 + 77)
+FILENAME = "node-v18.17.0-win-x64.zip"
+SHASUMS = f"{hashlib.sha256(PAYLOAD).hexdigest()}  {FILENAME}\n".encode('utf-8')
+
+
+class ChecksumHandler(BaseHTTPRequestHandler):
+    """Servidor de teste com Range que pode corromper as primeiras respostas"""
+    
+    corrupt_requests = 0
+    shasums_requests = 0
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def do_HEAD(self):
+        self._send_headers(200, len(PAYLOAD))
+    
+    def do_GET(self):
+        if self.path.endswith('/SHASUMS256.txt'):
+            ChecksumHandler.shasums_requests += 1
+            self._send_headers(200, len(SHASUMS))
+            self.wfile.write(SHASUMS)
+            return
+        
+        start, end = 0, len(PAYLOAD) - 1
+        match = re.match(r'bytes=(\d+)-(\d+)', self.headers.get('Range', ''))
+        if match:
+            start, end = int(match.group(1)), int(match.group(2))
+            self._send_headers(206, end - start + 1, f"bytes {start}-{end}/{len(PAYLOAD)}")
+        else:
+            self._send_headers(200, len(PAYLOAD))
+        
+        body = bytearray(PAYLOAD[start:end + 1])
+        if ChecksumHandler.corrupt_requests > 0:
+            ChecksumHandler.corrupt_requests -= 1
+            body[len(body) // 2] ^= 0xFF
+        self.wfile.write(body)
+    
+    def _send_headers(self, status, length, content_range=None):
+        self.send_response(status)
+        self.send_header('Content-Length', str(length))
+        self.send_header('ETag', '"payload"')
+        self.send_header('Accept-Ranges', 'bytes')
+        if content_range:
+            self.send_header('Content-Range', content_range)
+        self.end_headers()
+
+
+def start_server():
+    """Inicia o servidor de teste em uma porta livre"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ChecksumHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def test_ordered_hasher():
+    """Blocos fora de ordem, com memória limitada, geram o hash do arquivo"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "arquivo.part"
+        path.write_bytes(PAYLOAD)
+        
+        # Os primeiros 1 MB "já estavam no disco" (download retomado)
+        hasher = OrderedHasher(path, completed=[(0, 1024 * 1024 - 1)], max_buffer=256 * 1024)
+        blocks = [(offset, PAYLOAD[offset:offset + 65536])
+                  for offset in range(1024 * 1024, len(PAYLOAD), 65536)]
+        for offset, data in reversed(blocks):
+            hasher.update(offset, data)
+        
+        assert hasher.position == len(PAYLOAD)
+        assert hasher.hexdigest() == hashlib.sha256(PAYLOAD).hexdigest()
+    print("✅ Hash em ordem a partir de blocos fora de ordem")
+
+
+def test_shasums_cached():
+    """O SHASUMS256.txt é baixado uma vez e reaproveitado do disco"""
+    server, base_url = start_server()
+    ChecksumHandler.shasums_requests = 0
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            open_url = NodeDownloader(base_dir=temp_dir)._open_url
+            cache_dir = Path(temp_dir) / ".cache"
+            
+            checksums = ReleaseChecksums(base_url, cache_dir, open_url)
+            assert checksums.expected("18.17.0", FILENAME) == hashlib.sha256(PAYLOAD).hexdigest()
+            assert ChecksumHandler.shasums_requests == 1
+            
+            checksums = ReleaseChecksums(base_url, cache_dir, open_url)
+            assert checksums.expected("v18.17.0", FILENAME)
+            assert ChecksumHandler.shasums_requests == 1
+            assert parse_shasums("linha inválida\n") == {}
+        print("✅ SHASUMS256.txt guardado em cache")
+    finally:
+        server.shutdown()
+
+
+def test_shasums_failure_not_cached():
+    """Uma falha ao obter o SHASUMS256.txt só é lembrada por failure_ttl"""
+    server, base_url = start_server()
+    ChecksumHandler.shasums_requests = 0
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            open_url = NodeDownloader(base_dir=temp_dir)._open_url
+            offline = [True]
+            
+            def flaky_open(url, **kwargs):
+                if offline[0]:
+                    raise URLError("rede indisponível")
+                return open_url(url, **kwargs)
+            
+            checksums = ReleaseChecksums(base_url, Path(temp_dir) / ".cache", flaky_open, failure_ttl=0.2)
+            assert checksums.expected("18.17.0", FILENAME) is None
+            offline[0] = False
+            assert checksums.expected("18.17.0", FILENAME) is None
+            assert ChecksumHandler.shasums_requests == 0
+            
+            time.sleep(0.25)
+            assert checksums.expected("18.17.0", FILENAME) == hashlib.sha256(PAYLOAD).hexdigest()
+            assert ChecksumHandler.shasums_requests == 1
+        print("✅ Falha no SHASUMS256.txt expira e é tentada de novo")
+    finally:
+        server.shutdown()
+
+
+def test_corrupt_download_is_retried():
+    """Download segmentado corrompido: é descartado e baixado de novo"""
+    server, base_url = start_server()
+    ChecksumHandler.corrupt_requests = 1
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            destination = Path(temp_dir) / FILENAME
+            downloader = NodeDownloader(base_dir=temp_dir, connections=3)
+            sha256 = hashlib.sha256(PAYLOAD).hexdigest()
+            assert downloader.download_file(f"{base_url}{FILENAME}", destination, sha256)
+            assert destination.read_bytes() == PAYLOAD
+        print("✅ Download corrompido baixado novamente")
+    finally:
+        server.shutdown()
+
+
+def test_corrupt_download_is_refused():
+    """Arquivo que nunca confere com o SHASUMS256.txt é recusado"""
+    server, base_url = start_server()
+    ChecksumHandler.corrupt_requests = 1000
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            destination = Path(temp_dir) / FILENAME
+            downloader = NodeDownloader(base_dir=temp_dir, connections=1)
+            sha256 = hashlib.sha256(PAYLOAD).hexdigest()
+            assert not downloader.download_file(f"{base_url}{FILENAME}", destination, sha256)
+            assert not destination.exists()
+            assert not destination.with_name(FILENAME + '.part').exists()
+        print("✅ Arquivo com SHA-256 inválido recusado")
+    finally:
+        ChecksumHandler.corrupt_requests = 0
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_ordered_hasher()
+    test_shasums_cached()
+    test_shasums_failure_not_cached()
+    test_corrupt_download_is_retried()
+    test_corrupt_download_is_refused()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do daemon residente e do cliente leve
+
+Sobe um servidor local de releases e um daemon em um socket temporário.
+Verifica que o cliente instala pelo daemon, que uma versão já instalada
+responde em milissegundos sem rede, que resolve usa o índice em memória,
+que um cliente sem a chave é recusado e que stop encerra o daemon.
+"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+from pathlib import Path
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+sys.path.append(os.path.dirname(__file__))
+
+import tests_support
+from tests_support import archive_name, build_index, build_zip, start_server
+from node import NodeDownloader
+from node_daemon import NodeDaemon
+from node_client import request, key_path, DaemonUnavailable
+
+VERSIONS = ["18.17.0", "20.9.0"]
+
+
+class ReleaseHandler(tests_support.ReleaseHandler):
+    """Servidor de teste que conta as requisições"""
+    
+    index = build_index(VERSIONS)
+    archives = {archive_name(version): build_zip(version, node_size=64 * 1024)
+                for version in VERSIONS}
+    requests = 0
+    
+    def release_file(self, name):
+        ReleaseHandler.requests += 1
+        return super().release_file(name)
+
+
+def start_daemon(downloader, address):
+    """Inicia o daemon em uma thread e espera o socket ficar pronto"""
+    daemon = NodeDaemon(downloader, address)
+    daemon.warm()
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    for _ in range(100):
+        if os.path.exists(key_path(address)):
+            break
+        time.sleep(0.02)
+    return thread
+
+
+def test_daemon_round_trip():
+    """Instala pelo daemon, responde versões presentes sem rede e encerra com stop"""
+    server, base_url = start_server(ReleaseHandler)
+    
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            address = str(Path(temp_dir) / "daemon.sock")
+            downloader = NodeDownloader(base_dir=Path(temp_dir) / "nvm", base_url=base_url,
+                                        cache_dir="off")
+            thread = start_daemon(downloader, address)
+            
+            reply = request('install', address=address, versions=["18.17.0"])
+            assert reply['ok'] and reply['results'][0]['status'] == 'installed'
+            assert (Path(temp_dir) / "nvm" / "v18.17.0" / "node.exe").exists()
+            
+            # Versão presente: sem rede e em milissegundos
+            ReleaseHandler.requests = 0
+            started = time.perf_counter()
+            reply = request('install', address=address, versions=["v18.17.0"])
+            elapsed = time.perf_counter() - started
+            assert reply['results'][0]['status'] == 'present'
+            assert ReleaseHandler.requests == 0
+            assert elapsed < 0.5
+            
+            reply = request('resolve', address=address, versions=["20.9.0", "99.0.0"])
+            assert reply['results'][0]['url'].endswith("node-v20.9.0-win-x64.zip")
+            assert reply['results'][1]['status'] == 'failed' and not reply['ok']
+            assert ReleaseHandler.requests == 0
+            
+            reply = request('list', address=address)
+            assert [version for version, _ in reply['installed']] == ["18.17.0"]
+            print(f"✅ Versão presente confirmada em {elapsed * 1000:.1f} ms")
+            
+            # Sem a chave certa a conexão é recusada
+            try:
+                Client(address, authkey=b"chave errada").close()
+                assert False, "esperava falha de autenticação"
+            except AuthenticationError:
+                pass
+            
+            assert request('stop', address=address)['ok']
+            thread.join(timeout=5)
+            assert not thread.is_alive()
+            assert not os.path.exists(key_path(address))
+            try:
+                request('ping', address=address)
+                assert False, "o daemon deveria estar encerrado"
+            except DaemonUnavailable:
+                pass
+            print("✅ Daemon encerrado pelo cliente")
+    finally:
+        server.shutdown()
+
+
+def test_daemon_repairs_failed():
+    """Uma instalação --lazy que falhou não conta como presente: o daemon a refaz"""
+    server, base_url = start_server(ReleaseHandler)
+    
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            address = str(Path(temp_dir) / "daemon.sock")
+            downloader = NodeDownloader(base_dir=Path(temp_dir) / "nvm", base_url=base_url,
+                                        cache_dir="off")
+            thread = start_daemon(downloader, address)
+            try:
+                assert request('install', address=address, versions=["18.17.0"])['ok']
+                
+                # Só o runtime chegou; o restante falhou
+                version_dir = Path(temp_dir) / "nvm" / "v18.17.0"
+                (version_dir / "npm.cmd").unlink()
+                entry = downloader.registry.get("18.17.0")
+                downloader.registry.record("18.17.0", version_dir, entry['executable'],
+                                           sha256=entry['sha256'], archive=entry['archive'],
+                                           state='failed')
+                
+                reply = request('install', address=address, versions=["18.17.0"])
+                assert reply['ok'] and reply['results'][0]['status'] == 'installed'
+                assert (version_dir / "npm.cmd").exists()
+                assert downloader.registry.get("18.17.0")['state'] is None
+                
+                reply = request('install', address=address, versions=["18.17.0"])
+                assert reply['results'][0]['status'] == 'present'
+            finally:
+                request('stop', address=address)
+                thread.join(timeout=5)
+        print("✅ Instalação com falha refeita pelo daemon")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_daemon_round_trip()
+    test_daemon_repairs_failed()
@@ -7,7 +7,11 @@ Este script demonstra como usar a classe NodeDownloader
 sem interação do usuário.
 """
 
-from main_simple import NodeDownloader
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+from node import NodeDownloader
 
 def test_download():
     """Função de teste para demonstrar o funcionamento"""
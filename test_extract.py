@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste da extração de ZIPs do Node.js
+
+Gera um ZIP no formato do Node.js (pasta node-vX-win-x64/ no topo) e
+verifica que a extração remove o prefixo, substitui uma instalação
+anterior por inteiro e não deixa diretórios de preparação para trás,
+inclusive com vários workers em paralelo. A reinstalação incremental
+(sync_zip_to) só regrava os arquivos que diferem do ZIP.
+"""
+
+import os
+import sys
+import zipfile
+import tempfile
+from pathlib import Path
+sys.path.append(os.path.dirname(__file__))
+
+from node_extract import extract_zip_to, sync_zip_to, common_prefix, balance_batches
+
+PREFIX = "node-v18.17.0-win-x64/"
+MEMBERS = {
+    "node.exe": os.urandom(300 * 1024),
+    "npm.cmd": b"@echo off\r\nnode npm-cli.js %*\r\n",
+    "node_modules/npm/package.json": b'{"name": "npm"}',
+    "node_modules/npm/lib/cli.js": b"module.exports = () => {}\n" * 500,
+}
+
+
+def build_zip(path, members=MEMBERS, prefix=PREFIX):
+    """Cria um ZIP com a mesma estrutura dos publicados pelo Node.js"""
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
+        zip_ref.writestr(prefix, b"")
+        for name, data in members.items():
+            zip_ref.writestr(prefix + name, data)
+    return path
+
+
+def test_common_prefix():
+    """A pasta de topo só é removida quando todos os membros a compartilham"""
+    assert common_prefix([PREFIX, PREFIX + "node.exe"]) == PREFIX
+    assert common_prefix(["node.exe", PREFIX + "npm.cmd"]) == ""
+    print("✅ Prefixo comum detectado corretamente")
+
+
+def test_extract_strips_prefix():
+    """Os arquivos vão direto para o diretório da versão, sem a pasta de topo"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        zip_path = build_zip(temp_path / "node.zip")
+        version_dir = temp_path / "nvm" / "v18.17.0"
+        
+        stats = extract_zip_to(zip_path, version_dir)
+        assert stats['files'] == len(MEMBERS)
+        for name, data in MEMBERS.items():
+            assert (version_dir / name).read_bytes() == data
+        assert not (version_dir / PREFIX.rstrip('/')).exists()
+        assert sorted(p.name for p in version_dir.parent.iterdir()) == ["v18.17.0"]
+    print("✅ Extração direta para o diretório da versão")
+
+
+def test_extract_replaces_previous_install():
+    """Uma reinstalação substitui o diretório inteiro (sem arquivos antigos)"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        version_dir = temp_path / "v18.17.0"
+        version_dir.mkdir()
+        (version_dir / "arquivo_antigo.txt").write_text("antigo")
+        
+        extract_zip_to(build_zip(temp_path / "node.zip"), version_dir)
+        assert not (version_dir / "arquivo_antigo.txt").exists()
+        assert (version_dir / "node.exe").exists()
+        assert sorted(p.name for p in temp_path.iterdir()) == ["node.zip", "v18.17.0"]
+    print("✅ Instalação anterior substituída por rename")
+
+
+def test_extract_rejects_path_traversal():
+    """Membros que tentam sair do diretório de destino são recusados"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        zip_path = build_zip(temp_path / "evil.zip", {"../fora.txt": b"x"})
+        version_dir = temp_path / "v1.0.0"
+        try:
+            extract_zip_to(zip_path, version_dir)
+            assert False, "O ZIP malicioso deveria ser recusado"
+        except Exception as e:
+            assert "inválido" in str(e)
+        assert not (temp_path / "fora.txt").exists()
+        assert not version_dir.exists()
+    print("✅ Caminho malicioso recusado")
+
+
+def test_balance_batches():
+    """Os lotes recebem quantidades de bytes parecidas"""
+    infos = []
+    for index, size in enumerate([900, 500, 400, 300, 300, 200, 100, 100]):
+        info = zipfile.ZipInfo(f"f{index}")
+        info.file_size = size * 1024
+        infos.append((info, None))
+    
+    batches = balance_batches(infos, 3)
+    loads = [sum(info.file_size for info, _ in batch) for batch in batches]
+    assert len(batches) == 3
+    assert sum(len(batch) for batch in batches) == len(infos)
+    assert max(loads) - min(loads) <= 300 * 1024
+    print(f"✅ Lotes equilibrados: {[load // 1024 for load in loads]} KB")
+
+
+def test_parallel_extract():
+    """Muitos arquivos pequenos extraídos por vários workers"""
+    members = {f"node_modules/npm/lib/m{index:04d}.js": os.urandom(64) * (index % 50 + 1)
+               for index in range(400)}
+    members["node.exe"] = os.urandom(1024 * 1024)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        zip_path = build_zip(temp_path / "node.zip", members)
+        version_dir = temp_path / "v18.17.0"
+        
+        stats = extract_zip_to(zip_path, version_dir, workers=4)
+        assert stats['workers'] == 4
+        assert stats['files'] == len(members)
+        for name, data in members.items():
+            assert (version_dir / name).read_bytes() == data
+    print("✅ Extração paralela com 4 workers")
+
+
+def test_parallel_extract_detects_corruption():
+    """Um membro corrompido faz a extração falhar sem publicar nada"""
+    members = {f"lib/m{index:03d}.js": b"x" * 1000 for index in range(100)}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        zip_path = temp_path / "node.zip"
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_STORED) as zip_ref:
+            for name, data in members.items():
+                zip_ref.writestr(PREFIX + name, data)
+        
+        # Troca um byte do conteúdo de um membro (armazenado sem compressão)
+        raw = bytearray(zip_path.read_bytes())
+        raw[raw.index(b"x" * 1000) + 10] = ord("y")
+        zip_path.write_bytes(bytes(raw))
+        
+        version_dir = temp_path / "v18.17.0"
+        try:
+            extract_zip_to(zip_path, version_dir, workers=4)
+            assert False, "A corrupção deveria ser detectada"
+        except zipfile.BadZipFile:
+            pass
+        assert not version_dir.exists()
+        assert sorted(p.name for p in temp_path.iterdir()) == ["node.zip"]
+    print("✅ CRC-32 inválido detectado")
+
+
+def test_sync_rewrites_only_changed():
+    """Reinstalação sobre o diretório: só os arquivos diferentes são regravados"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        version_dir = temp_path / "v18.17.0"
+        manifest_path = temp_path / ".manifests" / "v18.17.0.json"
+        extract_zip_to(build_zip(temp_path / "node.zip"), version_dir, manifest_path=manifest_path)
+        
+        # Nada mudou: tudo conferido pelo manifesto, sem ler os arquivos
+        inode = (version_dir / "node.exe").stat().st_ino
+        stats = sync_zip_to(temp_path / "node.zip", version_dir, manifest_path=manifest_path)
+        assert (stats['written'], stats['verified'], stats['removed']) == (0, 0, 0)
+        assert (version_dir / "node.exe").stat().st_ino == inode
+        
+        # Arquivo corrompido (mesmo tamanho), apagado e sobrando; um membro mudou no ZIP
+        (version_dir / "npm.cmd").write_bytes(b"x" * len(MEMBERS["npm.cmd"]))
+        (version_dir / "node_modules/npm/package.json").unlink()
+        (version_dir / "node_modules/velho").mkdir()
+        (version_dir / "node_modules/velho/index.js").write_text("antigo")
+        members = dict(MEMBERS, **{"node_modules/npm/lib/cli.js": b"// novo\n"})
+        zip_path = build_zip(temp_path / "node2.zip", members)
+        
+        stats = sync_zip_to(zip_path, version_dir, workers=2, manifest_path=manifest_path)
+        assert stats['written'] == 3 and stats['unchanged'] == 1 and stats['removed'] == 1
+        assert stats['verified'] == 0
+        assert {p.relative_to(version_dir).as_posix(): p.read_bytes()
+                for p in version_dir.rglob('*') if p.is_file()} == members
+        assert not (version_dir / "node_modules/velho").exists()
+        assert (version_dir / "node.exe").stat().st_ino == inode
+        
+        # Sem manifesto, os arquivos iguais são conferidos lendo o CRC-32
+        manifest_path.unlink()
+        stats = sync_zip_to(zip_path, version_dir, manifest_path=manifest_path)
+        assert stats['written'] == 0 and stats['verified'] == len(members)
+        assert manifest_path.exists()
+    print("✅ Reinstalação incremental regrava só os arquivos alterados")
+
+
+if __name__ == "__main__":
+    test_common_prefix()
+    test_extract_strips_prefix()
+    test_extract_replaces_previous_install()
+    test_extract_rejects_path_traversal()
+    test_balance_batches()
+    test_parallel_extract()
+    test_parallel_extract_detects_corruption()
+    test_sync_rewrites_only_changed()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do pool de conexões HTTP
+
+Sobe um servidor HTTP/1.1 local (keep-alive) e verifica que o índice,
+os HEADs e os downloads do NodeDownloader reaproveitam a mesma conexão,
+além do tratamento de redirecionamentos e erros HTTP.
+"""
+
+import os
+import sys
+import json
+import tempfile
+import threading
+from pathlib import Path
+from urllib.error import HTTPError
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+sys.path.append(os.path.dirname(__file__))
+
+from node import NodeDownloader
+
+ZIP_NAME = "node-v18.17.0-win-x64.zip"
+PAYLOAD = os.urandom(256 * 1024)
+INDEX = json.dumps([{"version": "v18.17.0", "files": ["win-x64-zip"]}]).encode('utf-8')
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Servidor de teste com keep-alive, redirecionamento e 404"""
+    
+    protocol_version = 'HTTP/1.1'
+    connections = set()
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def do_HEAD(self):
+        self._respond(head=True)
+    
+    def do_GET(self):
+        self._respond(head=False)
+    
+    def _respond(self, head):
+        KeepAliveHandler.connections.add(self.client_address)
+        if self.path == '/old/index.json':
+            self.send_response(301)
+            self.send_header('Location', '/index.json')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        
+        body = {'/index.json': INDEX, f'/v18.17.0/{ZIP_NAME}': PAYLOAD}.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+
+def test_connection_reuse():
+    """Índice, HEAD e GET usam uma única conexão TCP"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/"
+    KeepAliveHandler.connections = set()
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            downloader = NodeDownloader(base_dir=temp_dir, connections=1)
+            downloader.index.url = f"{base_url}old/index.json"
+            downloader.index.base_url = base_url
+            
+            url, filename = downloader.get_download_url("18.17.0")
+            assert filename == ZIP_NAME
+            assert downloader.check_version_exists("18.17.0")
+            destination = Path(temp_dir) / filename
+            assert downloader.download_file(url, destination)
+            assert destination.read_bytes() == PAYLOAD
+            
+            try:
+                downloader._open_url(f"{base_url}v0.0.0/")
+                assert False, "404 deveria gerar HTTPError"
+            except HTTPError as e:
+                assert e.code == 404
+            
+            stats = downloader.pool_stats()
+            assert stats['opened'] == 1
+            assert stats['reused'] == stats['requests'] - 1
+            assert len(KeepAliveHandler.connections) == 1
+        print(f"✅ Conexão reaproveitada: {stats}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_connection_reuse()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do índice de versões (index.json)
+
+Sobe um servidor local com um index.json sintético e verifica que
+resolver várias versões custa no máximo uma requisição, que o cache em
+disco é reaproveitado dentro do TTL e revalidado com ETag (HTTP 304).
+"""
+
+import os
+import sys
+import json
+import tempfile
+import threading
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+sys.path.append(os.path.dirname(__file__))
+
+from node import NodeDownloader
+from node_index import ReleaseIndex
+
+INDEX = json.dumps([
+    {"version": "v20.9.0", "date": "2023-10-24", "lts": "Iron",
+     "files": ["linux-x64", "osx-arm64-tar", "win-x64-zip", "win-x86-zip"]},
+    {"version": "v18.17.0", "date": "2023-07-18", "lts": "Hydrogen",
+     "files": ["linux-x64", "win-x64-zip"]},
+    {"version": "v0.10.0", "date": "2013-03-11", "lts": False,
+     "files": ["src", "osx-x64-pkg"]},
+]).encode('utf-8')
+ETAG = '"index-1"'
+
+
+class IndexHandler(BaseHTTPRequestHandler):
+    """Servidor de teste que entrega INDEX e responde 304 ao ETag atual"""
+    
+    requests = 0
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def do_GET(self):
+        IndexHandler.requests += 1
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.send_header('ETag', ETAG)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(INDEX)))
+        self.send_header('ETag', ETAG)
+        self.end_headers()
+        self.wfile.write(INDEX)
+
+
+def start_server():
+    """Inicia o servidor de teste em uma porta livre"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), IndexHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def test_release_index():
+    """Resolve várias versões com uma requisição e reaproveita o cache"""
+    server, base_url = start_server()
+    IndexHandler.requests = 0
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_dir = Path(temp_dir)
+            open_url = NodeDownloader(base_dir=temp_dir)._open_url
+            
+            index = ReleaseIndex(base_url, cache_dir, open_url)
+            resolved = index.resolve_many(["18.17.0", "v20.9.0", "0.10.0"])
+            assert IndexHandler.requests == 1
+            assert resolved["18.17.0"] == (
+                f"{base_url}v18.17.0/node-v18.17.0-win-x64.zip", "node-v18.17.0-win-x64.zip")
+            assert resolved["v20.9.0"][1] == "node-v20.9.0-win-x64.zip"
+            assert resolved["0.10.0"] is None
+            assert index.has_version("0.10.0")
+            assert "osx-arm64" in index.platforms("20.9.0")
+            print("✅ Várias versões resolvidas com uma requisição")
+            
+            # Nova instância dentro do TTL: nenhum acesso à rede
+            index = ReleaseIndex(base_url, cache_dir, open_url)
+            assert index.has_version("20.9.0")
+            assert IndexHandler.requests == 1
+            print("✅ Cache em disco reaproveitado dentro do TTL")
+            
+            # TTL expirado: revalida com ETag e recebe 304
+            index = ReleaseIndex(base_url, cache_dir, open_url, ttl=0)
+            assert index.has_version("18.17.0")
+            assert IndexHandler.requests == 2
+            print("✅ Cache revalidado com ETag (304)")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_release_index()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste das métricas de instalação (--report e --json)
+
+Sobe um servidor local de releases e verifica que cada fase (resolve,
+checksums, download, hash, extract) é registrada com tempo e bytes, que
+o relatório traz requisições e reutilização de conexões e que, com
+--json, o stdout do node.py contém apenas eventos JSON-lines.
+"""
+
+import io
+import os
+import sys
+import json
+import tempfile
+from pathlib import Path
+from contextlib import redirect_stdout, redirect_stderr
+sys.path.append(os.path.dirname(__file__))
+
+import tests_support
+from tests_support import archive_name, build_index, build_zip
+import node
+from node import NodeDownloader
+
+VERSION = "20.9.0"
+ARCHIVE = build_zip(VERSION, node_size=300 * 1024)
+
+
+class ReleaseHandler(tests_support.ReleaseHandler):
+    """Servidor de teste keep-alive com index.json, SHASUMS256.txt e o ZIP"""
+    
+    protocol_version = "HTTP/1.1"
+    index = build_index([VERSION], date="2023-10-24", lts="Iron")
+    archives = {archive_name(VERSION): ARCHIVE}
+
+
+def start_server():
+    return tests_support.start_server(ReleaseHandler)
+
+
+def test_install_phases():
+    """Fases com tempo e bytes, eventos JSON-lines e relatório"""
+    server, base_url = start_server()
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            downloader = NodeDownloader(base_dir=temp_dir, base_url=base_url, cache_dir="off")
+            events = io.StringIO()
+            downloader.metrics.events = events
+            
+            assert downloader.download_version("lts")
+            assert downloader.download_version(VERSION)
+            report_path = Path(temp_dir) / "report.json"
+            downloader.metrics.finish_run(downloader.pool_stats(), str(report_path))
+            
+            report = json.loads(report_path.read_text(encoding='utf-8'))
+            first, second = report['installs']
+            assert first['spec'] == "lts" and first['version'] == VERSION
+            assert first['status'] == 'installed' and first['source'] == 'network'
+            assert set(first['phases']) == {'resolve', 'checksums', 'download', 'hash', 'extract'}
+            assert first['phases']['download']['bytes'] == len(ARCHIVE)
+            assert first['phases']['hash']['bytes'] == len(ARCHIVE)
+            assert first['phases']['extract']['files'] == 2
+            assert first['phases']['extract']['bytes'] == 300 * 1024 + len(b"@echo off\r\n")
+            assert second['status'] == 'present' and set(second['phases']) == {'resolve'}
+            assert report['totals']['download']['bytes'] == len(ARCHIVE)
+            assert report['http']['requests'] >= 3 and report['http']['reuse_ratio'] is not None
+            
+            lines = [json.loads(line) for line in events.getvalue().splitlines()]
+            kinds = [line['event'] for line in lines]
+            assert kinds[0] == 'install_start' and kinds[-1] == 'run'
+            assert kinds.count('install_end') == 2
+            phase = next(line for line in lines if line.get('phase') == 'download')
+            assert phase['version'] == VERSION and phase['seconds'] > 0
+        print(f"✅ Fases registradas: {', '.join(first['phases'])}")
+    finally:
+        server.shutdown()
+
+
+def test_json_mode():
+    """--json: stdout só com eventos; as mensagens normais vão para o stderr"""
+    server, base_url = start_server()
+    saved_argv, saved_env = sys.argv, dict(os.environ)
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            report_path = Path(temp_dir) / "report.json"
+            os.environ.update(NVM_DIR=str(Path(temp_dir) / "nvm"), NODE_MIRRORS=base_url,
+                              NODE_ARCHIVE_CACHE="off")
+            sys.argv = ["node.py", "--json", f"--report={report_path}", VERSION]
+            stdout, stderr = io.StringIO(), io.StringIO()
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                node.main()
+            
+            lines = [json.loads(line) for line in stdout.getvalue().splitlines()]
+            assert lines[-1]['event'] == 'run' and lines[-1]['installs'] == 1
+            end = next(line for line in lines if line['event'] == 'install_end')
+            assert end['status'] == 'installed'
+            assert "instalado com sucesso" in stderr.getvalue()
+            assert json.loads(report_path.read_text(encoding='utf-8'))['installs'][0]['status'] == 'installed'
+        print(f"✅ Modo --json: {len(lines)} eventos no stdout")
+    finally:
+        sys.argv = saved_argv
+        os.environ.clear()
+        os.environ.update(saved_env)
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_install_phases()
+    test_json_mode()
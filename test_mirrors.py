@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste dos espelhos (mirrors)
+
+Sobe dois servidores locais com o mesmo conteúdo, um lento e um rápido,
+e verifica que a sondagem coloca o rápido primeiro e fica no histórico,
+e que um download que trava no meio continua a faixa que faltava no
+outro espelho, com o SHA-256 conferindo no final. Um espelho principal
+fora do ar é trocado já na sondagem.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import socket
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+sys.path.append(os.path.dirname(__file__))
+
+import node_mirrors
+from node import NodeDownloader
+from node_mirrors import MirrorSet, parse_mirrors
+
+PAYLOAD = os.urandom(4 * 1024 * 1024 + 99)
+INDEX = json.dumps([{"version": "v18.17.0", "files": ["win-x64-zip"]}]).encode('utf-8') * 2000
+FILENAME = "node-v18.17.0-win-x64.zip"
+
+
+def make_handler(delay=0.0, stall_after=None):
+    """
+    Cria um servidor de teste com Range
+    
+    Args:
+        delay (float): Atraso antes de cada resposta (espelho lento)
+        stall_after (int): Bytes enviados antes de passar a gotejar
+    """
+    class MirrorHandler(BaseHTTPRequestHandler):
+        paths = []
+        
+        def log_message(self, format, *args):
+            pass
+        
+        def do_HEAD(self):
+            self._send_headers(200, len(PAYLOAD))
+        
+        def do_GET(self):
+            MirrorHandler.paths.append(self.path)
+            time.sleep(delay)
+            body = INDEX if self.path.endswith('/index.json') else PAYLOAD
+            
+            start, end = 0, len(body) - 1
+            match = re.match(r'bytes=(\d+)-(\d*)', self.headers.get('Range', ''))
+            if match:
+                start = int(match.group(1))
+                end = min(int(match.group(2) or end), end)
+                self._send_headers(206, end - start + 1, f"bytes {start}-{end}/{len(body)}")
+            else:
+                self._send_headers(200, len(body))
+            
+            data = body[start:end + 1]
+            if stall_after is None or body is INDEX:
+                self.wfile.write(data)
+                return
+            try:
+                self.wfile.write(data[:stall_after])
+                # Depois disso, poucos bytes por vez: bem abaixo da velocidade mínima
+                for offset in range(stall_after, len(data), 512):
+                    self.wfile.write(data[offset:offset + 512])
+                    time.sleep(0.05)
+            except OSError:
+                pass
+        
+        def _send_headers(self, status, length, content_range=None):
+            self.send_response(status)
+            self.send_header('Content-Length', str(length))
+            self.send_header('Accept-Ranges', 'bytes')
+            self.send_header('ETag', '"payload"')
+            if content_range:
+                self.send_header('Content-Range', content_range)
+            self.end_headers()
+    
+    return MirrorHandler
+
+
+def start_server(handler):
+    """Inicia um servidor de teste em uma porta livre"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/dist/"
+
+
+def test_parse_mirrors():
+    """Lista separada por vírgula ou espaço, sem repetições"""
+    assert parse_mirrors("https://a/dist, https://b/node/  https://a/dist/") == \
+        ["https://a/dist/", "https://b/node/"]
+    assert parse_mirrors(None) == []
+    print("✅ Lista de espelhos interpretada")
+
+
+def test_probe_picks_fastest():
+    """O espelho mais rápido vai para o início e a medição fica no histórico"""
+    slow, slow_url = start_server(make_handler(delay=0.3))
+    fast, fast_url = start_server(make_handler())
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            history = Path(temp_dir) / "mirrors.json"
+            open_url = NodeDownloader(base_dir=temp_dir)._open_url
+            
+            mirrors = MirrorSet([slow_url, fast_url], history, open_url)
+            assert mirrors.ranked() == [fast_url, slow_url]
+            assert mirrors.urls_for(f"{slow_url}v18.17.0/{FILENAME}")[0] == f"{fast_url}v18.17.0/{FILENAME}"
+            
+            # Histórico recente: nenhuma nova sondagem
+            probes = len(fast.RequestHandlerClass.paths)
+            mirrors = MirrorSet([slow_url, fast_url], history, open_url)
+            assert mirrors.ranked() == [fast_url, slow_url]
+            assert len(fast.RequestHandlerClass.paths) == probes
+            assert json.loads(history.read_text(encoding='utf-8'))[fast_url]['throughput'] > 0
+        print("✅ Espelho mais rápido escolhido e lembrado")
+    finally:
+        slow.shutdown()
+        fast.shutdown()
+
+
+def test_failover_on_stall():
+    """Download que trava continua a faixa restante em outro espelho"""
+    stalled, stalled_url = start_server(make_handler(stall_after=1024 * 1024))
+    healthy, healthy_url = start_server(make_handler())
+    window = node_mirrors.STALL_WINDOW
+    node_mirrors.STALL_WINDOW = 0.5
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Histórico dizendo que o espelho que vai travar é o mais rápido
+            history = Path(temp_dir) / ".cache" / "mirrors.json"
+            history.parent.mkdir(parents=True)
+            history.write_text(json.dumps({
+                stalled_url: {"throughput": 100e6, "rtt": 0.001, "probed_at": time.time()},
+                healthy_url: {"throughput": 1e6, "rtt": 0.001, "probed_at": time.time()},
+            }), encoding='utf-8')
+            
+            downloader = NodeDownloader(base_dir=temp_dir, base_url=stalled_url, connections=1,
+                                        mirrors=[healthy_url], cache_dir="off")
+            destination = Path(temp_dir) / FILENAME
+            sha256 = hashlib.sha256(PAYLOAD).hexdigest()
+            assert downloader.download_file(f"{stalled_url}v18.17.0/{FILENAME}", destination, sha256)
+            assert destination.read_bytes() == PAYLOAD
+            
+            # A faixa restante foi pedida ao outro espelho, a partir de onde parou
+            ranges = [path for path in healthy.RequestHandlerClass.paths if path.endswith('.zip')]
+            assert ranges
+            assert json.loads(history.read_text(encoding='utf-8'))[stalled_url]['failed']
+        print("✅ Download continuou no outro espelho após travar")
+    finally:
+        node_mirrors.STALL_WINDOW = window
+        stalled.shutdown()
+        healthy.shutdown()
+
+
+def test_failover_on_unreachable_primary():
+    """Espelho principal fora do ar: o download vai direto para o outro"""
+    healthy, healthy_url = start_server(make_handler())
+    # Porta sem ninguém escutando
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        dead_url = f"http://127.0.0.1:{sock.getsockname()[1]}/dist/"
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Histórico antigo dizendo que o espelho fora do ar é o mais rápido
+            history = Path(temp_dir) / ".cache" / "mirrors.json"
+            history.parent.mkdir(parents=True)
+            history.write_text(json.dumps({
+                dead_url: {"throughput": 100e6, "rtt": 0.001, "probed_at": time.time()},
+                healthy_url: {"throughput": 1e6, "rtt": 0.001, "probed_at": time.time()},
+            }), encoding='utf-8')
+            
+            downloader = NodeDownloader(base_dir=temp_dir, base_url=dead_url, connections=2,
+                                        mirrors=[healthy_url], cache_dir="off")
+            destination = Path(temp_dir) / FILENAME
+            sha256 = hashlib.sha256(PAYLOAD).hexdigest()
+            assert downloader.download_file(f"{dead_url}v18.17.0/{FILENAME}", destination, sha256)
+            assert destination.read_bytes() == PAYLOAD
+            assert json.loads(history.read_text(encoding='utf-8'))[dead_url]['failed']
+        print("✅ Espelho principal fora do ar trocado na sondagem")
+    finally:
+        healthy.shutdown()
+
+
+if __name__ == "__main__":
+    test_parse_mirrors()
+    test_probe_picks_fastest()
+    test_failover_on_stall()
+    test_failover_on_unreachable_primary()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do laço de download e dos relatórios de progresso
+
+Verifica que a leitura por readinto entrega exatamente os bytes da
+resposta (com e sem limite), que o tamanho do bloco cresce em links
+rápidos e diminui em links lentos, e que o relatório desenha no máximo
+~10 vezes por segundo, mas sempre mostra o estado final.
+"""
+
+import io
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(__file__))
+
+from node_download import AdaptiveChunkSize, read_chunks
+from node_progress import ProgressReporter
+
+PAYLOAD = os.urandom(5 * 1024 * 1024 + 123)
+
+
+class CountingProgress(ProgressReporter):
+    """Relatório de teste que guarda cada render()"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.frames = []
+        self.closed = False
+    
+    def render(self, downloaded, total):
+        self.frames.append(downloaded)
+    
+    def close(self):
+        self.closed = True
+
+
+def test_read_chunks():
+    """Os blocos reaproveitam o buffer e somam exatamente a resposta"""
+    received = bytearray()
+    sizes = set()
+    for chunk in read_chunks(io.BytesIO(PAYLOAD)):
+        assert isinstance(chunk, memoryview)
+        received += chunk
+        sizes.add(len(chunk))
+    assert bytes(received) == PAYLOAD
+    # Leituras locais são rápidas: o bloco cresce além dos 64 KB iniciais
+    assert max(sizes) > 64 * 1024
+    
+    limited = b"".join(bytes(chunk) for chunk in read_chunks(io.BytesIO(PAYLOAD), limit=100000))
+    assert limited == PAYLOAD[:100000]
+    print("✅ Leitura por readinto com buffer reaproveitado")
+
+
+def test_adaptive_chunk_size():
+    """O bloco dobra em leituras rápidas e cai pela metade em leituras lentas"""
+    sizer = AdaptiveChunkSize(initial=64 * 1024, minimum=16 * 1024, maximum=256 * 1024)
+    assert sizer.record(64 * 1024, 0.001) == 128 * 1024
+    assert sizer.record(128 * 1024, 0.001) == 256 * 1024
+    assert sizer.record(256 * 1024, 0.001) == 256 * 1024
+    assert sizer.record(256 * 1024, 1.0) == 128 * 1024
+    # Leitura parcial rápida (o servidor não tinha mais bytes): mantém
+    assert sizer.record(1000, 0.001) == 128 * 1024
+    print("✅ Tamanho do bloco acompanha a vazão")
+
+
+def test_progress_rate_limit():
+    """Milhares de atualizações geram poucos render(), incluindo o final"""
+    progress = CountingProgress("Baixando", max_rate=10)
+    progress.start(len(PAYLOAD))
+    started = time.monotonic()
+    downloaded = 0
+    while downloaded < len(PAYLOAD):
+        downloaded = min(downloaded + 512, len(PAYLOAD))
+        progress.update(downloaded)
+    elapsed = time.monotonic() - started
+    progress.finish()
+    
+    assert len(progress.frames) <= elapsed * 10 + 3
+    assert progress.frames[-1] == len(PAYLOAD)
+    assert progress.closed
+    print(f"✅ {len(progress.frames)} atualizações de tela para {len(PAYLOAD) // 512} blocos")
+
+
+if __name__ == "__main__":
+    test_read_chunks()
+    test_adaptive_chunk_size()
+    test_progress_rate_limit()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do registro de versões instaladas (installed.json)
+
+Sobe um servidor local de releases e verifica que a instalação grava o
+hash, a quantidade de arquivos e o tamanho; que "já instalada" é
+respondido pelo registro sem rede e sem criar diretórios; que uma
+versão apagada à mão sai do registro; e que rebuild reconstrói o
+registro a partir do disco, mantendo os hashes conhecidos. Uma
+instalação --lazy cujo processo morreu passa a "failed" em vez de
+deixar `wait` esperando.
+"""
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import subprocess
+import tempfile
+from pathlib import Path
+sys.path.append(os.path.dirname(__file__))
+
+import tests_support
+from tests_support import archive_name, build_index, build_zip, start_server
+from node import NodeDownloader
+from node_registry import InstallRegistry
+
+VERSION = "18.17.0"
+ZIP_NAME = archive_name(VERSION)
+ARCHIVE = build_zip(VERSION, {
+    "node.exe": os.urandom(100 * 1024),
+    "npm.cmd": b"@echo off\r\n",
+    "node_modules/npm/package.json": b"{}",
+})
+SHA256 = hashlib.sha256(ARCHIVE).hexdigest()
+
+
+class ReleaseHandler(tests_support.ReleaseHandler):
+    """Servidor de teste que registra os caminhos pedidos"""
+    
+    index = build_index([VERSION], date="2023-08-08", lts="Hydrogen")
+    archives = {ZIP_NAME: ARCHIVE}
+    paths = []
+    
+    def release_file(self, name):
+        ReleaseHandler.paths.append(self.path)
+        return super().release_file(name)
+
+
+def test_registry_install():
+    """Instalação registrada; consultas seguintes não usam a rede nem o diretório"""
+    server, base_url = start_server(ReleaseHandler)
+    
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            downloader = NodeDownloader(base_dir=temp_dir, base_url=base_url, cache_dir="off")
+            assert downloader.download_version(VERSION)
+            
+            entry = downloader.registry.get(VERSION)
+            assert entry['sha256'] == SHA256 and entry['archive'] == ZIP_NAME
+            assert entry['files'] == 3 and entry['executable'] == "node.exe"
+            assert entry['size'] == 100 * 1024 + len(b"@echo off\r\n") + 2
+            assert (Path(temp_dir) / "installed.json").exists()
+            
+            # Já instalada: nenhum download, nenhuma sonda
+            ReleaseHandler.paths = []
+            assert downloader.download_version(VERSION)
+            assert not [path for path in ReleaseHandler.paths if path.endswith(ZIP_NAME)]
+            
+            # Versão inexistente não deixa diretório vazio para trás
+            assert not downloader.download_version("99.0.0")
+            assert not (Path(temp_dir) / "v99.0.0").exists()
+            
+            # Outro processo (outra instância) enxerga o mesmo registro
+            assert InstallRegistry(temp_dir).get(VERSION)['sha256'] == SHA256
+            
+            # Diretório apagado à mão: sai do registro
+            shutil.rmtree(Path(temp_dir) / f"v{VERSION}")
+            assert not downloader.is_version_installed(VERSION)
+            assert downloader.registry.get(VERSION) is None
+        print("✅ Instalação registrada e consultada sem rede")
+    finally:
+        server.shutdown()
+
+
+def test_registry_rebuild():
+    """rebuild incorpora instalações antigas, ignora incompletas e mantém hashes"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base = Path(temp_dir)
+        downloader = NodeDownloader(base_dir=temp_dir, cache_dir="off")
+        
+        (base / "v18.17.0").mkdir()
+        (base / "v18.17.0" / "node.exe").write_bytes(b"x" * 10)
+        downloader.registry.record("18.17.0", base / "v18.17.0", "node.exe", sha256="ab" * 32)
+        
+        # Instalação de antes do registro (Linux) e uma incompleta
+        (base / "v16.20.0" / "bin").mkdir(parents=True)
+        (base / "v16.20.0" / "bin" / "node").write_bytes(b"y" * 20)
+        (base / "v16.20.0" / "README.md").write_bytes(b"z" * 5)
+        (base / "v15.0.0").mkdir()
+        
+        entries, incomplete = downloader.registry.rebuild(downloader._find_executable)
+        assert [entry['version'] for entry in entries] == ["16.20.0", "18.17.0"]
+        assert entries[0]['executable'] == "bin/node" and entries[0]['files'] == 2
+        assert entries[0]['size'] == 25 and entries[0]['sha256'] is None
+        assert entries[1]['sha256'] == "ab" * 32
+        assert incomplete == [base / "v15.0.0"]
+        
+        # Sem rebuild, uma instalação antiga também é reconhecida (e registrada)
+        (base / "v14.21.3").mkdir()
+        (base / "v14.21.3" / "node.exe").write_bytes(b"w")
+        assert downloader.is_version_installed("14.21.3")
+        assert downloader.registry.get("14.21.3")['files'] == 1
+        
+        # Instalações parcial (--only) e --lazy com falha continuam incompletas
+        downloader.registry.record("18.17.0", base / "v18.17.0", "node.exe", only=["node.exe"])
+        downloader.registry.record("16.20.0", base / "v16.20.0", "bin/node", state='failed')
+        assert not downloader._covers("18.17.0") and not downloader._covers("16.20.0")
+        downloader.registry.rebuild(downloader._find_executable)
+        assert not downloader._covers("18.17.0") and not downloader._covers("16.20.0")
+        assert downloader._covers("18.17.0", ["node.exe"])
+        assert downloader.registry.get("16.20.0")['state'] == 'failed'
+    print("✅ Registro reconstruído a partir do disco")
+
+
+def test_registry_stale_runtime():
+    """O estado runtime de um processo que já terminou vira failed"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base = Path(temp_dir)
+        (base / "v18.17.0").mkdir()
+        (base / "v18.17.0" / "node.exe").write_bytes(b"x")
+        downloader = NodeDownloader(base_dir=temp_dir, cache_dir="off")
+        downloader.registry.record("18.17.0", base / "v18.17.0", "node.exe", state='runtime')
+        assert downloader.registry.get("18.17.0")['pid'] == os.getpid()
+        assert downloader.registry.get("18.17.0")['state'] == 'runtime'
+        
+        # O mesmo registro, gravado por um processo que já terminou
+        finished = subprocess.Popen([sys.executable, "-c", "pass"])
+        finished.wait()
+        data = json.loads((base / "installed.json").read_text(encoding='utf-8'))
+        data['installed']["18.17.0"]['pid'] = finished.pid
+        (base / "installed.json").write_text(json.dumps(data), encoding='utf-8')
+        
+        other = NodeDownloader(base_dir=temp_dir, cache_dir="off")
+        assert not other.wait_install("18.17.0", timeout=5)
+        assert other.registry.get("18.17.0")['state'] == 'failed'
+    print("✅ Instalação --lazy interrompida marcada como falha")
+
+
+def test_registry_concurrent_processes():
+    """Processos registrando ao mesmo tempo não apagam as entradas uns dos outros"""
+    script = ("import sys\n"
+              "from node_registry import InstallRegistry\n"
+              "registry = InstallRegistry(sys.argv[1])\n"
+              "for patch in range(20):\n"
+              "    registry.record(f'{sys.argv[2]}.0.{patch}', sys.argv[1], 'node.exe',"
+              " files=1, size=1)\n")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        workers = [subprocess.Popen([sys.executable, "-c", script, temp_dir, str(major)],
+                                    cwd=os.path.dirname(os.path.abspath(__file__)))
+                   for major in range(4)]
+        assert all(worker.wait(timeout=60) == 0 for worker in workers)
+        assert len(InstallRegistry(temp_dir).entries()) == 4 * 20
+    print("✅ Registro alterado por 4 processos sem perder entradas")
+
+
+if __name__ == "__main__":
+    test_registry_install()
+    test_registry_rebuild()
+    test_registry_stale_runtime()
+    test_registry_concurrent_processes()
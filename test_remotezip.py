@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste da atualização delta por HTTP Range (node_remotezip)
+
+Publica duas versões de patch com a maior parte dos arquivos iguais,
+instala a primeira e atualiza para a segunda: só o diretório central e
+os membros que mudaram devem ser baixados, os arquivos iguais viram hard
+links e o resultado é idêntico ao conteúdo do ZIP novo. Sem suporte a
+Range no servidor, a atualização cai para a instalação completa.
+
+Também instala só o runtime (--only=runtime-only), que baixa apenas o
+node.exe, e confere que o pedido seguinte sem --only completa a versão.
+Na instalação em duas etapas (--lazy), o node.exe é publicado antes do
+node_modules, que chega depois com wait_install; sobre uma versão já
+instalada (--force), --lazy segue pela reinstalação incremental.
+"""
+
+import io
+import os
+import sys
+import random
+import zipfile
+import tempfile
+import threading
+from pathlib import Path
+sys.path.append(os.path.dirname(__file__))
+
+import tests_support
+from tests_support import archive_name, build_index, build_zip, installed_files
+from node import NodeDownloader
+from node_remotezip import member_ranges, member_filter, parse_only
+
+OLD, NEW = "18.17.0", "18.17.1"
+
+
+def build_contents():
+    """Duas versões: node.exe e um módulo mudam, um módulo é novo, o resto é igual"""
+    rng = random.Random(7)
+    shared = {f"node_modules/npm/lib/module{i:02d}.js": rng.randbytes(20 * 1024) for i in range(30)}
+    return {
+        OLD: dict(shared, **{"node.exe": rng.randbytes(400 * 1024)}),
+        NEW: dict(shared, **{"node.exe": rng.randbytes(400 * 1024),
+                             "node_modules/npm/lib/module05.js": rng.randbytes(20 * 1024),
+                             "node_modules/npm/lib/novo.js": b"module.exports = 1;\n"}),
+    }
+
+
+CONTENTS = build_contents()
+ARCHIVES = {archive_name(version): build_zip(version, files, directory=True)
+            for version, files in CONTENTS.items()}
+
+
+class ReleaseHandler(tests_support.ReleaseHandler):
+    """Servidor de teste com Range (desligável) e contagem dos bytes dos ZIPs"""
+    
+    protocol_version = "HTTP/1.1"
+    index = build_index([NEW, OLD], date="2023-08-08", lts="Hydrogen")
+    archives = ARCHIVES
+    ranges = True
+    # Pedidos de ZIP liberados antes de esperar o evento `hold` (None = sem espera)
+    free = None
+    hold = threading.Event()
+    archive_requests = 0
+    
+    def send_body(self, name, body, head=False):
+        if name in self.archives and self.free is not None:
+            type(self).archive_requests += 1
+            if self.archive_requests > self.free:
+                self.hold.wait(10)
+        super().send_body(name, body, head)
+
+
+def start_server():
+    ReleaseHandler.ranges = True
+    ReleaseHandler.sent = 0
+    ReleaseHandler.free = None
+    ReleaseHandler.archive_requests = 0
+    ReleaseHandler.hold = threading.Event()
+    return tests_support.start_server(ReleaseHandler)
+
+
+def test_delta_upgrade():
+    """Só os membros alterados são baixados; os iguais viram hard links"""
+    server, base_url = start_server()
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            downloader = NodeDownloader(base_dir=temp_dir, base_url=base_url, cache_dir="off",
+                                        connections=2)
+            assert downloader.download_version(OLD)
+            ReleaseHandler.sent = 0
+            
+            assert downloader.upgrade_version(NEW)
+            new_dir = Path(temp_dir) / f"v{NEW}"
+            assert installed_files(new_dir) == CONTENTS[NEW]
+            
+            # O node.exe novo e os dois módulos, mais o diretório central
+            new_zip = ARCHIVES[f"node-v{NEW}-win-x64.zip"]
+            assert ReleaseHandler.sent < len(new_zip) // 2
+            shared = new_dir / "node_modules/npm/lib/module00.js"
+            old = Path(temp_dir) / f"v{OLD}" / "node_modules/npm/lib/module00.js"
+            assert os.path.samefile(shared, old)
+            assert not os.path.samefile(new_dir / "node.exe", Path(temp_dir) / f"v{OLD}" / "node.exe")
+            
+            entry = downloader.registry.get(NEW)
+            assert entry['files'] == len(CONTENTS[NEW])
+            record = downloader.metrics.installs[-1]
+            assert record['source'] == 'delta' and record['status'] == 'installed'
+            assert record['phases']['compare']['files'] == len(CONTENTS[NEW]) - 3
+            assert not list((Path(temp_dir) / ".downloads").glob("*.ranges"))
+        print(f"✅ Atualização delta: {ReleaseHandler.sent} de {len(new_zip)} bytes baixados")
+    finally:
+        server.shutdown()
+
+
+def test_fallback_without_ranges():
+    """Servidor sem Range: a atualização baixa o ZIP inteiro"""
+    server, base_url = start_server()
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            downloader = NodeDownloader(base_dir=temp_dir, base_url=base_url, cache_dir="off")
+            assert downloader.download_version(OLD)
+            ReleaseHandler.ranges = False
+            assert downloader.upgrade_version(NEW, OLD)
+            assert installed_files(Path(temp_dir) / f"v{NEW}") == CONTENTS[NEW]
+            assert downloader.metrics.installs[-1]['source'] == 'network'
+        print("✅ Sem Range: instalação completa")
+    finally:
+        server.shutdown()
+
+
+def test_runtime_only():
+    """--only=runtime-only baixa só o node.exe; sem --only a versão é completada"""
+    server, base_url = start_server()
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            downloader = NodeDownloader(base_dir=temp_dir, base_url=base_url, cache_dir="off",
+                                        only="runtime-only")
+            assert downloader.download_version(NEW)
+            version_dir = Path(temp_dir) / f"v{NEW}"
+            assert installed_files(version_dir) == {"node.exe": CONTENTS[NEW]["node.exe"]}
+            new_zip = ARCHIVES[f"node-v{NEW}-win-x64.zip"]
+            assert ReleaseHandler.sent < len(new_zip) // 2
+            assert downloader.registry.get(NEW)['only'] == ["node.exe"]
+            assert downloader.metrics.installs[-1]['source'] == 'ranges'
+            
+            # Já instalada para o mesmo perfil; uma instalação completa substitui a parcial
+            assert downloader.download_version(NEW)
+            assert downloader.metrics.installs[-1]['status'] == 'present'
+            full = NodeDownloader(base_dir=temp_dir, base_url=base_url, cache_dir="off")
+            assert full.download_version(NEW)
+            assert installed_files(version_dir) == CONTENTS[NEW]
+            assert full.registry.get(NEW)['only'] is None
+        print(f"✅ Só o runtime: {len(new_zip) - ReleaseHandler.sent} bytes a menos que o ZIP")
+    finally:
+        server.shutdown()
+
+
+def test_lazy_install():
+    """--lazy: node.exe registrado como runtime pronto antes do node_modules"""
+    server, base_url = start_server()
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            downloader = NodeDownloader(base_dir=temp_dir, base_url=base_url, cache_dir="off",
+                                        lazy=True)
+            # Fim do ZIP e node.exe passam; o restante espera o teste conferir o estado
+            ReleaseHandler.free = 2
+            assert downloader.download_version(NEW)
+            version_dir = Path(temp_dir) / f"v{NEW}"
+            assert (version_dir / "node.exe").read_bytes() == CONTENTS[NEW]["node.exe"]
+            assert not (version_dir / "node_modules").exists()
+            assert downloader.registry.get(NEW)['state'] == 'runtime'
+            assert downloader.is_version_installed(NEW)
+            assert not downloader.wait_install(NEW, timeout=0.1)
+            
+            ReleaseHandler.hold.set()
+            assert downloader.wait_install(NEW)
+            assert installed_files(version_dir) == CONTENTS[NEW]
+            entry = downloader.registry.get(NEW)
+            assert entry['state'] is None and entry['files'] == len(CONTENTS[NEW])
+            record = downloader.metrics.installs[-1]
+            assert record['status'] == 'installed' and record['runtime_seconds'] > 0
+            assert not list((Path(temp_dir) / ".downloads").glob("*.ranges"))
+        print(f"✅ Runtime pronto em {record['runtime_seconds'] * 1000:.0f} ms, "
+              f"instalação completa em {record['seconds'] * 1000:.0f} ms")
+    finally:
+        ReleaseHandler.hold.set()
+        server.shutdown()
+
+
+def test_lazy_over_installed():
+    """--lazy --force sobre uma versão instalada não substitui o diretório"""
+    server, base_url = start_server()
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            downloader = NodeDownloader(base_dir=temp_dir, base_url=base_url, cache_dir="off")
+            assert downloader.download_version(NEW)
+            version_dir = Path(temp_dir) / f"v{NEW}"
+            module = version_dir / "node_modules/npm/lib/module00.js"
+            inode = module.stat().st_ino
+            
+            forced = NodeDownloader(base_dir=temp_dir, base_url=base_url, cache_dir="off",
+                                    lazy=True, force=True)
+            assert forced.download_version(NEW)
+            assert not forced._pending
+            assert module.stat().st_ino == inode
+            assert installed_files(version_dir) == CONTENTS[NEW]
+            assert forced.registry.get(NEW)['state'] is None
+        print("✅ --lazy sobre versão instalada: reinstalação incremental")
+    finally:
+        server.shutdown()
+
+
+def test_only_patterns():
+    """Perfis expandidos; padrões glob e de diretório"""
+    assert parse_only(None) is None
+    assert parse_only("runtime-only, node_modules\\npm") == ["node.exe", "node_modules/npm"]
+    select = member_filter(parse_only("node.exe,node_modules/npm,*.cmd"))
+    assert select("node.exe") and select("npm.cmd") and select("node_modules/npm/lib/a.js")
+    assert not select("node_modules/npmx/a.js") and not select("node_modules/corepack/a.js")
+    print("✅ Padrões de --only")
+
+
+def test_member_ranges():
+    """Membros vizinhos ficam na mesma faixa; distantes, em faixas separadas"""
+    with zipfile.ZipFile(io.BytesIO(ARCHIVES[f"node-v{NEW}-win-x64.zip"])) as zip_ref:
+        members = zip_ref.infolist()
+        end_of_data = zip_ref.start_dir
+    by_name = {info.filename.split('/', 1)[1]: info for info in members}
+    near = [by_name[f"node_modules/npm/lib/module{i:02d}.js"] for i in (3, 4)]
+    assert len(member_ranges(members, end_of_data, near)) == 1
+    far = [by_name["node_modules/npm/lib/module00.js"], by_name["node_modules/npm/lib/novo.js"]]
+    ranges = member_ranges(members, end_of_data, far, gap=0)
+    assert len(ranges) == 2 and ranges[-1][1] == end_of_data - 1
+    print(f"✅ Faixas: {ranges}")
+
+
+if __name__ == "__main__":
+    test_delta_upgrade()
+    test_fallback_without_ranges()
+    test_runtime_only()
+    test_lazy_install()
+    test_lazy_over_installed()
+    test_only_patterns()
+    test_member_ranges()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do download segmentado
+
+Sobe um servidor HTTP local com suporte a Range e verifica se o
+NodeDownloader baixa o arquivo em faixas paralelas, além do fallback
+para uma única conexão quando o servidor não aceita Range e da
+retomada de downloads interrompidos (.part + .part.json).
+"""
+
+import os
+import sys
+import re
+import tempfile
+import threading
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+sys.path.append(os.path.dirname(__file__))
+
+from node import NodeDownloader
+from node_download import split_ranges, PartState
+
+PAYLOAD = os.urandom(5 * 1024 * 1024 + 123)
+ETAG = '"payload-v1"'
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Servidor de teste que entrega PAYLOAD com ou sem suporte a Range"""
+    
+    accept_ranges = True
+    range_requests = 0
+    bytes_sent = 0
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def do_HEAD(self):
+        self._send_headers(200, len(PAYLOAD))
+    
+    def do_GET(self):
+        match = re.match(r'bytes=(\d+)-(\d+)', self.headers.get('Range', ''))
+        if_range = self.headers.get('If-Range')
+        if match and self.accept_ranges and if_range in (None, ETAG):
+            start, end = int(match.group(1)), int(match.group(2))
+            RangeHandler.range_requests += 1
+            RangeHandler.bytes_sent += end - start + 1
+            self._send_headers(206, end - start + 1, f"bytes {start}-{end}/{len(PAYLOAD)}")
+            self.wfile.write(PAYLOAD[start:end + 1])
+        else:
+            RangeHandler.bytes_sent += len(PAYLOAD)
+            self._send_headers(200, len(PAYLOAD))
+            self.wfile.write(PAYLOAD)
+    
+    def _send_headers(self, status, length, content_range=None):
+        self.send_response(status)
+        self.send_header('Content-Length', str(length))
+        self.send_header('ETag', ETAG)
+        if self.accept_ranges:
+            self.send_header('Accept-Ranges', 'bytes')
+        if content_range:
+            self.send_header('Content-Range', content_range)
+        self.end_headers()
+
+
+def start_server(accept_ranges):
+    """Inicia o servidor de teste em uma porta livre"""
+    handler = type('Handler', (RangeHandler,), {'accept_ranges': accept_ranges})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/node.zip"
+
+
+def test_split_ranges():
+    """As faixas cobrem o arquivo inteiro sem sobreposição"""
+    ranges = split_ranges(10 * 1024 * 1024 + 7, 4)
+    assert len(ranges) == 4
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == 10 * 1024 * 1024 + 6
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert start == end + 1
+    
+    # Arquivos pequenos não são divididos além do tamanho mínimo
+    assert len(split_ranges(1024, 8)) == 1
+    print("✅ Divisão em faixas correta")
+
+
+def test_segmented_download():
+    """Servidor com Range: o arquivo é baixado em várias faixas"""
+    server, url = start_server(accept_ranges=True)
+    RangeHandler.range_requests = 0
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            destination = Path(temp_dir) / "node.zip"
+            downloader = NodeDownloader(base_dir=temp_dir, connections=4)
+            assert downloader.download_file(url, destination)
+            assert destination.read_bytes() == PAYLOAD
+            assert RangeHandler.range_requests >= 2
+        print("✅ Download segmentado correto")
+    finally:
+        server.shutdown()
+
+
+def test_single_stream_fallback():
+    """Servidor sem Range: usa uma única conexão"""
+    server, url = start_server(accept_ranges=False)
+    RangeHandler.range_requests = 0
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            destination = Path(temp_dir) / "node.zip"
+            downloader = NodeDownloader(base_dir=temp_dir, connections=4)
+            assert downloader.download_file(url, destination)
+            assert destination.read_bytes() == PAYLOAD
+            assert RangeHandler.range_requests == 0
+        print("✅ Fallback para conexão única correto")
+    finally:
+        server.shutdown()
+
+
+def write_partial(destination, etag, completed):
+    """Simula um download interrompido com `completed` bytes já gravados"""
+    part_path = destination.with_name(destination.name + '.part')
+    with open(part_path, 'wb') as f:
+        f.write(PAYLOAD[:completed])
+        f.truncate(len(PAYLOAD))
+    state = PartState(part_path, None, len(PAYLOAD), etag=etag, ranges=[(0, completed - 1)])
+    return part_path, state
+
+
+def test_resume_partial_download():
+    """Um .part válido é completado pedindo apenas os bytes que faltam"""
+    server, url = start_server(accept_ranges=True)
+    RangeHandler.bytes_sent = 0
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            destination = Path(temp_dir) / "node.zip"
+            completed = 3 * 1024 * 1024
+            part_path, state = write_partial(destination, ETAG, completed)
+            state.url = url
+            state.save()
+            
+            downloader = NodeDownloader(base_dir=temp_dir, connections=2)
+            assert downloader.download_file(url, destination)
+            assert destination.read_bytes() == PAYLOAD
+            assert RangeHandler.bytes_sent == len(PAYLOAD) - completed
+            assert not part_path.exists()
+            assert not state.sidecar_path.exists()
+        print("✅ Download retomado a partir do .part")
+    finally:
+        server.shutdown()
+
+
+def test_resume_discards_changed_file():
+    """ETag diferente: o parcial é descartado e o download recomeça"""
+    server, url = start_server(accept_ranges=True)
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            destination = Path(temp_dir) / "node.zip"
+            _, state = write_partial(destination, '"payload-v0"', 1024 * 1024)
+            state.url = url
+            state.save()
+            
+            downloader = NodeDownloader(base_dir=temp_dir, connections=2)
+            assert downloader.download_file(url, destination)
+            assert destination.read_bytes() == PAYLOAD
+        print("✅ Parcial de outra versão do arquivo foi descartado")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_split_ranges()
+    test_segmented_download()
+    test_single_stream_fallback()
+    test_resume_partial_download()
+    test_resume_discards_changed_file()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste da resolução de intervalos e apelidos de versões
+
+Monta uma tabela com um histórico parecido com o do index.json real
+(várias linhas LTS, versões sem o ZIP do Windows) e verifica prefixos,
+^/~, comparações, ||, latest/lts/lts/<codinome>/lts/-N, a integração com
+o NodeDownloader e o tempo para resolver 1000 especificações.
+"""
+
+import os
+import sys
+import time
+import tempfile
+sys.path.append(os.path.dirname(__file__))
+
+from node import NodeDownloader
+from node_semver import ReleaseTable, spec_ranges
+
+# major -> (último minor, último patch, codinome LTS a partir do minor indicado)
+LINES = {
+    14: (21, 3, ("fermium", 15)),
+    16: (20, 2, ("gallium", 13)),
+    17: (9, 1, None),
+    18: (19, 0, ("hydrogen", 12)),
+    19: (9, 0, None),
+    20: (11, 1, ("iron", 9)),
+    21: (6, 2, None),
+}
+
+
+def build_releases():
+    """Histórico sintético no formato do index.json (ordem do índice: mais nova primeiro)"""
+    releases = []
+    for major, (last_minor, last_patch, lts) in LINES.items():
+        for minor in range(last_minor + 1):
+            for patch in range((last_patch if minor == last_minor else 3) + 1):
+                files = ["linux-x64", "osx-arm64-tar", "win-x64-zip"]
+                # Última versão da linha 20 ainda sem o ZIP do Windows
+                if (major, minor, patch) == (20, 11, 1):
+                    files.remove("win-x64-zip")
+                releases.append({
+                    "version": f"v{major}.{minor}.{patch}",
+                    "date": f"20{major}-{minor + 1:02d}-01",
+                    "lts": lts[0].capitalize() if lts and minor >= lts[1] else False,
+                    "files": files,
+                })
+    return list(reversed(releases))
+
+
+RELEASES = build_releases()
+
+
+def test_ranges():
+    """Prefixos, ^, ~ e comparações escolhem a maior versão do intervalo"""
+    table = ReleaseTable(RELEASES)
+    assert table.resolve("18") == "18.19.0"
+    assert table.resolve("v18.x") == "18.19.0"
+    assert table.resolve("18.17") == "18.17.3"
+    assert table.resolve("18.17.1") == "18.17.1"
+    assert table.resolve("^18.17.0") == "18.19.0"
+    assert table.resolve("~18.17") == "18.17.3"
+    assert table.resolve(">=16 <18") == "17.9.1"
+    assert table.resolve(">= 16 <= 16.5") == "16.5.3"
+    assert table.resolve(">20.11") == "21.6.2"
+    assert table.resolve("14 || 16") == "16.20.2"
+    assert table.resolve("15") is None
+    assert table.resolve("18.99.0") is None
+    assert spec_ranges("^0.10.3") == (((0, 10, 3), (0, 11, 0)),)
+    try:
+        table.resolve("dezoito")
+        assert False, "esperava ValueError"
+    except ValueError:
+        pass
+    print("✅ Intervalos resolvidos")
+
+
+def test_aliases_and_artifacts():
+    """latest/lts consideram só versões que publicam o arquivo pedido"""
+    table = ReleaseTable(RELEASES)
+    assert table.resolve("latest") == "21.6.2"
+    assert table.resolve("lts") == "20.11.1"
+    assert table.resolve("lts/*", "win-x64-zip") == "20.11.0"
+    assert table.resolve("20", "win-x64-zip") == "20.11.0"
+    assert table.resolve("lts/Hydrogen") == "18.19.0"
+    assert table.resolve("lts/-1") == "18.19.0"
+    assert table.resolve("lts/-3") == "14.21.3"
+    assert table.resolve("lts/-9") is None
+    # Versões da linha 18 antes de virar LTS não contam para lts/hydrogen
+    assert table.release("18.11.0")['lts'] is None
+    assert table.release("18.12.0")['lts'] == "hydrogen"
+    print("✅ Apelidos latest/lts resolvidos")
+
+
+def test_resolve_speed():
+    """1000 especificações em poucos milissegundos"""
+    table = ReleaseTable(RELEASES)
+    specs = ["18", "^16.13", "lts/gallium", ">=14 <17", "latest", "~20.9", "lts/-1", "19.x"] * 125
+    started = time.perf_counter()
+    for spec in specs:
+        assert table.resolve(spec, "win-x64-zip") is not None
+    elapsed = time.perf_counter() - started
+    assert elapsed < 0.1
+    print(f"✅ {len(specs)} especificações em {elapsed * 1000:.1f} ms ({len(table)} versões)")
+
+
+def test_downloader_specs():
+    """NodeDownloader aceita especificações no lugar da versão exata"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        downloader = NodeDownloader(base_dir=temp_dir, base_url="http://releases.invalid/",
+                                    cache_dir="off")
+        # Índice já carregado e dentro do TTL: nenhuma requisição
+        downloader.index.releases = {r['version'][1:]: r for r in RELEASES}
+        downloader.index.meta = {'fetched_at': time.time()}
+        
+        assert downloader.resolve_spec("v18.17.0") == "18.17.0"
+        assert downloader.resolve_spec("lts") == "20.11.0"
+        resolved = downloader.resolve_versions(["18", "lts/gallium", "15"])
+        assert resolved["18"][0] == "http://releases.invalid/v18.19.0/node-v18.19.0-win-x64.zip"
+        assert resolved["lts/gallium"][1] == "node-v16.20.2-win-x64.zip"
+        assert resolved["15"] is None
+    print("✅ Especificações aceitas pelo NodeDownloader")
+
+
+if __name__ == "__main__":
+    test_ranges()
+    test_aliases_and_artifacts()
+    test_resolve_speed()
+    test_downloader_specs()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do servidor de cache para a rede local (node.py serve)
+
+Sobe uma origem local lenta (index.json, SHASUMS256.txt e um ZIP) e o
+servidor de cache na frente dela. Verifica que muitos clientes pedindo
+o mesmo arquivo ao mesmo tempo geram uma única busca na origem, que
+acertos e faixas são servidos do disco, que caminhos inválidos são
+recusados e que o NodeDownloader instala apontando para o cache.
+"""
+
+import os
+import sys
+import time
+import zipfile
+import tempfile
+import threading
+import urllib.request
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(__file__))
+
+import tests_support
+from tests_support import archive_name, build_index, build_zip
+from node import NodeDownloader
+from node_http import HTTPTransport
+from node_server import PullThroughCache, ReleaseServer, clean_path, parse_range
+
+VERSION = "18.17.0"
+ZIP_NAME = archive_name(VERSION)
+ARCHIVE = build_zip(VERSION, node_size=4 * 1024 * 1024, compression=zipfile.ZIP_STORED)
+
+
+class UpstreamHandler(tests_support.ReleaseHandler):
+    """Origem de teste: envia os arquivos devagar, em blocos"""
+    
+    protocol_version = "HTTP/1.1"
+    index = build_index([VERSION], date="2023-08-08", lts="Hydrogen")
+    archives = {ZIP_NAME: ARCHIVE}
+    requests = []
+    
+    def do_GET(self, head=False):
+        UpstreamHandler.requests.append(self.path)
+        super().do_GET(head)
+    
+    def send_body(self, name, body, head=False):
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Last-Modified', 'Tue, 08 Aug 2023 12:00:00 GMT')
+        self.end_headers()
+        # ~20 MB/s: os clientes chegam enquanto a busca ainda está em andamento
+        for start in range(0, len(body), 256 * 1024):
+            self.wfile.write(body[start:start + 256 * 1024])
+            time.sleep(0.01)
+
+
+def start(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_pair(temp_dir):
+    """Origem + servidor de cache, ambos em portas livres"""
+    upstream, upstream_url = tests_support.start_server(UpstreamHandler)
+    cache = PullThroughCache(upstream_url, Path(temp_dir) / "mirror", HTTPTransport().open)
+    server = start(ReleaseServer(('127.0.0.1', 0), cache))
+    return upstream, server
+
+
+def fetch(url, headers=None):
+    request = urllib.request.Request(url, headers=headers or {})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.status, dict(response.headers), response.read()
+
+
+def test_clean_path_and_range():
+    """Caminhos fora da árvore são recusados; faixas são interpretadas como no RFC 7233"""
+    assert clean_path("/v18.17.0/node.zip?x=1") == "v18.17.0/node.zip"
+    assert clean_path("/") == ""
+    assert clean_path("/v18.17.0/") == "v18.17.0/"
+    assert clean_path("/../etc/passwd") is None
+    assert clean_path("/v18.17.0/%2e%2e/segredo") is None
+    assert parse_range("bytes=0-99", 1000) == (0, 99)
+    assert parse_range("bytes=900-", 1000) == (900, 999)
+    assert parse_range("bytes=-100", 1000) == (900, 999)
+    assert parse_range("bytes=990-2000", 1000) == (990, 999)
+    assert parse_range("bytes=1000-", 1000) is False
+    assert parse_range("bytes=0-1,5-6", 1000) is None
+    print("✅ Caminhos e faixas validados")
+
+
+def test_coalesced_fetch():
+    """50 clientes simultâneos: uma única busca na origem, todos recebem o arquivo"""
+    UpstreamHandler.requests = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        upstream, server = start_pair(temp_dir)
+        url = f"{server.url}v{VERSION}/{ZIP_NAME}"
+        try:
+            started = time.monotonic()
+            with ThreadPoolExecutor(max_workers=50) as executor:
+                results = list(executor.map(lambda _: fetch(url), range(50)))
+            elapsed = time.monotonic() - started
+            
+            assert all(status == 200 and body == ARCHIVE for status, _, body in results)
+            assert UpstreamHandler.requests.count(f"/v{VERSION}/{ZIP_NAME}") == 1
+            stats = server.cache.stats()
+            # Os que chegaram depois da publicação são acertos do cache
+            assert stats['misses'] == 1 and stats['coalesced'] + stats['hits'] == 49
+            print(f"✅ 50 clientes, 1 busca na origem "
+                  f"({50 * len(ARCHIVE) / elapsed / 1024 / 1024:.0f} MB/s servidos)")
+            
+            # Publicado no cache: acertos e faixas vêm do disco
+            cached = Path(temp_dir) / "mirror" / f"v{VERSION}" / ZIP_NAME
+            assert cached.read_bytes() == ARCHIVE
+            assert not list((Path(temp_dir) / "mirror" / ".tmp").iterdir())
+            
+            status, headers, body = fetch(url, {'Range': 'bytes=100-199'})
+            assert status == 206 and body == ARCHIVE[100:200]
+            assert headers['Content-Range'] == f"bytes 100-199/{len(ARCHIVE)}"
+            
+            # If-Range diferente: arquivo inteiro
+            status, _, body = fetch(url, {'Range': 'bytes=100-199', 'If-Range': 'outra data'})
+            assert status == 200 and body == ARCHIVE
+            assert UpstreamHandler.requests.count(f"/v{VERSION}/{ZIP_NAME}") == 1
+            print("✅ Acertos e faixas servidos do disco")
+        finally:
+            server.shutdown()
+            upstream.shutdown()
+
+
+def test_ranges_during_fetch():
+    """Faixas pedidas enquanto a busca acontece esperam os bytes chegarem"""
+    UpstreamHandler.requests = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        upstream, server = start_pair(temp_dir)
+        url = f"{server.url}v{VERSION}/{ZIP_NAME}"
+        size = len(ARCHIVE)
+        ranges = [(0, size // 2 - 1), (size // 2, size - 1), (size - 10, size - 1)]
+        try:
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                results = list(executor.map(
+                    lambda r: fetch(url, {'Range': f'bytes={r[0]}-{r[1]}'}), ranges))
+            for (start, end), (status, _, body) in zip(ranges, results):
+                assert status == 206 and body == ARCHIVE[start:end + 1]
+            assert UpstreamHandler.requests.count(f"/v{VERSION}/{ZIP_NAME}") == 1
+            
+            # Arquivo ausente na origem
+            try:
+                fetch(f"{server.url}v{VERSION}/nao-existe.zip")
+                assert False, "esperava 404"
+            except urllib.error.HTTPError as e:
+                assert e.code == 404
+            print("✅ Faixas atendidas durante a busca")
+        finally:
+            server.shutdown()
+            upstream.shutdown()
+
+
+def test_downloader_through_cache():
+    """O NodeDownloader instala usando o cache como base_url"""
+    UpstreamHandler.requests = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        upstream, server = start_pair(temp_dir)
+        try:
+            for client in ("a", "b"):
+                downloader = NodeDownloader(base_dir=Path(temp_dir) / client, base_url=server.url,
+                                            cache_dir="off")
+                assert downloader.download_version(VERSION)
+                assert (Path(temp_dir) / client / f"v{VERSION}" / "node.exe").exists()
+            # O segundo cliente não gerou buscas na origem
+            assert UpstreamHandler.requests.count(f"/v{VERSION}/{ZIP_NAME}") == 1
+            assert UpstreamHandler.requests.count("/index.json") == 1
+            print("✅ Dois clientes instalados com uma busca na origem")
+        finally:
+            server.shutdown()
+            upstream.shutdown()
+
+
+if __name__ == "__main__":
+    test_clean_path_and_range()
+    test_coalesced_fetch()
+    test_ranges_during_fetch()
+    test_downloader_through_cache()
@@ -4,7 +4,11 @@
 Teste simples para demonstrar o funcionamento da aplicação Node.js Downloader
 """
 
-from main_simple import NodeDownloader
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+from node import NodeDownloader
 
 def test_download():
     """Testa o download de uma versão específica"""
@@ -28,7 +32,7 @@ def test_download():
         
         print("\n🎉 Teste bem-sucedido! A aplicação está funcionando corretamente.")
         print(f"Para fazer o download completo, execute:")
-        print(f"py main_simple.py")
+        print(f"py node.py")
         print(f"E digite: {version}")
         
     except Exception as e:
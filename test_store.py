@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do armazenamento por conteúdo (node_store)
+
+Instala duas versões com a maior parte dos arquivos iguais usando o
+armazenamento: os arquivos iguais devem ser o mesmo inode nas duas
+versões e no blob, e o conteúdo de cada versão igual ao do seu ZIP.
+Depois de apagar uma versão, `gc` remove só os blobs que ficaram sem uso.
+"""
+
+import io
+import os
+import sys
+import random
+import shutil
+import hashlib
+import tarfile
+import tempfile
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(__file__))
+
+import tests_support
+from tests_support import archive_name, build_index, build_zip, installed_files, start_server
+from node import NodeDownloader
+from node_store import BlobStore
+from node_extract import extract_tar_stream
+
+OLD, NEW = "20.9.0", "20.10.0"
+
+
+def build_contents():
+    """Duas versões: node.exe e um módulo mudam, o resto é igual"""
+    rng = random.Random(11)
+    shared = {f"node_modules/npm/lib/module{i:02d}.js": rng.randbytes(8 * 1024) for i in range(20)}
+    return {
+        OLD: dict(shared, **{"node.exe": rng.randbytes(200 * 1024)}),
+        NEW: dict(shared, **{"node.exe": rng.randbytes(200 * 1024),
+                             "node_modules/npm/lib/module03.js": rng.randbytes(8 * 1024)}),
+    }
+
+
+CONTENTS = build_contents()
+
+
+class ReleaseHandler(tests_support.ReleaseHandler):
+    """Servidor de teste com o índice, os checksums e os ZIPs"""
+    
+    index = build_index([NEW, OLD], date="2023-10-24", lts="Iron")
+    archives = {archive_name(version): build_zip(version, files)
+                for version, files in CONTENTS.items()}
+
+
+def test_shared_store():
+    """Arquivos iguais entre versões são um único blob; gc remove os sem uso"""
+    server, base_url = start_server(ReleaseHandler)
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            downloader = NodeDownloader(base_dir=temp_dir, cache_dir="off", store=True,
+                                        base_url=base_url)
+            assert downloader.download_version(OLD)
+            assert downloader.download_version(NEW)
+            old_dir, new_dir = Path(temp_dir) / f"v{OLD}", Path(temp_dir) / f"v{NEW}"
+            assert installed_files(old_dir) == CONTENTS[OLD]
+            assert installed_files(new_dir) == CONTENTS[NEW]
+            
+            shared = "node_modules/npm/lib/module00.js"
+            assert os.path.samefile(old_dir / shared, new_dir / shared)
+            assert not os.path.samefile(old_dir / "node.exe", new_dir / "node.exe")
+            digest = hashlib.sha256(CONTENTS[OLD][shared]).hexdigest()
+            assert os.path.samefile(downloader.store.blob_path(digest), new_dir / shared)
+            
+            # 20 iguais + 2 node.exe + o módulo alterado
+            store = downloader.store
+            assert store.stats()['blobs'] == len(CONTENTS[OLD]) + 2
+            assert store.reused == len(CONTENTS[NEW]) - 2
+            assert not list(store.temp_dir.iterdir())
+            
+            # Reinstalação forçada: nada é regravado, os links continuam os mesmos
+            inode = (new_dir / "node.exe").stat().st_ino
+            forced = NodeDownloader(base_dir=temp_dir, cache_dir="off", store=True, force=True,
+                                    base_url=base_url)
+            assert forced.download_version(NEW)
+            assert forced.metrics.installs[-1]['status'] == 'installed'
+            assert (new_dir / "node.exe").stat().st_ino == inode
+            assert os.path.samefile(old_dir / shared, new_dir / shared)
+            
+            # Sem a versão antiga, só o node.exe e o módulo dela ficam sem uso
+            shutil.rmtree(old_dir)
+            result = store.gc()
+            assert result['removed'] == 2
+            stats = store.stats()
+            assert stats['blobs'] == len(CONTENTS[NEW]) and stats['unused'] == 0
+            assert installed_files(new_dir) == CONTENTS[NEW]
+        print(f"✅ Armazenamento compartilhado: {result['removed']} blobs removidos pelo gc")
+    finally:
+        server.shutdown()
+
+
+def test_store_tarball_and_crc():
+    """Tarballs também usam o armazenamento; CRC-32 inválido não grava blob"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = BlobStore(Path(temp_dir) / ".store")
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode='w:gz') as tar:
+            for name, data, mode in (("bin/node", b"\x7fELF", 0o755), ("README.md", b"# node", 0o644),
+                                     ("lib/README.md", b"# node", 0o644)):
+                info = tarfile.TarInfo(f"node-v{NEW}-linux-x64/{name}")
+                info.size, info.mode = len(data), mode
+                tar.addfile(info, io.BytesIO(data))
+        buffer.seek(0)
+        target = Path(temp_dir) / f"v{NEW}"
+        stats = extract_tar_stream(buffer, target, 'gz', store=store)
+        assert stats['files'] == 3
+        assert (target / "bin/node").read_bytes() == b"\x7fELF"
+        assert os.path.samefile(target / "README.md", target / "lib/README.md")
+        if os.name != 'nt':
+            assert os.access(target / "bin/node", os.X_OK)
+            assert not os.access(target / "README.md", os.X_OK)
+        
+        try:
+            store.add(io.BytesIO(b"conteudo"), expected_crc=0)
+            assert False, "CRC-32 inválido deveria falhar"
+        except ValueError:
+            pass
+        assert store.stats()['blobs'] == 2
+        assert not list(store.temp_dir.iterdir())
+    print("✅ Tarball no armazenamento e CRC-32 conferido")
+
+
+def test_store_concurrent_add():
+    """O mesmo conteúdo gravado por várias threads ao mesmo tempo vira um único inode"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = BlobStore(Path(temp_dir) / ".store")
+        contents = [os.urandom(1024) for _ in range(50)]
+        start = threading.Barrier(8)
+        
+        def install(worker):
+            start.wait()
+            destinations = []
+            for index, data in enumerate(contents):
+                destination = Path(temp_dir) / f"w{worker}" / f"{index}.js"
+                destination.parent.mkdir(exist_ok=True)
+                store.link(store.add(io.BytesIO(data)), destination)
+                destinations.append(destination)
+            return destinations
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            installed = list(executor.map(install, range(8)))
+        for index, data in enumerate(contents):
+            blob = store.blob_path(hashlib.sha256(data).hexdigest())
+            assert all(os.path.samefile(blob, destinations[index]) for destinations in installed)
+        assert store.added == len(contents) and store.reused == 7 * len(contents)
+        assert not list(store.temp_dir.iterdir())
+    print("✅ Gravações simultâneas do mesmo conteúdo compartilham o blob")
+
+
+if __name__ == "__main__":
+    test_shared_store()
+    test_store_tarball_and_crc()
+    test_store_concurrent_add()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste da instalação em fluxo de tarballs (Linux/macOS)
+
+Sobe um servidor local com um index.json e um node-v*-linux-x64.tar.xz
+sintético e verifica que o tarball é extraído enquanto é baixado, com a
+pasta de topo removida e os executáveis preservados, inclusive quando a
+conexão cai no meio do arquivo (retomada via Range).
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import hashlib
+import tarfile
+import tempfile
+import threading
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+sys.path.append(os.path.dirname(__file__))
+
+from node import NodeDownloader
+
+VERSION = "20.9.0"
+TOP = f"node-v{VERSION}-linux-x64"
+ETAG = '"tarball-1"'
+INDEX = json.dumps([
+    {"version": f"v{VERSION}", "date": "2023-10-24", "lts": "Iron",
+     "files": ["linux-x64", "win-x64-zip"]},
+]).encode('utf-8')
+
+
+def build_tarball(compression):
+    """Gera um tarball com a estrutura de uma release do Node.js"""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode=f'w:{compression}') as tar:
+        def add(name, data=b'', mode=0o644, type=tarfile.REGTYPE, linkname=''):
+            info = tarfile.TarInfo(f"{TOP}/{name}" if name else TOP)
+            info.type = type
+            info.mode = mode
+            info.linkname = linkname
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data) if data else None)
+        
+        add('', type=tarfile.DIRTYPE, mode=0o755)
+        add('bin', type=tarfile.DIRTYPE, mode=0o755)
+        add('bin/node', os.urandom(2 * 1024 * 1024), mode=0o755)
+        add('lib/node_modules/npm/bin/npm-cli.js', b"console.log('npm')\n", mode=0o755)
+        add('bin/npm', type=tarfile.SYMTYPE, linkname='../lib/node_modules/npm/bin/npm-cli.js')
+        add('README.md', b"# Node.js\n")
+    return buffer.getvalue()
+
+
+class TarballHandler(BaseHTTPRequestHandler):
+    """Servidor de teste: index.json e o tarball, derrubando a primeira conexão"""
+    
+    tarball = b''
+    compression = 'xz'
+    drop_first = False
+    range_requests = 0
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def do_GET(self):
+        body = type(self).tarball
+        if self.path.endswith('/index.json'):
+            self._send(200, INDEX)
+            return
+        if self.path.endswith('/SHASUMS256.txt'):
+            checksum = hashlib.sha256(body).hexdigest()
+            self._send(200, f"{checksum}  {TOP}.tar.{type(self).compression}\n".encode('utf-8'))
+            return
+        
+        match = re.match(r'bytes=(\d+)-', self.headers.get('Range', ''))
+        if match and self.headers.get('If-Range') == ETAG:
+            TarballHandler.range_requests += 1
+            start = int(match.group(1))
+            self._send(206, body[start:], f"bytes {start}-{len(body) - 1}/{len(body)}")
+            return
+        
+        if type(self).drop_first:
+            # Envia metade do arquivo e fecha a conexão
+            type(self).drop_first = False
+            self._send_headers(200, len(body))
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self._send(200, body)
+    
+    def _send(self, status, body, content_range=None):
+        self._send_headers(status, len(body), content_range)
+        self.wfile.write(body)
+    
+    def _send_headers(self, status, length, content_range=None):
+        self.send_response(status)
+        self.send_header('Content-Length', str(length))
+        self.send_header('ETag', ETAG)
+        self.send_header('Accept-Ranges', 'bytes')
+        if content_range:
+            self.send_header('Content-Range', content_range)
+        self.end_headers()
+
+
+def start_server(compression, drop_first=False):
+    """Inicia o servidor de teste em uma porta livre"""
+    handler = type('Handler', (TarballHandler,), {
+        'tarball': build_tarball(compression),
+        'compression': compression,
+        'drop_first': drop_first,
+    })
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def check_install(version_dir):
+    """Confere a estrutura instalada"""
+    assert (version_dir / "bin" / "node").stat().st_size == 2 * 1024 * 1024
+    assert os.access(version_dir / "bin" / "node", os.X_OK)
+    assert (version_dir / "bin" / "npm").is_symlink()
+    assert (version_dir / "bin" / "npm").read_bytes() == b"console.log('npm')\n"
+    assert not (version_dir / TOP).exists()
+
+
+def test_stream_install_xz():
+    """O .tar.xz é baixado e extraído em fluxo, sem arquivo intermediário"""
+    server, base_url = start_server('xz')
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            downloader = NodeDownloader(base_dir=temp_dir, platform="linux-x64", base_url=base_url,
+                                        cache_dir=Path(temp_dir) / "cache")
+            url, filename = downloader.get_download_url(VERSION)
+            assert filename == f"{TOP}.tar.xz"
+            assert url == f"{base_url}v{VERSION}/{filename}"
+            
+            assert downloader.download_version(VERSION)
+            check_install(Path(temp_dir) / f"v{VERSION}")
+            assert not (Path(temp_dir) / ".downloads" / filename).exists()
+        print("✅ Tarball .tar.xz instalado em fluxo")
+    finally:
+        server.shutdown()
+
+
+def test_stream_install_resumes_after_drop():
+    """Queda da conexão no meio do tarball: continua com Range de onde parou"""
+    server, base_url = start_server('gz', drop_first=True)
+    TarballHandler.range_requests = 0
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            version_dir = Path(temp_dir) / f"v{VERSION}"
+            downloader = NodeDownloader(base_dir=temp_dir, platform="linux-x64", base_url=base_url,
+                                        cache_dir=Path(temp_dir) / "cache")
+            url = f"{base_url}v{VERSION}/{TOP}.tar.gz"
+            assert downloader.stream_install(url, version_dir, 'gz')
+            check_install(version_dir)
+            assert TarballHandler.range_requests == 1
+        print("✅ Download em fluxo retomado após queda da conexão")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_stream_install_xz()
+    test_stream_install_resumes_after_drop()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste da linha do tempo no formato Chrome trace (--trace)
+
+Instala uma versão do servidor de benchmark com download segmentado e
+verifica que o arquivo gerado tem os intervalos de cada categoria, as
+threads nomeadas pelo papel e que, sem trace ativo, nada é registrado.
+"""
+
+import os
+import sys
+import json
+import tempfile
+import threading
+from pathlib import Path
+sys.path.append(os.path.dirname(__file__))
+
+import node_trace
+from node import NodeDownloader
+from node_bench import BenchServer, ReleaseTree
+from node_trace import NULL_SPAN, span, start_trace, stop_trace
+
+VERSION = "20.9.0"
+
+
+def test_trace_install():
+    """Intervalos por categoria e trilhas nomeadas por thread"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        tree = ReleaseTree(Path(temp_dir) / "dist", [VERSION], size="4M", files=8).build()
+        server = BenchServer(tree)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            downloader = NodeDownloader(base_dir=Path(temp_dir) / "nvm", base_url=server.url,
+                                        cache_dir="off", connections=2, extract_workers=2,
+                                        platform="win-x64")
+            downloader.show_progress = False
+            trace_path = Path(temp_dir) / "trace.json"
+            
+            start_trace()
+            try:
+                assert downloader.download_version(VERSION)
+            finally:
+                tracer = stop_trace(str(trace_path))
+            assert node_trace._tracer is None
+        finally:
+            server.shutdown()
+            server.server_close()
+        
+        data = json.loads(trace_path.read_text(encoding='utf-8'))
+        events = data['traceEvents']
+        spans = [event for event in events if event['ph'] == 'X']
+        assert len(spans) == len(tracer.events)
+        categories = {event['cat'] for event in spans}
+        assert {'phase', 'http', 'download', 'hash', 'extract', 'publish'} <= categories
+        assert all(event['dur'] >= 0 and event['ts'] >= 0 for event in spans)
+        
+        segments = [event for event in spans if event['cat'] == 'download']
+        assert len(segments) >= 2
+        assert sum(event['args']['bytes'] for event in segments) == tree.archives[VERSION]['bytes']
+        
+        thread_names = {event['args']['name'] for event in events if event['name'] == 'thread_name'}
+        assert any(name.startswith("segment") for name in thread_names)
+        assert any(name.startswith("extract") for name in thread_names)
+    print(f"✅ Trace com {len(spans)} intervalos em {len(thread_names)} threads")
+
+
+def test_trace_disabled():
+    """Sem trace ativo, span() devolve o contexto vazio compartilhado"""
+    assert node_trace._tracer is None
+    with span("nada", 'phase', version=VERSION) as args:
+        args['bytes'] = 1
+    assert span("nada", 'phase') is NULL_SPAN
+    assert stop_trace("nunca-gravado.json") is None
+    assert not os.path.exists("nunca-gravado.json")
+    print("✅ Trace desligado não registra nada")
+
+
+if __name__ == "__main__":
+    test_trace_install()
+    test_trace_disabled()
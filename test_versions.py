@@ -6,7 +6,11 @@ Teste do Node.js Downloader com versões populares
 Este script testa várias versões populares do Node.js
 """
 
-from main_simple import NodeDownloader
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+from node import NodeDownloader
 
 def test_multiple_versions():
     """Testa várias versões populares"""
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Servidor de releases e ZIPs de teste compartilhados pelos test_*.py
+
+Cada teste define as versões publicadas (index.json e ZIPs) em uma
+subclasse de ReleaseHandler e acrescenta só o que é seu: contadores de
+requisições, HTTP/1.1, Range, respostas lentas etc.
+"""
+
+import io
+import os
+import json
+import hashlib
+import zipfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from node_server import parse_range
+
+
+def archive_name(version):
+    """Nome do ZIP de uma versão (ex: "node-v18.17.0-win-x64.zip")"""
+    return f"node-v{version}-win-x64.zip"
+
+
+def build_zip(version, files=None, node_size=128 * 1024, compression=zipfile.ZIP_DEFLATED,
+              directory=False):
+    """
+    Gera um ZIP com a estrutura dos publicados pelo Node.js
+    
+    Args:
+        version (str): Versão (pasta node-vX-win-x64/ no topo)
+        files (dict): Caminho relativo -> conteúdo (None = node.exe aleatório e npm.cmd)
+        node_size (int): Tamanho do node.exe padrão
+        compression (int): Método de compressão dos membros
+        directory (bool): Incluir a entrada da pasta do topo
+    
+    Returns:
+        bytes: Conteúdo do ZIP
+    """
+    if files is None:
+        files = {"node.exe": os.urandom(node_size), "npm.cmd": b"@echo off\r\n"}
+    top = f"node-v{version}-win-x64"
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', compression) as zip_ref:
+        if directory:
+            zip_ref.writestr(f"{top}/", b"")
+        for name, data in files.items():
+            zip_ref.writestr(f"{top}/{name}", data)
+    return buffer.getvalue()
+
+
+def build_index(versions, date="2023-01-01", lts=False):
+    """
+    Gera um index.json com o ZIP win-x64 de cada versão
+    
+    Args:
+        versions (list): Versões, na ordem do índice
+        date (str): Data de publicação
+        lts (str): Codinome LTS ou False
+    
+    Returns:
+        bytes: Conteúdo do index.json
+    """
+    return json.dumps([
+        {"version": f"v{version}", "date": date, "lts": lts, "files": ["win-x64-zip"]}
+        for version in versions
+    ]).encode('utf-8')
+
+
+def shasums(archives):
+    """SHASUMS256.txt com as linhas de vários arquivos (nome -> conteúdo)"""
+    return "".join(f"{hashlib.sha256(data).hexdigest()}  {filename}\n"
+                   for filename, data in archives.items()).encode('utf-8')
+
+
+def installed_files(version_dir):
+    """Conteúdo de todos os arquivos de um diretório, por caminho relativo"""
+    return {path.relative_to(version_dir).as_posix(): path.read_bytes()
+            for path in version_dir.rglob('*') if path.is_file()}
+
+
+class ReleaseHandler(BaseHTTPRequestHandler):
+    """Servidor de teste com index.json, SHASUMS256.txt por versão e os ZIPs"""
+    
+    index = b"[]"
+    archives = {}
+    # Range, Accept-Ranges e ETag nos ZIPs (desligável por teste)
+    ranges = False
+    # Bytes dos ZIPs enviados
+    sent = 0
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def do_HEAD(self):
+        self.do_GET(head=True)
+    
+    def do_GET(self, head=False):
+        name = self.path.rsplit('/', 1)[-1]
+        body = self.release_file(name)
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_body(name, body, head)
+    
+    def release_file(self, name):
+        """
+        Conteúdo de um arquivo publicado
+        
+        Args:
+            name (str): Último segmento do caminho pedido
+        
+        Returns:
+            bytes: Conteúdo ou None se não existir
+        """
+        if name == 'index.json':
+            return self.index
+        if name == 'SHASUMS256.txt':
+            # /vX.Y.Z/SHASUMS256.txt (também com a URL absoluta de um proxy)
+            filename = archive_name(self.path.rsplit('/', 2)[-2][1:])
+            if filename not in self.archives:
+                return None
+            return shasums({filename: self.archives[filename]})
+        return self.archives.get(name)
+    
+    def send_body(self, name, body, head=False):
+        """Envia um arquivo, ou a faixa pedida de um ZIP quando `ranges` está ligado"""
+        is_archive = name in self.archives
+        byte_range = None
+        if is_archive and self.ranges and self.headers.get('Range'):
+            byte_range = parse_range(self.headers['Range'], len(body))
+        start, end = byte_range or (0, len(body) - 1)
+        self.send_response(206 if byte_range else 200)
+        self.send_header('Content-Length', str(end - start + 1))
+        if is_archive and self.ranges:
+            self.send_header('Accept-Ranges', 'bytes')
+            self.send_header('ETag', f'"{hashlib.md5(body).hexdigest()}"')
+        if byte_range:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(body)}')
+        self.end_headers()
+        if not head:
+            self.wfile.write(body[start:end + 1])
+            if is_archive:
+                type(self).sent += end - start + 1
+
+
+def start_server(handler):
+    """
+    Inicia um servidor de teste em uma porta livre
+    
+    Args:
+        handler (type): Classe do handler (ex: subclasse de ReleaseHandler)
+    
+    Returns:
+        tuple: (servidor, URL base terminada em '/')
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"